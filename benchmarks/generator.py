@@ -0,0 +1,144 @@
+""" Deterministic synthetic activity history for benchmarks.
+
+Days are split into working sessions separated by breaks and AFK periods.
+Applications are picked with fixed weights and window titles follow a Zipf
+distribution per application, so a few titles dominate and a long tail of
+titles is seen only once or twice, much like real browser/editor usage.
+The same seed always produces the same rows.
+"""
+import bisect
+import itertools
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from focuswatch.database.models.activity import Activity
+
+# (window_class, weight, title templates); {n} is replaced by a Zipf rank
+APPLICATIONS: List[Tuple[str, float, List[str]]] = [
+  ("firefox", 30, ["GitHub - project-{n}", "Stack Overflow - question {n}",
+                   "YouTube - video {n}", "reddit - thread {n}", "Gmail - message {n}",
+                   "Article {n} - Mozilla Firefox"]),
+  ("code", 25, ["module_{n}.py - focuswatch - Visual Studio Code",
+                "README.md - project-{n} - Visual Studio Code"]),
+  ("kitty", 12, ["vim notes-{n}.md", "~/src/project-{n}", "htop"]),
+  ("Slack", 8, ["Slack - #channel-{n}", "Slack - direct message {n}"]),
+  ("thunderbird", 5, ["Inbox - message {n} - Mozilla Thunderbird"]),
+  ("Spotify", 4, ["Spotify - track {n}"]),
+  ("libreoffice", 4, ["report-{n}.odt - LibreOffice Writer"]),
+  ("obsidian", 4, ["note {n} - Obsidian"]),
+  ("mpv", 3, ["episode-{n}.mkv - mpv"]),
+  ("steam", 2, ["Steam - game {n}"]),
+  ("gimp", 2, ["image-{n}.png - GIMP"]),
+  ("unknown-app-{n}", 1, ["Untitled window {n}"]),
+]
+
+SIZES: Dict[str, int] = {
+  "day": 1,
+  "month": 30,
+  "3years": 3 * 365,
+}
+
+
+class ZipfSampler:
+  """ Samples ranks 1..n with probability proportional to 1 / rank**exponent. """
+
+  def __init__(self, n: int, exponent: float, rng: random.Random):
+    self._rng = rng
+    self._cumulative = list(itertools.accumulate(
+      1.0 / rank ** exponent for rank in range(1, n + 1)))
+
+  def sample(self) -> int:
+    point = self._rng.random() * self._cumulative[-1]
+    return bisect.bisect_left(self._cumulative, point) + 1
+
+
+class ActivityGenerator:
+  """ Generates activity rows as dictionaries ready for a bulk insert.
+
+  Args:
+    seed: Random seed; the same seed always yields the same history.
+    titles_per_app: Number of distinct title ranks per title template.
+    zipf_exponent: Skew of the title distribution.
+    mean_duration: Mean length of a single activity in seconds.
+  """
+
+  def __init__(self,
+               seed: int = 0,
+               titles_per_app: int = 5000,
+               zipf_exponent: float = 1.1,
+               mean_duration: float = 60.0):
+    self._rng = random.Random(seed)
+    self._zipf = ZipfSampler(titles_per_app, zipf_exponent, self._rng)
+    self._mean_duration = mean_duration
+    self._app_weights = list(itertools.accumulate(
+      weight for _, weight, _ in APPLICATIONS))
+
+  def _pick_window(self) -> Tuple[str, str]:
+    point = self._rng.random() * self._app_weights[-1]
+    window_class, _, templates = APPLICATIONS[bisect.bisect_left(
+      self._app_weights, point)]
+    rank = self._zipf.sample()
+    title = self._rng.choice(templates).format(n=rank)
+    return window_class.format(n=rank % 50), title
+
+  def _day(self, day: datetime) -> Iterator[Dict[str, object]]:
+    """ Yield the activities of one day: a few sessions between 08:00 and 23:00. """
+    if day.weekday() >= 5 and self._rng.random() < 0.5:
+      return  # half of the weekends are off
+    current = day + timedelta(hours=8, minutes=self._rng.randint(0, 90))
+    end_of_day = day + timedelta(hours=self._rng.randint(17, 23))
+    while current < end_of_day:
+      session_end = current + \
+          timedelta(minutes=self._rng.randint(30, 150))
+      while current < min(session_end, end_of_day):
+        duration = max(1.0, self._rng.expovariate(1 / self._mean_duration))
+        stop = current + timedelta(seconds=duration)
+        window_class, window_name = self._pick_window()
+        yield {"time_start": current.isoformat(), "time_stop": stop.isoformat(),
+               "window_class": window_class, "window_name": window_name,
+               "category_id": None, "focused": False}
+        current = stop
+      # Break, logged as AFK like the watcher does
+      break_end = current + timedelta(minutes=self._rng.randint(5, 60))
+      yield {"time_start": current.isoformat(), "time_stop": break_end.isoformat(),
+             "window_class": "afk", "window_name": "afk",
+             "category_id": None, "focused": False}
+      current = break_end
+
+  def generate(self, days: int, end: Optional[datetime] = None) -> Iterator[Dict[str, object]]:
+    """ Yield activities for the given number of days ending at the end date (inclusive).
+
+    Args:
+      days: Number of days of history.
+      end: Last day of the history, defaults to 2024-06-30 so results are comparable.
+    """
+    end = (end or datetime(2024, 6, 30)).replace(
+      hour=0, minute=0, second=0, microsecond=0)
+    for offset in range(days - 1, -1, -1):
+      yield from self._day(end - timedelta(days=offset))
+
+
+def populate(engine, days: int, seed: int = 0, chunk_size: int = 10000,
+             end: Optional[datetime] = None) -> int:
+  """ Insert a synthetic history into the activity table.
+
+  Args:
+    engine: SQLAlchemy engine with the FocusWatch schema created.
+    days: Number of days of history.
+    seed: Random seed.
+    chunk_size: Rows per executemany batch.
+    end: Last day of the history.
+
+  Returns:
+    int: The number of inserted rows.
+  """
+  rows = ActivityGenerator(seed).generate(days, end)
+  total = 0
+  with engine.begin() as connection:
+    while chunk := list(itertools.islice(rows, chunk_size)):
+      connection.execute(insert(Activity.__table__), chunk)
+      total += len(chunk)
+  return total
@@ -0,0 +1,304 @@
+""" Benchmark runner for FocusWatch.
+
+Usage:
+  python -m benchmarks.run                         # day and month datasets
+  python -m benchmarks.run --sizes day month 3years --output bench.json
+  python -m benchmarks.run --compare previous.json # flag regressions
+
+Each dataset is generated into a temporary SQLite database, then every
+service aggregate, classify_entry, retroactive categorization and each
+dashboard viewmodel recompute is timed. Results are written as JSON.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.generator import SIZES, ActivityGenerator, populate
+from focuswatch import __version__
+
+END_DATE = datetime(2024, 6, 30)
+
+
+def measure(func: Callable[[], Any], repeat: int, budget: float) -> Dict[str, float]:
+  """ Call func up to repeat times, stopping early once the time budget is spent.
+
+  Returns:
+    Dict[str, float]: runs, min/median/mean/max in milliseconds.
+  """
+  samples: List[float] = []
+  started = time.perf_counter()
+  for _ in range(repeat):
+    start = time.perf_counter()
+    func()
+    samples.append((time.perf_counter() - start) * 1000)
+    if time.perf_counter() - started > budget:
+      break
+  return {
+    "runs": len(samples),
+    "min_ms": min(samples),
+    "median_ms": statistics.median(samples),
+    "mean_ms": statistics.fmean(samples),
+    "max_ms": max(samples),
+  }
+
+
+def _benchmarks(services: Dict[str, Any], days: int) -> Dict[str, Callable[[], Any]]:
+  """ Build the named benchmark callables for a dataset covering days days. """
+  # pylint: disable=import-outside-toplevel
+  from focuswatch.config import Config
+  from focuswatch.utils.query_cache import query_cache
+  from focuswatch.viewmodels.components.focus_breakdown_viewmodel import \
+      FocusBreakdownViewModel
+  from focuswatch.viewmodels.components.period_summary_viewmodel import \
+      PeriodSummaryViewModel
+  from focuswatch.viewmodels.components.timeline_viewmodel import \
+      TimelineViewModel
+  from focuswatch.viewmodels.components.top_applications_card_viewmodel import \
+      TopApplicationsCardViewModel
+  from focuswatch.viewmodels.components.top_categories_card_viewmodel import \
+      TopCategoriesCardViewModel
+  from focuswatch.viewmodels.components.top_titles_card_viewmodel import \
+      TopTitlesCardViewModel
+
+  activity_service = services["activity"]
+  category_service = services["category"]
+  classifier_service = services["classifier"]
+  config = Config()
+
+  day = END_DATE
+  period_start = END_DATE - timedelta(days=days - 1)
+  period_end = END_DATE
+
+  # Window titles to classify, taken from the same distribution as the data
+  generator = ActivityGenerator(seed=1)
+  sample = [row for _, row in zip(range(500), generator.generate(2, END_DATE))]
+
+  timeline = TimelineViewModel(activity_service, category_service, config)
+  timeline.update_period(day, None)
+  top_categories = TopCategoriesCardViewModel(
+    activity_service, category_service, config, period_start, period_end)
+  top_applications = TopApplicationsCardViewModel(
+    activity_service, config, period_start, period_end)
+  top_titles = TopTitlesCardViewModel(
+    activity_service, config, period_start, period_end)
+  focus_breakdown = FocusBreakdownViewModel(
+    activity_service, category_service, config)
+  focus_breakdown.update_period(day, None)
+  period_summary = PeriodSummaryViewModel(
+    activity_service, category_service, config, period_start, period_end, "Month")
+
+  benchmarks = {
+    "ActivityService.get_period_entries": lambda: activity_service.get_period_entries(day),
+    "ActivityService.get_date_entries_class_time_total":
+      lambda: activity_service.get_date_entries_class_time_total(day),
+    "ActivityService.get_period_entries_class_time_total":
+      lambda: activity_service.get_period_entries_class_time_total(period_start, period_end),
+    "ActivityService.get_period_entries_name_time_total":
+      lambda: activity_service.get_period_entries_name_time_total(period_start, period_end),
+    "ActivityService.get_longest_duration_category_id_for_window_class_in_period":
+      lambda: activity_service.get_longest_duration_category_id_for_window_class_in_period(
+        period_start, "firefox", period_end),
+    "ActivityService.get_top_uncategorized_window_classes":
+      activity_service.get_top_uncategorized_window_classes,
+    "ActivityService.get_top_uncategorized_window_names":
+      activity_service.get_top_uncategorized_window_names,
+    "ActivityService.get_top_uncategorized_entries":
+      activity_service.get_top_uncategorized_entries,
+    "ActivityService.get_uncategorized_totals_page":
+      lambda: activity_service.get_uncategorized_totals_page("name", 20, (60.0, "")),
+    "CategoryService.get_date_category_time_totals":
+      lambda: category_service.get_date_category_time_totals(day),
+    "CategoryService.get_period_category_time_totals":
+      lambda: category_service.get_period_category_time_totals(period_start, period_end),
+    "CategoryService.get_period_category_rollup":
+      lambda: category_service.get_period_category_rollup(period_start, period_end),
+    "ClassifierService.classify_entry (500 titles)": lambda: [
+      classifier_service.classify_entry(row["window_class"], row["window_name"])
+      for row in sample],
+    "TimelineViewModel.update_timeline_data": timeline.update_timeline_data,
+    "TopCategoriesCardViewModel.update_top_items": top_categories.update_top_items,
+    "TopApplicationsCardViewModel.update_top_items": top_applications.update_top_items,
+    "TopTitlesCardViewModel.update_top_items": top_titles.update_top_items,
+    "FocusBreakdownViewModel.compute_focus_breakdown": focus_breakdown.compute_focus_breakdown,
+    "PeriodSummaryViewModel.compute_period_summary": period_summary.compute_period_summary,
+  }
+
+  def uncached(func: Callable[[], Any]) -> Callable[[], Any]:
+    def run():
+      query_cache.clear()
+      return func()
+    return run
+
+  # Time the queries themselves, then what revisiting a period costs
+  cached = {f"{name} (cached)": benchmarks[name] for name in (
+    "ActivityService.get_period_entries_class_time_total",
+    "CategoryService.get_period_category_rollup",
+    "TopCategoriesCardViewModel.update_top_items")}
+  return {**{name: uncached(func) for name, func in benchmarks.items()}, **cached}
+
+
+def run_size(size: str, repeat: int, budget: float, seed: int) -> List[Dict[str, Any]]:
+  """ Generate one dataset and run every benchmark against it. """
+  # pylint: disable=import-outside-toplevel
+  from sqlalchemy import create_engine
+
+  from focuswatch.database.database_connection import DatabaseConnection
+  from focuswatch.database.database_manager import DatabaseManager
+  from focuswatch.database.models import Base
+  from focuswatch.services.activity_service import ActivityService
+  from focuswatch.services.categorization_service import \
+      CategorizationService
+  from focuswatch.services.category_service import CategoryService
+  from focuswatch.services.classifier_service import ClassifierService
+  from focuswatch.services.export_service import ExportService
+  from focuswatch.services.import_service import ImportService
+  from focuswatch.services.keyword_service import KeywordService
+  from focuswatch.services.sync_service import SyncService
+  from focuswatch.utils.instrumentation import metrics
+
+  days = SIZES[size]
+  results = []
+  with tempfile.TemporaryDirectory() as temp_dir:
+    DatabaseConnection._initialize_engine(  # pylint: disable=protected-access
+      os.path.join(temp_dir, "benchmark.sqlite"))
+    try:
+      DatabaseManager()
+      db_conn = DatabaseConnection()
+      rows = populate(db_conn.engine, days, seed=seed, end=END_DATE)
+      print(f"[{size}] generated {rows} activities over {days} days", file=sys.stderr)
+
+      keyword_service = KeywordService()
+      services = {
+        "activity": ActivityService(),
+        "category": CategoryService(keyword_service=keyword_service),
+      }
+      services["classifier"] = ClassifierService(
+        services["category"], keyword_service)
+
+      def record(name: str, stats: Dict[str, float]) -> None:
+        results.append({"size": size, "rows": rows, "benchmark": name, **stats})
+        median, runs = stats["median_ms"], stats["runs"]
+        checkouts, pings = stats.get("checkouts_per_run", 0), stats.get("pings_per_run", 0)
+        print(f"[{size}] {name:<80} median {median:10.2f} ms"
+              f" ({runs} runs, {checkouts:.0f} checkouts, {pings:.0f} pings)", file=sys.stderr)
+
+      def measure_pool(func: Callable[[], Any], runs: int) -> Dict[str, float]:
+        """ measure, with the connection checkouts and pings per run. """
+        before = metrics.snapshot()["counters"]
+        stats = measure(func, runs, budget)
+        after = metrics.snapshot()["counters"]
+        for counter in ("checkouts", "pings"):
+          stats[f"{counter}_per_run"] = (after.get(f"db.{counter}", 0) -
+                                         before.get(f"db.{counter}", 0)) / stats["runs"]
+        return stats
+
+      # Runs once: it categorizes the freshly generated, uncategorized history
+      categorization = CategorizationService(
+        services["activity"], services["classifier"])
+      record("CategorizationService.retroactive_categorization",
+             measure_pool(categorization.retroactive_categorization, 1))
+
+      for name, func in _benchmarks(services, days).items():
+        record(name, measure_pool(func, repeat))
+
+      export_path = os.path.join(temp_dir, "export.csv")
+      export_service = ExportService()
+      record("ExportService.export (csv)",
+             measure(lambda: export_service.export(export_path), repeat, budget))
+      # Every exported row is already stored: measures parsing and deduplication
+      import_service = ImportService(classifier_service=services["classifier"])
+      record("ImportService.import_file (csv, re-import)",
+             measure(lambda: import_service.import_file(export_path), 1, budget))
+
+      # A second device with its own history of the same size, merged once
+      peer_path = os.path.join(temp_dir, "peer.sqlite")
+      peer_engine = create_engine(f"sqlite:///{peer_path}")
+      Base.metadata.create_all(peer_engine)
+      populate(peer_engine, days, seed=seed + 1, end=END_DATE)
+      peer_engine.dispose()
+      sync_service = SyncService()
+      record("SyncService.sync_file (first merge)",
+             measure(lambda: sync_service.sync_file(peer_path), 1, budget))
+    finally:
+      DatabaseConnection().close_engine()
+  return results
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> int:
+  """ Print benchmarks that got slower than the baseline by more than threshold.
+
+  Returns:
+    int: The number of regressions.
+  """
+  with open(baseline_path, encoding="utf-8") as baseline_file:
+    baseline = {(r["size"], r["benchmark"]): r
+                for r in json.load(baseline_file)["results"]}
+  regressions = 0
+  for result in results:
+    previous = baseline.get((result["size"], result["benchmark"]))
+    if not previous or previous["median_ms"] <= 0:
+      continue
+    ratio = result["median_ms"] / previous["median_ms"]
+    if ratio > 1 + threshold:
+      regressions += 1
+      size, name = result["size"], result["benchmark"]
+      before, after = previous["median_ms"], result["median_ms"]
+      print(f"REGRESSION [{size}] {name}: {before:.2f} ms -> {after:.2f} ms ({ratio:.2f}x)")
+  return regressions
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+  parser = argparse.ArgumentParser(description="Run the FocusWatch benchmarks.")
+  parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["day", "month"],
+                      help="Datasets to generate (default: day month).")
+  parser.add_argument("--repeat", type=int, default=5,
+                      help="Maximum runs per benchmark.")
+  parser.add_argument("--budget", type=float, default=10.0,
+                      help="Seconds after which a benchmark stops repeating.")
+  parser.add_argument("--seed", type=int, default=0, help="Generator seed.")
+  parser.add_argument("--output", default="bench_output.json",
+                      help="Where to write the JSON results.")
+  parser.add_argument("--compare", metavar="BASELINE",
+                      help="Previous JSON results to compare against.")
+  parser.add_argument("--threshold", type=float, default=0.2,
+                      help="Relative slowdown reported as a regression (default: 0.2).")
+  return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+  args = parse_arguments(argv)
+  results = []
+  for size in args.sizes:
+    results.extend(run_size(size, args.repeat, args.budget, args.seed))
+
+  report = {
+    "meta": {
+      "focuswatch_version": __version__,
+      "python": platform.python_version(),
+      "platform": platform.platform(),
+      "sqlite": sqlite3.sqlite_version,
+      "timestamp": datetime.now().isoformat(timespec="seconds"),
+      "seed": args.seed,
+      "repeat": args.repeat,
+    },
+    "results": results,
+  }
+  with open(args.output, "w", encoding="utf-8") as output_file:
+    json.dump(report, output_file, indent=2)
+  print(f"Results written to {args.output}", file=sys.stderr)
+
+  if args.compare:
+    return 1 if compare(results, args.compare, args.threshold) else 0
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
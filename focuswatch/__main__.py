@@ -6,22 +6,7 @@ import shutil
 import sys
 import threading
 
-from PySide6.QtGui import QAction, QIcon
-from PySide6.QtWidgets import QApplication, QMenu, QMessageBox, QSystemTrayIcon
-
-from focuswatch.arguments import parse_arguments
-from focuswatch.config import Config
-from focuswatch.database.database_manager import DatabaseManager
-from focuswatch.logger import setup_logging
-from focuswatch.services.activity_service import ActivityService
-from focuswatch.services.category_service import CategoryService
-from focuswatch.services.classifier_service import ClassifierService
-from focuswatch.services.keyword_service import KeywordService
-from focuswatch.services.watcher_service import WatcherService
-from focuswatch.utils.resource_utils import apply_stylesheet
-from focuswatch.viewmodels.main_viewmodel import MainViewModel
-from focuswatch.viewmodels.mainwindow_viewmodel import MainWindowViewModel
-from focuswatch.views.mainwindow_view import MainWindowView
+from focuswatch.utils.profiling_utils import StartupProfiler
 
 # from qt_material import apply_stylesheet
 
@@ -54,20 +39,110 @@ def check_dependencies():
   logger.info("Dependencies are met.")
 
 
+class LazyMainWindow:
+  """ Builds the main window and its viewmodels on first show.
+
+  The dashboard viewmodels run their initial queries in __init__, so nothing
+  window related is imported or constructed until the window is requested.
+  """
+
+  def __init__(self, factory, profiler: StartupProfiler):
+    self._factory = factory
+    self._profiler = profiler
+    self._window = None
+
+  @property
+  def window(self):
+    """ The main window, or None if it has not been built yet. """
+    return self._window
+
+  def show(self) -> None:
+    """ Show the main window, building it first if needed. """
+    if self._window is None:
+      self._window = self._factory()
+      if self._profiler.reported:
+        # Window built after the startup report, print it again with the deferred stages
+        self._profiler.report()
+    self._window.show()
+
+  def toggle(self) -> None:
+    """ Hide the main window if visible, show it otherwise. """
+    if self._window is not None and self._window.isVisible():
+      self._window.hide()
+    else:
+      self.show()
+
+
+def create_main_window(profiler: StartupProfiler,
+                       watcher_service,
+                       activity_service,
+                       category_service,
+                       keyword_service,
+                       classifier_service):
+  """ Import and construct the viewmodels and the main window. """
+  with profiler.stage("viewmodels", kind="import"):
+    from focuswatch.viewmodels.main_viewmodel import MainViewModel
+    from focuswatch.viewmodels.mainwindow_viewmodel import MainWindowViewModel
+  with profiler.stage("views", kind="import"):
+    from focuswatch.views.mainwindow_view import MainWindowView
+
+  with profiler.stage("MainViewModel"):
+    main_viewmodel = MainViewModel(
+      watcher_service, activity_service, category_service, keyword_service)
+  with profiler.stage("MainWindowViewModel"):
+    mainwindow_viewmodel = MainWindowViewModel(
+        main_viewmodel, activity_service, category_service, keyword_service, classifier_service)
+  with profiler.stage("MainWindowView"):
+    main_window = MainWindowView(mainwindow_viewmodel)
+  return main_window
+
+
 def main():
+  profiler = StartupProfiler()
+
   logger.info("Starting FocusWatch")
   check_dependencies()
+
+  with profiler.stage("config, logging, arguments", kind="import"):
+    from focuswatch.arguments import parse_arguments
+    from focuswatch.config import Config
+    from focuswatch.logger import setup_logging
   setup_logging()
   args = parse_arguments()
+  profiler.enabled = args.profile_startup
+
+  if args.daemon:
+    # Headless mode, PySide6 is never imported
+    from focuswatch.daemon import run_daemon
+    sys.exit(run_daemon(
+      args.watch_interval if args.watch_interval else None,
+      args.verbose if args.verbose else None))
+
+  with profiler.stage("database, services", kind="import"):
+    from focuswatch.database.database_manager import DatabaseManager
+    from focuswatch.services.activity_service import ActivityService
+    from focuswatch.services.category_service import CategoryService
+    from focuswatch.services.change_log_service import ChangeLogService
+    from focuswatch.services.classifier_service import ClassifierService
+    from focuswatch.services.keyword_service import KeywordService
+    from focuswatch.services.watcher_service import WatcherService
+  with profiler.stage("PySide6", kind="import"):
+    from PySide6.QtGui import QAction, QIcon
+    from PySide6.QtWidgets import (QApplication, QMenu, QMessageBox,
+                                   QSystemTrayIcon)
+
+    from focuswatch.utils.resource_utils import apply_stylesheet
 
   # Instantiate the DatabaseManager and check if the database exists
-  _ = DatabaseManager()
+  with profiler.stage("DatabaseManager"):
+    _ = DatabaseManager()
 
   logger.info("Creating QApplication")
-  app = QApplication([])
+  with profiler.stage("QApplication"):
+    app = QApplication([])
 
-  # TODO theme.qss ?
-  apply_stylesheet(app, "mainwindow.qss")
+    # TODO theme.qss ?
+    apply_stylesheet(app, "mainwindow.qss")
 
   if not QSystemTrayIcon.isSystemTrayAvailable():
     # TODO retry - in wms like dwm tray might be not immediately available
@@ -85,42 +160,43 @@ def main():
 
   # Create the system tray
   logger.info("Creating the system tray")
-  tray = QSystemTrayIcon()
-  tray.setIcon(icon)
-  tray.setVisible(True)
-
-  # Create the menu
-  menu = QMenu()
-
-  # Create Services, ViewModels and MainWindowView
-  activity_service = ActivityService()
-  category_service = CategoryService()
-  keyword_service = KeywordService()
-  classifier_service = ClassifierService(category_service, keyword_service)
-
-  watcher_service = WatcherService(
-    activity_service,
-    category_service,
-    classifier_service,
-    args.watch_interval if args.watch_interval else None,
-    args.verbose if args.verbose else None, )
-
-  main_viewmodel = MainViewModel(
-    watcher_service, activity_service, category_service, keyword_service)
-
-  mainwindow_viewmodel = MainWindowViewModel(
-      main_viewmodel, activity_service, category_service, keyword_service, classifier_service)
-  main_window = MainWindowView(mainwindow_viewmodel)
+  with profiler.stage("System tray"):
+    tray = QSystemTrayIcon()
+    tray.setIcon(icon)
+    tray.setVisible(True)
+
+    # Create the menu
+    menu = QMenu()
+
+  # Create Services, the main window is built lazily on first show
+  with profiler.stage("Services"):
+    activity_service = ActivityService()
+    category_service = CategoryService()
+    keyword_service = KeywordService()
+    classifier_service = ClassifierService(category_service, keyword_service)
+
+  with profiler.stage("WatcherService"):
+    watcher_service = WatcherService(
+      activity_service,
+      category_service,
+      classifier_service,
+      args.watch_interval if args.watch_interval else None,
+      args.verbose if args.verbose else None,
+      change_log_service=ChangeLogService())
+
+  main_window = LazyMainWindow(
+    lambda: create_main_window(profiler, watcher_service, activity_service,
+                               category_service, keyword_service, classifier_service),
+    profiler)
 
   # Add actions to the menu
   open_mainwindow = QAction("Open")
-  open_mainwindow .triggered.connect(main_window.show)
+  open_mainwindow.triggered.connect(main_window.show)
   menu.addAction(open_mainwindow)
 
-  # Open or hide home on double-click
+  # Open or hide home on click
   tray.activated.connect(
-      lambda reason: main_window.hide() if reason == QSystemTrayIcon.Trigger and main_window.isVisible()
-      else main_window.show() if reason == QSystemTrayIcon.Trigger else None
+      lambda reason: main_window.toggle() if reason == QSystemTrayIcon.Trigger else None
   )
 
   # Logs action
@@ -143,9 +219,15 @@ def main():
   watcher_thread.start()
 
   config = Config()
+  if config["api"]["enabled"]:
+    from focuswatch.api_server import start_api_server
+    start_api_server(config)
+
   if not config["general"]["start_minimized"]:
     main_window.show()
 
+  profiler.report()
+
   sys.exit(app.exec())
 
 
@@ -0,0 +1,422 @@
+""" Local read-only HTTP API for FocusWatch.
+
+Serves the period aggregates as JSON on localhost so scripts and dashboards
+can read them without touching the database. The server runs an asyncio loop
+on a background thread and answers GET requests only:
+
+  /api/summary         total, focused and per category seconds
+  /api/categories      category rollup, see CategoryService.get_period_category_rollup
+  /api/top/apps        window classes by time spent
+  /api/top/titles      normalized window titles by time spent
+  /api/activities      the raw activities, streamed as a JSON array
+
+Every endpoint takes start and end dates (YYYY-MM-DD, both default to today),
+the top endpoints a limit. Responses carry an ETag derived from the change log,
+a request with a matching If-None-Match is answered 304 without querying.
+Requests whose Host header is not this server are answered 421, so that web
+pages cannot read the data through DNS rebinding.
+"""
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from focuswatch.config import Config
+from focuswatch.services.activity_service import ActivityService
+from focuswatch.services.category_service import CategoryService
+from focuswatch.services.change_log_service import ChangeLogService
+from focuswatch.services.export_service import ExportService
+
+logger = logging.getLogger(__name__)
+
+
+class ApiQuery(NamedTuple):
+  """ Parsed query parameters of a request. """
+  start: datetime
+  end: datetime
+  limit: int
+
+
+class ApiServer:
+  """ Serves the aggregates of the service layer over HTTP on localhost. """
+  HOST = "127.0.0.1"
+  # Host header names of the server, with its port
+  ALLOWED_HOSTS = ("127.0.0.1", "localhost")
+  DATE_FORMAT = "%Y-%m-%d"
+  REQUEST_TIMEOUT = 10.0  # seconds to receive the request line and headers
+  MAX_HEADERS = 100
+  DEFAULT_LIMIT = 10
+  MAX_LIMIT = 1000
+  ACTIVITIES_PATH = "/api/activities"
+  STREAM_CHUNK_SIZE = 1000
+
+  def __init__(self,
+               port: Optional[int] = None,
+               activity_service: Optional[ActivityService] = None,
+               category_service: Optional[CategoryService] = None,
+               export_service: Optional[ExportService] = None,
+               change_log_service: Optional[ChangeLogService] = None,
+               config: Optional[Config] = None):
+    """ Initialize the ApiServer.
+
+    Args:
+      port: Port to listen on, 0 for any free port. Taken from the config if None.
+      activity_service: Optional ActivityService instance for dependency injection.
+      category_service: Optional CategoryService instance for dependency injection.
+      export_service: Optional ExportService instance for dependency injection.
+      change_log_service: Optional ChangeLogService instance for dependency injection.
+      config: Optional Config instance for dependency injection.
+    """
+    self._config = config or Config()
+    self._port = int(self._config["api"]["port"]) if port is None else port
+    self._activity_service = activity_service or ActivityService()
+    self._category_service = category_service or CategoryService()
+    self._export_service = export_service or ExportService()
+    self._change_log_service = change_log_service or ChangeLogService()
+    self._routes: Dict[str, Callable[[ApiQuery], Dict[str, Any]]] = {
+      "/api/summary": self._summary,
+      "/api/categories": self._categories,
+      "/api/top/apps": self._top_apps,
+      "/api/top/titles": self._top_titles,
+    }
+    self._loop: Optional[asyncio.AbstractEventLoop] = None
+    self._server: Optional[asyncio.AbstractServer] = None
+    self._thread: Optional[threading.Thread] = None
+
+  @property
+  def port(self) -> int:
+    """ The port the server listens on, resolved once started. """
+    return self._port
+
+  def start(self) -> bool:
+    """ Start serving on a background thread.
+
+    Returns:
+      bool: True if the server is listening, False otherwise.
+    """
+    if self._thread is not None:
+      return self._server is not None
+    ready = threading.Event()
+    self._thread = threading.Thread(
+      target=self._run, args=(ready,), name="api_server", daemon=True)
+    self._thread.start()
+    ready.wait()
+    if self._server is None:
+      self._thread.join()
+      self._thread = None
+      return False
+    return True
+
+  def stop(self) -> None:
+    """ Stop the server, pending requests are cancelled. """
+    if self._thread is None:
+      return
+    self._loop.call_soon_threadsafe(self._loop.stop)
+    self._thread.join()
+    self._thread = None
+
+  def _run(self, ready: threading.Event) -> None:
+    """ Run the event loop of the server until stop is called. """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+      self._server = loop.run_until_complete(
+        asyncio.start_server(self._handle_connection, self.HOST, self._port))
+    except OSError as e:
+      logger.error(f"Failed to start the API server on {self.HOST}:{self._port}: {e}")
+      loop.close()
+      ready.set()
+      return
+
+    self._loop = loop
+    self._port = self._server.sockets[0].getsockname()[1]
+    logger.info(f"API server listening on http://{self.HOST}:{self._port}")
+    ready.set()
+    try:
+      loop.run_forever()
+    finally:
+      self._server.close()
+      tasks = asyncio.all_tasks(loop)
+      for task in tasks:
+        task.cancel()
+      loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+      loop.run_until_complete(loop.shutdown_default_executor())
+      loop.close()
+      self._server = None
+      self._loop = None
+      logger.info("API server stopped")
+
+  async def _handle_connection(self,
+                               reader: asyncio.StreamReader,
+                               writer: asyncio.StreamWriter) -> None:
+    """ Answer a single request, the connection is closed afterwards. """
+    try:
+      request = await asyncio.wait_for(self._read_request(reader), self.REQUEST_TIMEOUT)
+      if request is None:
+        await self._send_error(writer, HTTPStatus.BAD_REQUEST, "Malformed request")
+      else:
+        await self._respond(writer, *request)
+    except (asyncio.TimeoutError, ConnectionError, ValueError):
+      pass  # timed out, client gone or a line over the stream limit
+    except asyncio.CancelledError:
+      pass  # the server is stopping, finish quietly so the connection is closed
+    finally:
+      writer.close()
+      with contextlib.suppress(ConnectionError):
+        await writer.wait_closed()
+
+  async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str]]]:
+    """ Read the request line and headers.
+
+    Returns:
+      Optional[Tuple[str, str, Dict[str, str]]]: (method, target, headers with
+      lowercase names), None if the request is malformed.
+    """
+    parts = (await reader.readline()).decode("latin-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+      return None
+    headers = {}
+    for _ in range(self.MAX_HEADERS):
+      line = (await reader.readline()).decode("latin-1").strip()
+      if not line:
+        return parts[0], parts[1], headers
+      name, separator, value = line.partition(":")
+      if not separator:
+        return None
+      headers[name.strip().lower()] = value.strip()
+    return None
+
+  async def _respond(self,
+                     writer: asyncio.StreamWriter,
+                     method: str,
+                     target: str,
+                     headers: Dict[str, str]) -> None:
+    """ Route a request and write its response. """
+    if not self._is_allowed_host(headers.get("host")):
+      await self._send_error(writer, HTTPStatus.MISDIRECTED_REQUEST, "Unknown host")
+      return
+    if method != "GET":
+      await self._send_error(writer, HTTPStatus.METHOD_NOT_ALLOWED,
+                             f"Method {method} not allowed", {"Allow": "GET"})
+      return
+    url = urlsplit(target)
+    path = url.path.rstrip("/")
+    handler = self._routes.get(path)
+    if handler is None and path != self.ACTIVITIES_PATH:
+      await self._send_error(writer, HTTPStatus.NOT_FOUND, f"Unknown path {url.path}")
+      return
+    try:
+      query = self._parse_query(url.query)
+    except ValueError as e:
+      await self._send_error(writer, HTTPStatus.BAD_REQUEST, str(e))
+      return
+
+    loop = asyncio.get_running_loop()
+    etag = await loop.run_in_executor(None, self._etag, path, query)
+    response_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if self._etag_matches(headers.get("if-none-match"), etag):
+      await self._send(writer, HTTPStatus.NOT_MODIFIED, b"", response_headers)
+      return
+
+    if handler is None:
+      await self._stream_activities(writer, query, response_headers)
+      return
+    try:
+      body = await loop.run_in_executor(None, handler, query)
+    except SQLAlchemyError as e:
+      logger.error(f"Failed to answer {target}: {e}")
+      await self._send_error(writer, HTTPStatus.INTERNAL_SERVER_ERROR, "Database error")
+      return
+    await self._send(writer, HTTPStatus.OK, self._encode(body), response_headers)
+
+  def _is_allowed_host(self, host: Optional[str]) -> bool:
+    """ Whether a Host header names this server, e.g. localhost:<port>. """
+    return host is not None and host.lower() in (
+      f"{name}:{self._port}" for name in self.ALLOWED_HOSTS)
+
+  def _parse_query(self, query_string: str) -> ApiQuery:
+    """ Parse the start, end and limit parameters, unknown parameters are ignored.
+
+    Raises:
+      ValueError: If a parameter is invalid.
+    """
+    params = {key: values[-1] for key, values in parse_qs(query_string).items()}
+    today = datetime.now().strftime(self.DATE_FORMAT)
+    try:
+      start = datetime.strptime(params.get("start", today), self.DATE_FORMAT)
+      end = datetime.strptime(params.get("end", params.get("start", today)), self.DATE_FORMAT)
+    except ValueError as e:
+      raise ValueError("start and end must be dates formatted as YYYY-MM-DD") from e
+    if end < start:
+      raise ValueError("end must not be before start")
+    try:
+      limit = int(params.get("limit", self.DEFAULT_LIMIT))
+    except ValueError as e:
+      raise ValueError("limit must be an integer") from e
+    if not 1 <= limit <= self.MAX_LIMIT:
+      raise ValueError(f"limit must be between 1 and {self.MAX_LIMIT}")
+    return ApiQuery(start, end, limit)
+
+  def _etag(self, path: str, query: ApiQuery) -> str:
+    """ Return the entity tag of a response.
+
+    Any write to the activities or categories appends to the change log, so
+    the latest sequence number changes whenever a response could. The
+    heartbeats of the open activity are not logged, its time_stop is added.
+    """
+    parts = [path, query.start.date().isoformat(), query.end.date().isoformat(),
+             str(self._change_log_service.latest_sequence()),
+             self._activity_service.get_open_activity_time_stop() or ""]
+    if path.startswith("/api/top/"):
+      parts.append(str(query.limit))
+    if path == "/api/top/titles":
+      parts.append(json.dumps(dict(self._config["title_normalization"]), sort_keys=True))
+    return '"' + hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()[:20] + '"'
+
+  @staticmethod
+  def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """ Whether an If-None-Match header matches the entity tag, weak tags included. """
+    if not if_none_match:
+      return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+  def _summary(self, query: ApiQuery) -> Dict[str, Any]:
+    categories = {category.id: category for category in self._category_service.get_all_categories()}
+    category_totals = self._category_service.get_period_category_time_totals(query.start, query.end)
+    class_totals = self._activity_service.get_period_entries_class_time_total(query.start, query.end)
+    return {
+      **self._period(query),
+      "total_seconds": sum(seconds for _, _, seconds in class_totals),
+      "focused_seconds": sum(seconds for category_id, seconds in category_totals
+                             if category_id in categories and categories[category_id].focused),
+      "categories": [
+        {"id": category_id,
+         "name": categories[category_id].name if category_id in categories else None,
+         "seconds": seconds}
+        for category_id, seconds in category_totals],
+    }
+
+  def _categories(self, query: ApiQuery) -> Dict[str, Any]:
+    rollup = self._category_service.get_period_category_rollup(query.start, query.end)
+    return {
+      **self._period(query),
+      "categories": [
+        {"id": category.id,
+         "name": category.name,
+         "parent_category_id": category.parent_category_id,
+         "color": category.color,
+         "focused": bool(category.focused),
+         "seconds": self_seconds,
+         "total_seconds": total_seconds}
+        for category, self_seconds, total_seconds in rollup],
+    }
+
+  def _top_apps(self, query: ApiQuery) -> Dict[str, Any]:
+    totals = self._activity_service.get_period_entries_class_time_total(query.start, query.end)
+    return {**self._period(query), "apps": self._top(totals, "window_class", query.limit)}
+
+  def _top_titles(self, query: ApiQuery) -> Dict[str, Any]:
+    totals = self._activity_service.get_period_entries_name_time_total(query.start, query.end)
+    return {**self._period(query), "titles": self._top(totals, "window_name", query.limit)}
+
+  async def _stream_activities(self,
+                               writer: asyncio.StreamWriter,
+                               query: ApiQuery,
+                               headers: Dict[str, str]) -> None:
+    """ Write the activities of a period as a chunked JSON array.
+
+    Rows are fetched STREAM_CHUNK_SIZE at a time on the executor and written
+    as they arrive, so long ranges are served in constant memory. A database
+    error after the first chunk aborts the response without the final chunk.
+    """
+    loop = asyncio.get_running_loop()
+    records = self._export_service.iter_records(query.start, query.end, self.STREAM_CHUNK_SIZE)
+    try:
+      chunk = await loop.run_in_executor(None, next, records, None)
+    except SQLAlchemyError as e:
+      logger.error(f"Failed to stream activities: {e}")
+      await self._send_error(writer, HTTPStatus.INTERNAL_SERVER_ERROR, "Database error")
+      return
+
+    self._write_head(writer, HTTPStatus.OK, {**headers, "Transfer-Encoding": "chunked"})
+    separator = b"["
+    try:
+      while chunk is not None:
+        for record in chunk:
+          self._write_chunk(writer, separator + self._encode(record))
+          separator = b","
+        await writer.drain()
+        chunk = await loop.run_in_executor(None, next, records, None)
+      self._write_chunk(writer, b"]" if separator == b"," else b"[]")
+      writer.write(b"0\r\n\r\n")
+      await writer.drain()
+    except SQLAlchemyError as e:
+      logger.error(f"Failed to stream activities: {e}")
+    finally:
+      await loop.run_in_executor(None, records.close)
+
+  @staticmethod
+  def _top(totals: List[Tuple[str, Optional[int], int]], key: str, limit: int) -> List[Dict[str, Any]]:
+    return [{key: name, "category_id": category_id, "seconds": seconds}
+            for name, category_id, seconds in totals[:limit]]
+
+  @staticmethod
+  def _period(query: ApiQuery) -> Dict[str, str]:
+    return {"start": query.start.date().isoformat(), "end": query.end.date().isoformat()}
+
+  @staticmethod
+  def _encode(body: Any) -> bytes:
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+  @staticmethod
+  def _write_head(writer: asyncio.StreamWriter, status: HTTPStatus, headers: Dict[str, str]) -> None:
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}",
+             "Content-Type: application/json; charset=utf-8",
+             "Connection: close"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+  @staticmethod
+  def _write_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+    writer.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+  async def _send(self,
+                  writer: asyncio.StreamWriter,
+                  status: HTTPStatus,
+                  body: bytes,
+                  headers: Optional[Dict[str, str]] = None) -> None:
+    headers = dict(headers or {})
+    if status != HTTPStatus.NOT_MODIFIED:
+      headers["Content-Length"] = str(len(body))
+    self._write_head(writer, status, headers)
+    writer.write(body)
+    await writer.drain()
+
+  async def _send_error(self,
+                        writer: asyncio.StreamWriter,
+                        status: HTTPStatus,
+                        message: str,
+                        headers: Optional[Dict[str, str]] = None) -> None:
+    await self._send(writer, status, self._encode({"error": message}), headers)
+
+
+def start_api_server(config: Optional[Config] = None) -> Optional[ApiServer]:
+  """ Start the API server if it is enabled in the config.
+
+  Returns:
+    Optional[ApiServer]: The running server, None if disabled or it failed to start.
+  """
+  config = config or Config()
+  if not config["api"]["enabled"]:
+    return None
+  server = ApiServer(config=config)
+  return server if server.start() else None
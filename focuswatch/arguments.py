@@ -1,11 +1,10 @@
 """ Command line arguments for the focuswatch application. """
 import argparse
 import sys
+from datetime import datetime
 
 from focuswatch import __version__
 from focuswatch.config import Config
-from focuswatch.services.category_service import CategoryService
-from focuswatch.services.keyword_service import KeywordService
 
 
 def display_config():
@@ -21,6 +20,7 @@ def display_config():
 
 def display_categories():
   """ Display all categories from the database """
+  from focuswatch.services.category_service import CategoryService  # pylint: disable=import-outside-toplevel
   category_service = CategoryService()
   categories = category_service.get_all_categories()
   print(f"{"id".ljust(4)}{"name".ljust(15)}{"parent category".ljust(4)}")
@@ -33,6 +33,7 @@ def display_categories():
 
 def add_category(category):
   """ Add a category to the database """
+  from focuswatch.services.category_service import CategoryService  # pylint: disable=import-outside-toplevel
   category_name, parent_category = category[0], int(category[1]) if len(
     category) > 1 else None
   category_service = CategoryService()
@@ -44,6 +45,7 @@ def add_category(category):
 
 def display_keywords():
   """ Display all keywords from the database """
+  from focuswatch.services.keyword_service import KeywordService  # pylint: disable=import-outside-toplevel
   keyword_service = KeywordService()
   keywords = keyword_service.get_all_keywords()
   print(f"{"id".ljust(4)}{"name".ljust(15)}{"category_id".ljust(4)}")
@@ -56,6 +58,7 @@ def display_keywords():
 
 def add_keyword(keyword):
   """ Add a keyword to the database """
+  from focuswatch.services.keyword_service import KeywordService  # pylint: disable=import-outside-toplevel
   keyword_service = KeywordService()
   if keyword_service.add_keyword(keyword[0], keyword[1]):
     display_keywords()
@@ -63,6 +66,68 @@ def add_keyword(keyword):
     print("Error adding a keyword")
 
 
+def export_activities(file_path, period_start=None, period_end=None):
+  """ Export the activity history to a CSV, JSONL or Parquet file """
+  from focuswatch.services.export_service import ExportService  # pylint: disable=import-outside-toplevel
+
+  def print_progress(exported, total):
+    print(f"\rExported {exported}/{total} activities", end="", file=sys.stderr)
+
+  exported = ExportService().export(file_path, period_start=period_start, period_end=period_end,
+                                    progress_callback=print_progress)
+  print(file=sys.stderr)
+  if exported is None:
+    print("Error exporting activities")
+    return 1
+  print(f"Exported {exported} activities to {file_path}")
+  return 0
+
+
+def import_activities(file_path):
+  """ Import activities from a FocusWatch export or an ActivityWatch export """
+  # pylint: disable=import-outside-toplevel
+  from focuswatch.database.database_manager import DatabaseManager
+  from focuswatch.services.import_service import ImportService
+
+  DatabaseManager()  # the history may be imported into a new database
+
+  def print_progress(read, total):
+    print(f"\rRead {read}/{total} records", end="", file=sys.stderr)
+
+  result = ImportService().import_file(file_path, progress_callback=print_progress)
+  print(file=sys.stderr)
+  if result is None:
+    print("Error importing activities")
+    return 1
+  print(f"Imported {result.imported} activities from {file_path} "
+        f"({result.skipped} of {result.read} records skipped)")
+  return 0
+
+
+def sync_database(file_path):
+  """ Merge the activities of another FocusWatch database """
+  # pylint: disable=import-outside-toplevel
+  from focuswatch.database.database_manager import DatabaseManager
+  from focuswatch.services.sync_service import SyncService
+
+  DatabaseManager()
+  result = SyncService().sync_file(file_path)
+  if result is None:
+    print("Error syncing activities")
+    return 1
+  print(f"Merged {result.inserted} activities from {file_path} "
+        f"({result.duplicates} duplicates skipped, {result.updated} updated, {result.deleted} deleted)")
+  return 0
+
+
+def parse_date(value):
+  """ Parse a YYYY-MM-DD date argument """
+  try:
+    return datetime.strptime(value, "%Y-%m-%d")
+  except ValueError as e:
+    raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD") from e
+
+
 def parse_arguments():
   """ Parse the arguments """
   parser = argparse.ArgumentParser(
@@ -76,6 +141,7 @@ def parse_arguments():
   general_parser = parser.add_argument_group("General")
   categories_parser = parser.add_argument_group("Categories")
   keywords_parser = parser.add_argument_group("Keywords")
+  data_parser = parser.add_argument_group("Data")
   config_parser = parser.add_argument_group("Config")
 
   # General arguments
@@ -85,6 +151,13 @@ def parse_arguments():
                               help="Watcher interval", type=float)
   general_parser.add_argument("-v", "--verbose", action="store_true",
                               help="Verbose output", default=False)
+  general_parser.add_argument("--daemon", action="store_true",
+                              help="Run only the watcher, headless and without Qt", default=False)
+  general_parser.add_argument("--daemon-status", action="store_true",
+                              help="Display the status of a running daemon and exit")
+  general_parser.add_argument("--profile-startup", action="store_true",
+                              help="Print an import and construction time breakdown of the startup",
+                              default=False)
 
   # Categories arguments
   categories_parser.add_argument("-c", "--categories", action="store_true",
@@ -98,6 +171,20 @@ def parse_arguments():
   keywords_parser.add_argument(
     "--add-keyword", nargs=2, help="Add a keyword", metavar=("KEYWORD", "CATEGORY"))
 
+  # Data arguments
+  data_parser.add_argument("--export", metavar="FILE",
+                           help="Export activities to FILE (.csv, .jsonl or .parquet) and exit")
+  data_parser.add_argument("--from", dest="period_start", type=parse_date, metavar="YYYY-MM-DD",
+                           help="First day to export, defaults to the beginning of the history")
+  data_parser.add_argument("--to", dest="period_end", type=parse_date, metavar="YYYY-MM-DD",
+                           help="Last day to export (inclusive), defaults to today")
+  data_parser.add_argument("--import", dest="import_file", metavar="FILE",
+                           help="Import activities from a FocusWatch export (.csv, .jsonl) "
+                           "or an ActivityWatch export (.json) and exit")
+  data_parser.add_argument("--sync", dest="sync_file", metavar="FILE",
+                           help="Merge the activities recorded since the last sync by the "
+                           "FocusWatch database FILE of another machine and exit")
+
   # Config arguments
   config_parser.add_argument(
     "--config-wi", help="Change default watch interval", type=float, metavar="WATCH_INTERVAL")
@@ -116,6 +203,11 @@ def parse_arguments():
     display_config()
     sys.exit()
 
+  if args.daemon_status:
+    from focuswatch.daemon import display_status  # pylint: disable=import-outside-toplevel
+    display_status()
+    sys.exit()
+
   # Categories
   if args.categories:
     display_categories()
@@ -134,25 +226,39 @@ def parse_arguments():
     add_keyword(args.add_keyword)
     sys.exit()
 
+  # Data
+  if args.export:
+    sys.exit(export_activities(args.export, args.period_start, args.period_end))
+
+  if args.import_file:
+    sys.exit(import_activities(args.import_file))
+
+  if args.sync_file:
+    sys.exit(sync_database(args.sync_file))
+
   # Config
   if args.config_wi:
     config = Config()
     config["general"]["watch_interval"] = args.config_wi
+    config.flush()
     sys.exit()
 
   if args.config_verbose:
     config = Config()
     config["general"]["verbose"] = True
+    config.flush()
     sys.exit()
 
   if args.config_no_verbose:
     config = Config()
     config["general"]["verbose"] = False
+    config.flush()
     sys.exit()
 
   if args.config_db:
     config = Config()
     config["database"]["location"] = args.config_db
+    config.flush()
     sys.exit()
 
   return args
@@ -1,17 +1,66 @@
-""" Configuration module for FocusWatch. """
+""" Configuration module for FocusWatch.
+
+Config is a process-wide singleton per configuration file. Reads are served
+from the in-memory snapshot; writes mark it dirty and are coalesced into a
+single debounced, atomic (temp file + rename) write. Subscribers are notified
+of every changed option.
+"""
+import atexit
+import copy
 import logging
 import os
 import sys
-from collections.abc import MutableMapping
-from typing import Any, Optional
+import threading
+import weakref
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Callable, Dict, List, Optional
 
 import yaml
 
 logger = logging.getLogger(__name__)
 
+ConfigSubscriber = Callable[[str, str, Any], None]
+
+
+class ConfigSection(MutableMapping):
+  """ Live view of a configuration section.
+
+  Assignments go through Config.set so nested writes such as
+  config["general"]["watch_interval"] = 2.0 are tracked and persisted.
+  Values are returned as stored: mutating a list or dict value in place, e.g.
+  config["title_normalization"]["rules"].append(rule), is not tracked and
+  not written. Assign a new value instead.
+  """
+
+  def __init__(self, config: "Config", name: str):
+    self._config = config
+    self._name = name
+
+  def __getitem__(self, key: str) -> Any:
+    return self._config.get_option(self._name, key)
+
+  def __setitem__(self, key: str, value: Any):
+    self._config.set(self._name, key, value)
+
+  def __delitem__(self, key: str):
+    self._config.delete(self._name, key)
+
+  def __iter__(self):
+    return iter(list(self._config.section_snapshot(self._name)))
+
+  def __len__(self):
+    return len(self._config.section_snapshot(self._name))
+
+  def __repr__(self):
+    return f"{self.__class__.__name__}({self._name}, {self._config.section_snapshot(self._name)})"
+
 
 class Config(MutableMapping):
   """ Configuration class for FocusWatch """
+  WRITE_DELAY = 0.5  # seconds of quiet before dirty changes are written
+
+  _instances: Dict[str, "Config"] = {}
+  _instances_lock = threading.Lock()
   DEFAULT_CONFIG = {
     "general": {
       "watch_interval": 1.0,
@@ -19,9 +68,15 @@ class Config(MutableMapping):
       "watch_afk": True,
       "afk_timeout": 10,
       "start_minimized": False,
+      "adaptive_interval": True,
+      "max_watch_interval": 5.0,
+      "heartbeat_interval": 15.0,
     },
     "database": {
       "location": None,
+      # "auto": DuckDB for long periods when duckdb and its sqlite extension are
+      # installed locally, SQLite otherwise. "sqlite": never DuckDB.
+      "analytics_engine": "auto",
     },
     "logging": {
       "location": None,
@@ -36,21 +91,47 @@ class Config(MutableMapping):
       "distracted_goal": 20.0,
       "display_cards_idle": True,
       "display_timeline_idle": True,
+      "prefetch_adjacent_periods": True,
+    },
+    "title_normalization": {
+      "enabled": True,
+      "strip_counters": True,
+      "rules": [],
+    },
+    "daemon": {
+      "status_socket": None,
+      "status_port": 47711,
+    },
+    "api": {
+      "enabled": False,  # read-only JSON API on localhost, see api_server
+      "port": 47712,
     }
   }
 
+  def __new__(cls, config_file_path: Optional[str] = None):
+    # Config() and Config(default_config_path) must share one instance
+    key = os.path.abspath(config_file_path or os.path.join(cls._get_project_root(), "config.yml"))
+    with cls._instances_lock:
+      instance = cls._instances.get(key)
+      if instance is None:
+        instance = super().__new__(cls)
+        instance._initialized = False
+        cls._instances[key] = instance
+    return instance
+
   def __init__(self, config_file_path: Optional[str] = None):
+    if self._initialized:
+      return  # shared instance, already loaded
+
+    self._lock = threading.RLock()
+    self._dirty = False
+    self._write_timer: Optional[threading.Timer] = None
+    self._subscribers: List[Callable[[], Optional[ConfigSubscriber]]] = []
+
     self.is_frozen = getattr(sys, "frozen", False)
+    self.project_root = self._get_project_root()
 
     if self.is_frozen:
-      if sys.platform.startswith("linux"):
-        self.project_root = os.path.expanduser("~/.focuswatch")
-      elif sys.platform.startswith("win"):
-        self.project_root = os.path.join(
-          os.getenv("LOCALAPPDATA"), "FocusWatch")
-      else:
-        raise EnvironmentError("Unsupported platform")
-
       self.default_config_path = os.path.join(
         self.project_root, "config.yml")
       self.default_database_path = os.path.join(
@@ -60,8 +141,6 @@ class Config(MutableMapping):
       self.default_log_path = os.path.join(
         self.project_root, "logs", "focuswatch.log.jsonl")
     else:
-      self.project_root = os.path.dirname(
-        os.path.dirname(os.path.abspath(__file__)))
       self.default_config_path = os.path.join(
         self.project_root, "config.yml")
       self.default_database_path = os.path.join(
@@ -71,34 +150,97 @@ class Config(MutableMapping):
       self.default_log_path = os.path.join(
         self.project_root, "logs", "focuswatch.log.jsonl")
 
+    self.default_status_socket_path = os.path.join(
+      self.project_root, "focuswatch.sock")
+
     os.makedirs(os.path.dirname(self.default_log_path), exist_ok=True)
 
     self.DEFAULT_CONFIG["database"]["location"] = self.default_database_path
     self.DEFAULT_CONFIG["logging"]["location"] = self.default_log_path
     self.DEFAULT_CONFIG["logging"]["logger_config"] = self.default_logger_config_path
+    self.DEFAULT_CONFIG["daemon"]["status_socket"] = self.default_status_socket_path
 
     self.config_file_path = config_file_path or self.default_config_path
+    self._config: Dict[str, Any] = {}
     self.load_config()
 
+    self._initialized = True
+    atexit.register(self.flush)
+
+  @staticmethod
+  def _get_project_root() -> str:
+    """ Return the directory of the default config, database and logs. """
+    if getattr(sys, "frozen", False):
+      if sys.platform.startswith("linux"):
+        return os.path.expanduser("~/.focuswatch")
+      if sys.platform.startswith("win"):
+        return os.path.join(os.getenv("LOCALAPPDATA"), "FocusWatch")
+      raise EnvironmentError("Unsupported platform")
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
   def initialize_config(self):
     """ Initialize the configuration file with default values """
-    self._config = self.DEFAULT_CONFIG.copy()
-    self.write_config_to_file()
+    with self._lock:
+      previous = self._config
+      self._config = copy.deepcopy(self.DEFAULT_CONFIG)
+      self.write_config_to_file()
+    self._notify_diff(previous, self._config)
 
   def write_config_to_file(self):
-    """ Write the configuration to the configuration file. """
-    try:
-      os.makedirs(os.path.dirname(self.config_file_path), exist_ok=True)
-      os.makedirs(os.path.dirname(
-        self._config["logging"]["location"]), exist_ok=True)
-      with open(self.config_file_path, "w", encoding="utf-8") as config_file:
-        yaml.dump(self._config, config_file, default_flow_style=False)
-      # logger.info("Configuration file written successfully.")
-    except FileNotFoundError as e:
-      logger.error(f"The configuration file was not found. {e}")
-    except IOError as e:
-      logger.error(
-        f"An error occurred while writing the configuration file. {e}")
+    """ Write the configuration to the configuration file immediately.
+
+    The file is written to a temporary file first and renamed over the
+    configuration file, so readers never see a partially written file.
+    """
+    with self._lock:
+      self._cancel_pending_write()
+      try:
+        os.makedirs(os.path.dirname(self.config_file_path), exist_ok=True)
+        os.makedirs(os.path.dirname(
+          self._config["logging"]["location"]), exist_ok=True)
+        temp_path = f"{self.config_file_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as config_file:
+          yaml.dump(self._config, config_file, default_flow_style=False)
+        os.replace(temp_path, self.config_file_path)
+        self._dirty = False
+        # logger.info("Configuration file written successfully.")
+      except FileNotFoundError as e:
+        logger.error(f"The configuration file was not found. {e}")
+      except IOError as e:
+        logger.error(
+          f"An error occurred while writing the configuration file. {e}")
+
+  def flush(self) -> None:
+    """ Write pending changes now, if there are any. """
+    with self._lock:
+      if self._dirty:
+        self.write_config_to_file()
+
+  @property
+  def is_dirty(self) -> bool:
+    """ Whether there are changes that have not been written yet. """
+    return self._dirty
+
+  def _schedule_write(self) -> None:
+    """ Mark the config dirty and (re)start the debounce timer. """
+    with self._lock:
+      self._dirty = True
+      self._cancel_pending_write()
+      self._write_timer = threading.Timer(self.WRITE_DELAY, self.flush)
+      self._write_timer.daemon = True
+      self._write_timer.start()
+
+  def _cancel_pending_write(self) -> None:
+    if self._write_timer is not None:
+      self._write_timer.cancel()
+      self._write_timer = None
+
+  def reload(self) -> None:
+    """ Re-read the configuration file, notifying subscribers of changed options. """
+    with self._lock:
+      previous = copy.deepcopy(self._config)
+      self.load_config()
+    self._notify_diff(previous, self._config)
 
   def load_config(self):
     """ Load config from the configuration file. """
@@ -112,14 +254,14 @@ class Config(MutableMapping):
       else:
         with open(self.config_file_path, "r", encoding="utf-8") as config_file:
           self._config = yaml.safe_load(config_file) or {}
-        # Check for required sections
-        required_sections = self.DEFAULT_CONFIG.keys()
-        if not all(section in self._config for section in required_sections):
+        if not isinstance(self._config, dict):
           logger.info(
-            "Missing sections in configuration file. Reinitializing configuration.")
+            "Malformed configuration file. Reinitializing configuration.")
           self.initialize_config()
           return
+        self._dirty = False
 
+        # Missing sections and keys are added with defaults, keeping user values
         self._validate_config_keys()
 
     except (IOError, yaml.YAMLError) as e:
@@ -133,7 +275,7 @@ class Config(MutableMapping):
       if section not in self._config:
         logger.warning(
           f"Section '{section}' missing from config. Adding with defaults: {defaults}")
-        self._config[section] = defaults.copy()
+        self._config[section] = copy.deepcopy(defaults)
         updated = True
         continue
       for key, default_value in defaults.items():
@@ -147,19 +289,102 @@ class Config(MutableMapping):
     if updated:
       self.write_config_to_file()
 
+  def get_option(self, section: str, key: str) -> Any:
+    """ Return a single option from the in-memory snapshot. """
+    return self._config[section][key]
+
+  def section_snapshot(self, section: str) -> Dict[str, Any]:
+    """ Return a shallow copy of a section. """
+    with self._lock:
+      return dict(self._config[section])
+
+  def set(self, section: str, key: str, value: Any) -> None:
+    """ Set an option, schedule a write and notify subscribers if it changed.
+
+    Args:
+      section: The config section, e.g. "general".
+      key: The option name within the section.
+      value: The new value.
+    """
+    with self._lock:
+      options = self._config.setdefault(section, {})
+      if key in options and options[key] == value:
+        return
+      options[key] = value
+      self._schedule_write()
+    self._notify(section, key, value)
+
+  def delete(self, section: str, key: str) -> None:
+    """ Delete an option, schedule a write and notify subscribers. """
+    with self._lock:
+      del self._config[section][key]
+      self._schedule_write()
+    self._notify(section, key, None)
+
+  def subscribe(self, callback: ConfigSubscriber) -> None:
+    """ Register a callback called as callback(section, key, value) on changes.
+
+    Bound methods are held weakly, so subscribing does not keep the owner alive.
+    Callbacks run on the thread that made the change.
+    """
+    if hasattr(callback, "__self__"):
+      ref = weakref.WeakMethod(callback)
+    else:
+      ref = lambda: callback  # pylint: disable=unnecessary-lambda-assignment
+    with self._lock:
+      self._subscribers.append(ref)
+
+  def unsubscribe(self, callback: ConfigSubscriber) -> None:
+    """ Remove a previously registered callback. """
+    with self._lock:
+      self._subscribers = [ref for ref in self._subscribers
+                           if ref() is not None and ref() != callback]
+
+  def _notify(self, section: str, key: str, value: Any) -> None:
+    """ Call every live subscriber, dropping the dead ones. """
+    with self._lock:
+      callbacks = [ref() for ref in self._subscribers]
+      self._subscribers = [ref for ref, callback in zip(
+        self._subscribers, callbacks) if callback is not None]
+    for callback in callbacks:
+      if callback is None:
+        continue
+      try:
+        callback(section, key, value)
+      except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error(f"Config subscriber {callback} failed: {e}")
+
+  def _notify_diff(self, previous: Dict[str, Any], current: Dict[str, Any]) -> None:
+    """ Notify subscribers about every option that differs between two snapshots. """
+    for section, options in current.items():
+      if not isinstance(options, Mapping):
+        continue
+      old_options = previous.get(section, {})
+      for key, value in options.items():
+        if key not in old_options or old_options[key] != value:
+          self._notify(section, key, value)
+
   def __getitem__(self, key: str) -> Any:
-    return self._config[key]
+    value = self._config[key]
+    if isinstance(value, Mapping):
+      return ConfigSection(self, key)
+    return value
 
   def __setitem__(self, key: str, value: Any):
-    self._config[key] = value
-    self.write_config_to_file()
+    with self._lock:
+      previous = {key: copy.deepcopy(self._config.get(key, {}))}
+      self._config[key] = dict(value) if isinstance(value, Mapping) else value
+      self._schedule_write()
+    if isinstance(value, Mapping):
+      self._notify_diff(previous, {key: self._config[key]})
 
   def __delitem__(self, key: str):
-    del self._config[key]
-    self.write_config_to_file()
+    with self._lock:
+      del self._config[key]
+      self._schedule_write()
 
   def __iter__(self):
-    return iter(self._config)
+    return iter(list(self._config))
 
   def __len__(self):
     return len(self._config)
@@ -169,5 +394,4 @@ class Config(MutableMapping):
 
 
 if __name__ == "__main__":
-  config = Config()
-  print(config)
+  print(Config())
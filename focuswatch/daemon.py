@@ -0,0 +1,250 @@
+""" Headless daemon mode for FocusWatch.
+
+Runs only the tracking pipeline (WatcherService and persistence) without
+importing PySide6. The daemon flushes the in-progress activity on SIGTERM/SIGINT
+and exposes a small local status socket that answers every connection with a
+single JSON line.
+"""
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import psutil
+
+from focuswatch import __version__
+from focuswatch.config import Config
+from focuswatch.utils.instrumentation import metrics
+
+if TYPE_CHECKING:
+  from focuswatch.api_server import ApiServer
+  from focuswatch.services.watcher_service import WatcherService
+
+logger = logging.getLogger(__name__)
+
+HAS_UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+
+
+class _StatusRequestHandler(socketserver.StreamRequestHandler):
+  """ Writes the daemon status as one JSON line and closes the connection. """
+
+  def handle(self):
+    status = self.server.status_provider()
+    self.wfile.write(json.dumps(status, default=str).encode("utf-8") + b"\n")
+
+
+if HAS_UNIX_SOCKETS:
+  class _UnixStatusServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPStatusServer(socketserver.ThreadingTCPServer):
+  daemon_threads = True
+  allow_reuse_address = True
+
+
+def _status_address(config: Config):
+  """ Return the status socket address, a path for unix sockets or a localhost (host, port) tuple. """
+  if HAS_UNIX_SOCKETS:
+    return config["daemon"]["status_socket"]
+  return ("127.0.0.1", int(config["daemon"]["status_port"]))
+
+
+class FocusWatchDaemon:
+  """ Runs the watcher in the foreground with a status socket in the background. """
+
+  def __init__(self,
+               watcher_service: "WatcherService",
+               config: Optional[Config] = None):
+    """ Initialize the daemon.
+
+    Args:
+      watcher_service: The watcher to run.
+      config: Optional Config instance for dependency injection.
+    """
+    self._watcher_service = watcher_service
+    self._config = config or Config()
+    self._address = _status_address(self._config)
+    self._status_server = None
+    self._status_thread: Optional[threading.Thread] = None
+    self._started_at = datetime.now()
+    self._process = psutil.Process(os.getpid())
+
+  def get_status(self) -> Dict[str, Any]:
+    """ Return the daemon status served on the status socket. """
+    return {
+      "pid": self._process.pid,
+      "version": __version__,
+      "started_at": self._started_at.isoformat(),
+      "uptime_seconds": int((datetime.now() - self._started_at).total_seconds()),
+      "memory_rss_bytes": self._process.memory_info().rss,
+      "watcher": self._watcher_service.get_status(),
+      "metrics": metrics.snapshot(),
+    }
+
+  def start_status_server(self) -> None:
+    """ Start serving the status socket on a background thread. """
+    try:
+      if HAS_UNIX_SOCKETS:
+        if os.path.exists(self._address):
+          os.remove(self._address)  # stale socket from a previous run
+        self._status_server = _UnixStatusServer(
+          self._address, _StatusRequestHandler)
+        os.chmod(self._address, 0o600)
+      else:
+        self._status_server = _TCPStatusServer(
+          self._address, _StatusRequestHandler)
+    except OSError as e:
+      logger.error(f"Failed to start the status socket at {self._address}: {e}")
+      return
+
+    self._status_server.status_provider = self.get_status
+    self._status_thread = threading.Thread(
+      target=self._status_server.serve_forever, name="status_socket", daemon=True)
+    self._status_thread.start()
+    logger.info(f"Status socket listening on {self._address}")
+
+  def stop_status_server(self) -> None:
+    """ Stop the status socket and remove the socket file. """
+    if self._status_server is None:
+      return
+    self._status_server.shutdown()
+    self._status_server.server_close()
+    self._status_server = None
+    if HAS_UNIX_SOCKETS and os.path.exists(self._address):
+      os.remove(self._address)
+
+  def start_api_server(self) -> Optional["ApiServer"]:
+    """ Start the local HTTP API if it is enabled in the config.
+
+    Returns:
+      Optional[ApiServer]: The running server, None if disabled or it failed to start.
+    """
+    if not self._config.get("api", {}).get("enabled"):
+      return None
+    from focuswatch.api_server import start_api_server  # pylint: disable=import-outside-toplevel
+    return start_api_server(self._config)
+
+  def install_signal_handlers(self) -> None:
+    """ Stop the watcher cleanly on SIGTERM, SIGINT and SIGHUP. """
+    def handle_signal(signum, frame):  # pylint: disable=unused-argument
+      logger.info(f"Received {signal.Signals(signum).name}, stopping the watcher")
+      self._watcher_service.stop()
+
+    for name in ("SIGTERM", "SIGINT", "SIGHUP"):
+      if hasattr(signal, name):
+        signal.signal(getattr(signal, name), handle_signal)
+
+  def run(self) -> int:
+    """ Run the watcher until a stop signal is received.
+
+    Returns:
+      int: The process exit code.
+    """
+    self.install_signal_handlers()
+    self.start_status_server()
+    api_server = self.start_api_server()
+    try:
+      logger.info("Starting the watcher in daemon mode")
+      self._watcher_service.monitor()
+    finally:
+      if api_server is not None:
+        api_server.stop()
+      self.stop_status_server()
+    logger.info("FocusWatch daemon stopped")
+    return 0
+
+
+def run_daemon(watch_interval: Optional[float] = None,
+               verbose: Optional[int] = None) -> int:
+  """ Set up persistence and run the headless daemon.
+
+  Args:
+    watch_interval: Optional watch interval overriding the config.
+    verbose: Optional verbosity overriding the config.
+
+  Returns:
+    int: The process exit code.
+  """
+  # pylint: disable=import-outside-toplevel
+  from focuswatch.database.database_connection import DatabaseConnection
+  from focuswatch.database.database_manager import DatabaseManager
+  from focuswatch.services.activity_service import ActivityService
+  from focuswatch.services.category_service import CategoryService
+  from focuswatch.services.change_log_service import ChangeLogService
+  from focuswatch.services.classifier_service import ClassifierService
+  from focuswatch.services.keyword_service import KeywordService
+  from focuswatch.services.watcher_service import WatcherService
+
+  _ = DatabaseManager()
+
+  activity_service = ActivityService()
+  keyword_service = KeywordService()
+  category_service = CategoryService(keyword_service=keyword_service)
+  classifier_service = ClassifierService(category_service, keyword_service)
+  watcher_service = WatcherService(
+    activity_service,
+    category_service,
+    classifier_service,
+    watch_interval,
+    verbose,
+    change_log_service=ChangeLogService())
+
+  daemon = FocusWatchDaemon(watcher_service)
+  try:
+    return daemon.run()
+  finally:
+    DatabaseConnection().close_engine()
+
+
+def query_status(config: Optional[Config] = None, timeout: float = 2.0) -> Optional[Dict[str, Any]]:
+  """ Read the status of a running daemon from its status socket.
+
+  Args:
+    config: Optional Config instance for dependency injection.
+    timeout: Socket timeout in seconds.
+
+  Returns:
+    Optional[Dict[str, Any]]: The daemon status, or None if no daemon is reachable.
+  """
+  address = _status_address(config or Config())
+  family = socket.AF_UNIX if HAS_UNIX_SOCKETS else socket.AF_INET
+  try:
+    with socket.socket(family, socket.SOCK_STREAM) as client:
+      client.settimeout(timeout)
+      client.connect(address)
+      chunks = []
+      while chunk := client.recv(4096):
+        chunks.append(chunk)
+  except OSError as e:
+    logger.debug(f"Could not reach the daemon status socket at {address}: {e}")
+    return None
+  try:
+    return json.loads(b"".join(chunks).decode("utf-8"))
+  except ValueError as e:
+    logger.error(f"Malformed daemon status: {e}")
+    return None
+
+
+def display_status() -> None:
+  """ Print the status of a running daemon. """
+  status = query_status()
+  if status is None:
+    print("FocusWatch daemon is not running.")
+    return
+  watcher = status.get("watcher", {})
+  uptime = status["uptime_seconds"]
+  pid, version = status["pid"], status["version"]
+  memory = status["memory_rss_bytes"] / 1024 / 1024
+  print(f"pid            {pid}")
+  print(f"version        {version}")
+  print(f"uptime         {uptime // 3600}h {uptime % 3600 // 60}m")
+  print(f"memory (rss)   {memory:.1f} MiB")
+  for label, key in (("running", "running"), ("window class", "window_class"),
+                     ("window name", "window_name"), ("active since", "time_start")):
+    print(f"{label.ljust(15)}{watcher.get(key)}")
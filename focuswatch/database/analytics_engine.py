@@ -0,0 +1,175 @@
+""" Optional DuckDB engine for the long period aggregates of FocusWatch.
+
+SQLite sums a year of activities one row at a time. When the duckdb package is
+installed, the time totals of long periods are computed by an embedded DuckDB
+instead: it attaches the FocusWatch database file read-only through its sqlite
+extension and aggregates the rows vectorized, so results always reflect the
+latest writes. Short periods are served faster by the ix_activity_time_start
+range scan of SQLite and stay there.
+
+time_totals returns None when DuckDB cannot answer (not installed, its sqlite
+extension not installed locally, disabled in the configuration, in-memory
+database, period too short or query failure), the services then run their
+SQLite statement of the queries module.
+"""
+
+import importlib
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from focuswatch.config import Config
+from focuswatch.database.queries import period_params
+from focuswatch.utils.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+ENGINE_AUTO = "auto"  # DuckDB when installed
+ENGINE_SQLITE = "sqlite"  # never DuckDB
+
+_DURATION = "epoch(CAST(a.time_stop AS TIMESTAMP)) - epoch(CAST(a.time_start AS TIMESTAMP))"
+_PERIOD = "a.time_start >= ? AND a.time_start < ?"
+
+# Same results as the queries module statements of the same kind. SQLite reports
+# the category of an arbitrary activity of a group, here it is the latest one.
+STATEMENTS = {
+  "class": f"""
+    SELECT a.window_class, arg_max(a.category_id, a.time_start), sum({_DURATION}) AS total
+    FROM focuswatch.activity a
+    WHERE {_PERIOD}
+    GROUP BY a.window_class
+    ORDER BY total DESC""",
+  "name": f"""
+    SELECT coalesce(w.title_key, a.window_name) AS title, arg_max(a.category_id, a.time_start),
+           sum({_DURATION}) AS total
+    FROM focuswatch.activity a
+    LEFT JOIN focuswatch.window_titles w
+      ON w.window_class = a.window_class AND w.window_name = a.window_name
+    WHERE {_PERIOD}
+    GROUP BY title
+    ORDER BY total DESC""",
+  "category": f"""
+    SELECT a.category_id, sum({_DURATION}) AS total
+    FROM focuswatch.activity a
+    WHERE {_PERIOD} AND a.category_id IS NOT NULL
+    GROUP BY a.category_id
+    ORDER BY total DESC""",
+}
+
+
+class AnalyticsEngine:
+  """ Thread-safe registry of DuckDB connections, one per attached database file.
+
+  A database whose attachment failed is not retried until close is called.
+  """
+  # Periods of fewer days are left to SQLite
+  MIN_PERIOD_DAYS = 28
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._module: Any = None  # the duckdb module, False if it is not installed
+    self._connections: Dict[str, Any] = {}  # database path -> connection, None if attaching failed
+
+  def is_enabled(self) -> bool:
+    """ Whether the configuration allows DuckDB and the duckdb package is installed. """
+    if Config().section_snapshot("database").get("analytics_engine", ENGINE_AUTO) == ENGINE_SQLITE:
+      return False
+    return self._get_module() is not None
+
+  def _get_module(self):
+    """ Import duckdb on first use, None if it is not installed. """
+    if self._module is None:
+      try:
+        self._module = importlib.import_module("duckdb")
+        logger.info(f"DuckDB {self._module.__version__} available for analytics.")
+      except ImportError:
+        self._module = False
+        logger.debug("DuckDB not installed, aggregates run on SQLite.")
+    return self._module or None
+
+  @staticmethod
+  def _database_path(engine) -> Optional[str]:
+    """ The file of a SQLite engine, None for in-memory or other databases. """
+    url = getattr(engine, "url", None)
+    database = getattr(url, "database", None)
+    if getattr(url, "drivername", "").startswith("sqlite") and isinstance(database, str):
+      return database if database and database != ":memory:" else None
+    return None
+
+  def _get_connection(self, engine):
+    """ Return the DuckDB connection with the database of the engine attached, None if unavailable. """
+    path = self._database_path(engine)
+    if path is None or not self.is_enabled():
+      return None
+    with self._lock:
+      if path not in self._connections:
+        self._connections[path] = self._attach(path)
+      return self._connections[path]
+
+  def _attach(self, path: str):
+    """ Open an in-memory DuckDB and attach the SQLite file at path read-only.
+
+    The sqlite extension must already be installed locally, it is never
+    downloaded at runtime; without it the aggregates run on SQLite.
+    """
+    duckdb = self._module
+    try:
+      connection = duckdb.connect(config={"autoinstall_known_extensions": False})
+      connection.execute("LOAD sqlite")
+      quoted = path.replace("'", "''")
+      connection.execute(f"ATTACH '{quoted}' AS focuswatch (TYPE SQLITE, READ_ONLY)")
+      logger.info(f"Attached {path} to DuckDB for analytics.")
+      return connection
+    except duckdb.Error as e:
+      logger.warning(f"Failed to attach {path} to DuckDB, aggregates run on SQLite: {e}")
+      return None
+
+  def time_totals(self,
+                  engine,
+                  kind: str,
+                  period_start: datetime,
+                  period_end: Optional[datetime] = None) -> Optional[List[Tuple]]:
+    """ Return the time totals of a period computed by DuckDB.
+
+    Args:
+      engine: The SQLAlchemy engine of the FocusWatch database.
+      kind: "class", "name" or "category", see STATEMENTS.
+      period_start: The first day of the period.
+      period_end: The last day of the period. If None, only period_start is considered.
+
+    Returns:
+      The rows like the SQLite statement of the same kind with integer seconds,
+      None if DuckDB cannot answer and the caller must fall back to SQLite.
+    """
+    last_day = (period_end or period_start).date()
+    if (last_day - period_start.date()).days + 1 < self.MIN_PERIOD_DAYS:
+      return None
+    connection = self._get_connection(engine)
+    if connection is None:
+      return None
+
+    params = period_params(period_start, period_end)
+    try:
+      with metrics.timer(f"analytics.{kind}_time_totals"):
+        cursor = connection.cursor()  # one per call, DuckDB cursors are not shared between threads
+        try:
+          rows = cursor.execute(STATEMENTS[kind], [params["first_day"], params["day_after"]]).fetchall()
+        finally:
+          cursor.close()
+      return [row[:-1] + (int(row[-1] or 0),) for row in rows]
+    except self._module.Error as e:
+      logger.error(f"DuckDB failed to compute {kind} time totals, falling back to SQLite: {e}")
+      return None
+
+  def close(self, engine=None) -> None:
+    """ Close the DuckDB connection of an engine, or all of them if engine is None. """
+    with self._lock:
+      paths = list(self._connections) if engine is None else [self._database_path(engine)]
+      for path in paths:
+        connection = self._connections.pop(path, None)
+        if connection is not None:
+          connection.close()
+
+
+analytics = AnalyticsEngine()
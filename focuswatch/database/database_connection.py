@@ -9,14 +9,30 @@ from typing import Callable, Optional
 from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from focuswatch.config import Config
+from focuswatch.database.analytics_engine import analytics
+from focuswatch.utils.instrumentation import instrument_engine
+from focuswatch.utils.query_cache import query_cache
 
 logger = logging.getLogger(__name__)
 
 
 class DatabaseConnection:
-  """ Manages the database connection and sessions using SQLAlchemy. """
+  """ Manages the database connection and sessions using SQLAlchemy.
+
+  Every service method opens its own session, so connections are checked out
+  many times per dashboard refresh. They are kept open in the pool and handed
+  out last in, first out, so a thread mostly gets back the connection it just
+  returned along with its prepared statements. A local file cannot drop the
+  connection like a server can, so checkouts are not pinged.
+  """
+  # Enough for the UI, watcher, prefetch and status threads without overflow
+  POOL_SIZE = 8
+  MAX_OVERFLOW = 8
+  # Prepared statements kept by each sqlite3 connection (the driver default is 128)
+  CACHED_STATEMENTS = 512
 
   _engine = None
   _SessionFactory: Optional[Callable[[], Session]] = None
@@ -38,7 +54,16 @@ class DatabaseConnection:
     if cls._engine is None:
       try:
         db_uri = f"sqlite:///{db_name}"
-        cls._engine = create_engine(db_uri, pool_pre_ping=True)
+        cls._engine = create_engine(
+          db_uri,
+          poolclass=QueuePool,
+          pool_size=cls.POOL_SIZE,
+          max_overflow=cls.MAX_OVERFLOW,
+          pool_use_lifo=True,
+          pool_pre_ping=False,
+          connect_args={"check_same_thread": False,
+                        "cached_statements": cls.CACHED_STATEMENTS})
+        instrument_engine(cls._engine)
         cls._SessionFactory = sessionmaker(bind=cls._engine)
         logger.info("Database engine initialized.")
       except SQLAlchemyError as e:
@@ -83,8 +108,11 @@ class DatabaseConnection:
 
   def close_engine(self):
     """ Close the database engine and reset internal state. """
-    if self._engine:
-      self._engine.dispose()
-      self._engine = None
-      self._SessionFactory = None
+    cls = type(self)
+    if cls._engine:
+      analytics.close(cls._engine)
+      cls._engine.dispose()
+      cls._engine = None
+      cls._SessionFactory = None
+      query_cache.clear()
       logger.info("Database engine closed.")
@@ -4,19 +4,139 @@ This module provides a class for managing the database setup and initialization
 """
 
 import logging
-from typing import Optional
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
 
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
 
 from focuswatch.database.database_connection import DatabaseConnection
 from focuswatch.database.models import Base
+from focuswatch.database.models.change_log import \
+    ChangeLog  # pylint: disable=unused-import # noqa: F401
 from focuswatch.database.models.metadata import Metadata
+from focuswatch.database.models.uncategorized_total import \
+    UncategorizedTotal  # pylint: disable=unused-import # noqa: F401
+from focuswatch.database.models.window_title import \
+    WindowTitle  # pylint: disable=unused-import # noqa: F401
+from focuswatch.services.activity_service import ActivityService
 from focuswatch.services.category_service import CategoryService
+from focuswatch.services.change_log_service import ChangeLogService
 from focuswatch.services.keyword_service import KeywordService
 
 logger = logging.getLogger(__name__)
 
 CURRENT_SCHEMA_VERSION = "1.0"
+# Metadata key of the random ID telling databases apart when merging histories
+DATABASE_ID_KEY = "database_id"
+
+WINDOW_TITLE_TRIGGER = "activity_window_title_insert"
+
+# Keeps window_titles and its FTS5 trigram index in sync with activity inserts
+SEARCH_INDEX_DDL = [
+  f"""CREATE TRIGGER IF NOT EXISTS {WINDOW_TITLE_TRIGGER} AFTER INSERT ON activity
+  BEGIN
+    INSERT INTO window_titles (window_class, window_name)
+    SELECT new.window_class, new.window_name
+    WHERE NOT EXISTS (SELECT 1 FROM window_titles
+                      WHERE window_class = new.window_class AND window_name = new.window_name);
+  END""",
+  """CREATE VIRTUAL TABLE IF NOT EXISTS window_titles_fts USING fts5(
+    window_class, window_name,
+    content='window_titles', content_rowid='id', tokenize='trigram')""",
+  """CREATE TRIGGER IF NOT EXISTS window_titles_fts_insert AFTER INSERT ON window_titles
+  BEGIN
+    INSERT INTO window_titles_fts (rowid, window_class, window_name)
+    VALUES (new.id, new.window_class, new.window_name);
+  END""",
+]
+
+# Adds the titles of activities inserted while WINDOW_TITLE_TRIGGER was dropped (bulk imports)
+WINDOW_TITLES_BACKFILL = """INSERT OR IGNORE INTO window_titles (window_class, window_name)
+  SELECT DISTINCT window_class, window_name FROM activity WHERE id > :after_id"""
+
+# Columns of the tables whose changes are appended to change_log
+CHANGE_LOG_TABLES: Dict[str, Tuple[str, ...]] = {
+  "activity": ("time_start", "time_stop", "window_class", "window_name", "category_id", "focused"),
+  "categories": ("name", "parent_category_id", "color", "focused"),
+}
+CHANGE_LOG_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+# Column extended by the heartbeats of the open activity, see ActivityService.open_activity
+CHANGE_LOG_HEARTBEAT_COLUMNS = {"activity": "time_stop"}
+
+
+def _change_log_ddl() -> Dict[str, str]:
+  """ Return the change_log triggers of CHANGE_LOG_TABLES by trigger name.
+
+  Updates that leave every tracked column unchanged are not recorded, neither
+  are the heartbeats of the open activity: the row is recorded when it is closed.
+  """
+  ddl = {}
+  for table, columns in CHANGE_LOG_TABLES.items():
+    old_values = "json_object(" + ", ".join(f"'{column}', old.{column}" for column in columns) + ")"
+    changed = " OR ".join(f"old.{column} IS NOT new.{column}" for column in columns)
+    heartbeat_column = CHANGE_LOG_HEARTBEAT_COLUMNS.get(table)
+    if heartbeat_column is not None:
+      changed = " OR ".join(
+        [f"old.{column} IS NOT new.{column}" for column in columns if column != heartbeat_column] +
+        [f"(old.{heartbeat_column} IS NOT new.{heartbeat_column} AND new.id IS NOT "
+         f"(SELECT CAST(value AS INTEGER) FROM metadata "
+         f"WHERE key = '{ActivityService.OPEN_ACTIVITY_KEY}'))"])
+    for operation, event, row, values, condition in (
+        ("insert", "INSERT", "new", "NULL", ""),
+        ("update", "UPDATE", "new", old_values, f" WHEN {changed}"),
+        ("delete", "DELETE", "old", old_values, "")):
+      name = f"{table}_change_{operation}"
+      ddl[name] = f"""CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table}{condition}
+  BEGIN
+    INSERT INTO change_log (table_name, row_id, operation, changed_at, old_values)
+    VALUES ('{table}', {row}.id, '{operation}', {CHANGE_LOG_NOW}, {values});
+  END"""
+  return ddl
+
+
+CHANGE_LOG_DDL = _change_log_ddl()
+ACTIVITY_INSERT_CHANGE_TRIGGER = "activity_change_insert"
+
+# Records the activities inserted while ACTIVITY_INSERT_CHANGE_TRIGGER was dropped (bulk imports)
+CHANGE_LOG_BACKFILL = f"""INSERT INTO change_log (table_name, row_id, operation, changed_at)
+  SELECT 'activity', id, 'insert', {CHANGE_LOG_NOW} FROM activity WHERE id > :after_id ORDER BY id"""
+
+
+@contextmanager
+def bulk_activity_inserts(connection) -> Iterator[None]:
+  """ Drop the per row activity insert triggers for the duration of a bulk insert.
+
+  The window titles and the change log of the rows inserted in the block are
+  filled once at its end, in the transaction of connection, and the triggers
+  are recreated. If the block raises, call restore_activity_insert_triggers
+  once the transaction is rolled back.
+
+  Args:
+    connection: The connection the activities are inserted on, in a transaction.
+  """
+  last_id = connection.execute(text("SELECT max(id) FROM main.activity")).scalar() or 0
+  connection.execute(text(f"DROP TRIGGER IF EXISTS {WINDOW_TITLE_TRIGGER}"))
+  connection.execute(text(f"DROP TRIGGER IF EXISTS {ACTIVITY_INSERT_CHANGE_TRIGGER}"))
+  yield
+  connection.execute(text(WINDOW_TITLES_BACKFILL), {"after_id": last_id})
+  connection.execute(text(CHANGE_LOG_BACKFILL), {"after_id": last_id})
+  connection.execute(text(SEARCH_INDEX_DDL[0]))
+  connection.execute(text(CHANGE_LOG_DDL[ACTIVITY_INSERT_CHANGE_TRIGGER]))
+
+
+def restore_activity_insert_triggers(db_conn: DatabaseConnection) -> None:
+  """ Recreate the triggers dropped by a failed bulk_activity_inserts block.
+
+  DDL may be committed outside of the failed transaction.
+  """
+  try:
+    with db_conn.engine.begin() as connection:
+      connection.execute(text(SEARCH_INDEX_DDL[0]))
+      connection.execute(text(CHANGE_LOG_DDL[ACTIVITY_INSERT_CHANGE_TRIGGER]))
+  except SQLAlchemyError as e:
+    logger.error(f"Failed to restore the activity insert triggers: {e}")
 
 
 class DatabaseManager:
@@ -33,6 +153,9 @@ class DatabaseManager:
     """
     self._db_conn = DatabaseConnection()
     self._setup_database()
+    self._add_missing_columns()
+    self._setup_search_index()
+    self._setup_change_log()
 
     self._category_service = category_service or CategoryService(
       db_conn=self._db_conn)
@@ -45,6 +168,7 @@ class DatabaseManager:
       self._mark_defaults_inserted()
 
     self._ensure_schema_version()
+    self._ensure_database_id()
 
   def _setup_database(self):
     """ Set up the database by creating tables if they don't exist. """
@@ -55,6 +179,80 @@ class DatabaseManager:
       logger.error(f"Error setting up database: {e}")
       raise
 
+  def _add_missing_columns(self):
+    """ Add the nullable columns declared on models after their table already existed.
+
+    create_all only creates missing tables, new columns of existing tables are added here.
+    """
+    try:
+      with self._db_conn.engine.begin() as connection:
+        inspector = inspect(connection)
+        for table in Base.metadata.sorted_tables:
+          existing = {column["name"] for column in inspector.get_columns(table.name)}
+          for column in table.columns:
+            if column.name in existing or not column.nullable:
+              continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(
+              f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            logger.info(f"Added column {table.name}.{column.name}.")
+    except SQLAlchemyError as e:
+      logger.error(f"Error adding missing columns: {e}")
+      raise
+
+  def _setup_search_index(self):
+    """ Create the window title search index and backfill it from existing activities.
+
+    Also creates indexes declared on models after their table already existed.
+    FTS5 with the trigram tokenizer needs SQLite 3.34; without it search falls
+    back to LIKE over window_titles.
+    """
+    try:
+      with self._db_conn.engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+          for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+        connection.execute(text(SEARCH_INDEX_DDL[0]))
+        titles = connection.execute(
+          text("SELECT COUNT(*) FROM window_titles")).scalar()
+        if not titles:
+          connection.execute(text(
+            "INSERT INTO window_titles (window_class, window_name) "
+            "SELECT DISTINCT window_class, window_name FROM activity"))
+    except SQLAlchemyError as e:
+      logger.error(f"Error setting up window titles: {e}")
+      return
+
+    try:
+      with self._db_conn.engine.begin() as connection:
+        indexed = connection.execute(text(
+          "SELECT 1 FROM sqlite_master WHERE name = 'window_titles_fts'")).scalar()
+        for statement in SEARCH_INDEX_DDL[1:]:
+          connection.execute(text(statement))
+        if not indexed:
+          connection.execute(text(
+            "INSERT INTO window_titles_fts (window_titles_fts) VALUES ('rebuild')"))
+          logger.info("Window title search index created.")
+    except OperationalError as e:
+      logger.warning(f"Full-text search unavailable, using LIKE search: {e}")
+
+  def _setup_change_log(self):
+    """ Create the change_log triggers and prune the changes every consumer has processed.
+
+    The triggers are recreated so that databases created by an older version
+    get their current definition.
+    """
+    try:
+      with self._db_conn.engine.begin() as connection:
+        for name, statement in CHANGE_LOG_DDL.items():
+          connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+          connection.execute(text(statement))
+    except SQLAlchemyError as e:
+      logger.error(f"Error setting up the change log: {e}")
+      raise
+    ChangeLogService(db_conn=self._db_conn).prune()
+
   def _is_defaults_inserted(self) -> bool:
     """ Check if default data has been inserted.
 
@@ -106,6 +304,17 @@ class DatabaseManager:
         logger.error(f"Error ensuring schema version: {e}")
         session.rollback()
 
+  def _ensure_database_id(self):
+    """ Give the database its random ID on first start. """
+    with self._db_conn.get_session() as session:
+      try:
+        if session.get(Metadata, DATABASE_ID_KEY) is None:
+          session.add(Metadata(key=DATABASE_ID_KEY, value=uuid.uuid4().hex))
+          session.commit()
+      except SQLAlchemyError as e:
+        logger.error(f"Error ensuring database ID: {e}")
+        session.rollback()
+
   def _insert_default_data(self):
     """ Insert default categories and keywords into the database. """
     try:
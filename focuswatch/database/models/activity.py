@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String
 
 from focuswatch.database.models import Base
 
@@ -12,6 +12,10 @@ class Activity(Base):
   """ Represents an activity in the database. """
 
   __tablename__ = "activity"
+  __table_args__ = (
+    Index("ix_activity_window", "window_name", "window_class"),
+    Index("ix_activity_time_start", "time_start"),
+  )
 
   id = Column(Integer, primary_key=True, autoincrement=True)
   time_start = Column(String, nullable=False)
@@ -0,0 +1,55 @@
+""" Change log model for FocusWatch. """
+
+from typing import Optional
+
+from sqlalchemy import Column, Integer, String
+
+from focuswatch.database.models import Base
+
+
+class ChangeLog(Base):
+  """ An insert, update or delete of an activity or category row.
+
+  Rows are appended by triggers on the tracked tables, so every write is
+  recorded whichever code path made it. seq is never reused, consumers keep
+  the last seq they processed as their watermark, see ChangeLogService.
+  old_values holds the JSON encoded previous values of updated or deleted rows.
+  """
+
+  __tablename__ = "change_log"
+  __table_args__ = {"sqlite_autoincrement": True}
+
+  seq = Column(Integer, primary_key=True, autoincrement=True)
+  table_name = Column(String, nullable=False)
+  row_id = Column(Integer, nullable=False)
+  operation = Column(String, nullable=False)  # "insert", "update" or "delete"
+  changed_at = Column(String, nullable=False)
+  old_values = Column(String, nullable=True)
+
+  def __init__(self,
+               table_name: str = "",
+               row_id: int = 0,
+               operation: str = "",
+               changed_at: str = "",
+               old_values: Optional[str] = None,
+               seq: Optional[int] = None):
+    """ Initialize the change.
+
+    Args:
+      table_name: The table of the changed row.
+      row_id: The id of the changed row.
+      operation: "insert", "update" or "delete".
+      changed_at: Local time of the change as ISO string.
+      old_values: JSON object of the previous values, None for inserts.
+      seq: Optional sequence number if pre-assigned.
+    """
+    self.seq = seq
+    self.table_name = table_name
+    self.row_id = row_id
+    self.operation = operation
+    self.changed_at = changed_at
+    self.old_values = old_values
+
+  def __repr__(self):
+    return (f"ChangeLog(seq={self.seq}, table_name='{self.table_name}', row_id={self.row_id}, "
+            f"operation='{self.operation}')")
@@ -1,6 +1,7 @@
 """ Keyword model for FocusWatch. """
 
-from typing import Optional
+import re
+from typing import Any, Dict, Optional, Pattern
 
 from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
 
@@ -8,32 +9,64 @@ from focuswatch.database.models import Base
 
 
 class Keyword(Base):
-  """ Represents a keyword in the database. """
+  """ Represents a keyword in the database.
+
+  A keyword matches as a substring, a whole word or a regular expression,
+  against the window title ("class name"), the window class or the window
+  name only. Exclusion keywords prevent their category from being assigned
+  by keywords of lower or equal priority.
+  """
 
   __tablename__ = "keywords"
 
+  MATCH_SUBSTRING = "substring"
+  MATCH_WORD = "word"
+  MATCH_REGEX = "regex"
+  MATCH_TYPES = (MATCH_SUBSTRING, MATCH_WORD, MATCH_REGEX)
+  TARGET_TITLE = "title"
+  TARGET_CLASS = "class"
+  TARGET_NAME = "name"
+  TARGETS = (TARGET_TITLE, TARGET_CLASS, TARGET_NAME)
+
   id = Column(Integer, primary_key=True, autoincrement=True)
   name = Column(String, nullable=False)
   category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
   match_case = Column(Boolean, nullable=False, default=False)
+  # Nullable as they were added to existing databases, NULL means the default
+  match_type = Column(String, nullable=True, default=MATCH_SUBSTRING)
+  target = Column(String, nullable=True, default=TARGET_TITLE)
+  exclude = Column(Boolean, nullable=True, default=False)
+  priority = Column(Integer, nullable=True, default=0)
 
-  def __init__(self, 
-               name: str = "", 
+  def __init__(self,
+               name: str = "",
                category_id: int = None,
-               match_case: bool = False, 
-               id: Optional[int] = None):
+               match_case: bool = False,
+               id: Optional[int] = None,
+               match_type: str = MATCH_SUBSTRING,
+               target: str = TARGET_TITLE,
+               exclude: bool = False,
+               priority: int = 0):
     """ Initialize the keyword.
 
     Args:
-      name: Keyword name.
+      name: Keyword name, a regular expression for regex keywords.
       category_id: ID of the associated category.
       match_case: Whether matching is case-sensitive.
       id: Optional ID if pre-assigned.
+      match_type: One of MATCH_TYPES.
+      target: What the keyword is matched against, one of TARGETS.
+      exclude: Whether the keyword prevents its category from being assigned.
+      priority: Keywords of higher priority win over deeper categories and override exclusions.
     """
     self.id = id
     self.name = name
     self.category_id = category_id
     self.match_case = match_case
+    self.match_type = match_type
+    self.target = target
+    self.exclude = exclude
+    self.priority = priority
 
   # def __eq__(self, other): # Possibly obsolete
   #   if not isinstance(other, Keyword):
@@ -44,17 +77,61 @@ class Keyword(Base):
   def __repr__(self):
     return f"Keyword(name='{self.name}', category_id={self.category_id}, id={self.id}, match_case={self.match_case})"
 
+  def rule_fields(self) -> Dict[str, Any]:
+    """ The fields defining what the keyword matches, with NULLs replaced by their defaults. """
+    return {
+      "name": self.name,
+      "match_case": bool(self.match_case),
+      "match_type": self.match_type or self.MATCH_SUBSTRING,
+      "target": self.target or self.TARGET_TITLE,
+      "exclude": bool(self.exclude),
+      "priority": self.priority or 0,
+    }
+
   # def __hash__(self): # this as well
   #   return hash((self.name, self.category_id, self.id, self.match_case))
 
+  def pattern(self) -> Optional[Pattern]:
+    """ Compile the keyword of a word or regex keyword.
+
+    Returns:
+      Optional[Pattern]: The compiled pattern, None for substring keywords.
+
+    Raises:
+      re.error: If the regular expression is invalid.
+    """
+    match_type = self.match_type or self.MATCH_SUBSTRING
+    if match_type == self.MATCH_SUBSTRING:
+      return None
+    flags = 0 if self.match_case else re.IGNORECASE
+    if match_type == self.MATCH_WORD:
+      # \b would not match around keywords starting or ending with punctuation
+      return re.compile(rf"(?<!\w){re.escape(self.name)}(?!\w)", flags)
+    return re.compile(self.name, flags)
+
+  def target_text(self, window_class: str, window_name: str) -> str:
+    """ Return the part of a window title the keyword is matched against. """
+    target = self.target or self.TARGET_TITLE
+    if target == self.TARGET_CLASS:
+      return window_class
+    if target == self.TARGET_NAME:
+      return window_name
+    return f"{window_class} {window_name}"
+
   def matches(self, text: str) -> bool:
     """ Check if this keyword matches the given text.
 
     Args:
-      text: Text to match against.
+      text: Text to match against, see target_text.
     Returns:
       bool: True if the keyword matches the text.
     """
+    try:
+      pattern = self.pattern()
+    except re.error:
+      return False
+    if pattern is not None:
+      return pattern.search(text) is not None
     if self.match_case:
       return self.name in text
     return self.name.lower() in text.lower()
@@ -0,0 +1,39 @@
+""" Uncategorized totals model for FocusWatch. """
+
+from sqlalchemy import Column, Float, Index, String
+
+from focuswatch.database.models import Base
+
+
+class UncategorizedTotal(Base):
+  """ Total uncategorized time per window class or window name.
+
+  A rollup of the activity table maintained by ActivityService, ranked by
+  (total_seconds, name) so that the categorization helper can page through it
+  without aggregating the whole history.
+  """
+
+  __tablename__ = "uncategorized_totals"
+  __table_args__ = (
+    Index("ix_uncategorized_totals_rank", "kind", "total_seconds", "name"),
+  )
+
+  kind = Column(String, primary_key=True)  # "class" or "name"
+  name = Column(String, primary_key=True)
+  total_seconds = Column(Float, nullable=False, default=0.0)
+
+  def __init__(self, kind: str, name: str, total_seconds: float = 0.0):
+    """ Initialize the total.
+
+    Args:
+      kind: "class" for window classes, "name" for window names.
+      name: The window class or window name.
+      total_seconds: Uncategorized time in seconds.
+    """
+    self.kind = kind
+    self.name = name
+    self.total_seconds = total_seconds
+
+  def __repr__(self):
+    return (f"UncategorizedTotal(kind='{self.kind}', name='{self.name}', "
+            f"total_seconds={self.total_seconds})")
@@ -0,0 +1,46 @@
+""" Window title model for FocusWatch. """
+
+from typing import Optional
+
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+
+from focuswatch.database.models import Base
+
+
+class WindowTitle(Base):
+  """ A distinct (window_class, window_name) pair seen in the activity table.
+
+  Rows are added by a trigger on activity inserts and indexed by the
+  window_titles_fts FTS5 table for search. title_key is the normalized title
+  the title aggregates group on, filled lazily and NULL until then.
+  """
+
+  __tablename__ = "window_titles"
+  __table_args__ = (UniqueConstraint("window_class", "window_name"),)
+
+  id = Column(Integer, primary_key=True, autoincrement=True)
+  window_class = Column(String, nullable=False)
+  window_name = Column(String, nullable=False)
+  title_key = Column(String, nullable=True)
+
+  def __init__(self,
+               window_class: str = "",
+               window_name: str = "",
+               title_key: Optional[str] = None,
+               id: Optional[int] = None):
+    """ Initialize the window title.
+
+    Args:
+      window_class: Window class name.
+      window_name: Window name.
+      title_key: Normalized window name.
+      id: Optional ID if pre-assigned.
+    """
+    self.id = id
+    self.window_class = window_class
+    self.window_name = window_name
+    self.title_key = title_key
+
+  def __repr__(self):
+    return (f"WindowTitle(id={self.id}, window_class='{self.window_class}', "
+            f"window_name='{self.window_name}')")
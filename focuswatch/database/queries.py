@@ -0,0 +1,132 @@
+""" Prebuilt statements for the period aggregates of FocusWatch.
+
+The statements are built once with bound parameters, so SQLAlchemy compiles
+each of them once and serves later executions from its compiled cache. Every
+period query filters with PERIOD and takes its parameters from period_params.
+
+PERIOD compares time_start as text: ISO timestamps sort like the dates they
+start with, so the filter can use ix_activity_time_start, unlike date(time_start).
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import and_, bindparam, func, literal, select
+
+from focuswatch.database.models.activity import Activity
+from focuswatch.database.models.category import Category
+from focuswatch.database.models.window_title import WindowTitle
+
+MAX_CATEGORY_DEPTH = 32  # guards the rollup against parent cycles
+
+# Activities starting between :first_day and the day before :day_after
+PERIOD = and_(Activity.time_start >= bindparam("first_day"),
+              Activity.time_start < bindparam("day_after"))
+
+DURATION_SECONDS = (func.julianday(Activity.time_stop) -
+                    func.julianday(Activity.time_start)) * 86400
+TOTAL_SECONDS = func.sum(DURATION_SECONDS).label("total_time_seconds")
+
+
+def period_params(period_start: datetime, period_end: Optional[datetime] = None) -> Dict[str, str]:
+  """ Return the parameters of PERIOD.
+
+  Args:
+    period_start: The first day of the period.
+    period_end: The last day of the period. If None, only period_start is considered.
+  """
+  last_day = (period_end or period_start).date()
+  return {"first_day": period_start.date().isoformat(),
+          "day_after": (last_day + timedelta(days=1)).isoformat()}
+
+
+def open_period(period_start: Optional[datetime], period_end: Optional[datetime]):
+  """ Return a filter like PERIOD with literal bounds, either of which may be left open.
+
+  Args:
+    period_start: The first day, None for the beginning of the history.
+    period_end: The last day (inclusive), None for no upper bound.
+
+  Returns:
+    The condition, None if both bounds are open.
+  """
+  conditions = []
+  if period_start:
+    conditions.append(Activity.time_start >= period_start.date().isoformat())
+  if period_end:
+    conditions.append(Activity.time_start < (period_end.date() + timedelta(days=1)).isoformat())
+  return and_(*conditions) if conditions else None
+
+
+PERIOD_ENTRIES = select(Activity).where(PERIOD)
+
+# (window_class, category_id, total_time_seconds)
+CLASS_TIME_TOTALS = (
+  select(Activity.window_class, Activity.category_id, TOTAL_SECONDS)
+  .where(PERIOD)
+  .group_by(Activity.window_class)
+  .order_by(TOTAL_SECONDS.desc()))
+
+# (title key, category_id, total_time_seconds), raw titles without a key yet stand for themselves
+_TITLE = func.coalesce(WindowTitle.title_key, Activity.window_name)
+NAME_TIME_TOTALS = (
+  select(_TITLE, Activity.category_id, TOTAL_SECONDS)
+  .outerjoin(WindowTitle, and_(WindowTitle.window_class == Activity.window_class,
+                               WindowTitle.window_name == Activity.window_name))
+  .where(PERIOD)
+  .group_by(_TITLE)
+  .order_by(TOTAL_SECONDS.desc()))
+
+# (category_id,) of the category :window_class was in the longest
+LONGEST_CATEGORY_FOR_CLASS = (
+  select(Activity.category_id)
+  .where(PERIOD, Activity.window_class == bindparam("window_class"))
+  .group_by(Activity.category_id)
+  .order_by(func.sum(DURATION_SECONDS).desc())
+  .limit(1))
+
+# (category_id, total_time_seconds)
+CATEGORY_TIME_TOTALS = (
+  select(Activity.category_id, TOTAL_SECONDS)
+  .where(PERIOD, Activity.category_id.is_not(None))
+  .group_by(Activity.category_id)
+  .order_by(TOTAL_SECONDS.desc()))
+
+
+def _category_rollup():
+  """ Build CATEGORY_ROLLUP, child time is rolled up to every ancestor by a recursive CTE. """
+  self_time = (
+    select(Activity.category_id.label("category_id"), func.sum(DURATION_SECONDS).label("seconds"))
+    .where(PERIOD, Activity.category_id.is_not(None))
+    .group_by(Activity.category_id)
+    .cte("self_time"))
+
+  # (category_id, ancestor_id) for every category and each of its ancestors, itself included
+  ancestry = (
+    select(Category.id.label("category_id"), Category.id.label("ancestor_id"),
+           literal(0).label("depth"))
+    .cte("ancestry", recursive=True))
+  parent = Category.__table__.alias("parent")
+  ancestry = ancestry.union_all(
+    select(ancestry.c.category_id, parent.c.parent_category_id, ancestry.c.depth + 1)
+    .join(parent, parent.c.id == ancestry.c.ancestor_id)
+    .where(parent.c.parent_category_id.is_not(None),
+           ancestry.c.depth < MAX_CATEGORY_DEPTH))
+
+  own_time = self_time.alias("own_time")
+  descendant_time = self_time.alias("descendant_time")
+  subtree_seconds = func.sum(func.coalesce(descendant_time.c.seconds, 0))
+  return (
+    select(Category,
+           func.coalesce(own_time.c.seconds, 0).label("self_seconds"),
+           subtree_seconds.label("subtree_seconds"))
+    .join(ancestry, ancestry.c.ancestor_id == Category.id)
+    .outerjoin(descendant_time, descendant_time.c.category_id == ancestry.c.category_id)
+    .outerjoin(own_time, own_time.c.category_id == Category.id)
+    .group_by(Category.id)
+    .having(subtree_seconds > 0)
+    .order_by(subtree_seconds.desc(), Category.id))
+
+
+# (Category, self_seconds, subtree_seconds) of the categories with time in their subtree
+CATEGORY_ROLLUP = _category_rollup()
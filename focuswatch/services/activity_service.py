@@ -2,28 +2,65 @@
 
 import logging
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-from sqlalchemy import func, or_
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import (Integer, cast, func, literal, literal_column, or_, select,
+                        table, text, tuple_, update)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.orm import Session
 
+from focuswatch.config import Config
+from focuswatch.database import queries
+from focuswatch.database.analytics_engine import analytics
 from focuswatch.database.database_connection import DatabaseConnection
 from focuswatch.database.models.activity import Activity
 from focuswatch.database.models.category import Category
+from focuswatch.database.models.keyword import Keyword
+from focuswatch.database.models.metadata import Metadata
+from focuswatch.database.models.uncategorized_total import \
+    UncategorizedTotal
+from focuswatch.database.models.window_title import WindowTitle
+from focuswatch.services.title_normalizer import TitleNormalizer
+from focuswatch.utils.query_cache import query_cache
 
 logger = logging.getLogger(__name__)
 
 
 class ActivityService:
   """ Service class for managing activities in the FocusWatch application. """
-
-  def __init__(self, db_conn: Optional[DatabaseConnection] = None):
+  # Columns rolled up in the uncategorized_totals table, by kind
+  UNCATEGORIZED_COLUMNS = {
+    "class": Activity.window_class,
+    "name": Activity.window_name,
+  }
+  # Highest activity id folded into uncategorized_totals
+  UNCATEGORIZED_WATERMARK_KEY = "uncategorized_totals_watermark"
+  # The trigram tokenizer only matches queries of at least three characters
+  MIN_FTS_QUERY_LENGTH = 3
+  # Window titles per recategorization statement, well below SQLite's variable limit
+  TITLES_PER_UPDATE = 400
+  # ID of the activity the watcher is recording, its time_stop is the last heartbeat
+  OPEN_ACTIVITY_KEY = "open_activity_id"
+  HEARTBEAT_UPDATE = "UPDATE activity SET time_stop = ? WHERE id = ?"
+  CLOSE_UPDATE = ("UPDATE activity SET time_stop = ?, window_class = ?, window_name = ?, "
+                  "category_id = ?, focused = ? WHERE id = ?")
+  INSERT_WINDOW_TITLE = "INSERT OR IGNORE INTO window_titles (window_class, window_name) VALUES (?, ?)"
+  # Fingerprint of the normalization rules the title keys of window_titles were computed with
+  TITLE_NORMALIZATION_KEY = "title_normalization"
+
+  def __init__(self,
+               db_conn: Optional[DatabaseConnection] = None,
+               title_normalizer: Optional[TitleNormalizer] = None):
     """ Initialize the ActivityService.
 
     Args:
       db_conn: Optional DatabaseConnection instance for dependency injection.
+      title_normalizer: Optional TitleNormalizer, built from the title_normalization config section if None.
     """
     self._db_conn = db_conn or DatabaseConnection()
+    self._title_normalizer = title_normalizer
+    self._title_normalizer_config: Optional[Dict] = None
 
   def insert_activity(self, activity: Activity) -> bool:
     """ Insert an activity into the database.
@@ -34,10 +71,13 @@ class ActivityService:
     Returns:
       bool: True if the activity was inserted successfully, False otherwise.
     """
+    started = activity.time_start
     with self._db_conn.get_session() as session:
       try:
         session.add(activity)
         session.commit()
+        query_cache.invalidate(
+          (started if isinstance(started, datetime) else datetime.fromisoformat(started)).date())
         # logger.debug(f"Inserted new activity: {activity.window_name}")
         return True
       except SQLAlchemyError as e:
@@ -45,6 +85,134 @@ class ActivityService:
         session.rollback()
         return False
 
+  def open_activity(self, activity: Activity) -> Optional[int]:
+    """ Insert the activity being recorded, with its time_stop equal to its time_start.
+
+    The row is extended by heartbeat_activity and finalized by close_activity.
+    Until then its ID is kept in the metadata table, so that a crash leaves at
+    most one heartbeat interval unaccounted for.
+
+    Args:
+      activity: The activity that just started.
+
+    Returns:
+      Optional[int]: The ID of the open row, None on failure.
+    """
+    day = datetime.fromisoformat(activity.time_start).date()
+    with self._db_conn.get_session() as session:
+      try:
+        session.add(activity)
+        session.flush()
+        activity_id = activity.id
+        session.merge(Metadata(self.OPEN_ACTIVITY_KEY, str(activity_id)))
+        session.commit()
+        query_cache.invalidate(day)
+        return activity_id
+      except SQLAlchemyError as e:
+        logger.error(f"Failed to insert open activity: {e}")
+        session.rollback()
+        return None
+
+  def heartbeat_activity(self, activity_id: int, time_start: datetime, time_stop: datetime) -> bool:
+    """ Extend the open activity up to time_stop.
+
+    Args:
+      activity_id: The ID returned by open_activity.
+      time_start: Start of the activity, the cached periods of its day are invalidated.
+      time_stop: The current time.
+
+    Returns:
+      bool: True if the activity was updated successfully, False otherwise.
+    """
+    try:
+      with self._db_conn.engine.begin() as connection:
+        connection.exec_driver_sql(self.HEARTBEAT_UPDATE, (time_stop.isoformat(), activity_id))
+      query_cache.invalidate(time_start.date())
+      return True
+    except SQLAlchemyError as e:
+      logger.error(f"Failed to update open activity {activity_id}: {e}")
+      return False
+
+  def close_activity(self, activity_id: int, activity: Activity) -> bool:
+    """ Finalize the open activity with the values of activity.
+
+    The window may differ from the one the row was opened with, when the
+    time turned out to be AFK.
+
+    Args:
+      activity_id: The ID returned by open_activity.
+      activity: The final activity, its time_start is not changed.
+
+    Returns:
+      bool: True if the activity was closed successfully, False otherwise.
+    """
+    try:
+      with self._db_conn.engine.begin() as connection:
+        # Cleared first, the change log ignores the heartbeats of the open row
+        connection.execute(
+          Metadata.__table__.delete().where(Metadata.key == self.OPEN_ACTIVITY_KEY))
+        connection.exec_driver_sql(self.CLOSE_UPDATE, (
+          activity.time_stop, activity.window_class, activity.window_name,
+          activity.category_id, bool(activity.focused), activity_id))
+        connection.exec_driver_sql(
+          self.INSERT_WINDOW_TITLE, (activity.window_class, activity.window_name))
+      query_cache.invalidate(datetime.fromisoformat(activity.time_start).date())
+      return True
+    except SQLAlchemyError as e:
+      logger.error(f"Failed to close open activity {activity_id}: {e}")
+      return False
+
+  def get_open_activity_time_stop(self) -> Optional[str]:
+    """ Return the time_stop of the open activity, as of its last heartbeat.
+
+    Heartbeats are not recorded in the change log, this tells readers that
+    the ongoing activity grew.
+
+    Returns:
+      Optional[str]: The time_stop, None if no activity is open or on failure.
+    """
+    with self._db_conn.get_session() as session:
+      try:
+        return session.execute(
+          select(Activity.time_stop)
+          .join(Metadata, Activity.id == cast(Metadata.value, Integer))
+          .where(Metadata.key == self.OPEN_ACTIVITY_KEY)).scalar()
+      except SQLAlchemyError as e:
+        logger.error(f"Failed to get the open activity: {e}")
+        return None
+
+  def recover_open_activity(self) -> Optional[int]:
+    """ Close the activity left open by a watcher that did not shut down cleanly.
+
+    The row keeps the time_stop of its last heartbeat. A row that never got a
+    heartbeat has no duration and is removed.
+
+    Returns:
+      Optional[int]: The ID of the recovered activity, None if there was none.
+    """
+    with self._db_conn.get_session() as session:
+      try:
+        row = session.get(Metadata, self.OPEN_ACTIVITY_KEY)
+        if row is None:
+          return None
+        activity_id = int(row.value)
+        session.delete(row)
+        activity = session.get(Activity, activity_id)
+        if activity is not None and activity.time_stop == activity.time_start:
+          session.delete(activity)
+          watermark = self._get_uncategorized_watermark(session)
+          if watermark is not None and activity_id <= watermark:
+            # The rollup only folds in new rows, rebuild it without the deleted one
+            session.delete(session.get(Metadata, self.UNCATEGORIZED_WATERMARK_KEY))
+        session.commit()
+        query_cache.clear()
+        logger.info(f"Recovered activity {activity_id} left open by the previous run")
+        return activity_id
+      except (SQLAlchemyError, ValueError) as e:
+        logger.error(f"Failed to recover the open activity: {e}")
+        session.rollback()
+        return None
+
   def update_category(self, activity_id: int, category_id: int) -> bool:
     """ Update the category ID of an activity.
 
@@ -57,10 +225,9 @@ class ActivityService:
     """
     with self._db_conn.get_session() as session:
       try:
-        session.query(Activity).filter(Activity.id == activity_id).update(
-          {Activity.category_id: category_id}
-        )
+        self._recategorize(session, Activity.id == activity_id, category_id)
         session.commit()
+        query_cache.clear()
         return True
       except SQLAlchemyError as e:
         logger.error(f"Failed to update category for activity: {e}")
@@ -82,10 +249,9 @@ class ActivityService:
 
     with self._db_conn.get_session() as session:
       try:
-        session.query(Activity).filter(Activity.id.in_(activity_ids)).update(
-          {Activity.category_id: category_id}, synchronize_session=False
-        )
+        self._recategorize(session, Activity.id.in_(activity_ids), category_id)
         session.commit()
+        query_cache.clear()
         return True
       except SQLAlchemyError as e:
         logger.error(f"Failed to bulk update categories for activities: {e}")
@@ -104,11 +270,13 @@ class ActivityService:
     """
     with self._db_conn.get_session() as session:
       try:
-        session.query(Activity).filter(
+        self._recategorize(
+          session,
           or_(Activity.window_class == activity_name,
-              Activity.window_name == activity_name)
-        ).update({Activity.category_id: category_id}, synchronize_session=False)
+              Activity.window_name == activity_name),
+          category_id)
         session.commit()
+        query_cache.clear()
         return True
       except SQLAlchemyError as e:
         logger.error(
@@ -116,6 +284,92 @@ class ActivityService:
         session.rollback()
         return False
 
+  def bulk_update_category_by_titles(self,
+                                     categories: Dict[Tuple[str, str], Optional[int]]) -> int:
+    """ Recategorize activities by window title, in a single transaction.
+
+    Args:
+      categories: The new category ID of each (window_class, window_name).
+
+    Returns:
+      int: The number of updated activities, -1 on failure.
+    """
+    by_category: Dict[Optional[int], List[Tuple[str, str]]] = {}
+    for title, category_id in categories.items():
+      by_category.setdefault(category_id, []).append(title)
+
+    with self._db_conn.get_session() as session:
+      try:
+        updated = 0
+        title_column = tuple_(Activity.window_class, Activity.window_name)
+        for category_id, titles in by_category.items():
+          for i in range(0, len(titles), self.TITLES_PER_UPDATE):
+            condition = (title_column.in_(titles[i:i + self.TITLES_PER_UPDATE]) &
+                         Activity.category_id.is_distinct_from(category_id))
+            updated += session.query(func.count(Activity.id)).filter(condition).scalar()
+            self._recategorize(session, condition, category_id)
+        session.commit()
+        query_cache.clear()
+        return updated
+      except SQLAlchemyError as e:
+        logger.error(f"Failed to update categories by window title: {e}")
+        session.rollback()
+        return -1
+
+  def get_window_titles_by_category(self, category_ids: Iterable[int]) -> Set[Tuple[str, str]]:
+    """ Return the distinct (window_class, window_name) of the activities in the given categories. """
+    category_ids = list(category_ids)
+    if not category_ids:
+      return set()
+    with self._db_conn.get_session() as session:
+      try:
+        return set(session.execute(
+          select(Activity.window_class, Activity.window_name)
+          .where(Activity.category_id.in_(category_ids))
+          .distinct()).tuples())
+      except SQLAlchemyError as e:
+        logger.error(f"Failed to retrieve window titles by category: {e}")
+        return set()
+
+  def get_window_titles_matching(self, keywords: Iterable[Keyword]) -> Set[Tuple[str, str]]:
+    """ Return the known (window_class, window_name) that any of the keywords match.
+
+    Keywords are matched as the classifier does, exclusion keywords included.
+    The window titles index narrows the candidates of substring and whole word
+    keywords that fit in a column.
+
+    Args:
+      keywords: The keywords.
+    """
+    titles: Set[Tuple[str, str]] = set()
+    with self._db_conn.get_session() as session:
+      for keyword in keywords:
+        name = keyword.name
+        if not name:
+          continue
+        candidates = select(WindowTitle.window_class, WindowTitle.window_name)
+        # Regular expressions, keywords that may span the class and the name,
+        # or that LIKE cannot fold the case of, are checked against every title
+        indexed = (keyword.rule_fields()["match_type"] != Keyword.MATCH_REGEX
+                   and " " not in name
+                   and (name.isascii() or len(name) >= self.MIN_FTS_QUERY_LENGTH))
+        rows = None
+        for use_fts in ((True, False) if indexed else (None,)):
+          try:
+            stmt = candidates if use_fts is None else candidates.where(
+              WindowTitle.id.in_(self._match_window_titles(name, use_fts)))
+            rows = session.execute(stmt).all()
+            break
+          except SQLAlchemyError as e:
+            logger.error(f"Failed to match window titles with '{name}': {e}")
+            session.rollback()
+        if rows is None:
+          continue
+        for window_class, window_name in rows:
+          if keyword.matches(keyword.target_text(window_class, window_name)):
+            titles.add((window_class, window_name))
+    return titles
+
   def get_all_activities(self) -> List[Activity]:
     """ Return all activity entries in the database.
 
@@ -154,8 +408,7 @@ class ActivityService:
     """
     with self._db_conn.get_session() as session:
       try:
-        today = datetime.now().date()
-        return session.query(Activity).filter(func.date(Activity.time_start) == today).all()
+        return list(session.scalars(queries.PERIOD_ENTRIES, queries.period_params(datetime.now())))
       except SQLAlchemyError as e:
         logger.error(f"Failed to retrieve today's activities: {e}")
         return []
@@ -171,13 +424,13 @@ class ActivityService:
     """
     with self._db_conn.get_session() as session:
       try:
-        formatted_date = date.date()
-        return session.query(Activity).filter(func.date(Activity.time_start) == formatted_date).all()
+        return list(session.scalars(queries.PERIOD_ENTRIES, queries.period_params(date)))
       except SQLAlchemyError as e:
         logger.error(
-          f"Failed to retrieve activities for date {formatted_date}: {e}")
+          f"Failed to retrieve activities for date {date.date()}: {e}")
         return []
 
+  @query_cache.cached("activity.period_entries")
   def get_period_entries(self, period_start: datetime, period_end: Optional[datetime] = None) -> List[Activity]:
     """ Return all entries for a given period.
 
@@ -190,17 +443,8 @@ class ActivityService:
     """
     with self._db_conn.get_session() as session:
       try:
-        start_date = period_start.date()
-        if period_end:
-          end_date = period_end.date()
-          query = session.query(Activity).filter(
-            func.date(Activity.time_start).between(start_date, end_date)
-          )
-        else:
-          query = session.query(Activity).filter(
-            func.date(Activity.time_start) == start_date)
-
-        activities = query.all()
+        activities = list(session.scalars(
+          queries.PERIOD_ENTRIES, queries.period_params(period_start, period_end)))
         for activity in activities:
           activity.time_start = datetime.fromisoformat(activity.time_start)
           activity.time_stop = datetime.fromisoformat(
@@ -220,25 +464,9 @@ class ActivityService:
       List[Tuple[str, Optional[int], int]]: A list of tuples containing
       (window_class, category_id, total_time_seconds).
     """
-    with self._db_conn.get_session() as session:
-      try:
-        formatted_date = date.date()
-        result = (session.query(
-            Activity.window_class,
-            Activity.category_id,
-            (func.sum(func.julianday(Activity.time_stop) -
-             func.julianday(Activity.time_start)) * 86400).label("total_time_seconds")
-          )
-          .filter(func.date(Activity.time_start) == formatted_date)
-          .group_by(Activity.window_class)
-          .order_by(func.sum(func.julianday(Activity.time_stop) - func.julianday(Activity.time_start)).desc())
-          .all())
-        return [(r[0], r[1], int(r[2])) for r in result]
-      except SQLAlchemyError as e:
-        logger.error(
-          f"Failed to retrieve class time totals for date {formatted_date}: {e}")
-        return []
+    return self._time_totals(queries.CLASS_TIME_TOTALS, date, None, "class")
 
+  @query_cache.cached("activity.class_time_totals")
   def get_period_entries_class_time_total(
       self,
       period_start: datetime,
@@ -254,37 +482,18 @@ class ActivityService:
       List[Tuple[str, Optional[int], int]]: A list of tuples containing
       (window_class, category_id, total_time_seconds).
     """
-    with self._db_conn.get_session() as session:
-      try:
-        start_date = period_start.date()
-        query = (session.query(
-            Activity.window_class,
-            Activity.category_id,
-            (func.sum(func.julianday(Activity.time_stop) -
-             func.julianday(Activity.time_start)) * 86400).label("total_time_seconds")
-          )
-          .group_by(Activity.window_class)
-          .order_by(func.sum(func.julianday(Activity.time_stop) - func.julianday(Activity.time_start)).desc()))
-
-        if period_end:
-          end_date = period_end.date()
-          query = query.filter(
-            func.date(Activity.time_start).between(start_date, end_date))
-        else:
-          query = query.filter(func.date(Activity.time_start) == start_date)
-
-        result = query.all()
-        return [(r[0], r[1], int(r[2])) for r in result]
-      except SQLAlchemyError as e:
-        logger.error(f"Failed to retrieve class time totals for period: {e}")
-        return []
+    return self._time_totals(queries.CLASS_TIME_TOTALS, period_start, period_end, "class")
 
+  @query_cache.cached("activity.name_time_totals")
   def get_period_entries_name_time_total(
       self,
       period_start: datetime,
       period_end: Optional[datetime] = None
   ) -> List[Tuple[str, Optional[int], int]]:
-    """ Return the total time spent on each window name for a given period.
+    """ Return the total time spent on each normalized window name for a given period.
+
+    Titles differing only by unread counters or by the normalization rules are
+    grouped together, see TitleNormalizer.
 
     Args:
       period_start: The start date of the period.
@@ -292,33 +501,85 @@ class ActivityService:
 
     Returns:
       List[Tuple[str, Optional[int], int]]: A list of tuples containing
-      (window_name, category_id, total_time_seconds).
+      (normalized_window_name, category_id, total_time_seconds).
     """
-    with self._db_conn.get_session() as session:
-      try:
-        start_date = period_start.date()
-        query = (session.query(
-            Activity.window_name,
-            Activity.category_id,
-            (func.sum(func.julianday(Activity.time_stop) -
-             func.julianday(Activity.time_start)) * 86400).label("total_time_seconds")
-          )
-          .group_by(Activity.window_name)
-          .order_by(func.sum(func.julianday(Activity.time_stop) - func.julianday(Activity.time_start)).desc()))
+    return self._time_totals(queries.NAME_TIME_TOTALS, period_start, period_end, "name",
+                             prepare=self._refresh_title_keys)
 
-        if period_end:
-          end_date = period_end.date()
-          query = query.filter(
-            func.date(Activity.time_start).between(start_date, end_date))
-        else:
-          query = query.filter(func.date(Activity.time_start) == start_date)
+  def _time_totals(self,
+                   statement,
+                   period_start: datetime,
+                   period_end: Optional[datetime],
+                   kind: str,
+                   prepare: Optional[Callable[[Session], None]] = None) -> List[Tuple[str, Optional[int], int]]:
+    """ Run a (key, category_id, total_time_seconds) statement of the queries module for a period.
 
-        result = query.all()
-        return [(r[0], r[1], int(r[2])) for r in result]
+    Long periods are computed by the DuckDB analytics engine when it is available.
+
+    Args:
+      statement: The statement, e.g. queries.CLASS_TIME_TOTALS.
+      period_start: The start date of the period.
+      period_end: The end date of the period. If None, only period_start is considered.
+      kind: What the totals are keyed by, "class" or "name", see analytics_engine.STATEMENTS.
+      prepare: Called with the session before the statement runs.
+    """
+    with self._db_conn.get_session() as session:
+      try:
+        if prepare is not None:
+          prepare(session)
+        totals = analytics.time_totals(self._db_conn.engine, kind, period_start, period_end)
+        if totals is not None:
+          return totals
+        result = session.execute(statement, queries.period_params(period_start, period_end))
+        return [(key, category_id, int(seconds)) for key, category_id, seconds in result]
       except SQLAlchemyError as e:
-        logger.error(f"Failed to retrieve name time totals for period: {e}")
+        logger.error(f"Failed to retrieve {kind} time totals for period: {e}")
         return []
 
+  def _get_title_normalizer(self) -> TitleNormalizer:
+    """ Return the title normalizer, rebuilt when the title_normalization config section changes. """
+    if self._title_normalizer is not None and self._title_normalizer_config is None:
+      return self._title_normalizer
+    config = Config()
+    if self._title_normalizer_config is None:
+      config.subscribe(self._on_config_changed)
+    section = config.section_snapshot("title_normalization")
+    if section != self._title_normalizer_config:
+      self._title_normalizer = TitleNormalizer.from_config(section)
+      self._title_normalizer_config = section
+    return self._title_normalizer
+
+  def _on_config_changed(self, section: str, key: str, value) -> None:  # pylint: disable=unused-argument
+    """ Drop the cached title aggregates when the normalization rules change. """
+    if section == "title_normalization":
+      query_cache.clear()
+
+  def _refresh_title_keys(self, session: Session) -> None:
+    """ Compute the title keys of the window titles that have none yet.
+
+    Keys are computed once per distinct title rather than per activity; when
+    the normalization rules change, every key is recomputed.
+    """
+    normalizer = self._get_title_normalizer()
+    stored = session.get(Metadata, self.TITLE_NORMALIZATION_KEY)
+    changed = stored is None or stored.value != normalizer.fingerprint
+    if changed:
+      session.execute(update(WindowTitle).values(title_key=None))
+      session.merge(Metadata(self.TITLE_NORMALIZATION_KEY, normalizer.fingerprint))
+
+    pending = (session.query(WindowTitle.id, WindowTitle.window_class, WindowTitle.window_name)
+               .filter(WindowTitle.title_key.is_(None))
+               .all())
+    if pending:
+      session.execute(update(WindowTitle), [
+        {"id": title_id, "title_key": normalizer.normalize(window_class, window_name)}
+        for title_id, window_class, window_name in pending])
+    if changed or pending:
+      session.commit()
+    if changed and stored is not None:
+      # Aggregates cached with the previous keys are stale
+      query_cache.clear()
+
   def get_longest_duration_category_id_for_window_class_on_date(
       self,
       date: datetime,
@@ -333,22 +594,7 @@ class ActivityService:
     Returns:
       Optional[int]: The category ID with the longest duration, or None if not found.
     """
-    with self._db_conn.get_session() as session:
-      try:
-        formatted_date = date.date()
-        result = (session.query(Activity.category_id)
-                  .filter(
-            func.date(Activity.time_start) == formatted_date,
-            Activity.window_class == window_class
-        )
-            .group_by(Activity.category_id)
-            .order_by(func.sum(func.julianday(Activity.time_stop) - func.julianday(Activity.time_start)).desc())
-            .first())
-        return result[0] if result else None
-      except SQLAlchemyError as e:
-        logger.error(
-          f"Failed to retrieve longest duration category for window class {window_class} on date {formatted_date}: {e}")
-        return None
+    return self.get_longest_duration_category_id_for_window_class_in_period(date, window_class)
 
   def get_longest_duration_category_id_for_window_class_in_period(
       self,
@@ -368,106 +614,179 @@ class ActivityService:
     """
     with self._db_conn.get_session() as session:
       try:
-        start_date = period_start.date()
-        query = (session.query(Activity.category_id)
-                 .filter(Activity.window_class == window_class)
-                 .group_by(Activity.category_id)
-                 .order_by(func.sum(func.julianday(Activity.time_stop) - func.julianday(Activity.time_start)).desc()))
-
-        if period_end:
-          end_date = period_end.date()
-          query = query.filter(
-            func.date(Activity.time_start).between(start_date, end_date))
-        else:
-          query = query.filter(func.date(Activity.time_start) == start_date)
-
-        result = query.first()
-        return result[0] if result else None
+        return session.execute(queries.LONGEST_CATEGORY_FOR_CLASS, {
+          "window_class": window_class,
+          **queries.period_params(period_start, period_end)}).scalar()
       except SQLAlchemyError as e:
         logger.error(
-          f"Failed to retrieve longest duration category for window class {window_class} in period: {e}")
+          f"Failed to retrieve longest duration category for window class {window_class}: {e}")
         return None
 
-  def get_top_uncategorized_window_classes(
+  def _recategorize(self, session: Session, condition, category_id: int) -> None:
+    """ Set the category of the matching activities, keeping uncategorized_totals in sync.
+
+    Args:
+      session: The session the update runs in; the caller commits.
+      condition: Filter selecting the activities to update.
+      category_id: The new category ID.
+    """
+    watermark = self._get_uncategorized_watermark(session)
+    if watermark is not None:
+      condition_folded = condition & (Activity.id <= watermark)
+      self._fold_uncategorized_totals(session, condition_folded, sign=-1)
+    session.query(Activity).filter(condition).update(
+      {Activity.category_id: category_id}, synchronize_session=False)
+    if watermark is not None:
+      self._fold_uncategorized_totals(session, condition_folded)
+
+  @staticmethod
+  def _is_uncategorized():
+    """ Filter of the activities without a category or in Uncategorized.
+
+    The category is looked up by the statement itself, so a recreated
+    Uncategorized category is picked up.
+    """
+    uncategorized_id = (select(Category.id)
+                        .where(Category.name == "Uncategorized")
+                        .scalar_subquery())
+    return or_(Activity.category_id.is_(None), Activity.category_id == uncategorized_id)
+
+  def _get_uncategorized_watermark(self, session: Session) -> Optional[int]:
+    """ Return the highest activity ID folded into uncategorized_totals, None if not built. """
+    row = session.get(Metadata, self.UNCATEGORIZED_WATERMARK_KEY)
+    return int(row.value) if row else None
+
+  def _fold_uncategorized_totals(self, session: Session, condition, sign: int = 1) -> None:
+    """ Add (sign=1) or remove (sign=-1) the uncategorized time of the matching activities. """
+    for kind, column in self.UNCATEGORIZED_COLUMNS.items():
+      totals = (select(literal(kind), column, func.sum(queries.DURATION_SECONDS) * sign)
+                .where(condition, self._is_uncategorized(),
+                       Activity.time_stop.is_not(None))
+                .group_by(column))
+      statement = sqlite_insert(UncategorizedTotal).from_select(
+        ["kind", "name", "total_seconds"], totals)
+      statement = statement.on_conflict_do_update(
+        index_elements=["kind", "name"],
+        set_={"total_seconds": UncategorizedTotal.total_seconds +
+              statement.excluded.total_seconds})
+      session.execute(statement)
+    if sign < 0:
+      session.query(UncategorizedTotal).filter(
+        UncategorizedTotal.total_seconds < 0.5).delete(synchronize_session=False)
+
+  def _refresh_uncategorized_totals(self, session: Session) -> None:
+    """ Bring uncategorized_totals up to date with the activity table.
+
+    The first call builds the rollup from the whole history; later calls only
+    fold in activities inserted since, recategorizations being applied as they happen.
+    """
+    watermark = self._get_uncategorized_watermark(session)
+    latest = session.query(func.max(Activity.id)).scalar() or 0
+    open_activity = session.get(Metadata, self.OPEN_ACTIVITY_KEY)
+    if open_activity is not None:
+      # Its duration still grows, it is folded in once closed
+      latest = min(latest, int(open_activity.value) - 1)
+    if watermark is not None and watermark >= latest:
+      return
+
+    if watermark is None:
+      session.query(UncategorizedTotal).delete(synchronize_session=False)
+      self._fold_uncategorized_totals(session, Activity.id <= latest)
+    else:
+      self._fold_uncategorized_totals(
+        session, Activity.id.between(watermark + 1, latest))
+    session.merge(Metadata(self.UNCATEGORIZED_WATERMARK_KEY, str(latest)))
+    session.commit()
+
+  def get_uncategorized_totals_page(
       self,
+      kind: str,
       limit: int = 10,
-      offset: int = 0,
+      after: Optional[Tuple[float, str]] = None,
       threshold_seconds: int = 60
-  ) -> List[Tuple[str, int]]:
-    """ Return the top uncategorized window classes sorted by total time spent.
+  ) -> Tuple[List[Tuple[str, int]], Optional[Tuple[float, str]]]:
+    """ Return one page of uncategorized window classes or names ranked by total time.
 
-    Entries with total time less than the threshold are excluded.
+    Pages are read from the uncategorized_totals rollup using keyset pagination
+    on (total_seconds, name), so each page costs the same regardless of history size.
 
     Args:
+      kind: "class" for window classes, "name" for window names.
       limit: The maximum number of entries to return.
-      offset: The number of entries to skip before starting to collect the result set.
+      after: The cursor returned with the previous page, None for the first page.
       threshold_seconds: The minimum total time in seconds for an entry to be included.
 
     Returns:
-      List[Tuple[str, int]]: A list of tuples containing (window_class, total_time_seconds).
+      Tuple: A list of (name, total_time_seconds) tuples and the cursor for the
+      next page, which is None when there are no more entries.
     """
     with self._db_conn.get_session() as session:
       try:
-        uncategorized_id = session.query(Category.id).filter(
-          Category.name == "Uncategorized").scalar()
-        query = (session.query(
-            Activity.window_class,
-            (func.sum(func.julianday(Activity.time_stop) -
-             func.julianday(Activity.time_start)) * 86400).label("total_time_seconds")
-          )
-          .filter(or_(Activity.category_id.is_(None), Activity.category_id == uncategorized_id))
-          .group_by(Activity.window_class)
-          .having(func.sum(func.julianday(Activity.time_stop) - func.julianday(Activity.time_start)) * 86400 >= threshold_seconds)
-          .order_by(func.sum(func.julianday(Activity.time_stop) - func.julianday(Activity.time_start)).desc())
-          .limit(limit)
-          .offset(offset))
+        self._refresh_uncategorized_totals(session)
+        query = (session.query(UncategorizedTotal.name, UncategorizedTotal.total_seconds)
+          .filter(UncategorizedTotal.kind == kind,
+                  UncategorizedTotal.total_seconds >= threshold_seconds))
+        if after is not None:
+          last_total, last_name = after
+          query = query.filter(or_(
+            UncategorizedTotal.total_seconds < last_total,
+            (UncategorizedTotal.total_seconds == last_total) &
+            (UncategorizedTotal.name > last_name)))
+        result = (query
+          .order_by(UncategorizedTotal.total_seconds.desc(), UncategorizedTotal.name)
+          .limit(limit + 1)
+          .all())
 
-        result = query.all()
-        return [(r[0], int(r[1])) for r in result]
+        has_more = len(result) > limit
+        result = result[:limit]
+        cursor = (result[-1][1], result[-1][0]) if has_more else None
+        return [(r[0], int(r[1])) for r in result], cursor
       except SQLAlchemyError as e:
-        logger.error(
-          f"Failed to retrieve top uncategorized window classes: {e}")
-        return []
+        logger.error(f"Failed to retrieve uncategorized totals: {e}")
+        session.rollback()
+        return [], None
+
+  def get_top_uncategorized_window_classes(
+      self,
+      limit: int = 10,
+      after: Optional[Tuple[float, str]] = None,
+      threshold_seconds: int = 60
+  ) -> List[Tuple[str, int]]:
+    """ Return the top uncategorized window classes sorted by total time spent.
+
+    Entries with total time less than the threshold are excluded. Pages are
+    read with get_uncategorized_totals_page, see there for the cursor.
+
+    Args:
+      limit: The maximum number of entries to return.
+      after: The (total_time_seconds, window_class) of the last entry of the previous page.
+      threshold_seconds: The minimum total time in seconds for an entry to be included.
+
+    Returns:
+      List[Tuple[str, int]]: A list of tuples containing (window_class, total_time_seconds).
+    """
+    return self.get_uncategorized_totals_page("class", limit, after, threshold_seconds)[0]
 
   def get_top_uncategorized_window_names(
       self,
       limit: int = 10,
-      offset: int = 0,
+      after: Optional[Tuple[float, str]] = None,
       threshold_seconds: int = 60
   ) -> List[Tuple[str, int]]:
     """ Return the top uncategorized window names sorted by total time spent.
 
-    Entries with total time less than the threshold are excluded.
+    Entries with total time less than the threshold are excluded. Pages are
+    read with get_uncategorized_totals_page, see there for the cursor.
 
     Args:
       limit: The maximum number of entries to return.
-      offset: The number of entries to skip before starting to collect the result set.
+      after: The (total_time_seconds, window_name) of the last entry of the previous page.
       threshold_seconds: The minimum total time in seconds for an entry to be included.
 
     Returns:
       List[Tuple[str, int]]: A list of tuples containing (window_name, total_time_seconds).
     """
-    with self._db_conn.get_session() as session:
-      try:
-        uncategorized_id = session.query(Category.id).filter(
-          Category.name == "Uncategorized").scalar()
-        query = (session.query(
-            Activity.window_name,
-            (func.sum(func.julianday(Activity.time_stop) -
-             func.julianday(Activity.time_start)) * 86400).label("total_time_seconds")
-          )
-          .filter(or_(Activity.category_id.is_(None), Activity.category_id == uncategorized_id))
-          .group_by(Activity.window_name)
-          .having(func.sum(func.julianday(Activity.time_stop) - func.julianday(Activity.time_start)) * 86400 >= threshold_seconds)
-          .order_by(func.sum(func.julianday(Activity.time_stop) - func.julianday(Activity.time_start)).desc())
-          .limit(limit)
-          .offset(offset))
-
-        result = query.all()
-        return [(r[0], int(r[1])) for r in result]
-      except SQLAlchemyError as e:
-        logger.error(f"Failed to retrieve top uncategorized window names: {e}")
-        return []
+    return self.get_uncategorized_totals_page("name", limit, after, threshold_seconds)[0]
 
   def get_top_uncategorized_entries(
       self,
@@ -485,17 +804,14 @@ class ActivityService:
     """
     with self._db_conn.get_session() as session:
       try:
-        uncategorized_id = session.query(Category.id).filter(
-          Category.name == "Uncategorized").scalar()
         query = (session.query(
             Activity.window_class,
             Activity.window_name,
-            (func.sum(func.julianday(Activity.time_stop) -
-             func.julianday(Activity.time_start)) * 86400).label("total_time_seconds")
+            queries.TOTAL_SECONDS
           )
-          .filter(or_(Activity.category_id.is_(None), Activity.category_id == uncategorized_id))
+          .filter(self._is_uncategorized())
           .group_by(Activity.window_class, Activity.window_name)
-          .order_by(func.sum(func.julianday(Activity.time_stop) - func.julianday(Activity.time_start)).desc())
+          .order_by(queries.TOTAL_SECONDS.desc())
           .limit(limit)
           .offset(offset))
 
@@ -504,3 +820,72 @@ class ActivityService:
       except SQLAlchemyError as e:
         logger.error(f"Failed to retrieve top uncategorized entries: {e}")
         return []
+
+  def _match_window_titles(self, query: str, use_fts: bool = True):
+    """ Return a select of WindowTitle ids whose class or name contains query. """
+    if use_fts and len(query) >= self.MIN_FTS_QUERY_LENGTH:
+      # Quote the query so FTS5 treats it as a single substring, not as syntax
+      phrase = '"' + query.replace('"', '""') + '"'
+      return (select(literal_column("rowid"))
+              .select_from(table("window_titles_fts"))
+              .where(text("window_titles_fts MATCH :phrase").bindparams(phrase=phrase)))
+    pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    return select(WindowTitle.id).where(or_(
+      WindowTitle.window_class.like(pattern, escape="\\"),
+      WindowTitle.window_name.like(pattern, escape="\\")))
+
+  def search(
+      self,
+      query: str,
+      period_start: Optional[datetime] = None,
+      period_end: Optional[datetime] = None,
+      limit: int = 50
+  ) -> List[Tuple[str, str, int]]:
+    """ Search window classes and titles, returning the matches with their total time.
+
+    Matching is a case-insensitive substring search over the distinct window titles,
+    served by the window_titles_fts trigram index.
+
+    Args:
+      query: The text to search for.
+      period_start: The start date of the period. If None, the whole history is searched.
+      period_end: The end date of the period. If None, only period_start is considered.
+      limit: The maximum number of entries to return.
+
+    Returns:
+      List[Tuple[str, str, int]]: A list of tuples containing
+      (window_class, window_name, total_time_seconds) sorted by total time.
+    """
+    query = query.strip()
+    if not query:
+      return []
+
+    with self._db_conn.get_session() as session:
+      for use_fts in (True, False):
+        try:
+          matches = (select(WindowTitle.window_class, WindowTitle.window_name)
+                     .where(WindowTitle.id.in_(self._match_window_titles(query, use_fts)))
+                     .subquery())
+          result = (session.query(Activity.window_class, Activity.window_name, queries.TOTAL_SECONDS)
+            .join(matches, (Activity.window_name == matches.c.window_name) &
+                  (Activity.window_class == matches.c.window_class)))
+          if period_start:
+            result = (result.filter(queries.PERIOD)
+                      .params(**queries.period_params(period_start, period_end)))
+          result = (result
+            .group_by(Activity.window_class, Activity.window_name)
+            .order_by(queries.TOTAL_SECONDS.desc())
+            .limit(limit)
+            .all())
+          return [(r[0], r[1], int(r[2] or 0)) for r in result]
+        except OperationalError as e:
+          if use_fts:
+            logger.warning(f"Full-text search failed, falling back to LIKE: {e}")
+            session.rollback()
+            continue
+          logger.error(f"Failed to search activities for '{query}': {e}")
+          return []
+        except SQLAlchemyError as e:
+          logger.error(f"Failed to search activities for '{query}': {e}")
+          return []
+    return []
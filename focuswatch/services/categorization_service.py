@@ -1,5 +1,9 @@
 from collections import defaultdict
 import logging
+from typing import TYPE_CHECKING, Iterable, Tuple
+
+if TYPE_CHECKING:
+  from focuswatch.services.category_service import CategoryImportChanges
 
 logger = logging.getLogger(__name__)
 
@@ -30,15 +34,13 @@ class CategorizationService:
       key = (activity.window_class, activity.window_name)
       activity_groups[key].append(activity)
 
+    # Classify once per group, on a single snapshot of the keywords
+    categories = self._classifier.batch_classifier()(activity_groups.keys())
+
     # Process each group
     processed_activities = 0
-    for group_activities in activity_groups.values():
-      window_class = group_activities[0].window_class
-      window_name = group_activities[0].window_name
-
-      # Classify once per group
-      category_id = self._classifier.classify_entry(
-          window_class, window_name)
+    for key, group_activities in activity_groups.items():
+      category_id = categories[key]
 
       # Find activities that need updating
       activities_to_update = [
@@ -64,3 +66,45 @@ class CategorizationService:
 
     logger.info("Retroactive categorization completed.")
     return True
+
+  def reclassify_titles(self, titles: Iterable[Tuple[str, str]], progress_callback=None) -> bool:
+    """ Reclassify the activities of the given window titles only.
+
+    Args:
+        titles: (window_class, window_name) pairs to reclassify.
+        progress_callback (callable, optional): Function to call with progress updates.
+    """
+    titles = list(titles)
+    total = len(titles)
+    if progress_callback:
+      progress_callback(0, total)
+
+    classify = self._classifier.batch_classifier()
+    updated = 0
+    chunk_size = 1000
+    for i in range(0, total, chunk_size):
+      result = self._activity_service.bulk_update_category_by_titles(
+          classify(titles[i:i + chunk_size]))
+      if result < 0:
+        return False
+      updated += result
+      if progress_callback:
+        progress_callback(min(i + chunk_size, total), total)
+
+    logger.info(f"Reclassified {updated} activities of {total} window titles.")
+    return True
+
+  def reclassify_after_import(self, changes: "CategoryImportChanges", progress_callback=None) -> bool:
+    """ Reclassify the activities a category import may have changed the category of.
+
+    Those are the activities of removed categories or of categories that lost
+    keywords, and the activities whose title matches an added keyword or a
+    removed exclusion keyword.
+
+    Args:
+        changes: What the import changed.
+        progress_callback (callable, optional): Function to call with progress updates.
+    """
+    titles = self._activity_service.get_window_titles_by_category(changes.stale_category_ids)
+    titles |= self._activity_service.get_window_titles_matching(changes.changed_keywords)
+    return self.reclassify_titles(sorted(titles), progress_callback)
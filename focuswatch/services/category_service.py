@@ -1,24 +1,50 @@
 """ Category service module for the FocusWatch application. """
 
 import logging
+from collections import defaultdict
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 import yaml
-from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 
+from focuswatch.database import queries
+from focuswatch.database.analytics_engine import analytics
 from focuswatch.database.database_connection import DatabaseConnection
-from focuswatch.database.models.activity import Activity
 from focuswatch.database.models.category import Category
 from focuswatch.database.models.keyword import Keyword
 from focuswatch.services.keyword_service import KeywordService
+from focuswatch.utils.query_cache import query_cache
+from focuswatch.utils.rules_version import rules_version
 
 logger = logging.getLogger(__name__)
 
+NamePath = Tuple[str, ...]  # category names from the root down
+
+
+class CategoryImportChanges(NamedTuple):
+  """ What a category import changed, categories are identified by their name path. """
+  added_categories: List[NamePath]
+  updated_categories: List[NamePath]  # color or focused changed
+  removed_categories: List[NamePath]
+  added_keywords: List[Tuple[NamePath, str]]
+  removed_keywords: List[Tuple[NamePath, str]]
+  # Activities of these categories (removed, or that lost keywords) must be reclassified
+  stale_category_ids: List[int]
+  # Copies of the added keywords and of the removed exclusion keywords,
+  # the titles they match must be reclassified
+  changed_keywords: List[Keyword]
+
+  @property
+  def has_changes(self) -> bool:
+    """ Whether the import changed anything. """
+    return any((self.added_categories, self.updated_categories, self.removed_categories,
+                self.added_keywords, self.removed_keywords))
+
 
 class CategoryService:
   """ Service class for managing categories in the FocusWatch application. """
+  MAX_CATEGORY_DEPTH = queries.MAX_CATEGORY_DEPTH
 
   def __init__(self,
                db_conn: Optional[DatabaseConnection] = None,
@@ -64,6 +90,7 @@ class CategoryService:
 
         session.add(category)
         session.commit()
+        rules_version.bump()
         logger.info(
           f"Created new category: {category.name} with ID {category.id}")
         return category.id
@@ -103,6 +130,36 @@ class CategoryService:
         logger.error(f"Failed to retrieve categories: {e}")
         return []
 
+  def get_categories_with_keywords(
+      self,
+      category_ids: Optional[Iterable[int]] = None
+  ) -> List[Tuple[Category, List[str]]]:
+    """ Retrieve categories together with their keyword names in a single query.
+
+    Args:
+      category_ids: Only return these categories. All categories if None.
+
+    Returns:
+      List[Tuple[Category, List[str]]]: (category, keyword names) pairs ordered by category ID.
+    """
+    with self._db_conn.get_session() as session:
+      try:
+        query = (session.query(Category, Keyword.name)
+                 .outerjoin(Keyword, Keyword.category_id == Category.id)
+                 .order_by(Category.id, Keyword.id))
+        if category_ids is not None:
+          query = query.filter(Category.id.in_(list(category_ids)))
+
+        grouped: Dict[int, Tuple[Category, List[str]]] = {}
+        for category, keyword_name in query.all():
+          _, keywords = grouped.setdefault(category.id, (category, []))
+          if keyword_name is not None:
+            keywords.append(keyword_name)
+        return list(grouped.values())
+      except SQLAlchemyError as e:
+        logger.error(f"Failed to retrieve categories with keywords: {e}")
+        return []
+
   def update_category(self, category: Category) -> bool:
     """ Update an existing category in the database.
 
@@ -138,6 +195,8 @@ class CategoryService:
 
         session.merge(category)
         session.commit()
+        query_cache.clear()
+        rules_version.bump()
         logger.info(f"Updated category: {category.name}")
         return True
       except SQLAlchemyError as e:
@@ -176,6 +235,8 @@ class CategoryService:
         logger.info(f"Deleted keywords for category ID: {category_id}")
 
         session.commit()
+        query_cache.clear()
+        rules_version.bump()
         return True
       except SQLAlchemyError as e:
         logger.error(f"Failed to delete category: {e}")
@@ -239,6 +300,8 @@ class CategoryService:
             logger.warning(f"Failed to create category: {name}")
 
         session.commit()
+        query_cache.clear()
+        rules_version.bump()
         logger.info("Default categories inserted successfully.")
       except SQLAlchemyError as e:
         logger.error(f"Failed to insert default categories: {e}")
@@ -250,23 +313,7 @@ class CategoryService:
     Returns:
       List[Tuple[int, int]]: A list of tuples containing (category_id, total_time_seconds).
     """
-    with self._db_conn.get_session() as session:
-      try:
-        today = datetime.now().date()
-        result = (session.query(
-            Activity.category_id,
-            (func.sum(func.julianday(Activity.time_stop) -
-             func.julianday(Activity.time_start)) * 86400).label("total_time_seconds")
-          )
-          .filter(func.date(Activity.time_start) == today)
-          .group_by(Activity.category_id)
-          .order_by(func.sum(func.julianday(Activity.time_stop) - func.julianday(Activity.time_start)).desc())
-          .all())
-        # Filter out NULL category_ids
-        return [(r[0], int(r[1])) for r in result if r[0] is not None]
-      except SQLAlchemyError as e:
-        logger.error(f"Failed to get daily category time totals: {e}")
-        return []
+    return self._category_time_totals(datetime.now())
 
   def get_date_category_time_totals(self, date: datetime) -> List[Tuple[int, int]]:
     """ Return the total time spent on each category for a given date.
@@ -277,25 +324,9 @@ class CategoryService:
     Returns:
       List[Tuple[int, int]]: A list of tuples containing (category_id, total_time_seconds).
     """
-    with self._db_conn.get_session() as session:
-      try:
-        formatted_date = date.date()
-        result = (session.query(
-            Activity.category_id,
-            (func.sum(func.julianday(Activity.time_stop) -
-             func.julianday(Activity.time_start)) * 86400).label("total_time_seconds")
-          )
-          .filter(func.date(Activity.time_start) == formatted_date)
-          .group_by(Activity.category_id)
-          .order_by(func.sum(func.julianday(Activity.time_stop) - func.julianday(Activity.time_start)).desc())
-          .all())
-        # Filter out NULL category_ids
-        return [(r[0], int(r[1])) for r in result if r[0] is not None]
-      except SQLAlchemyError as e:
-        logger.error(
-          f"Failed to get category time totals for {formatted_date}: {e}")
-        return []
+    return self._category_time_totals(date)
 
+  @query_cache.cached("category.time_totals")
   def get_period_category_time_totals(
       self,
       start_date: datetime,
@@ -310,32 +341,57 @@ class CategoryService:
     Returns:
       List[Tuple[int, int]]: A list of tuples containing (category_id, total_time_seconds).
     """
+    return self._category_time_totals(start_date, end_date)
+
+  def _category_time_totals(self,
+                            start_date: datetime,
+                            end_date: Optional[datetime] = None) -> List[Tuple[int, int]]:
+    """ Return (category_id, total_time_seconds) of the categorized activities of a period.
+
+    Long periods are computed by the DuckDB analytics engine when it is available.
+    """
+    totals = analytics.time_totals(self._db_conn.engine, "category", start_date, end_date)
+    if totals is not None:
+      return totals
     with self._db_conn.get_session() as session:
       try:
-        start_date_str = start_date.date()
-        query = (session.query(
-            Activity.category_id,
-            (func.sum(func.julianday(Activity.time_stop) -
-             func.julianday(Activity.time_start)) * 86400).label("total_time_seconds")
-          )
-          .group_by(Activity.category_id)
-          .order_by(func.sum(func.julianday(Activity.time_stop) - func.julianday(Activity.time_start)).desc()))
-
-        if end_date:
-          end_date_str = end_date.date()
-          query = query.filter(func.date(Activity.time_start).between(
-            start_date_str, end_date_str))
-        else:
-          query = query.filter(
-            func.date(Activity.time_start) == start_date_str)
-
-        result = query.all()
-        # Filter out NULL category_ids
-        return [(r[0], int(r[1])) for r in result if r[0] is not None]
+        result = session.execute(queries.CATEGORY_TIME_TOTALS,
+                                 queries.period_params(start_date, end_date))
+        return [(category_id, int(seconds)) for category_id, seconds in result]
       except SQLAlchemyError as e:
         logger.error(f"Failed to get category time totals for period: {e}")
         return []
 
+  @query_cache.cached("category.rollup")
+  def get_period_category_rollup(
+      self,
+      start_date: datetime,
+      end_date: Optional[datetime] = None
+  ) -> List[Tuple[Category, int, int]]:
+    """ Return the time spent in each category and in its whole subtree for a period.
+
+    Child time is rolled up to every ancestor by a recursive CTE, so the result
+    comes from a single query. Categories whose subtree has no time are omitted;
+    every ancestor of a returned category is returned as well.
+
+    Args:
+      start_date: The start date of the period.
+      end_date: The end date of the period. If None, only start_date is considered.
+
+    Returns:
+      List[Tuple[Category, int, int]]: (category, self_seconds, subtree_seconds)
+      ordered by subtree_seconds descending.
+    """
+    with self._db_conn.get_session() as session:
+      try:
+        result = session.execute(queries.CATEGORY_ROLLUP,
+                                 queries.period_params(start_date, end_date))
+        return [(category, int(self_seconds), int(total_seconds))
+                for category, self_seconds, total_seconds in result]
+      except SQLAlchemyError as e:
+        logger.error(f"Failed to get category rollup for period: {e}")
+        return []
+
   def get_category_id_from_name(self, category_name: str) -> Optional[int]:
     """ Return the id of a category given its name.
 
@@ -391,34 +447,36 @@ class CategoryService:
   def export_categories_to_yml(self) -> str:
     """ Export categories and their keywords to a YAML string.
 
+    Parents are written before their children, each category with its name
+    path so that categories sharing a name are imported under the right parent.
+
     Returns:
       str: The YAML string representing the categories and keywords.
     """
     with self._db_conn.get_session() as session:
       try:
         categories = session.query(Category).all()
+        keywords = defaultdict(list)
+        default_fields = Keyword().rule_fields()
+        for keyword in session.query(Keyword).order_by(Keyword.id):
+          # Keep plain keywords as short as in older exports
+          fields = keyword.rule_fields()
+          keywords[keyword.category_id].append(
+            {key: value for key, value in fields.items()
+             if key in ("name", "match_case") or value != default_fields[key]})
+
+        paths = self.get_name_paths(categories)
         categories_dict = []
-
-        for category in categories:
-          category_dict = {
+        for category in sorted(categories, key=lambda c: (len(paths[c.id]), c.id)):
+          categories_dict.append({
             "id": category.id,
             "name": category.name,
             "color": category.color,
-            "focused": category.focused
-          }
-
-          if category.parent_category_id:
-            parent = session.query(Category).filter(
-              Category.id == category.parent_category_id).first()
-            category_dict["parent_name"] = parent.name if parent else None
-          else:
-            category_dict["parent_name"] = None
-
-          keywords = self._keyword_service.get_keywords_for_category(
-            category.id)
-          category_dict["keywords"] = [
-            {"name": k.name, "match_case": k.match_case} for k in keywords]
-          categories_dict.append(category_dict)
+            "focused": category.focused,
+            "parent_name": paths[category.id][-2] if len(paths[category.id]) > 1 else None,
+            "parent_path": list(paths[category.id][:-1]),
+            "keywords": keywords[category.id],
+          })
 
         yaml_str = yaml.dump(categories_dict, sort_keys=False)
         logger.debug("Exported categories and keywords to YAML.")
@@ -427,49 +485,156 @@ class CategoryService:
         logger.error(f"Failed to export categories and keywords: {e}")
         raise
 
-  def import_categories_from_yml(self, yml_str: str) -> bool:
+  def get_name_paths(self, categories: Iterable[Category]) -> Dict[int, NamePath]:
+    """ Return the name path of each category by ID.
+
+    Args:
+      categories: The categories, parents are looked up among them.
+    """
+    by_id = {category.id: category for category in categories}
+    return {category.id: self._name_path(category, by_id) for category in by_id.values()}
+
+  def _name_path(self, category: Category, by_id: Dict[int, Category]) -> NamePath:
+    """ Return the names from the root category down to category. """
+    path = [category.name]
+    parent = by_id.get(category.parent_category_id)
+    while parent is not None and len(path) < self.MAX_CATEGORY_DEPTH:
+      path.append(parent.name)
+      parent = by_id.get(parent.parent_category_id)
+    return tuple(reversed(path))
+
+  def _parse_category_entries(self, entries: List[Dict[str, Any]]) -> Dict[NamePath, Dict[str, Any]]:
+    """ Index the categories of an export by name path.
+
+    Older exports only have parent_name, it refers to the latest category of
+    that name defined before, or to any category of that name.
+    """
+    by_name = {}
+    for entry in entries:
+      by_name.setdefault(entry["name"], entry)
+
+    paths: Dict[int, NamePath] = {}
+
+    def path_of(entry: Dict[str, Any], depth: int = 0) -> NamePath:
+      if id(entry) not in paths:
+        if entry.get("parent_path") is not None:
+          parent_path = tuple(entry["parent_path"])
+        elif entry.get("parent_name") and depth < self.MAX_CATEGORY_DEPTH:
+          parent = seen.get(entry["parent_name"]) or by_name.get(entry["parent_name"])
+          parent_path = path_of(parent, depth + 1) if parent else ()
+        else:
+          parent_path = ()
+        paths[id(entry)] = parent_path + (entry["name"],)
+      return paths[id(entry)]
+
+    seen: Dict[str, Dict[str, Any]] = {}
+    desired = {}
+    for entry in entries:
+      desired[path_of(entry)] = entry
+      seen[entry["name"]] = entry
+    return desired
+
+  @staticmethod
+  def _parse_keyword(entry: Dict[str, Any]) -> Keyword:
+    """ Build a (detached) keyword from an exported keyword, missing fields taking their default.
+
+    Raises:
+      ValueError: If the match type or the target is unknown.
+    """
+    keyword = Keyword(name=entry["name"],
+                      match_case=bool(entry.get("match_case", False)),
+                      match_type=entry.get("match_type") or Keyword.MATCH_SUBSTRING,
+                      target=entry.get("target") or Keyword.TARGET_TITLE,
+                      exclude=bool(entry.get("exclude", False)),
+                      priority=int(entry.get("priority") or 0))
+    if keyword.match_type not in Keyword.MATCH_TYPES or keyword.target not in Keyword.TARGETS:
+      raise ValueError(f"Invalid keyword: {entry}")
+    return keyword
+
+  def import_categories_from_yml(self, yml_str: str) -> Optional[CategoryImportChanges]:
     """ Import categories and their keywords from a YAML string.
 
+    Categories are matched with the existing ones by name path. Matched
+    categories are updated in place and keep their ID, only the differences
+    are inserted or deleted, in a single transaction. Activities therefore
+    keep their category unless it was removed.
+
     Args:
       yml_str: The YAML string representing the categories and keywords.
 
     Returns:
-      bool: True if the import was successful, False otherwise.
+      Optional[CategoryImportChanges]: What changed, None if the import failed.
     """
     with self._db_conn.get_session() as session:
       try:
-        categories = yaml.safe_load(yml_str)
-        session.query(Category).delete()
-        session.query(Keyword).delete()
-
-        name_to_id = {}
-        for category_data in categories:
-          parent_name = category_data.pop("parent_name", None)
-          keywords_data = category_data.pop("keywords", [])
-          category_data.pop("id", None)
-
-          parent_id = name_to_id.get(parent_name) if parent_name else None
-          category = Category(
-            name=category_data["name"],
-            parent_category_id=parent_id,
-            color=category_data.get("color"),
-            focused=category_data.get("focused", False)
-          )
-          session.add(category)
-          session.flush()  # Ensure ID is assigned
-          name_to_id[category.name] = category.id
+        desired = self._parse_category_entries(yaml.safe_load(yml_str) or [])
 
-          for keyword_data in keywords_data:
-            keyword = Keyword(
-              name=keyword_data["name"],
-              category_id=category.id,
-              match_case=keyword_data.get("match_case", False)
-            )
-            session.add(keyword)
+        categories = session.query(Category).all()
+        by_id = {category.id: category for category in categories}
+        existing = {self._name_path(category, by_id): category for category in categories}
+        current_keywords: Dict[int, Dict[Tuple, Keyword]] = defaultdict(dict)
+        for keyword in session.query(Keyword):
+          current_keywords[keyword.category_id][tuple(keyword.rule_fields().values())] = keyword
+
+        changes = CategoryImportChanges([], [], [], [], [], [], [])
+        stale_ids = set()
+
+        # Parents first, so that a new category's parent already exists
+        for path, entry in sorted(desired.items(), key=lambda item: len(item[0])):
+          color = entry.get("color")
+          focused = bool(entry.get("focused", False))
+          category = existing.get(path)
+          if category is None:
+            parent = existing.get(path[:-1])
+            category = Category(name=path[-1],
+                                parent_category_id=parent.id if parent else None,
+                                color=color,
+                                focused=focused)
+            session.add(category)
+            session.flush()  # Ensure ID is assigned
+            existing[path] = category
+            changes.added_categories.append(path)
+          elif category.color != color or bool(category.focused) != focused:
+            category.color = color
+            category.focused = focused
+            changes.updated_categories.append(path)
+
+          keywords = current_keywords.get(category.id, {})
+          wanted = {tuple(self._parse_keyword(keyword).rule_fields().values()): keyword
+                    for keyword in entry.get("keywords") or []}
+          for key in sorted(wanted.keys() - keywords.keys()):
+            keyword = self._parse_keyword(wanted[key])
+            session.add(Keyword(category_id=category.id, **keyword.rule_fields()))
+            changes.added_keywords.append((path, keyword.name))
+            changes.changed_keywords.append(keyword)
+          for key in sorted(keywords.keys() - wanted):
+            removed = keywords[key]
+            if removed.exclude:
+              changes.changed_keywords.append(Keyword(**removed.rule_fields()))
+            session.delete(removed)
+            changes.removed_keywords.append((path, key[0]))
+            stale_ids.add(category.id)
+
+        # Children first
+        for path in sorted(existing.keys() - desired.keys(), key=len, reverse=True):
+          category = existing[path]
+          for keyword in current_keywords.get(category.id, {}).values():
+            session.delete(keyword)
+          session.delete(category)
+          changes.removed_categories.append(path)
+          stale_ids.add(category.id)
 
+        changes.stale_category_ids.extend(sorted(stale_ids))
         session.commit()
-        return True
-      except (yaml.YAMLError, SQLAlchemyError) as e:
+        query_cache.clear()
+        rules_version.bump()
+        logger.info(
+          f"Imported categories: {len(changes.added_categories)} added, "
+          f"{len(changes.updated_categories)} updated, {len(changes.removed_categories)} removed, "
+          f"{len(changes.added_keywords)} keywords added, "
+          f"{len(changes.removed_keywords)} keywords removed")
+        return changes
+      except (yaml.YAMLError, SQLAlchemyError, KeyError, TypeError, ValueError) as e:
         logger.error(f"Failed to import categories and keywords: {e}")
         session.rollback()
-        return False
+        return None
@@ -0,0 +1,186 @@
+""" Change log service module for the FocusWatch application.
+
+Triggers append every insert, update and delete of the activity and categories
+tables to change_log (see DatabaseManager). Derived structures read the changes
+after their watermark, apply them and store the last processed sequence number
+as their new watermark:
+
+  watermark = service.get_watermark("my_index")
+  if not service.is_complete_since(watermark):
+    ...  # changes were pruned, rebuild from scratch
+  for change in service.changes_since(watermark):
+    ...
+  service.set_watermark("my_index", change.seq)
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from focuswatch.database.database_connection import DatabaseConnection
+from focuswatch.database.models.change_log import ChangeLog
+from focuswatch.database.models.metadata import Metadata
+
+logger = logging.getLogger(__name__)
+
+
+class Change(NamedTuple):
+  """ A change of a tracked row, see ChangeLog. """
+  seq: int
+  table_name: str
+  row_id: int
+  operation: str
+  changed_at: str
+  old_values: Optional[Dict[str, Any]]
+
+
+class ChangeLogService:
+  """ Service class for reading and pruning the change log. """
+  # Metadata key of the watermark of a consumer
+  WATERMARK_KEY = "change_log.watermark.{}"
+  # Metadata key of the highest sequence number pruned so far
+  PRUNED_KEY = "change_log.pruned_through"
+  # Changes are kept this long even if no consumer processed them
+  RETENTION_DAYS = 30
+  DEFAULT_LIMIT = 1000
+
+  def __init__(self, db_conn: Optional[DatabaseConnection] = None):
+    """ Initialize the ChangeLogService.
+
+    Args:
+      db_conn: Optional DatabaseConnection instance for dependency injection.
+    """
+    self._db_conn = db_conn or DatabaseConnection()
+
+  def latest_sequence(self) -> int:
+    """ Return the sequence number of the last change, 0 if nothing was recorded.
+
+    A new consumer that built its structure from the current tables starts from here.
+    """
+    with self._db_conn.get_session() as session:
+      try:
+        latest = session.execute(select(func.max(ChangeLog.seq))).scalar()
+        return latest or self._get_int(session, self.PRUNED_KEY)
+      except SQLAlchemyError as e:
+        logger.error(f"Failed to get the latest change sequence: {e}")
+        return 0
+
+  def changes_since(self,
+                    watermark: int,
+                    tables: Optional[Iterable[str]] = None,
+                    limit: int = DEFAULT_LIMIT) -> List[Change]:
+    """ Return the changes recorded after a watermark, oldest first.
+
+    Args:
+      watermark: The last sequence number already processed, 0 for all changes.
+      tables: Only return changes of these tables, all tables if None.
+      limit: Maximum number of changes, call again from the last seq for more.
+
+    Returns:
+      List[Change]: The changes, an empty list on failure.
+    """
+    with self._db_conn.get_session() as session:
+      try:
+        query = select(ChangeLog).where(ChangeLog.seq > watermark)
+        if tables is not None:
+          query = query.where(ChangeLog.table_name.in_(list(tables)))
+        rows = session.scalars(query.order_by(ChangeLog.seq).limit(limit))
+        return [Change(row.seq, row.table_name, row.row_id, row.operation, row.changed_at,
+                       json.loads(row.old_values) if row.old_values else None)
+                for row in rows]
+      except SQLAlchemyError as e:
+        logger.error(f"Failed to get changes since {watermark}: {e}")
+        return []
+
+  def is_complete_since(self, watermark: int) -> bool:
+    """ Whether every change after a watermark is still in the log.
+
+    A consumer whose watermark fell behind the pruned changes must rebuild.
+    """
+    with self._db_conn.get_session() as session:
+      try:
+        return watermark >= self._get_int(session, self.PRUNED_KEY)
+      except SQLAlchemyError as e:
+        logger.error(f"Failed to check the change log since {watermark}: {e}")
+        return False
+
+  def get_watermark(self, consumer: str) -> int:
+    """ Return the last sequence number processed by a consumer, 0 if it has none. """
+    with self._db_conn.get_session() as session:
+      try:
+        return self._get_int(session, self.WATERMARK_KEY.format(consumer))
+      except SQLAlchemyError as e:
+        logger.error(f"Failed to get the change log watermark of {consumer}: {e}")
+        return 0
+
+  def set_watermark(self, consumer: str, seq: int) -> bool:
+    """ Store the last sequence number processed by a consumer.
+
+    prune deletes the changes at or below the lowest watermark of all consumers.
+
+    Returns:
+      bool: True if stored successfully, False otherwise.
+    """
+    with self._db_conn.get_session() as session:
+      try:
+        session.merge(Metadata(key=self.WATERMARK_KEY.format(consumer), value=str(seq)))
+        session.commit()
+        return True
+      except SQLAlchemyError as e:
+        logger.error(f"Failed to set the change log watermark of {consumer}: {e}")
+        session.rollback()
+        return False
+
+  def remove_consumer(self, consumer: str) -> bool:
+    """ Forget the watermark of a consumer, its changes no longer hold back pruning. """
+    with self._db_conn.get_session() as session:
+      try:
+        session.execute(delete(Metadata).where(Metadata.key == self.WATERMARK_KEY.format(consumer)))
+        session.commit()
+        return True
+      except SQLAlchemyError as e:
+        logger.error(f"Failed to remove the change log consumer {consumer}: {e}")
+        session.rollback()
+        return False
+
+  def prune(self, retention_days: int = RETENTION_DAYS) -> int:
+    """ Delete the changes processed by every consumer and those older than the retention.
+
+    Args:
+      retention_days: Changes older than this are deleted even if a consumer has not processed them.
+
+    Returns:
+      int: The number of deleted changes.
+    """
+    cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+    with self._db_conn.get_session() as session:
+      try:
+        watermarks = session.scalars(select(Metadata.value).where(
+          Metadata.key.like(self.WATERMARK_KEY.format("%")))).all()
+        condition = ChangeLog.changed_at < cutoff
+        if watermarks:
+          condition = condition | (ChangeLog.seq <= min(int(value) for value in watermarks))
+        pruned_through = session.execute(select(func.max(ChangeLog.seq)).where(condition)).scalar()
+        if pruned_through is None:
+          return 0
+        # Changes are appended in seq order, everything up to the last match goes
+        deleted = session.execute(delete(ChangeLog).where(ChangeLog.seq <= pruned_through)).rowcount
+        session.merge(Metadata(key=self.PRUNED_KEY,
+                               value=str(max(pruned_through, self._get_int(session, self.PRUNED_KEY)))))
+        session.commit()
+        logger.info(f"Pruned {deleted} changes from the change log.")
+        return deleted
+      except SQLAlchemyError as e:
+        logger.error(f"Failed to prune the change log: {e}")
+        session.rollback()
+        return 0
+
+  @staticmethod
+  def _get_int(session, key: str) -> int:
+    """ Return an integer stored in the metadata table, 0 if the key is missing. """
+    value = session.execute(select(Metadata.value).where(Metadata.key == key)).scalar()
+    return int(value) if value else 0
@@ -5,17 +5,38 @@ user activity entries based on window class and name.
 """
 
 import logging
-from typing import Optional, TYPE_CHECKING
+import time
+from collections.abc import Hashable
+from typing import (TYPE_CHECKING, Callable, Dict, Iterable, List, NamedTuple,
+                    Optional, Tuple)
+
+from focuswatch.services.keyword_matcher import KeywordMatcher
+from focuswatch.utils.instrumentation import metrics
+from focuswatch.utils.rules_version import rules_version
 
 if TYPE_CHECKING:
+  from focuswatch.database.models.category import Category
   from focuswatch.services.category_service import CategoryService
   from focuswatch.services.keyword_service import KeywordService
 
 logger = logging.getLogger(__name__)
 
+MAX_CATEGORY_DEPTH = 32  # guards the depths against parent cycles
+
+
+class _Snapshot(NamedTuple):
+  """ A compiled snapshot of the keywords and categories. """
+  version: int  # rules_version when the rules were last read
+  checked_at: float  # time.monotonic() when the rules were last read
+  key: Hashable  # identifies the rules the matcher was compiled from
+  matcher: KeywordMatcher
+  uncategorized_id: Optional[int]
+
 
 class ClassifierService:
   """Service class for classifying activities in the FocusWatch application."""
+  # Rules written by another process are picked up after at most this many seconds
+  REFRESH_INTERVAL = 60.0
 
   def __init__(
       self,
@@ -24,7 +45,10 @@ class ClassifierService:
     ):
     self._category_service = category_service
     self._keyword_service = keyword_service
+    # Replaced as a whole
+    self._snapshot: Optional[_Snapshot] = None
 
+  @metrics.timed("classifier.classify_entry")
   def classify_entry(self, window_class: str, window_name: str) -> Optional[int]:
     """ Classify an entry based on the window class and name.
 
@@ -33,26 +57,94 @@ class ClassifierService:
       window_name: The name of the window.
 
     Returns:
-      Optional[int]: Category id with max depth from keywords in window name and class,
+      Optional[int]: Category id of the best matching keyword, see KeywordMatcher,
                      or id of 'Uncategorized' category if no match is found.
     """
-    entry = f"{window_class} {window_name}"
-    keywords = self._keyword_service.get_all_keywords()
+    snapshot = self._get_snapshot()
+    category_id = snapshot.matcher.match(window_class, window_name)
+    return snapshot.uncategorized_id if category_id is None else category_id
+
+  @metrics.timed("classifier.classify_entries")
+  def classify_entries(self,
+                       entries: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[int]]:
+    """ Classify many entries, loading keywords and category depths only once.
+
+    Args:
+      entries: (window_class, window_name) pairs, duplicates are classified once.
+
+    Returns:
+      Dict[Tuple[str, str], Optional[int]]: The category id of every distinct pair,
+                                            as classify_entry would return it.
+    """
+    return self.batch_classifier()(entries)
+
+  def batch_classifier(self,
+                       cache_size: int = 100000) -> Callable[[Iterable[Tuple[str, str]]],
+                                                             Dict[Tuple[str, str], Optional[int]]]:
+    """ Return a function behaving like classify_entries on a snapshot of the keywords.
+
+    The returned function does not query the database, so it can be used
+    while a write transaction is open on another connection. Results are
+    remembered across calls, up to cache_size distinct entries.
+    """
+    snapshot = self._get_snapshot()
+    matcher, uncategorized_id = snapshot.matcher, snapshot.uncategorized_id
+    cache: Dict[Tuple[str, str], Optional[int]] = {}
+
+    def classify(entries: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[int]]:
+      categories: Dict[Tuple[str, str], Optional[int]] = {}
+      for entry in entries:
+        if entry in categories:
+          continue
+        if entry not in cache:
+          if len(cache) >= cache_size:
+            cache.clear()
+          category_id = matcher.match(*entry)
+          cache[entry] = uncategorized_id if category_id is None else category_id
+        categories[entry] = cache[entry]
+      return categories
+    return classify
 
-    keyword_depths = {}
-    entry_lower = entry.lower()
-
-    for keyword in keywords:
-      if keyword.match_case:
-        if keyword.name in entry:
-          keyword_depths[keyword.category_id] = self._category_service.get_category_depth(
-            keyword.category_id)
-      else:
-        if keyword.name.lower() in entry_lower:
-          keyword_depths[keyword.category_id] = self._category_service.get_category_depth(
-            keyword.category_id)
-
-    if keyword_depths:
-      return max(keyword_depths, key=keyword_depths.get)
+  def _get_snapshot(self) -> _Snapshot:
+    """ Return the matcher of the current keywords.
+
+    The rules are only read again after a write through the keyword or
+    category services of this process bumped rules_version, or once
+    REFRESH_INTERVAL passed, and only recompiled if they changed.
+    """
+    version = rules_version.value
+    now = time.monotonic()
+    snapshot = self._snapshot
+    if (snapshot is not None and snapshot.version == version
+        and now - snapshot.checked_at < self.REFRESH_INTERVAL):
+      return snapshot
+
+    keywords = self._keyword_service.get_all_keywords()
+    categories = self._category_service.get_all_categories()
+    key = (tuple((keyword.id, keyword.category_id) + tuple(keyword.rule_fields().values())
+                 for keyword in keywords),
+           tuple((category.id, category.name, category.parent_category_id)
+                 for category in categories))
+    if snapshot is not None and snapshot.key == key:
+      snapshot = snapshot._replace(version=version, checked_at=now)
     else:
-      return self._category_service.get_category_id_from_name("Uncategorized") or None
+      uncategorized_id = next((category.id for category in categories
+                               if category.name == "Uncategorized"), None)
+      snapshot = _Snapshot(version, now, key,
+                           KeywordMatcher(keywords, self._depths(categories)), uncategorized_id)
+    self._snapshot = snapshot
+    return snapshot
+
+  @staticmethod
+  def _depths(categories: List["Category"]) -> Dict[int, int]:
+    """ Depth of every category in the hierarchy, 0 for root categories. """
+    parents = {category.id: category.parent_category_id for category in categories}
+    depths = {}
+    for category_id in parents:
+      depth = 0
+      parent_id = parents[category_id]
+      while parent_id is not None and depth < MAX_CATEGORY_DEPTH:
+        depth += 1
+        parent_id = parents.get(parent_id)
+      depths[category_id] = depth
+    return depths
@@ -0,0 +1,245 @@
+""" Export service module for the FocusWatch application.
+
+Activities are streamed from the database in fixed-size chunks and written as
+they arrive, so exporting years of history uses constant memory.
+"""
+
+import csv
+import importlib.util
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from focuswatch.database import queries
+from focuswatch.database.database_connection import DatabaseConnection
+from focuswatch.database.models.activity import Activity
+from focuswatch.database.models.category import Category
+from focuswatch.utils.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class ExportService:
+  """ Service class for exporting the activity history to files. """
+  FORMATS = ("csv", "jsonl", "parquet")
+  COLUMNS = ("id", "time_start", "time_stop", "window_class", "window_name",
+             "category_id", "category", "focused")
+  DEFAULT_CHUNK_SIZE = 10000
+
+  def __init__(self, db_conn: Optional[DatabaseConnection] = None):
+    """ Initialize the ExportService.
+
+    Args:
+      db_conn: Optional DatabaseConnection instance for dependency injection.
+    """
+    self._db_conn = db_conn or DatabaseConnection()
+
+  @staticmethod
+  def is_parquet_available() -> bool:
+    """ Parquet export needs the optional pyarrow package. """
+    return importlib.util.find_spec("pyarrow") is not None
+
+  @classmethod
+  def available_formats(cls) -> List[str]:
+    """ The formats that can be exported with the installed packages. """
+    return [fmt for fmt in cls.FORMATS
+            if fmt != "parquet" or cls.is_parquet_available()]
+
+  @classmethod
+  def format_from_path(cls, file_path: str) -> Optional[str]:
+    """ Guess the export format from the file extension.
+
+    Returns:
+      Optional[str]: The format, or None if the extension is not supported.
+    """
+    extension = os.path.splitext(file_path)[1].lower().lstrip(".")
+    if extension == "json":
+      extension = "jsonl"
+    return extension if extension in cls.FORMATS else None
+
+  def count_activities(self,
+                       period_start: Optional[datetime] = None,
+                       period_end: Optional[datetime] = None) -> int:
+    """ Count the activities of a period, used as the progress total.
+
+    Args:
+      period_start: First day to export, None for the beginning of the history.
+      period_end: Last day to export (inclusive), None for today.
+
+    Returns:
+      int: The number of activities.
+    """
+    stmt = select(func.count(Activity.id))
+    condition = queries.open_period(period_start, period_end)
+    if condition is not None:
+      stmt = stmt.where(condition)
+    try:
+      with self._db_conn.engine.connect() as connection:
+        return connection.execute(stmt).scalar() or 0
+    except SQLAlchemyError as e:
+      logger.error(f"Failed to count activities: {e}")
+      return 0
+
+  def _export_statement(self,
+                        period_start: Optional[datetime],
+                        period_end: Optional[datetime]):
+    stmt = (
+      select(Activity.id, Activity.time_start, Activity.time_stop,
+             Activity.window_class, Activity.window_name,
+             Activity.category_id, Category.name, Activity.focused)
+      .outerjoin(Category, Activity.category_id == Category.id)
+      .order_by(Activity.id)
+    )
+    condition = queries.open_period(period_start, period_end)
+    if condition is not None:
+      stmt = stmt.where(condition)
+    return stmt
+
+  def iter_records(self,
+                   period_start: Optional[datetime] = None,
+                   period_end: Optional[datetime] = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """ Stream the activities of a period as records keyed by COLUMNS.
+
+    The connection stays open until the iterator is exhausted or closed.
+
+    Args:
+      period_start: First day, None for the beginning of the history.
+      period_end: Last day (inclusive), None for today.
+      chunk_size: Number of rows fetched and yielded at a time.
+
+    Yields:
+      List[Dict[str, Any]]: The next chunk of records.
+
+    Raises:
+      SQLAlchemyError: If the query fails, the caller may have sent earlier chunks already.
+    """
+    with self._db_conn.engine.connect() as connection:
+      result = connection.execution_options(yield_per=chunk_size).execute(
+        self._export_statement(period_start, period_end))
+      for chunk in result.partitions():
+        yield [self._record(row) for row in chunk]
+
+  @metrics.timed()
+  def export(self,
+             file_path: str,
+             fmt: Optional[str] = None,
+             period_start: Optional[datetime] = None,
+             period_end: Optional[datetime] = None,
+             progress_callback: Optional[ProgressCallback] = None,
+             chunk_size: int = DEFAULT_CHUNK_SIZE) -> Optional[int]:
+    """ Export the activities of a period to a file.
+
+    The file is written next to its destination and moved into place once
+    complete, so a failed export never leaves a truncated file behind.
+
+    Args:
+      file_path: Destination file.
+      fmt: One of FORMATS, guessed from the file extension if None.
+      period_start: First day to export, None for the beginning of the history.
+      period_end: Last day to export (inclusive), None for today.
+      progress_callback: Called with (exported, total) after every chunk.
+      chunk_size: Number of rows fetched and written at a time.
+
+    Returns:
+      Optional[int]: The number of exported activities, None on failure.
+    """
+    fmt = fmt or self.format_from_path(file_path)
+    if fmt not in self.FORMATS:
+      logger.error(f"Unsupported export format for {file_path}: {fmt}")
+      return None
+    if fmt == "parquet" and not self.is_parquet_available():
+      logger.error("Parquet export requires the pyarrow package")
+      return None
+
+    writers = {"csv": self._write_csv,
+               "jsonl": self._write_jsonl,
+               "parquet": self._write_parquet}
+    total = self.count_activities(period_start, period_end)
+    temp_path = f"{file_path}.part"
+    try:
+      with self._db_conn.engine.connect() as connection:
+        result = connection.execution_options(yield_per=chunk_size).execute(
+          self._export_statement(period_start, period_end))
+        exported = writers[fmt](temp_path, result.partitions(), total, progress_callback)
+      os.replace(temp_path, file_path)
+    except (SQLAlchemyError, OSError) as e:
+      logger.error(f"Failed to export activities to {file_path}: {e}")
+      return None
+    finally:
+      # Left behind by any failure, writer errors included
+      if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    logger.info(f"Exported {exported} activities to {file_path}")
+    return exported
+
+  @staticmethod
+  def _report(progress_callback: Optional[ProgressCallback], exported: int, total: int) -> None:
+    if progress_callback:
+      # Rows inserted during the export may push the count past the total
+      progress_callback(exported, max(total, exported))
+
+  def _write_csv(self, path: str, chunks, total: int,
+                 progress_callback: Optional[ProgressCallback]) -> int:
+    exported = 0
+    with open(path, "w", encoding="utf-8", newline="") as export_file:
+      writer = csv.writer(export_file)
+      writer.writerow(self.COLUMNS)
+      for chunk in chunks:
+        writer.writerows(self._normalize(row) for row in chunk)
+        exported += len(chunk)
+        self._report(progress_callback, exported, total)
+    return exported
+
+  def _write_jsonl(self, path: str, chunks, total: int,
+                   progress_callback: Optional[ProgressCallback]) -> int:
+    exported = 0
+    with open(path, "w", encoding="utf-8") as export_file:
+      for chunk in chunks:
+        export_file.writelines(
+          json.dumps(self._record(row), ensure_ascii=False) + "\n"
+          for row in chunk)
+        exported += len(chunk)
+        self._report(progress_callback, exported, total)
+    return exported
+
+  def _write_parquet(self, path: str, chunks, total: int,
+                     progress_callback: Optional[ProgressCallback]) -> int:
+    # pylint: disable=import-outside-toplevel
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+      ("id", pa.int64()), ("time_start", pa.string()), ("time_stop", pa.string()),
+      ("window_class", pa.string()), ("window_name", pa.string()),
+      ("category_id", pa.int64()), ("category", pa.string()), ("focused", pa.bool_()),
+    ])
+    exported = 0
+    with pq.ParquetWriter(path, schema) as writer:
+      for chunk in chunks:
+        columns = list(zip(*(self._normalize(row) for row in chunk)))
+        writer.write_batch(pa.RecordBatch.from_arrays(
+          [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+          schema=schema))
+        exported += len(chunk)
+        self._report(progress_callback, exported, total)
+    return exported
+
+  @staticmethod
+  def _normalize(row: Sequence) -> tuple:
+    """ Convert a result row to plain values, focused as a bool. """
+    values = tuple(row)
+    return values[:-1] + (bool(values[-1]),)
+
+  @classmethod
+  def _record(cls, row: Sequence) -> Dict[str, Any]:
+    """ Convert a result row to a dict keyed by COLUMNS. """
+    return dict(zip(cls.COLUMNS, cls._normalize(row)))
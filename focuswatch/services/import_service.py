@@ -0,0 +1,327 @@
+""" Import service module for the FocusWatch application.
+
+Loads activity histories from FocusWatch exports (CSV, JSON lines) and from
+ActivityWatch bucket exports. Files are read in chunks that are deduplicated
+against the stored history, classified in one batch and inserted with a
+single executemany, all inside one transaction.
+"""
+
+import bisect
+import csv
+import itertools
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import (Any, Callable, Dict, Iterable, Iterator, List,
+                    NamedTuple, Optional, Tuple)
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from focuswatch.database.database_connection import DatabaseConnection
+from focuswatch.database.database_manager import (
+    bulk_activity_inserts, restore_activity_insert_triggers)
+from focuswatch.database.models.activity import Activity
+from focuswatch.services.category_service import CategoryService
+from focuswatch.services.classifier_service import ClassifierService
+from focuswatch.services.keyword_service import KeywordService
+from focuswatch.utils.instrumentation import metrics
+from focuswatch.utils.query_cache import query_cache
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], None]
+# (time_start, time_stop, window_class, window_name, focused)
+ImportRecord = Tuple[datetime, datetime, str, str, bool]
+
+
+class ImportResult(NamedTuple):
+  """ Outcome of an import. """
+  read: int  # records read from the file
+  imported: int  # activities inserted, a record split around existing activities counts once per piece
+  skipped: int  # records already covered by the history, or invalid
+
+
+class _Coverage:
+  """ Merged, sorted time ranges already present in the history. """
+
+  def __init__(self, ranges: Iterable[Tuple[datetime, datetime]]):
+    self._starts: List[datetime] = []
+    self._stops: List[datetime] = []
+    for start, stop in ranges:
+      self.add(start, stop)
+
+  def add(self, start: datetime, stop: datetime) -> None:
+    """ Add a range, merging it with the ranges it overlaps or touches. """
+    first = bisect.bisect_left(self._stops, start)
+    last = bisect.bisect_right(self._starts, stop)
+    if first < last:
+      start = min(start, self._starts[first])
+      stop = max(stop, self._stops[last - 1])
+    self._starts[first:last] = [start]
+    self._stops[first:last] = [stop]
+
+  def subtract(self, start: datetime, stop: datetime) -> List[Tuple[datetime, datetime]]:
+    """ Return the parts of [start, stop) that are not covered yet. """
+    pieces = []
+    index = bisect.bisect_right(self._stops, start)
+    while index < len(self._starts) and self._starts[index] < stop:
+      if self._starts[index] > start:
+        pieces.append((start, self._starts[index]))
+      start = max(start, self._stops[index])
+      index += 1
+    if start < stop:
+      pieces.append((start, stop))
+    return pieces
+
+
+class ImportService:
+  """ Service class for importing activity histories from files. """
+  FORMATS = ("csv", "jsonl", "activitywatch")
+  DEFAULT_CHUNK_SIZE = 10000
+  # Existing activities are looked up from this long before a chunk, longer ones may be duplicated
+  MAX_ACTIVITY_DURATION = timedelta(days=1)
+  # Pieces left after trimming overlaps shorter than this are dropped
+  MIN_DURATION = timedelta(seconds=1)
+  # Executed directly with the driver, compiling the statement per row costs more than the insert
+  INSERT_ACTIVITY = ("INSERT INTO activity "
+                     "(time_start, time_stop, window_class, window_name, focused, category_id) "
+                     "VALUES (?, ?, ?, ?, ?, ?)")
+
+  def __init__(self,
+               db_conn: Optional[DatabaseConnection] = None,
+               classifier_service: Optional[ClassifierService] = None):
+    """ Initialize the ImportService.
+
+    Args:
+      db_conn: Optional DatabaseConnection instance for dependency injection.
+      classifier_service: Optional ClassifierService used to categorize imported activities.
+    """
+    self._db_conn = db_conn or DatabaseConnection()
+    if classifier_service is None:
+      keyword_service = KeywordService(db_conn=self._db_conn)
+      classifier_service = ClassifierService(
+        CategoryService(db_conn=self._db_conn, keyword_service=keyword_service),
+        keyword_service)
+    self._classifier_service = classifier_service
+
+  @staticmethod
+  def detect_format(file_path: str) -> Optional[str]:
+    """ Guess the format of a file from its extension and first line.
+
+    A .json file holding FocusWatch records one per line is JSON lines,
+    anything else is taken as an ActivityWatch export.
+
+    Returns:
+      Optional[str]: One of FORMATS, or None if the file is not supported.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".csv":
+      return "csv"
+    if extension == ".jsonl":
+      return "jsonl"
+    if extension != ".json":
+      return None
+    try:
+      with open(file_path, encoding="utf-8") as import_file:
+        head = import_file.read(64 * 1024)
+      first_line, newline, _ = head.partition("\n")
+      if newline and "time_start" in json.loads(first_line):
+        return "jsonl"
+    except (OSError, ValueError, TypeError):
+      pass
+    return "activitywatch"
+
+  @metrics.timed()
+  def import_file(self,
+                  file_path: str,
+                  fmt: Optional[str] = None,
+                  progress_callback: Optional[ProgressCallback] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Optional[ImportResult]:
+    """ Import the activities of a file.
+
+    The import runs in a single transaction, a failure leaves the history
+    untouched. The window title index and the change log are filled once at
+    the end instead of by the per row triggers, and the uncategorized rollup
+    picks up the new rows on its next read.
+
+    Args:
+      file_path: File to import.
+      fmt: One of FORMATS, detected from the file if None.
+      progress_callback: Called with (read, total) after every chunk.
+      chunk_size: Number of records deduplicated, classified and inserted at a time.
+
+    Returns:
+      Optional[ImportResult]: The import counts, None on failure.
+    """
+    fmt = fmt or self.detect_format(file_path)
+    readers = {"csv": self._read_csv,
+               "jsonl": self._read_jsonl,
+               "activitywatch": self._read_activitywatch}
+    if fmt not in readers:
+      logger.error(f"Unsupported import format for {file_path}: {fmt}")
+      return None
+
+    read = imported = skipped = 0
+    try:
+      total, records = readers[fmt](file_path)
+      # Loaded before the transaction, the classifier services use their own connections
+      classify = self._classifier_service.batch_classifier()
+      with self._db_conn.engine.begin() as connection, bulk_activity_inserts(connection):
+        while chunk := list(itertools.islice(records, chunk_size)):
+          rows, chunk_skipped = self._deduplicate(connection, chunk)
+          if rows:
+            categories = classify((row[2], row[3]) for row in rows)
+            connection.exec_driver_sql(
+              self.INSERT_ACTIVITY, [row + (categories[(row[2], row[3])],) for row in rows])
+          read += len(chunk)
+          imported += len(rows)
+          skipped += chunk_skipped
+          if progress_callback:
+            progress_callback(read, max(total, read))
+    except (SQLAlchemyError, OSError, ValueError, KeyError, TypeError) as e:
+      logger.error(f"Failed to import activities from {file_path}: {e}")
+      restore_activity_insert_triggers(self._db_conn)
+      return None
+
+    if imported:
+      query_cache.clear()
+    logger.info(f"Imported {imported} activities from {file_path} "
+                f"({read} read, {skipped} skipped)")
+    return ImportResult(read, imported, skipped)
+
+  def _deduplicate(self,
+                   connection,
+                   chunk: List[Optional[ImportRecord]]) -> Tuple[List[tuple], int]:
+    """ Trim the records of a chunk to the time not covered by stored activities.
+
+    Records are processed by start time and added to the coverage as they
+    are accepted, so overlaps within the file are removed too.
+
+    Returns:
+      Tuple[List[tuple], int]: (time_start, time_stop, window_class, window_name, focused)
+                               rows to insert and the number of dropped records.
+    """
+    records = sorted(record for record in chunk if record)
+    skipped = len(chunk) - len(records)
+    if not records:
+      return [], skipped
+
+    period_start = records[0][0]
+    period_stop = max(record[1] for record in records)
+    existing = connection.execute(
+      select(Activity.time_start, Activity.time_stop)
+      .where(Activity.time_start >= (period_start - self.MAX_ACTIVITY_DURATION).isoformat(),
+             Activity.time_start < period_stop.isoformat(),
+             Activity.time_stop > period_start.isoformat())
+      .order_by(Activity.time_start))
+    coverage = _Coverage((datetime.fromisoformat(start), datetime.fromisoformat(stop))
+                         for start, stop in existing)
+
+    rows = []
+    for start, stop, window_class, window_name, focused in records:
+      pieces = [(piece_start, piece_stop)
+                for piece_start, piece_stop in coverage.subtract(start, stop)
+                if piece_stop - piece_start >= self.MIN_DURATION]
+      if not pieces:
+        skipped += 1
+        continue
+      for piece_start, piece_stop in pieces:
+        coverage.add(piece_start, piece_stop)
+        rows.append((piece_start.isoformat(), piece_stop.isoformat(),
+                     window_class, window_name, focused))
+    return rows, skipped
+
+  @staticmethod
+  def _parse_time(value: str) -> datetime:
+    """ Parse an ISO timestamp, converting aware times to naive local time like the watcher stores. """
+    time = datetime.fromisoformat(value)
+    if time.tzinfo is not None:
+      time = time.astimezone().replace(tzinfo=None)
+    return time
+
+  @classmethod
+  def _record(cls, values: Dict[str, Any]) -> Optional[ImportRecord]:
+    """ Convert a FocusWatch export record, None if it has no valid time range. """
+    if not values.get("time_start") or not values.get("time_stop"):
+      return None
+    start = cls._parse_time(values["time_start"])
+    stop = cls._parse_time(values["time_stop"])
+    if stop <= start:
+      return None
+    focused = values.get("focused")
+    if isinstance(focused, str):
+      focused = focused.strip().lower() in ("true", "1")
+    return (start, stop, values["window_class"] or "", values["window_name"] or "", bool(focused))
+
+  @staticmethod
+  def _count_lines(file_path: str) -> int:
+    with open(file_path, "rb") as import_file:
+      return sum(block.count(b"\n") for block in iter(lambda: import_file.read(1 << 20), b""))
+
+  def _read_csv(self, file_path: str) -> Tuple[int, Iterator[Optional[ImportRecord]]]:
+    """ Stream a CSV file with the columns of the FocusWatch export. """
+    with open(file_path, encoding="utf-8", newline="") as import_file:
+      columns = next(csv.reader(import_file), [])
+    missing = {"time_start", "time_stop", "window_class", "window_name"} - set(columns)
+    if missing:
+      raise ValueError(f"missing CSV columns: {", ".join(sorted(missing))}")
+
+    def records() -> Iterator[Optional[ImportRecord]]:
+      with open(file_path, encoding="utf-8", newline="") as import_file:
+        for values in csv.DictReader(import_file):
+          yield self._record(values)
+
+    return max(self._count_lines(file_path) - 1, 0), records()
+
+  def _read_jsonl(self, file_path: str) -> Tuple[int, Iterator[Optional[ImportRecord]]]:
+    """ Stream a JSON lines file with one FocusWatch export record per line. """
+    def records() -> Iterator[Optional[ImportRecord]]:
+      with open(file_path, encoding="utf-8") as import_file:
+        for line in import_file:
+          if line.strip():
+            yield self._record(json.loads(line))
+
+    return self._count_lines(file_path), records()
+
+  def _read_activitywatch(self, file_path: str) -> Tuple[int, Iterator[Optional[ImportRecord]]]:
+    """ Read an ActivityWatch export, either all buckets or a single one.
+
+    Window events become activities and AFK events become "afk" activities,
+    like the watcher logs them. AFK buckets are read first so that window
+    events recorded while away are trimmed around the AFK periods.
+    """
+    with open(file_path, encoding="utf-8") as import_file:
+      data = json.load(import_file)
+    if not isinstance(data, dict):
+      raise ValueError("an ActivityWatch export must be a JSON object")
+    buckets = data["buckets"] if "buckets" in data else {"": data}
+    if not isinstance(buckets, dict) or not all(isinstance(bucket, dict) for bucket in buckets.values()):
+      raise ValueError("ActivityWatch buckets must be JSON objects")
+    buckets = [bucket for bucket in buckets.values()
+               if bucket.get("type") in ("afkstatus", "currentwindow")]
+    buckets.sort(key=lambda bucket: bucket["type"] != "afkstatus")
+    if not buckets:
+      raise ValueError("no ActivityWatch window or AFK bucket found")
+
+    def records() -> Iterator[Optional[ImportRecord]]:
+      for bucket in buckets:
+        is_afk_bucket = bucket["type"] == "afkstatus"
+        for event in bucket.get("events", []):
+          if not isinstance(event, dict) or not isinstance(event.get("data", {}), dict):
+            raise ValueError(f"malformed ActivityWatch event: {event!r}")
+          event_data = event.get("data", {})
+          if is_afk_bucket:
+            if event_data.get("status") != "afk":
+              yield None
+              continue
+            window_class = window_name = "afk"
+          else:
+            window_class = event_data.get("app") or ""
+            window_name = event_data.get("title") or ""
+          start = self._parse_time(event["timestamp"])
+          stop = start + timedelta(seconds=float(event.get("duration", 0)))
+          yield (start, stop, window_class, window_name, False) if stop > start else None
+
+    return sum(len(bucket.get("events", [])) for bucket in buckets), records()
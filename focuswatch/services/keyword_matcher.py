@@ -0,0 +1,92 @@
+""" Compiled keyword matcher for FocusWatch.
+
+The classifier matches every window title against every keyword. The
+KeywordMatcher compiles a snapshot of the keywords once: patterns are
+compiled, substring keywords are lowercased, and the rules are ordered so that
+the first match not excluded is the category to assign.
+"""
+
+import logging
+import re
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from focuswatch.database.models.keyword import Keyword
+
+logger = logging.getLogger(__name__)
+
+Predicate = Callable[[str], bool]
+
+
+class KeywordMatcher:
+  """ Matches window titles against a snapshot of the keywords.
+
+  The category assigned is the one of the matching keyword with the highest
+  priority, then of the deepest category, then of the first keyword. An
+  exclusion keyword that matches prevents its own category from being
+  assigned by keywords of lower or equal priority; the next match wins instead.
+  """
+  # Index of the text each target is matched against in the tuple built by _texts,
+  # the lowercased text follows
+  TEXT_INDEX = {
+    Keyword.TARGET_TITLE: 0,
+    Keyword.TARGET_CLASS: 2,
+    Keyword.TARGET_NAME: 4,
+  }
+
+  def __init__(self, keywords: Iterable[Keyword], depths: Mapping[int, int]):
+    """ Compile the keywords.
+
+    Args:
+      keywords: The keywords, invalid regular expressions are logged and skipped.
+      depths: Depth of the keywords' categories, 0 if missing.
+    """
+    rules = []
+    self._exclusions: Dict[int, List[Tuple[int, int, Predicate]]] = defaultdict(list)
+    for position, keyword in enumerate(keywords):
+      compiled = self._compile(keyword)
+      if compiled is None:
+        continue
+      priority = keyword.priority or 0
+      if keyword.exclude:
+        self._exclusions[keyword.category_id].append((priority,) + compiled)
+      else:
+        rules.append(((-priority, -depths.get(keyword.category_id, 0), position),
+                      (priority, keyword.category_id) + compiled))
+    rules.sort(key=lambda rule: rule[0])
+    self._rules: List[Tuple[int, int, int, Predicate]] = [rule for _, rule in rules]
+
+  @classmethod
+  def _compile(cls, keyword: Keyword) -> Optional[Tuple[int, Predicate]]:
+    """ Return (text index, predicate) for a keyword, None if its pattern is invalid. """
+    index = cls.TEXT_INDEX.get(keyword.target or Keyword.TARGET_TITLE, 0)
+    try:
+      pattern = keyword.pattern()
+    except re.error as e:
+      logger.error(f"Ignoring keyword '{keyword.name}' with an invalid regular expression: {e}")
+      return None
+    if pattern is not None:
+      return index, pattern.search
+    if keyword.match_case:
+      needle = keyword.name
+      return index, lambda text: needle in text
+    needle = keyword.name.lower()
+    return index + 1, lambda text: needle in text
+
+  @staticmethod
+  def _texts(window_class: str, window_name: str) -> Tuple[str, ...]:
+    title = f"{window_class} {window_name}"
+    return (title, title.lower(), window_class, window_class.lower(),
+            window_name, window_name.lower())
+
+  def _is_excluded(self, category_id: int, priority: int, texts: Tuple[str, ...]) -> bool:
+    return any(exclusion_priority >= priority and predicate(texts[index])
+               for exclusion_priority, index, predicate in self._exclusions.get(category_id, ()))
+
+  def match(self, window_class: str, window_name: str) -> Optional[int]:
+    """ Return the category to assign to a window title, None if no keyword matches. """
+    texts = self._texts(window_class or "", window_name or "")
+    for priority, category_id, index, predicate in self._rules:
+      if predicate(texts[index]) and not self._is_excluded(category_id, priority, texts):
+        return category_id
+    return None
@@ -9,6 +9,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from focuswatch.database.database_connection import DatabaseConnection
 from focuswatch.database.models.category import Category
 from focuswatch.database.models.keyword import Keyword
+from focuswatch.utils.rules_version import rules_version
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +63,7 @@ class KeywordService:
               f"Category '{category_name}' not found for keyword '{keyword_name}'.")
 
         session.commit()
+        rules_version.bump()
         logger.info("Default keywords inserted successfully.")
       except SQLAlchemyError as e:
         logger.error(f"Failed to insert default keywords: {e}")
@@ -108,6 +110,7 @@ class KeywordService:
 
         session.add(keyword)
         session.commit()
+        rules_version.bump()
         logger.info(f"Added new keyword: {keyword.name}")
         return True
       except SQLAlchemyError as e:
@@ -129,6 +132,7 @@ class KeywordService:
       try:
         session.merge(keyword)
         session.commit()
+        rules_version.bump()
         logger.info(f"Updated keyword: {keyword.name}")
         return True
       except SQLAlchemyError as e:
@@ -153,6 +157,7 @@ class KeywordService:
         if keyword:
           session.delete(keyword)
           session.commit()
+          rules_version.bump()
           logger.info(f"Deleted keyword with ID: {keyword_id}")
         else:
           logger.warning(
@@ -0,0 +1,284 @@
+""" Sync service module for the FocusWatch application.
+
+Merges the history recorded by FocusWatch on another machine, e.g. a laptop
+database copied or synced to the desktop, into the local database. The peer
+file is attached to a local connection and merged with INSERT ... SELECT, so
+a year of history is copied without going through Python row by row.
+
+Each sync remembers, per peer database, the last peer activity ID it copied
+and the last peer change log sequence it replayed. The next sync only copies
+the activities added since and replays the updates and deletes the peer made
+to activities already copied, see ChangeLogService.
+"""
+
+import json
+import logging
+import os
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import insert, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from focuswatch.database.database_connection import DatabaseConnection
+from focuswatch.database.database_manager import (
+    DATABASE_ID_KEY, bulk_activity_inserts, restore_activity_insert_triggers)
+from focuswatch.database.models.category import Category
+from focuswatch.services.activity_service import ActivityService
+from focuswatch.services.category_service import CategoryService, NamePath
+from focuswatch.services.change_log_service import ChangeLogService
+from focuswatch.utils.instrumentation import metrics
+from focuswatch.utils.query_cache import query_cache
+from focuswatch.utils.rules_version import rules_version
+
+logger = logging.getLogger(__name__)
+
+
+class SyncResult(NamedTuple):
+  """ What a sync merged. """
+  read: int  # peer activities added since the previous sync
+  inserted: int
+  duplicates: int  # identical to a stored activity, skipped
+  updated: int  # copies updated after the peer changed them
+  deleted: int  # copies deleted after the peer deleted them
+
+
+class SyncService:
+  """ Service class for merging the history of another FocusWatch database. """
+  PEER = "sync_peer"  # schema name the peer database is attached as
+  # Metadata keys of the sync state of a peer, by peer database ID
+  ACTIVITY_WATERMARK_KEY = "sync.{}.activity_id"
+  CHANGE_WATERMARK_KEY = "sync.{}.change_seq"
+
+  # Activities are identical if all of these match, {0} prefixes the other activity's columns
+  SAME_ACTIVITY = ("a.time_start = {0}time_start AND a.time_stop IS {0}time_stop "
+                   "AND a.window_class = {0}window_class AND a.window_name = {0}window_name")
+  # Without statistics SQLite may probe ix_activity_window instead, which matches
+  # every activity of a window and makes the merge quadratic
+  ACTIVITY_BY_START = "main.activity a INDEXED BY ix_activity_time_start"
+  INSERT_NEW = f"""INSERT INTO main.activity
+    (time_start, time_stop, window_class, window_name, category_id, focused)
+    SELECT p.time_start, p.time_stop, p.window_class, p.window_name, m.local_id, p.focused
+    FROM {PEER}.activity p LEFT JOIN temp.sync_categories m ON m.peer_id = p.category_id
+    WHERE p.id > :after_id AND p.id <= :through_id
+      AND NOT EXISTS (SELECT 1 FROM {ACTIVITY_BY_START} WHERE {SAME_ACTIVITY.format("p.")})
+    ORDER BY p.id"""
+  FIND_COPY = f"SELECT a.id FROM {ACTIVITY_BY_START} WHERE {SAME_ACTIVITY.format(":")} ORDER BY a.id"
+  PEER_ACTIVITY = f"""SELECT p.time_start, p.time_stop, p.window_class, p.window_name,
+      m.local_id AS category_id, p.focused
+    FROM {PEER}.activity p LEFT JOIN temp.sync_categories m ON m.peer_id = p.category_id
+    WHERE p.id = :row_id"""
+  UPDATE_COPY = """UPDATE main.activity SET time_start = :time_start, time_stop = :time_stop,
+      window_class = :window_class, window_name = :window_name, category_id = :category_id,
+      focused = :focused
+    WHERE id = :id"""
+
+  def __init__(self,
+               db_conn: Optional[DatabaseConnection] = None,
+               category_service: Optional[CategoryService] = None):
+    """ Initialize the SyncService.
+
+    Args:
+      db_conn: Optional DatabaseConnection instance for dependency injection.
+      category_service: Optional CategoryService instance for dependency injection.
+    """
+    self._db_conn = db_conn or DatabaseConnection()
+    self._category_service = category_service or CategoryService(db_conn=self._db_conn)
+
+  @metrics.timed()
+  def sync_file(self, peer_path: str) -> Optional[SyncResult]:
+    """ Merge the activities of another FocusWatch database file.
+
+    Categories are matched by name path, the categories missing locally are
+    created. Activities identical to a stored one are skipped, the activity
+    the peer is still recording is left for the next sync. The merge runs in
+    a single transaction, a failure leaves the history and the categories untouched.
+
+    Args:
+      peer_path: The SQLite database file of the other FocusWatch installation.
+
+    Returns:
+      Optional[SyncResult]: The merge counts, None on failure.
+    """
+    if not os.path.isfile(peer_path):
+      logger.error(f"Cannot sync, {peer_path} is not a file")
+      return None
+    try:
+      with self._db_conn.engine.connect() as connection:
+        # ATTACH and DETACH are not allowed inside a transaction
+        connection.exec_driver_sql(f"ATTACH DATABASE ? AS {self.PEER}", (peer_path,))
+        connection.commit()
+        try:
+          result = self._merge(connection, peer_path)
+        finally:
+          connection.rollback()
+          connection.exec_driver_sql("DROP TABLE IF EXISTS temp.sync_categories")
+          connection.exec_driver_sql(f"DETACH DATABASE {self.PEER}")
+          connection.commit()
+    except (SQLAlchemyError, ValueError) as e:
+      logger.error(f"Failed to sync with {peer_path}: {e}")
+      restore_activity_insert_triggers(self._db_conn)
+      return None
+
+    if result.inserted or result.updated or result.deleted:
+      query_cache.clear()
+    logger.info(f"Synced with {peer_path}: {result.inserted} activities added, "
+                f"{result.duplicates} duplicates skipped, {result.updated} updated, "
+                f"{result.deleted} deleted")
+    return result
+
+  def _merge(self, connection, peer_path: str) -> SyncResult:
+    """ Merge the attached peer database, see sync_file. """
+    peer_id = self._scalar(connection, f"SELECT value FROM {self.PEER}.metadata WHERE key = :key",
+                           key=DATABASE_ID_KEY)
+    peer_id = peer_id or f"file:{os.path.abspath(peer_path)}"  # a database older than its ID
+    if peer_id == self._scalar(connection, "SELECT value FROM main.metadata WHERE key = :key",
+                               key=DATABASE_ID_KEY):
+      raise ValueError("a database cannot be synced with itself")
+
+    # Read before the activities, peer changes made in between are replayed next time
+    has_change_log = self._scalar(
+      connection, f"SELECT 1 FROM {self.PEER}.sqlite_master WHERE name = 'change_log'")
+    latest_seq = (self._scalar(connection, f"SELECT max(seq) FROM {self.PEER}.change_log")
+                  if has_change_log else None) or 0
+    after_id = int(self._metadata(connection, self.ACTIVITY_WATERMARK_KEY.format(peer_id)) or 0)
+    through_id = self._scalar(connection, f"SELECT max(id) FROM {self.PEER}.activity") or 0
+    open_id = self._scalar(connection, f"SELECT value FROM {self.PEER}.metadata WHERE key = :key",
+                           key=ActivityService.OPEN_ACTIVITY_KEY)
+    if open_id is not None:
+      # Its time_stop still grows, it is copied once closed
+      through_id = min(through_id, int(open_id) - 1)
+
+    created = self._map_categories(connection)
+    updated = deleted = 0
+    if has_change_log:
+      updated, deleted = self._replay_changes(connection, peer_id, after_id)
+      self._set_metadata(connection, self.CHANGE_WATERMARK_KEY.format(peer_id), latest_seq)
+
+    read = inserted = 0
+    if through_id > after_id:
+      read = self._scalar(connection, f"SELECT count(*) FROM {self.PEER}.activity "
+                          "WHERE id > :after_id AND id <= :through_id",
+                          after_id=after_id, through_id=through_id)
+      with bulk_activity_inserts(connection):
+        inserted = connection.execute(text(self.INSERT_NEW),
+                                      {"after_id": after_id, "through_id": through_id}).rowcount
+      self._set_metadata(connection, self.ACTIVITY_WATERMARK_KEY.format(peer_id), through_id)
+
+    if updated or deleted:
+      # Changed rows may already be folded into the uncategorized rollup, rebuild it
+      connection.execute(text("DELETE FROM main.metadata WHERE key = :key"),
+                         {"key": ActivityService.UNCATEGORIZED_WATERMARK_KEY})
+    connection.commit()
+    if created:
+      rules_version.bump()
+    return SyncResult(read, inserted, read - inserted, updated, deleted)
+
+  def _map_categories(self, connection) -> int:
+    """ Fill temp.sync_categories with the local category ID of every peer category.
+
+    Categories are matched by name path, the missing ones are created on
+    connection with the color and focus of the peer category.
+
+    Returns:
+      int: The number of created categories.
+    """
+    local_ids: Dict[NamePath, Optional[int]] = {
+      path: category_id for category_id, path
+      in self._read_name_paths(connection, "main").items()}
+    peer_details = {category_id: (color, focused) for category_id, color, focused in connection.execute(
+      text(f"SELECT id, color, focused FROM {self.PEER}.categories"))}
+
+    mapping = []
+    created = 0
+    peer_paths = self._read_name_paths(connection, self.PEER)
+    for peer_id, path in sorted(peer_paths.items(), key=lambda item: len(item[1])):
+      if path not in local_ids:
+        local_ids[path] = self._create_category(
+          connection, path, local_ids.get(path[:-1]), *peer_details[peer_id])
+        created += local_ids[path] is not None
+      mapping.append({"peer_id": peer_id, "local_id": local_ids[path]})
+
+    connection.exec_driver_sql(
+      "CREATE TEMP TABLE IF NOT EXISTS sync_categories (peer_id INTEGER PRIMARY KEY, local_id INTEGER)")
+    connection.exec_driver_sql("DELETE FROM temp.sync_categories")
+    if mapping:
+      connection.execute(text("INSERT INTO temp.sync_categories VALUES (:peer_id, :local_id)"), mapping)
+    return created
+
+  def _read_name_paths(self, connection, schema: str) -> Dict[int, NamePath]:
+    """ Return the name path of each category of a schema by ID. """
+    categories = [Category(name=name, parent_category_id=parent_id, id=category_id)
+                  for category_id, name, parent_id in connection.execute(
+                    text(f"SELECT id, name, parent_category_id FROM {schema}.categories"))]
+    return self._category_service.get_name_paths(categories)
+
+  @staticmethod
+  def _create_category(connection,
+                       path: NamePath,
+                       parent_id: Optional[int],
+                       color: Optional[str],
+                       focused: bool) -> Optional[int]:
+    """ Create a category of the peer on connection, None if it cannot be created here. """
+    if len(path) > 1 and parent_id is None:
+      return None
+    full_name = "/".join(path)
+    if len(path) > 1 and path[-1] == path[-2]:
+      logger.warning(f"Cannot create the category {full_name} of the peer, "
+                     "it has the name of its parent")
+      return None
+    category_id = connection.execute(insert(Category).values(
+      name=path[-1], parent_category_id=parent_id, color=color, focused=bool(focused))
+    ).inserted_primary_key[0]
+    logger.info(f"Created the category {full_name} of the peer")
+    return category_id
+
+  def _replay_changes(self, connection, peer_id: str, after_id: int) -> Tuple[int, int]:
+    """ Apply the peer updates and deletes of activities copied by previous syncs.
+
+    The copy of a peer activity is the local activity identical to it before
+    its first change since the last sync, it is updated to the current peer
+    row or deleted with it.
+
+    Returns:
+      Tuple[int, int]: The numbers of updated and deleted activities.
+    """
+    since_seq = int(self._metadata(connection, self.CHANGE_WATERMARK_KEY.format(peer_id)) or 0)
+    pruned = self._scalar(connection, f"SELECT value FROM {self.PEER}.metadata WHERE key = :key",
+                          key=ChangeLogService.PRUNED_KEY)
+    if since_seq and pruned and int(pruned) > since_seq:
+      logger.warning("The peer pruned changes not synced yet, some of its updates are missed")
+
+    first_values = {}
+    for row_id, old_values in connection.execute(text(
+        f"SELECT row_id, old_values FROM {self.PEER}.change_log "
+        "WHERE seq > :since_seq AND table_name = 'activity' AND row_id <= :after_id "
+        "AND operation IN ('update', 'delete') ORDER BY seq"),
+        {"since_seq": since_seq, "after_id": after_id}):
+      first_values.setdefault(row_id, json.loads(old_values))
+
+    updated = deleted = 0
+    for row_id, old in first_values.items():
+      local_id = self._scalar(connection, self.FIND_COPY, **{
+        key: old[key] for key in ("time_start", "time_stop", "window_class", "window_name")})
+      if local_id is None:
+        continue
+      current = connection.execute(text(self.PEER_ACTIVITY), {"row_id": row_id}).first()
+      if current is None:
+        connection.execute(text("DELETE FROM main.activity WHERE id = :id"), {"id": local_id})
+        deleted += 1
+      else:
+        connection.execute(text(self.UPDATE_COPY), {**current._mapping, "id": local_id})
+        updated += 1
+    return updated, deleted
+
+  @staticmethod
+  def _scalar(connection, statement: str, **params):
+    return connection.execute(text(statement), params).scalar()
+
+  def _metadata(self, connection, key: str) -> Optional[str]:
+    return self._scalar(connection, "SELECT value FROM main.metadata WHERE key = :key", key=key)
+
+  @staticmethod
+  def _set_metadata(connection, key: str, value) -> None:
+    connection.execute(text("INSERT OR REPLACE INTO main.metadata (key, value) VALUES (:key, :value)"),
+                       {"key": key, "value": str(value)})
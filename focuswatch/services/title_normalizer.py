@@ -0,0 +1,86 @@
+""" Window title normalization for FocusWatch.
+
+Titles such as "(3) Slack | general" or "● main.py - Visual Studio Code" only
+differ from their previous versions by a counter or a marker. Normalizing them
+gives one key per document or channel, which the title aggregates group on.
+Raw titles are stored unchanged, the key is kept once per distinct title.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from typing import Any, List, Mapping, Optional, Pattern, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TitleNormalizer:
+  """ Rewrites window titles with unread counters stripped and regex rules applied.
+
+  A rule is a mapping with a "pattern" regex, a "replace" string (re.sub
+  syntax, empty by default) and an optional "window_class" regex restricting
+  it to matching window classes, which makes per-application templates. Rules
+  run in order after the counters are stripped.
+  """
+  # Unread counters and modified markers, e.g. "(3) ", "[12] ", "● ", "* " and " (5)"
+  COUNTER_PATTERNS = (
+    r"^(?:[●•*]\s*)+",
+    r"(?:^|\s)[(\[]\d{1,4}\+?[)\]](?=\s|$)",
+  )
+
+  def __init__(self,
+               rules: Sequence[Mapping[str, Any]] = (),
+               strip_counters: bool = True,
+               enabled: bool = True):
+    """ Compile the normalization rules.
+
+    Args:
+      rules: The regex rules, invalid rules are logged and skipped.
+      strip_counters: Whether to strip unread counters and modified markers.
+      enabled: If False, titles are returned unchanged.
+    """
+    self._enabled = enabled
+    self._counters = [re.compile(pattern) for pattern in self.COUNTER_PATTERNS] if strip_counters else []
+    self._rules: List[Tuple[Optional[Pattern], Pattern, str]] = []
+    for rule in rules:
+      if not isinstance(rule, Mapping):
+        logger.error(f"Ignoring title normalization rule {rule!r}: not a mapping")
+        continue
+      try:
+        window_class = rule.get("window_class")
+        self._rules.append((
+          re.compile(window_class, re.IGNORECASE) if window_class else None,
+          re.compile(rule["pattern"]),
+          rule.get("replace", "")))
+      except (KeyError, TypeError, re.error) as e:
+        logger.error(f"Ignoring invalid title normalization rule {rule!r}: {e}")
+    # Identifies the rules the stored title keys were computed with
+    self.fingerprint = hashlib.sha1(json.dumps(
+      {"enabled": enabled, "strip_counters": strip_counters, "rules": list(rules)},
+      sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+  @classmethod
+  def from_config(cls, section: Mapping[str, Any]) -> "TitleNormalizer":
+    """ Build a normalizer from the title_normalization config section. """
+    return cls(rules=section.get("rules") or (),
+               strip_counters=bool(section.get("strip_counters", True)),
+               enabled=bool(section.get("enabled", True)))
+
+  def normalize(self, window_class: str, window_name: str) -> str:
+    """ Return the normalized form of a window title, the raw title if nothing is left of it.
+
+    Args:
+      window_class: The window class, selecting the class specific rules.
+      window_name: The raw window title.
+    """
+    if not self._enabled:
+      return window_name
+    title = window_name
+    for pattern in self._counters:
+      title = pattern.sub("", title)
+    for class_pattern, pattern, replace in self._rules:
+      if class_pattern is None or class_pattern.fullmatch(window_class or ""):
+        title = pattern.sub(replace, title)
+    title = " ".join(title.split())
+    return title or window_name
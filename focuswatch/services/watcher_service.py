@@ -6,19 +6,22 @@ This module is responsible for monitoring the user's activity and logging it to
 import ctypes
 import logging
 import subprocess
+import threading
 import time
 from datetime import datetime
 from sys import platform
-from typing import Optional, TYPE_CHECKING
+from typing import Any, Dict, Optional, TYPE_CHECKING
 
 import psutil
 
 from focuswatch.config import Config
 from focuswatch.database.models.activity import Activity
+from focuswatch.utils.instrumentation import metrics
 
 if TYPE_CHECKING:
   from focuswatch.services.activity_service import ActivityService
   from focuswatch.services.category_service import CategoryService
+  from focuswatch.services.change_log_service import ChangeLogService
   from focuswatch.services.keyword_service import KeywordService
   from focuswatch.services.classifier_service import ClassifierService
 
@@ -56,16 +59,43 @@ class WatcherService():
   This class is responsible for monitoring the user's activity and logging it to the database. 
   It uses the Classifier class to classify the activity based on the window class and name.
 
+  Changes to the settings in HOT_RELOADABLE_SETTINGS are applied between ticks without a restart.
+  With adaptive_interval enabled the polling interval doubles (up to max_watch_interval)
+  while the user is idle and snaps back to watch_interval on input or a window change.
+
+  The current activity is stored as soon as it starts, as an open row whose
+  time_stop is updated every heartbeat_interval seconds, so a crash loses at
+  most one heartbeat and the dashboards show the ongoing activity.
+
   Currently, the Watcher class supports Linux with xorg and Windows platforms.
   """
+  # config key in the general section -> (attribute, type)
+  HOT_RELOADABLE_SETTINGS = {
+    "watch_interval": ("_watch_interval", float),
+    "watch_afk": ("_watch_afk", bool),
+    "afk_timeout": ("_afk_timeout", float),
+    "adaptive_interval": ("_adaptive_interval", bool),
+    "max_watch_interval": ("_max_watch_interval", float),
+    "heartbeat_interval": ("_heartbeat_interval", float),
+  }
+  # Idle time in seconds after which the adaptive interval starts backing off
+  IDLE_BACKOFF_THRESHOLD = 30.0
+  # Seconds an idle time sample is reused when only the adaptive interval needs it
+  IDLE_SAMPLE_INTERVAL = 5.0
+  # Seconds between two prunes of the change log, the first one runs on the first tick
+  PRUNE_INTERVAL = 6 * 3600.0
 
   def __init__(self,
                activity_service: "ActivityService",
                category_service: "CategoryService",
                classifier_service: "ClassifierService",
                watch_interval: Optional[float] = None,
-               verbose: Optional[int] = None
+               verbose: Optional[int] = None,
+               change_log_service: Optional["ChangeLogService"] = None
                ):
+    self._stop_event = threading.Event()
+    self._wake_event = threading.Event()
+
     # Load configuration
     self._config = Config()
     self._watch_interval = float(
@@ -75,11 +105,27 @@ class WatcherService():
     self._watch_afk = bool(self._config["general"]["watch_afk"])
     self._afk_timeout = float(
       self._config["general"]["afk_timeout"])
+    self._adaptive_interval = bool(
+      self._config["general"]["adaptive_interval"])
+    self._max_watch_interval = float(
+      self._config["general"]["max_watch_interval"])
+    self._heartbeat_interval = float(
+      self._config["general"]["heartbeat_interval"])
+    self._watch_interval_override = watch_interval
+    self._current_interval = self._watch_interval
+    self._idle_time = 0.0
+    self._idle_sampled_at = 0.0
+
+    # Settings changed from other threads are applied between ticks
+    self._settings_lock = threading.Lock()
+    self._pending_settings: Dict[str, Any] = {}
+    self._config.subscribe(self._on_config_changed)
 
     # Initialize services
     self._activity_service = activity_service
     self._category_service = category_service
     self._classifier_service = classifier_service
+    self._change_log_service = change_log_service
 
     # Initialize activity variables
     self._window_name = self.get_active_window_name()
@@ -87,10 +133,92 @@ class WatcherService():
     self._time_start = time.time()
     self._time_stop = None
     self._category = None
+    self._running = False
+    self._afk = False
+
+    # Open row of the current activity, see ActivityService.open_activity
+    self._open_activity_id: Optional[int] = None
+    self._last_heartbeat = 0.0
+    self._activity_service.recover_open_activity()
+    self._last_prune: Optional[float] = None
 
   def __del__(self):
-    # Save the last entry before exiting
-    self.save_entry()
+    # Save the last entry before exiting, unless monitor() already flushed it
+    if not self._stop_event.is_set():
+      self.save_entry()
+
+  @property
+  def is_running(self) -> bool:
+    """ Whether the monitor loop is running and has not been asked to stop. """
+    return self._running and not self._stop_event.is_set()
+
+  def stop(self) -> None:
+    """ Ask the monitor loop to exit.
+
+    The loop wakes up immediately, saves the in-progress activity and returns.
+    Safe to call from a signal handler or another thread.
+    """
+    self._stop_event.set()
+    self._wake_event.set()
+
+  def get_status(self) -> dict:
+    """ Return a snapshot of the watcher state.
+
+    Returns:
+      dict: The current window, when it became active and the watcher settings.
+    """
+    return {
+      "running": self.is_running,
+      "window_class": self._window_class,
+      "window_name": self._window_name,
+      "time_start": datetime.fromtimestamp(self._time_start).isoformat(),
+      "watch_interval": self._watch_interval,
+      "current_interval": self._current_interval,
+      "adaptive_interval": self._adaptive_interval,
+      "watch_afk": self._watch_afk,
+      "afk_timeout": self._afk_timeout,
+    }
+
+  def _on_config_changed(self, section: str, key: str, value) -> None:
+    """ Queue a changed watcher setting and wake the monitor loop to apply it. """
+    if section != "general" or key not in self.HOT_RELOADABLE_SETTINGS:
+      return
+    if key == "watch_interval" and self._watch_interval_override:
+      return  # the command line value wins
+    with self._settings_lock:
+      self._pending_settings[key] = value
+    self._wake_event.set()
+
+  def _apply_pending_settings(self) -> None:
+    """ Apply settings queued by _on_config_changed. Called between ticks. """
+    with self._settings_lock:
+      pending, self._pending_settings = self._pending_settings, {}
+    for key, value in pending.items():
+      attribute, cast = self.HOT_RELOADABLE_SETTINGS[key]
+      try:
+        setattr(self, attribute, cast(value))
+      except (TypeError, ValueError):
+        logger.error(f"Ignoring invalid value for {key}: {value!r}")
+        continue
+      logger.info(f"Watcher setting {key} changed to {value}")
+    if pending:
+      self._current_interval = self._watch_interval
+
+  def _next_interval(self, idle_time: float, activity_changed: bool) -> float:
+    """ Return how long to sleep before the next tick.
+
+    Args:
+      idle_time: Seconds since the last user input.
+      activity_changed: Whether the active window changed during this tick.
+
+    Returns:
+      float: The polling interval in seconds.
+    """
+    if (not self._adaptive_interval or activity_changed
+            or idle_time < self.IDLE_BACKOFF_THRESHOLD):
+      return self._watch_interval
+    ceiling = max(self._watch_interval, self._max_watch_interval)
+    return min(self._current_interval * 2, ceiling)
 
   def get_active_window_name(self) -> str:
     """ Get the name of the active window. 
@@ -158,8 +286,46 @@ class WatcherService():
       logger.error("This platform is not supported")
       raise NotImplementedError("This platform is not supported")
 
+  def _open_entry(self, category_id: Optional[int] = None) -> None:
+    """ Store the activity that just started as an open row.
+
+    Args:
+      category_id: Category of the activity, classified if None.
+    """
+    self._category = category_id or self._classifier_service.classify_entry(
+        window_class=self._window_class, window_name=self._window_name)
+    activity = Activity(
+      window_class=self._window_class,
+      window_name=self._window_name,
+      time_start=datetime.fromtimestamp(self._time_start),
+      time_stop=datetime.fromtimestamp(self._time_start),
+      category_id=self._category,
+      focused=self._category_service.get_category_focused(self._category)
+    )
+    self._open_activity_id = self._activity_service.open_activity(activity)
+    self._last_heartbeat = self._time_start
+
+  def _heartbeat(self) -> None:
+    """ Extend the open row up to now, at most every heartbeat_interval seconds. """
+    now = time.time()
+    if self._open_activity_id is None or now - self._last_heartbeat < self._heartbeat_interval:
+      return
+    self._last_heartbeat = now
+    self._activity_service.heartbeat_activity(
+      self._open_activity_id, datetime.fromtimestamp(self._time_start), datetime.fromtimestamp(now))
+
+  def _prune_change_log(self) -> None:
+    """ Prune the change log every PRUNE_INTERVAL seconds, it grows with every write. """
+    now = time.time()
+    if self._change_log_service is None or (
+        self._last_prune is not None and now - self._last_prune < self.PRUNE_INTERVAL):
+      return
+    self._last_prune = now
+    self._change_log_service.prune()
+
+  @metrics.timed("watcher.save_entry")
   def save_entry(self) -> None:
-    """ Save the current activity entry to the database. """
+    """ Save the current activity entry to the database, closing its open row if any. """
     if self._verbose:
       print(f"[{self._time_stop - self._time_start:.3f}] [{self._window_class}] {
             self._window_name[:32]} {self._category}")
@@ -177,7 +343,11 @@ class WatcherService():
       project_id=None,
       focused=is_focused
     )
-    self._activity_service.insert_activity(activity)
+    if self._open_activity_id is not None:
+      self._activity_service.close_activity(self._open_activity_id, activity)
+      self._open_activity_id = None
+    else:
+      self._activity_service.insert_activity(activity)
 
   def _get_linux_idle_time(self) -> int:
     """ Get the idle time on Linux using xprintidle. 
@@ -223,46 +393,88 @@ class WatcherService():
       logger.error(f"Error getting idle time: {e}")
       return 0
 
-  def _check_afk_status(self) -> None:
-    """ Check the AFK status of the user. 
+  def _sample_idle_time(self) -> float:
+    """ Return the idle time of this tick.
 
-    If the user is AFK for more than the AFK timeout, log the AFK status to the database.
+    AFK detection samples every tick. The adaptive interval alone only
+    compares the idle time with IDLE_BACKOFF_THRESHOLD, so a sample is aged
+    and reused for IDLE_SAMPLE_INTERVAL seconds instead of spawning
+    xprintidle on every tick.
+
+    Returns:
+      float: The idle time in seconds.
+    """
+    now = time.time()
+    if (self._watch_afk or self._afk
+            or now - self._idle_sampled_at >= self.IDLE_SAMPLE_INTERVAL):
+      self._idle_time = self._get_idle_time()
+      self._idle_sampled_at = now
+    return self._idle_time + (now - self._idle_sampled_at)
+
+  def _get_idle_time(self) -> float:
+    """ Get the time since the last user input.
+
+    Returns:
+      float: The idle time in seconds.
 
     Raises:
       NotImplementedError: If the platform is not supported.
     """
-    afk_time = 0
     if platform in ["linux", "linux2"]:
-      afk_time = self._get_linux_idle_time()
+      return self._get_linux_idle_time()
     elif platform in ["Windows", "win32", "cygwin"]:
-      afk_time = self._get_windows_idle_time()
+      return self._get_windows_idle_time()
     else:
       logger.error("This platform is not supported")
       raise NotImplementedError("This platform is not supported")
 
-    if afk_time > self._afk_timeout * 60:
+  def _check_afk_status(self, afk_time: Optional[float] = None) -> None:
+    """ Check the AFK status of the user. 
+
+    If the user is AFK for more than the AFK timeout, the current activity is
+    logged as AFK and an open AFK activity is recorded until input resumes.
+
+    Args:
+      afk_time: The idle time in seconds, queried if not given.
+
+    Raises:
+      NotImplementedError: If the platform is not supported.
+    """
+    if afk_time is None:
+      afk_time = self._get_idle_time()
+
+    is_afk = self._watch_afk and afk_time > self._afk_timeout * 60
+    if is_afk == self._afk:
+      return
+
+    if is_afk:
       self._time_stop = time.time()
       self._category = self._category_service.get_category_id_from_name(
         "AFK")
       self._window_class = "afk"
       self._window_name = "afk"
       self.save_entry()
-
-      self._time_start = time.time()
-      self._window_name = self.get_active_window_name()
-      self._window_class = self.get_active_window_class()
+      self._time_start = self._time_stop
+      self._open_entry(self._category)
+    else:
+      self._log_activity_change()
+      self._reset_activity_state()
+    self._afk = is_afk
 
   def _reset_activity_state(self) -> None:
-    """ Reset the activity state. """
+    """ Start recording the active window. """
     self._time_start = time.time()
     self._window_name = self.get_active_window_name()
     self._window_class = self.get_active_window_class()
+    self._open_entry()
 
   def _log_activity_change(self) -> None:
     """ Log the activity change to the database. """
     self._time_stop = time.time()
-    self._category = self._classifier_service.classify_entry(
-        window_class=self._window_class, window_name=self._window_name)
+    if self._open_activity_id is None:
+      # Classified when opened otherwise
+      self._category = self._classifier_service.classify_entry(
+          window_class=self._window_class, window_name=self._window_name)
     self.save_entry()
 
   def monitor(self) -> None:
@@ -272,15 +484,47 @@ class WatcherService():
     It logs the activity to the database using the Classifier class to classify the activity based on the window class and name. 
     It also logs the time spent on each activity.
 
+    The loop runs until stop() is called, after which the in-progress activity is saved.
+
     Raises:
       NotImplementedError: If the platform is not supported.
     """
-    while True:
-      if self._watch_afk:
-        self._check_afk_status()
-
-      if self._window_name != self.get_active_window_name():  # log only on activity change
-        self._log_activity_change()
-        self._reset_activity_state()
-
-      time.sleep(self._watch_interval)
+    self._running = True
+    self._open_entry()
+    try:
+      while not self._stop_event.is_set():
+        tick_start = time.perf_counter()
+        self._apply_pending_settings()
+
+        idle_time = 0.0
+        if self._watch_afk or self._adaptive_interval:
+          idle_time = self._sample_idle_time()
+        if self._watch_afk or self._afk:
+          self._check_afk_status(idle_time)
+
+        # While AFK the open AFK activity lasts until input resumes
+        activity_changed = (not self._afk and
+                            self._window_name != self.get_active_window_name())
+        if activity_changed:  # log only on activity change
+          self._log_activity_change()
+          self._reset_activity_state()
+        else:
+          self._heartbeat()
+        self._prune_change_log()
+
+        self._current_interval = self._next_interval(
+          idle_time, activity_changed)
+        metrics.record("watcher.tick", time.perf_counter() - tick_start)
+
+        sleep_start = time.perf_counter()
+        woken = self._wake_event.wait(self._current_interval)
+        self._wake_event.clear()
+        if not woken:
+          # How late the loop woke up compared to the requested interval
+          metrics.record("watcher.tick_jitter",
+                         abs(time.perf_counter() - sleep_start - self._current_interval))
+    finally:
+      self._running = False
+
+    # Flush the in-progress activity so a clean shutdown loses nothing
+    self._log_activity_change()
@@ -0,0 +1,222 @@
+""" Runtime instrumentation for FocusWatch.
+
+A process-wide Metrics registry collects timings, sampled values and counters
+from the hot paths (database queries, classification, saving activities,
+viewmodel recomputes and timeline rendering). Slow operations and a periodic
+summary are emitted as structured log events, which MyJSONFormatter writes to
+the JSON log. The Diagnostics page and the daemon status read snapshots.
+"""
+import functools
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(sorted_samples: List[float], fraction: float) -> float:
+  """ Nearest-rank percentile of an already sorted list. """
+  if not sorted_samples:
+    return 0.0
+  return sorted_samples[max(0, math.ceil(fraction * len(sorted_samples)) - 1)]
+
+
+def _summarize(samples: Deque[float], scale: float = 1.0) -> Dict[str, float]:
+  ordered = sorted(samples)
+  return {
+    "count": len(ordered),
+    "p50": _percentile(ordered, 0.50) * scale,
+    "p95": _percentile(ordered, 0.95) * scale,
+    "max": ordered[-1] * scale if ordered else 0.0,
+  }
+
+
+class Metrics:
+  """ Thread-safe registry of timings, sampled values and counters.
+
+  Only the most recent SAMPLE_SIZE samples are kept per metric, so memory stays
+  bounded and percentiles reflect recent behaviour.
+  """
+  SAMPLE_SIZE = 512
+  SLOW_THRESHOLD = 0.25  # seconds, timings above this are logged individually
+  SUMMARY_INTERVAL = 300.0  # seconds between summary events
+  SCOPE_COUNTS = ("queries", "checkouts", "pings")  # counted per refresh
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._local = threading.local()
+    self._timings: Dict[str, Deque[float]] = {}
+    self._values: Dict[str, Deque[float]] = {}
+    self._counters: Dict[str, int] = {}
+    self._last_summary = time.monotonic()
+
+  def record(self, name: str, seconds: float) -> None:
+    """ Record a duration in seconds. """
+    with self._lock:
+      self._timings.setdefault(
+        name, deque(maxlen=self.SAMPLE_SIZE)).append(seconds)
+    if seconds >= self.SLOW_THRESHOLD:
+      logger.info(f"Slow operation {name} took {seconds * 1000:.1f} ms", extra={
+        "event": "metrics.slow", "metric": name, "duration_ms": round(seconds * 1000, 3)})
+    self._maybe_log_summary()
+
+  def record_value(self, name: str, value: float) -> None:
+    """ Record a sampled value such as a query count. """
+    with self._lock:
+      self._values.setdefault(
+        name, deque(maxlen=self.SAMPLE_SIZE)).append(value)
+
+  def increment(self, name: str, amount: int = 1) -> None:
+    """ Increment a counter. """
+    with self._lock:
+      self._counters[name] = self._counters.get(name, 0) + amount
+
+  @contextmanager
+  def timer(self, name: str) -> Iterator[None]:
+    """ Time a block of code. """
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.record(name, time.perf_counter() - start)
+
+  def timed(self, name: Optional[str] = None) -> Callable:
+    """ Decorator timing every call of a function.
+
+    Args:
+      name: Metric name, defaults to the function's qualified name.
+    """
+    def decorator(func: Callable) -> Callable:
+      metric = name or func.__qualname__
+
+      @functools.wraps(func)
+      def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+          return func(*args, **kwargs)
+        finally:
+          self.record(metric, time.perf_counter() - start)
+      return wrapper
+    return decorator
+
+  @contextmanager
+  def refresh(self, name: str) -> Iterator[None]:
+    """ Time a refresh and record the database work done inside it on this thread.
+
+    The number of queries, connection checkouts and connection pings are
+    recorded as the values "<name>.queries", "<name>.checkouts" and "<name>.pings".
+    """
+    scopes = self._scopes()
+    scope = dict.fromkeys(self.SCOPE_COUNTS, 0)
+    scopes.append(scope)
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      scopes.remove(scope)
+      self.record(name, time.perf_counter() - start)
+      for kind, count in scope.items():
+        self.record_value(f"{name}.{kind}", count)
+
+  def _charge(self, kind: str) -> None:
+    """ Count one database operation in the open refresh scopes of this thread. """
+    for scope in self._scopes():
+      scope[kind] += 1
+
+  def count_query(self, seconds: float) -> None:
+    """ Record one database query and charge it to the open refresh scopes. """
+    self._charge("queries")
+    self.increment("db.queries")
+    self.record("db.query", seconds)
+
+  def count_checkout(self) -> None:
+    """ Record one connection checkout from the pool. """
+    self._charge("checkouts")
+    self.increment("db.checkouts")
+
+  def count_ping(self) -> None:
+    """ Record one liveness ping of a checked out connection. """
+    self._charge("pings")
+    self.increment("db.pings")
+
+  def _scopes(self) -> List[Dict[str, int]]:
+    scopes = getattr(self._local, "scopes", None)
+    if scopes is None:
+      scopes = self._local.scopes = []
+    return scopes
+
+  def snapshot(self) -> Dict[str, Any]:
+    """ Return percentiles for every metric and the counter values.
+
+    Returns:
+      Dict[str, Any]: {"timings": {name: {count, p50, p95, max}} in milliseconds,
+      "values": {name: {count, p50, p95, max}}, "counters": {name: int}}.
+    """
+    with self._lock:
+      timings = {name: deque(samples) for name, samples in self._timings.items()}
+      values = {name: deque(samples) for name, samples in self._values.items()}
+      counters = dict(self._counters)
+    return {
+      "timings": {name: _summarize(samples, 1000.0) for name, samples in sorted(timings.items())},
+      "values": {name: _summarize(samples) for name, samples in sorted(values.items())},
+      "counters": dict(sorted(counters.items())),
+    }
+
+  def reset(self) -> None:
+    """ Drop all recorded samples and counters. """
+    with self._lock:
+      self._timings.clear()
+      self._values.clear()
+      self._counters.clear()
+
+  def log_summary(self) -> None:
+    """ Emit the current snapshot as a structured log event. """
+    self._last_summary = time.monotonic()
+    logger.info("Metrics summary", extra={
+      "event": "metrics.summary", **self.snapshot()})
+
+  def _maybe_log_summary(self) -> None:
+    if time.monotonic() - self._last_summary >= self.SUMMARY_INTERVAL:
+      self.log_summary()
+
+
+metrics = Metrics()
+
+
+def instrument_engine(engine, registry: Metrics = metrics) -> None:
+  """ Count and time every statement executed through a SQLAlchemy engine.
+
+  Connection checkouts from the pool and the pings of pool_pre_ping are
+  counted as well.
+
+  Args:
+    engine: The engine to instrument.
+    registry: The Metrics instance to record into.
+  """
+  from sqlalchemy import event  # pylint: disable=import-outside-toplevel
+
+  @event.listens_for(engine, "checkout")
+  def _checkout(dbapi_connection, connection_record, connection_proxy):  # pylint: disable=unused-argument
+    registry.count_checkout()
+
+  # Pings do not go through the cursor events, the dialect of each engine is its own
+  do_ping = engine.dialect.do_ping
+
+  def _do_ping(dbapi_connection):
+    registry.count_ping()
+    return do_ping(dbapi_connection)
+  engine.dialect.do_ping = _do_ping
+
+  @event.listens_for(engine, "before_cursor_execute")
+  def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # pylint: disable=unused-argument
+    conn.info["query_start"] = time.perf_counter()
+
+  @event.listens_for(engine, "after_cursor_execute")
+  def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # pylint: disable=unused-argument
+    start = conn.info.pop("query_start", None)
+    if start is not None:
+      registry.count_query(time.perf_counter() - start)
@@ -0,0 +1,68 @@
+""" Startup profiling helpers for FocusWatch. """
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+  """ Records how long each startup stage takes.
+
+  Stages are always recorded since perf_counter is cheap; the report is only
+  printed when the user asks for it with --profile-startup.
+  """
+
+  def __init__(self, enabled: bool = False):
+    self.enabled = enabled
+    self._origin = time.perf_counter()
+    self._stages: List[Tuple[str, str, float]] = []
+    self.reported = False
+
+  @contextmanager
+  def stage(self, name: str, kind: str = "construct") -> Iterator[None]:
+    """ Time a block of code.
+
+    Args:
+      name: Human readable stage name.
+      kind: Stage kind, either "import" or "construct".
+    """
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      elapsed = time.perf_counter() - start
+      self._stages.append((kind, name, elapsed))
+      logger.debug(f"Startup stage '{name}' ({kind}) took {elapsed * 1000:.1f} ms")
+
+  @property
+  def stages(self) -> List[Tuple[str, str, float]]:
+    """ Recorded stages as (kind, name, seconds) tuples. """
+    return list(self._stages)
+
+  def total(self, kind: str) -> float:
+    """ Sum of the recorded durations for a stage kind in seconds. """
+    return sum(elapsed for stage_kind, _, elapsed in self._stages if stage_kind == kind)
+
+  def format_report(self) -> str:
+    """ Format the recorded stages as a plain text table. """
+    lines = ["Startup profile:"]
+    for kind in ("import", "construct"):
+      stages = [(name, elapsed)
+                for stage_kind, name, elapsed in self._stages if stage_kind == kind]
+      if not stages:
+        continue
+      lines.append(f"  [{kind}]")
+      for name, elapsed in stages:
+        lines.append(f"    {name.ljust(40)}{elapsed * 1000:9.1f} ms")
+      lines.append(f"    {"total".ljust(40)}{self.total(kind) * 1000:9.1f} ms")
+    wall = time.perf_counter() - self._origin
+    lines.append(f"  {"wall time since start".ljust(42)}{wall * 1000:9.1f} ms")
+    return "\n".join(lines)
+
+  def report(self) -> None:
+    """ Print the report if profiling is enabled. """
+    if self.enabled:
+      print(self.format_report())
+      self.reported = True
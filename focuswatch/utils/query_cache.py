@@ -0,0 +1,141 @@
+""" Result cache for the period aggregate queries of FocusWatch.
+
+Browsing the dashboard re-runs the same aggregates for the same days over and
+over. Past days never change unless activities are recategorized or imported,
+so their results are kept until a write invalidates them. Results are keyed by
+(database engine, query kind, first day, last day); the services writing to the
+database invalidate the days they touch, or everything when categories change.
+"""
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from datetime import date, datetime
+from typing import Any, Callable, Optional, Tuple
+
+from focuswatch.utils.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[Hashable, str, date, date]
+
+
+class QueryCache:
+  """ Thread-safe LRU cache of query results for a range of days.
+
+  The cache is bounded both in entries and in cached rows, the size of a list
+  result being its length. Every invalidation bumps a generation counter, a
+  result computed while a write was committed is not stored.
+  """
+  MAX_ENTRIES = 256
+  MAX_ROWS = 200000
+
+  def __init__(self, max_entries: int = MAX_ENTRIES, max_rows: int = MAX_ROWS):
+    self._lock = threading.Lock()
+    self._entries: "OrderedDict[CacheKey, Tuple[Any, int]]" = OrderedDict()
+    self._max_entries = max_entries
+    self._max_rows = max_rows
+    self._rows = 0
+    self._generation = 0
+    self._last_write = float("-inf")
+
+  @staticmethod
+  def _period(period_start: datetime, period_end: Optional[datetime]) -> Tuple[date, date]:
+    """ The days covered by a period, a missing end meaning the start day only. """
+    return period_start.date(), (period_end or period_start).date()
+
+  def get_or_compute(self,
+                     owner: Hashable,
+                     kind: str,
+                     period_start: datetime,
+                     period_end: Optional[datetime],
+                     compute: Callable[[], Any]) -> Any:
+    """ Return the cached result of a query, computing and storing it on a miss.
+
+    Empty results are not stored, they are cheap to recompute and the services
+    also return them when a query fails.
+
+    Args:
+      owner: Identifies the database, results of different databases never mix.
+      kind: The query, e.g. "activity.period_entries".
+      period_start: The first day of the period.
+      period_end: The last day of the period, None for period_start only.
+      compute: Runs the query.
+    """
+    key = (owner, kind) + self._period(period_start, period_end)
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is not None:
+        self._entries.move_to_end(key)
+        generation = None
+      else:
+        generation = self._generation
+    if entry is not None:
+      metrics.increment("query_cache.hits")
+      return self._copy(entry[0])
+
+    metrics.increment("query_cache.misses")
+    result = compute()
+    if not result:
+      return result
+    rows = len(result) if isinstance(result, (list, tuple)) else 1
+    with self._lock:
+      if generation == self._generation and rows <= self._max_rows and key not in self._entries:
+        self._entries[key] = (result, rows)
+        self._rows += rows
+        while len(self._entries) > self._max_entries or self._rows > self._max_rows:
+          _, (_, evicted_rows) = self._entries.popitem(last=False)
+          self._rows -= evicted_rows
+    return self._copy(result)
+
+  @staticmethod
+  def _copy(result: Any) -> Any:
+    # Callers may append to or sort the list they get, but not to the cached one
+    return list(result) if isinstance(result, list) else result
+
+  def invalidate(self, day: Optional[date] = None) -> None:
+    """ Drop the results of the periods containing day, or every result if day is None. """
+    with self._lock:
+      self._generation += 1
+      self._last_write = time.monotonic()
+      if day is None:
+        self._entries.clear()
+        self._rows = 0
+        return
+      for key in [key for key in self._entries if key[2] <= day <= key[3]]:
+        self._rows -= self._entries.pop(key)[1]
+
+  def clear(self) -> None:
+    """ Drop every cached result. """
+    self.invalidate()
+
+  def seconds_since_write(self) -> float:
+    """ Time since the last invalidation, i.e. since the database was last written. """
+    with self._lock:
+      return time.monotonic() - self._last_write
+
+  def __len__(self) -> int:
+    with self._lock:
+      return len(self._entries)
+
+  def cached(self, kind: str) -> Callable:
+    """ Decorator caching a service method taking (period_start, period_end=None).
+
+    The service must have a _db_conn, its engine identifies the database.
+
+    Args:
+      kind: Name of the query in the cache keys.
+    """
+    def decorator(func: Callable) -> Callable:
+      @functools.wraps(func)
+      def wrapper(service, period_start: datetime, period_end: Optional[datetime] = None):
+        return self.get_or_compute(
+          service._db_conn.engine, kind, period_start, period_end,  # pylint: disable=protected-access
+          lambda: func(service, period_start, period_end))
+      return wrapper
+    return decorator
+
+
+query_cache = QueryCache()
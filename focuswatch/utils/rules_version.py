@@ -0,0 +1,29 @@
+""" Version of the classification rules of FocusWatch.
+
+The classifier compiles the keywords and the category hierarchy into a
+KeywordMatcher once. The services writing keywords or categories bump the
+version, the classifier recompiles when it sees a new one instead of reading
+the rules back on every classification.
+"""
+import threading
+
+
+class RulesVersion:
+  """ Thread-safe counter of the writes to keywords and categories in this process. """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._value = 0
+
+  @property
+  def value(self) -> int:
+    """ The current version, changes after every bump. """
+    return self._value
+
+  def bump(self) -> None:
+    """ Mark the keywords or categories as changed. """
+    with self._lock:
+      self._value += 1
+
+
+rules_version = RulesVersion()
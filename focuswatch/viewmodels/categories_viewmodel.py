@@ -1,6 +1,5 @@
 import logging
-from collections import defaultdict
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from PySide6.QtCore import Property, QObject, Signal, Slot
 
@@ -9,9 +8,12 @@ from focuswatch.services.categorization_service import CategorizationService
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CATEGORY_COLOR = "#F9F9F9"
+
 if TYPE_CHECKING:
   from focuswatch.services.activity_service import ActivityService
-  from focuswatch.services.category_service import CategoryService
+  from focuswatch.services.category_service import (CategoryImportChanges,
+                                                     CategoryService)
   from focuswatch.services.classifier_service import ClassifierService
   from focuswatch.services.keyword_service import KeywordService
 
@@ -38,6 +40,7 @@ class CategoriesViewModel(QObject):
     self._categories: List[Category] = []
     self._filter_text: str = ""
     self._organized_categories: Dict[int, Dict[str, Any]] = {}
+    self._import_changes: Optional["CategoryImportChanges"] = None
 
     self._load_categories()
 
@@ -67,78 +70,144 @@ class CategoriesViewModel(QObject):
     return self._organized_categories
 
   def _load_categories(self):
-    self._categories = self._category_service.get_all_categories()
-    self._organize_categories()
+    """ Load all categories with their keywords and rebuild the tree. """
+    rows = self._category_service.get_categories_with_keywords()
+    self._categories = [category for category, _ in rows]
+    self._organize_categories(rows)
     self.categories_changed.emit()
 
-  def _organize_categories(self):
-    """ Organize categories into a hierarchical structure. """
-    cat_key: Dict[int, List[str]] = defaultdict(list)
-    for category in self._categories:
-      category_keywords = self._keyword_service.get_keywords_for_category(
-          category.id)
-      cat_key[category.id] = [
-          keyword.name for keyword in category_keywords]
-
-    temp_cat_dict: Dict[int, Dict[str, Any]] = defaultdict(dict)
-    for category in self._categories:
-      category_dict = {
-          "category": category,
-          "keywords": cat_key[category.id],
-          "children": [],
-          "expanded": True,
-      }
-      if category.parent_category_id is None:
-        temp_cat_dict[category.id] = category_dict
-      elif category.parent_category_id not in temp_cat_dict:
-        temp_cat_dict[category.parent_category_id] = {
-            "category": None,
-            "keywords": [],
-            "children": [category.id],
-            "expanded": True,
-        }
-        temp_cat_dict[category.id] = category_dict
-      else:
-        parent_category = temp_cat_dict[category.parent_category_id]
-        parent_category["children"].append(category.id)
-        temp_cat_dict[category.id] = category_dict
-
-    cat_dict: Dict[int, Dict[str, Any]] = {}
-
-    def organize_categories_recursive(cat_id):
-      category_data = temp_cat_dict[cat_id]
-      cat_dict[cat_id] = category_data
-      for child_id in category_data["children"]:
-        organize_categories_recursive(child_id)
-
-    root_categories = [
-        category.id for category in self._categories if category.parent_category_id is None]
-    for root_cat_id in root_categories:
-      organize_categories_recursive(root_cat_id)
+  def _organize_categories(self, rows: List[Tuple[Category, List[str]]]):
+    """ Organize categories into a hierarchical structure.
+
+    Every category gets a node {"category", "keywords", "children", "expanded", "color"}
+    keyed by its ID; children hold child IDs in category ID order.
+
+    Args:
+      rows: (category, keyword names) pairs as returned by get_categories_with_keywords.
+    """
+    expanded = {category_id: node["expanded"]
+                for category_id, node in self._organized_categories.items()}
+    cat_dict: Dict[int, Dict[str, Any]] = {
+      category.id: self._create_node(
+        category, keywords, expanded.get(category.id, True))
+      for category, keywords in rows
+    }
+    for category_id, node in cat_dict.items():
+      parent_id = node["category"].parent_category_id
+      if parent_id is not None and parent_id in cat_dict:
+        cat_dict[parent_id]["children"].append(category_id)
+      elif parent_id is not None:
+        logger.warning(
+          f"Parent {parent_id} of category {category_id} not found, showing it as a root.")
+        node["category"].parent_category_id = None
 
     self._organized_categories = cat_dict
+    for category_id, node in cat_dict.items():
+      if node["category"].parent_category_id is None:
+        self._resolve_colors(category_id)
+
+    self.organized_categories_changed.emit()
+
+  @staticmethod
+  def _create_node(category: Category, keywords: List[str], expanded: bool = True) -> Dict[str, Any]:
+    return {
+      "category": category,
+      "keywords": keywords,
+      "children": [],
+      "expanded": expanded,
+      "color": None,
+    }
+
+  def _resolve_colors(self, category_id: int) -> None:
+    """ Set the display color of a subtree, inheriting the parent's color where unset. """
+    stack = [category_id]
+    while stack:
+      node = self._organized_categories[stack.pop()]
+      parent_id = node["category"].parent_category_id
+      parent_color = (self._organized_categories[parent_id]["color"]
+                      if parent_id is not None else None)
+      node["color"] = node["category"].color or parent_color or DEFAULT_CATEGORY_COLOR
+      stack.extend(node["children"])
+
+  @Slot(int)
+  def refresh_category(self, category_id: int) -> None:
+    """ Reload a single category after an edit and patch its subtree in the tree.
+
+    Handles created, updated (including moved) and deleted categories with one query.
+    """
+    rows = self._category_service.get_categories_with_keywords([category_id])
+    nodes = self._organized_categories
+    old_node = nodes.get(category_id)
+
+    if old_node is not None:
+      self._detach(category_id)
+
+    if not rows:
+      if old_node is not None:
+        # Deleting a category turns its children into root categories
+        for child_id in old_node["children"]:
+          nodes[child_id]["category"].parent_category_id = None
+          self._resolve_colors(child_id)
+        del nodes[category_id]
+      self._categories = [c for c in self._categories if c.id != category_id]
+    else:
+      category, keywords = rows[0]
+      node = self._create_node(
+        category, keywords, old_node["expanded"] if old_node else True)
+      if old_node is not None:
+        node["children"] = old_node["children"]
+      nodes[category_id] = node
+
+      parent_id = category.parent_category_id
+      if parent_id is not None and parent_id in nodes:
+        siblings = nodes[parent_id]["children"]
+        siblings.append(category_id)
+        siblings.sort()
+      elif parent_id is not None:
+        category.parent_category_id = None
+      self._resolve_colors(category_id)
+
+      self._categories = [c for c in self._categories if c.id != category_id]
+      self._categories.append(category)
+      self._categories.sort(key=lambda c: c.id)
 
     self.organized_categories_changed.emit()
+    self.categories_changed.emit()
+
+  def _detach(self, category_id: int) -> None:
+    """ Remove a category from its parent's children. """
+    parent_id = self._organized_categories[category_id]["category"].parent_category_id
+    if parent_id is not None and parent_id in self._organized_categories:
+      children = self._organized_categories[parent_id]["children"]
+      if category_id in children:
+        children.remove(category_id)
 
   @Slot(int, result=int)
   def get_category_depth(self, category_id: int) -> int:
     """ Get the depth of a category in the category hierarchy. """
-    return self._category_service.get_category_depth(category_id)
+    depth = 0
+    node = self._organized_categories.get(category_id)
+    while node is not None and node["category"].parent_category_id is not None:
+      depth += 1
+      node = self._organized_categories.get(
+        node["category"].parent_category_id)
+    return depth
 
   def add_category(
       self, name: str, parent_id: Optional[int] = None, color: Optional[str] = None
   ) -> bool:
     """ Add a new category. """
-    result = self._category_service.create_category(name, parent_id, color)
-    if result:
-      self._load_categories()
-    return result
+    category_id = self._category_service.create_category(
+      Category(name=name, parent_category_id=parent_id, color=color))
+    if category_id:
+      self.refresh_category(category_id)
+    return bool(category_id)
 
   def update_category(self, category: Category) -> bool:
     """ Update an existing category. """
     result = self._category_service.update_category(category)
     if result:
-      self._load_categories()
+      self.refresh_category(category.id)
     return result
 
   @Slot(int, result=bool)
@@ -146,7 +215,7 @@ class CategoriesViewModel(QObject):
     """ Delete a category by its ID. """
     result = self._category_service.delete_category(category_id)
     if result:
-      self._load_categories()
+      self.refresh_category(category_id)
     return result
 
   @Slot(result=bool)
@@ -180,11 +249,27 @@ class CategoriesViewModel(QObject):
       file.write(categories)
     return True
 
-  def import_categories(self, file_path: str) -> bool:
-    """ Import categories from a YAML file. """
+  def import_categories(self, file_path: str) -> Optional["CategoryImportChanges"]:
+    """ Import categories from a YAML file.
+
+    Returns:
+      Optional[CategoryImportChanges]: What the import changed, None if it failed.
+    """
     with open(file_path, "r", encoding="utf-8") as file:
       categories = file.read()
 
-    self._category_service.import_categories_from_yml(categories)
+    self._import_changes = self._category_service.import_categories_from_yml(categories)
     self._load_categories()
-    return True
+    return self._import_changes
+
+  @Slot(result=bool)
+  def reclassify_imported(self) -> bool:
+    """ Reclassify only the activities affected by the last import. """
+    if self._import_changes is None:
+      return True
+    result = self._categorization_service.reclassify_after_import(
+        self._import_changes,
+        progress_callback=self.retroactive_categorization_progress.emit
+      )
+    self._import_changes = None
+    return result
@@ -4,6 +4,8 @@ from typing import TYPE_CHECKING, Dict, List, Optional
 
 from PySide6.QtCore import Property, QObject, Signal, Slot
 
+from focuswatch.utils.instrumentation import metrics
+
 if TYPE_CHECKING:
   from focuswatch.config import Config
   from focuswatch.database.models.activity import Activity
@@ -95,6 +97,7 @@ class FocusBreakdownViewModel(QObject):
     """
     return self._breakdown_data
 
+  @metrics.timed()
   def compute_focus_breakdown(self) -> None:
     """ Compute the focus breakdown data for the specified period. """
     try:
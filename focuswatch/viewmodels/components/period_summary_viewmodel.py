@@ -4,6 +4,8 @@ from typing import TYPE_CHECKING, Dict, Optional
 
 from PySide6.QtCore import Property, QObject, Signal, Slot
 
+from focuswatch.utils.instrumentation import metrics
+
 if TYPE_CHECKING:
   from focuswatch.config import Config
   from focuswatch.services.activity_service import ActivityService
@@ -114,6 +116,7 @@ class PeriodSummaryViewModel(QObject):
   def period_data(self) -> Dict[str, float]:
     return self._period_data
 
+  @metrics.timed()
   def compute_period_summary(self) -> None:
     """ Compute the period summary data. """
     activities = self._activity_service.get_period_entries(
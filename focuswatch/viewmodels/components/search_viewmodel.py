@@ -0,0 +1,87 @@
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from PySide6.QtCore import Property, QObject, Signal, Slot
+
+from focuswatch.utils.instrumentation import metrics
+
+if TYPE_CHECKING:
+  from focuswatch.services.activity_service import ActivityService
+
+logger = logging.getLogger(__name__)
+
+
+class SearchViewModel(QObject):
+  """ ViewModel for the window title search box. """
+  query_changed = Signal()
+  all_time_changed = Signal()
+  results_changed = Signal()
+
+  def __init__(self,
+               activity_service: "ActivityService",
+               period_start: datetime,
+               period_end: Optional[datetime] = None,
+               result_limit: int = 50):
+    super().__init__()
+    self._activity_service = activity_service
+    self._period_start = period_start
+    self._period_end = period_end
+    self._result_limit = result_limit
+
+    self._query = ""
+    self._all_time = False
+    self._results: List[Tuple[str, str, int]] = []
+
+  @Property(str, notify=query_changed)
+  def query(self) -> str:
+    return self._query
+
+  @Property(bool, notify=all_time_changed)
+  def all_time(self) -> bool:
+    """ Search the whole history instead of the selected period. """
+    return self._all_time
+
+  @all_time.setter
+  def all_time(self, value: bool) -> None:
+    if self._all_time != value:
+      self._all_time = value
+      self.all_time_changed.emit()
+      self.update_results()
+
+  @Property(list, notify=results_changed)
+  def results(self) -> List[Tuple[str, str, int]]:
+    """ Matching (window_class, window_name, total_time_seconds), longest first. """
+    return self._results
+
+  @Slot(datetime, datetime)
+  def update_period(self, start: datetime, end: Optional[datetime]) -> None:
+    """ Update the searched period. """
+    self._period_start = start
+    self._period_end = end
+    if not self._all_time:
+      self.update_results()
+
+  @Slot(str)
+  def search(self, query: str) -> None:
+    """ Search window classes and titles for query. """
+    query = query.strip()
+    if query != self._query:
+      self._query = query
+      self.query_changed.emit()
+    self.update_results()
+
+  @metrics.timed()
+  def update_results(self) -> None:
+    """ Run the current query. """
+    if not self._query:
+      results = []
+    elif self._all_time:
+      results = self._activity_service.search(self._query, limit=self._result_limit)
+    else:
+      results = self._activity_service.search(
+        self._query, self._period_start, self._period_end, limit=self._result_limit)
+
+    if results != self._results:
+      self._results = results
+      self.results_changed.emit()
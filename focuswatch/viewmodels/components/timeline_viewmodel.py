@@ -1,11 +1,12 @@
 import logging
 from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
 
 from PySide6.QtCore import Property, QObject, Signal, Slot
 
 from focuswatch.database.models.activity import Activity
+from focuswatch.utils.instrumentation import metrics
 from focuswatch.utils.ui_utils import get_category_color_or_parent
 
 if TYPE_CHECKING:
@@ -15,6 +16,19 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CATEGORY_COLOR = "#F9F9F9"
+MINUTES_PER_DAY = 24 * 60
+
+
+class TimelineBlock(NamedTuple):
+  """ A run of adjacent minutes with the same category. """
+  start_minute: int
+  duration: int  # minutes
+  category_id: int
+  category_name: str
+  parent_name: Optional[str]
+  color: str
+
 
 class TimelineViewModel(QObject):
   """ Viewmodel for the Timeline component in the Dashboard. """
@@ -34,7 +48,7 @@ class TimelineViewModel(QObject):
     self._period_start: datetime = datetime.now().replace(
       hour=0, minute=0, second=0, microsecond=0)
     self._period_end: Optional[datetime] = None
-    self._timeline_data: Dict[int, List[int]] = {}
+    self._timeline_blocks: List[TimelineBlock] = []
 
     self.update_timeline_data()
 
@@ -65,59 +79,93 @@ class TimelineViewModel(QObject):
       self._period_end = value
       self.period_end_changed.emit()
 
-  @Property(dict, notify=timeline_data_changed)
-  def timeline_data(self) -> Dict[int, List[int]]:
-    return self._timeline_data
+  @Property(list, notify=timeline_data_changed)
+  def timeline_blocks(self) -> List[TimelineBlock]:
+    """ Contiguous blocks of the day, ordered by start minute. """
+    return self._timeline_blocks
 
+  @metrics.timed()
   def update_timeline_data(self) -> None:
     period_entries: List[Activity] = self._activity_service.get_period_entries(
       self._period_start, self._period_end)
     self._period_entries = period_entries
-    hour_chunk_entries = defaultdict(dict)
-    hour_entries = {i: [0, 0, 0, 0, 0, 0]
-                    for i in range(24)}  # 6 quarters in an hour
 
-    afk_category_id = None
     if not self._config["dashboard"]["display_timeline_idle"]:
-      afk_category_id = self._category_service.get_category_id_from_name(
-          "AFK")
-
-    for entry in period_entries:
-      timestamp_start = entry.time_start
-      timestamp_stop = entry.time_stop
-      category_id = entry.category_id
+      afk_category_id = self._category_service.get_category_id_from_name("AFK")
+      period_entries = [entry for entry in period_entries
+                        if entry.category_id != afk_category_id]
 
-      if not self._config["dashboard"]["display_timeline_idle"]:
-        if entry.category_id == afk_category_id:
-          continue
-
-      while timestamp_start < timestamp_stop:
-        hour_start = timestamp_start.hour
-        minute_start = timestamp_start.minute // 10
-        quarter_hour_start = f"{hour_start:02d}:{minute_start}"
+    self._timeline_blocks = self._build_blocks(period_entries)
+    self.timeline_data_changed.emit()
 
-        duration_in_this_quarter = min(
-          10 - (timestamp_start.minute % 10),
-          (timestamp_stop - timestamp_start).total_seconds() / 60
-        )
+  @staticmethod
+  def _minute_spans(entry: Activity) -> List[Tuple[int, int]]:
+    """ Return the (start, stop) minutes of the day covered by an activity.
 
-        if category_id in hour_chunk_entries[quarter_hour_start]:
-          hour_chunk_entries[quarter_hour_start][category_id] += duration_in_this_quarter
+    The start is rounded down and the stop up to the minute, an activity
+    running past midnight is split in two.
+    """
+    start = entry.time_start.hour * 60 + entry.time_start.minute
+    stop_minute = entry.time_stop.hour * 60 + entry.time_stop.minute
+    if entry.time_stop.second or entry.time_stop.microsecond:
+      stop_minute += 1
+    if entry.time_stop.date() > entry.time_start.date():
+      return [(start, MINUTES_PER_DAY), (0, stop_minute)]
+    return [(start, stop_minute)]
+
+  def _build_blocks(self, entries: List[Activity]) -> List[TimelineBlock]:
+    """ Build the blocks of the day from the activities, at minute resolution.
+
+    A minute already covered by an earlier activity stays with it, so blocks
+    never overlap and adjacent blocks with the same category are merged.
+    Category names, parents and colors are resolved from a single category query.
+    """
+    categories = {category.id: category
+                  for category in self._category_service.get_all_categories()}
+    colors: Dict[int, str] = {}
+
+    def resolve_color(category_id: int) -> str:
+      if category_id not in colors:
+        category = categories.get(category_id)
+        if category is None:
+          colors[category_id] = DEFAULT_CATEGORY_COLOR
+        elif category.color:
+          colors[category_id] = category.color
+        elif category.parent_category_id in categories:
+          colors[category_id] = DEFAULT_CATEGORY_COLOR  # guards against parent cycles
+          colors[category_id] = resolve_color(category.parent_category_id)
         else:
-          hour_chunk_entries[quarter_hour_start][category_id] = duration_in_this_quarter
-
-        timestamp_start += timedelta(minutes=duration_in_this_quarter)
-
-    for quarter, entries in hour_chunk_entries.items():
-      max_category = max(entries, key=lambda category_id,
-                         # W0640 Capture 'entries' by value
-                         entries=entries: entries[category_id])
-      hour, index = quarter.split(sep=":")
-      hour_entries[int(hour)][int(index)] = max_category
+          colors[category_id] = DEFAULT_CATEGORY_COLOR
+      return colors[category_id]
+
+    spans = sorted((start, stop, entry.category_id)
+                   for entry in entries if entry.time_stop is not None
+                   and entry.category_id in categories
+                   for start, stop in self._minute_spans(entry))
+
+    blocks: List[TimelineBlock] = []
+    for start, stop, category_id in spans:
+      if blocks:
+        last = blocks[-1]
+        last_stop = last.start_minute + last.duration
+        start = max(start, last_stop)
+        if stop <= start:
+          continue  # Within minutes already covered
+        if start == last_stop and category_id == last.category_id:
+          blocks[-1] = last._replace(duration=stop - last.start_minute)
+          continue
 
-    self._timeline_data = dict(hour_entries)
-    # logger.info(f"Timeline data updated")
-    self.timeline_data_changed.emit()
+      category = categories[category_id]
+      parent = categories.get(category.parent_category_id)
+      blocks.append(TimelineBlock(
+        start_minute=start,
+        duration=stop - start,
+        category_id=category_id,
+        category_name=category.name,
+        parent_name=parent.name if parent else None,
+        color=resolve_color(category_id),
+      ))
+    return blocks
 
   def get_top_entries(self, start_time_str: str, end_time_str: str) -> List[Dict[str, Any]]:
     """ Get top 5 entries between start_time and end_time.
@@ -2,6 +2,7 @@ import logging
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
+from focuswatch.utils.instrumentation import metrics
 from focuswatch.viewmodels.components.top_items_card_viewmodel import \
     TopItemsCardViewModel
 
@@ -27,6 +28,7 @@ class TopApplicationsCardViewModel(TopItemsCardViewModel):
 
     self.update_top_items()
 
+  @metrics.timed()
   def update_top_items(self) -> None:
     """ Update the list of top items."""
     top_applications = self._activity_service.get_period_entries_class_time_total(
@@ -2,6 +2,7 @@ import logging
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
+from focuswatch.utils.instrumentation import metrics
 from focuswatch.viewmodels.components.top_items_card_viewmodel import \
     TopItemsCardViewModel
 
@@ -26,6 +27,7 @@ class TopTitlesCardViewModel(TopItemsCardViewModel):
 
     self.update_top_items()
 
+  @metrics.timed()
   def update_top_items(self) -> None:
     """ Update the list of top items."""
     self._top_items.clear()
@@ -0,0 +1,64 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import Property, QObject, Signal, Slot
+
+from focuswatch.utils.instrumentation import Metrics, metrics
+
+logger = logging.getLogger(__name__)
+
+MetricRow = Tuple[str, int, float, float, float]
+
+
+class DiagnosticsViewModel(QObject):
+  """ ViewModel for the hidden Diagnostics page.
+
+  Exposes a snapshot of the instrumentation registry as table rows.
+  """
+  snapshot_changed = Signal()
+
+  def __init__(self, registry: Optional[Metrics] = None):
+    super().__init__()
+    self._metrics = registry or metrics
+    self._snapshot: Dict[str, Any] = self._metrics.snapshot()
+
+  @Property(dict, notify=snapshot_changed)
+  def snapshot(self) -> Dict[str, Any]:
+    """ The latest metrics snapshot. """
+    return self._snapshot
+
+  @Property(list, notify=snapshot_changed)
+  def timing_rows(self) -> List[MetricRow]:
+    """ (name, count, p50 ms, p95 ms, max ms) for every timed operation. """
+    return self._rows("timings")
+
+  @Property(list, notify=snapshot_changed)
+  def value_rows(self) -> List[MetricRow]:
+    """ (name, count, p50, p95, max) for every sampled value, e.g. queries per refresh. """
+    return self._rows("values")
+
+  @Property(dict, notify=snapshot_changed)
+  def counters(self) -> Dict[str, int]:
+    """ Counter totals since start or the last reset. """
+    return self._snapshot["counters"]
+
+  def _rows(self, kind: str) -> List[MetricRow]:
+    return [(name, stats["count"], stats["p50"], stats["p95"], stats["max"])
+            for name, stats in self._snapshot[kind].items()]
+
+  @Slot()
+  def refresh(self) -> None:
+    """ Take a new snapshot. """
+    self._snapshot = self._metrics.snapshot()
+    self.snapshot_changed.emit()
+
+  @Slot()
+  def reset(self) -> None:
+    """ Clear the recorded metrics. """
+    self._metrics.reset()
+    self.refresh()
+
+  @Slot()
+  def log_summary(self) -> None:
+    """ Write the current metrics to the log as a structured event. """
+    self._metrics.log_summary()
@@ -1,5 +1,5 @@
 import logging
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 from PySide6.QtCore import Property, QObject, Signal
 
@@ -43,8 +43,9 @@ class CategorizationHelperDialogViewModel(QObject):
     self._uncategorized_window_classes: List = []
     self._uncategorized_window_names: List = []
     self._limit = 20
-    self._offset_classes = 0
-    self._offset_names = 0
+    # Keyset cursors of the last loaded pages
+    self._cursor_classes: Optional[Tuple[float, str]] = None
+    self._cursor_names: Optional[Tuple[float, str]] = None
     self._has_more_classes = True
     self._has_more_names = True
     self._threshold_seconds = 60
@@ -81,15 +82,15 @@ class CategorizationHelperDialogViewModel(QObject):
 
   def load_window_classes(self) -> None:
     """ Load uncategorized window classes into the ViewModel. """
-    new_entries = self._activity_service.get_top_uncategorized_window_classes(
+    new_entries, self._cursor_classes = self._activity_service.get_uncategorized_totals_page(
+        "class",
         limit=self._limit,
-        offset=self._offset_classes,
+        after=self._cursor_classes,
         threshold_seconds=self._threshold_seconds
     )
     if new_entries:
       self._uncategorized_window_classes.extend(new_entries)
-      self._offset_classes += len(new_entries)
-      self._has_more_classes = len(new_entries) >= self._limit
+      self._has_more_classes = self._cursor_classes is not None
       self.has_more_classes_changed.emit()
       self.uncategorized_window_classes_changed.emit()
     else:
@@ -98,15 +99,15 @@ class CategorizationHelperDialogViewModel(QObject):
 
   def load_window_names(self) -> None:
     """ Load uncategorized window names into the ViewModel. """
-    new_entries = self._activity_service.get_top_uncategorized_window_names(
+    new_entries, self._cursor_names = self._activity_service.get_uncategorized_totals_page(
+        "name",
         limit=self._limit,
-        offset=self._offset_names,
+        after=self._cursor_names,
         threshold_seconds=self._threshold_seconds
     )
     if new_entries:
       self._uncategorized_window_names.extend(new_entries)
-      self._offset_names += len(new_entries)
-      self._has_more_names = len(new_entries) >= self._limit
+      self._has_more_names = self._cursor_names is not None
       self.has_more_names_changed.emit()
       self.uncategorized_window_names_changed.emit()
     else:
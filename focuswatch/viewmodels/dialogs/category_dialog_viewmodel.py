@@ -105,24 +105,47 @@ class CategoryDialogViewModel(QObject):
     self.keywords_changed.emit()
 
   @Slot(str, bool)
-  def add_keyword(self, keyword_name: str, match_case: bool) -> None:
+  @Slot(str, bool, str, str, bool, int)
+  def add_keyword(self,
+                  keyword_name: str,
+                  match_case: bool,
+                  match_type: str = Keyword.MATCH_SUBSTRING,
+                  target: str = Keyword.TARGET_TITLE,
+                  exclude: bool = False,
+                  priority: int = 0) -> None:
     """ Add a keyword to the category. """
     keyword = Keyword(
         name=keyword_name,
         match_case=match_case,
-        category_id=self._category.id  # Might be None for new category
+        category_id=self._category.id,  # Might be None for new category
+        match_type=match_type,
+        target=target,
+        exclude=exclude,
+        priority=priority
     )
     self._keywords.append(keyword)
     self._added_keywords.append(keyword)
     self.keywords_changed.emit()
 
   @Slot(int, str, bool)
-  def update_keyword(self, index: int, new_name: str, new_match_case: bool) -> None:
+  @Slot(int, str, bool, str, str, bool, int)
+  def update_keyword(self,
+                     index: int,
+                     new_name: str,
+                     new_match_case: bool,
+                     new_match_type: str = Keyword.MATCH_SUBSTRING,
+                     new_target: str = Keyword.TARGET_TITLE,
+                     new_exclude: bool = False,
+                     new_priority: int = 0) -> None:
     """ Update a keyword in the category. """
     if 0 <= index < len(self._keywords):
       keyword = self._keywords[index]
       keyword.name = new_name
       keyword.match_case = new_match_case
+      keyword.match_type = new_match_type
+      keyword.target = new_target
+      keyword.exclude = new_exclude
+      keyword.priority = new_priority
       if keyword not in self._added_keywords and keyword not in self._updated_keywords:
         self._updated_keywords.append(keyword)
       self.keywords_changed.emit()
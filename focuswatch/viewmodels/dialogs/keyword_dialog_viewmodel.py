@@ -1,4 +1,5 @@
 import logging
+import re
 from typing import Optional
 
 from PySide6.QtCore import Property, QObject, Signal, Slot
@@ -12,6 +13,10 @@ class KeywordDialogViewModel(QObject):
   """ ViewModel for the keyword dialog. """
   name_changed = Signal()
   match_case_changed = Signal()
+  match_type_changed = Signal()
+  target_changed = Signal()
+  exclude_changed = Signal()
+  priority_changed = Signal()
 
   def __init__(
           self,
@@ -39,6 +44,46 @@ class KeywordDialogViewModel(QObject):
       self._keyword.match_case = value
       self.match_case_changed.emit()
 
+  @Property(str, notify=match_type_changed)
+  def match_type(self) -> str:
+    return self._keyword.match_type or Keyword.MATCH_SUBSTRING
+
+  @match_type.setter
+  def match_type(self, value: str):
+    if self.match_type != value:
+      self._keyword.match_type = value
+      self.match_type_changed.emit()
+
+  @Property(str, notify=target_changed)
+  def target(self) -> str:
+    return self._keyword.target or Keyword.TARGET_TITLE
+
+  @target.setter
+  def target(self, value: str):
+    if self.target != value:
+      self._keyword.target = value
+      self.target_changed.emit()
+
+  @Property(bool, notify=exclude_changed)
+  def exclude(self) -> bool:
+    return bool(self._keyword.exclude)
+
+  @exclude.setter
+  def exclude(self, value: bool):
+    if self.exclude != value:
+      self._keyword.exclude = value
+      self.exclude_changed.emit()
+
+  @Property(int, notify=priority_changed)
+  def priority(self) -> int:
+    return self._keyword.priority or 0
+
+  @priority.setter
+  def priority(self, value: int):
+    if self.priority != value:
+      self._keyword.priority = value
+      self.priority_changed.emit()
+
   def get_keyword(self) -> Keyword:
     return self._keyword
 
@@ -49,4 +94,12 @@ class KeywordDialogViewModel(QObject):
   @Slot(result=bool)
   def is_input_valid(self) -> bool:
     # Check if the keyword name is not empty
-    return bool(self._keyword.name.strip())
+    return bool(self._keyword.name.strip()) and self.pattern_error() is None
+
+  def pattern_error(self) -> Optional[str]:
+    """ Return why the regular expression of a regex keyword is invalid, None if it is valid. """
+    try:
+      self._keyword.pattern()
+      return None
+    except re.error as e:
+      return str(e)
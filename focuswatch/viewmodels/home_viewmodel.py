@@ -1,13 +1,18 @@
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
-from PySide6.QtCore import Property, QObject, Signal, Slot
+from PySide6.QtCore import Property, QObject, QTimer, Signal, Slot
 
+from focuswatch.utils.instrumentation import metrics
+from focuswatch.utils.query_cache import query_cache
 from focuswatch.viewmodels.components.focus_breakdown_viewmodel import \
     FocusBreakdownViewModel
 from focuswatch.viewmodels.components.period_summary_viewmodel import \
     PeriodSummaryViewModel
+from focuswatch.viewmodels.components.search_viewmodel import SearchViewModel
 from focuswatch.viewmodels.components.timeline_viewmodel import \
     TimelineViewModel
 from focuswatch.viewmodels.components.top_applications_card_viewmodel import \
@@ -25,7 +30,15 @@ logger = logging.getLogger(__name__)
 
 
 class HomeViewModel(QObject):
-  """ ViewModel for the Home view. """
+  """ ViewModel for the Home view.
+
+  After every period change the previous and next periods are prefetched in
+  the background into the query cache, so that shifting the period is instant.
+  """
+  PREFETCH_DELAY_MS = 500  # lets the current period render, and coalesces quick clicks
+  PREFETCH_QUIET_SECONDS = 2.0  # prefetch only once the database was not written for this long
+  PREFETCH_MAX_WAIT = 30.0  # seconds, the prefetch is dropped if writes never quiet down
+  PREFETCH_PAUSE = 0.05  # seconds between queries, leaving the database to the watcher
   # Signals for property changes
   period_start_changed = Signal()
   period_end_changed = Signal()
@@ -90,6 +103,18 @@ class HomeViewModel(QObject):
       self._period_type
     )
 
+    self._search_viewmodel = SearchViewModel(
+      self._activity_service,
+      self._period_start,
+      self._period_end
+    )
+
+    self._prefetch_generation = 0
+    self._prefetch_timer = QTimer(self)
+    self._prefetch_timer.setSingleShot(True)
+    self._prefetch_timer.setInterval(self.PREFETCH_DELAY_MS)
+    self._prefetch_timer.timeout.connect(self._start_prefetch)
+
     self._connect_period_changed()
     self._connect_refresh_triggered()
 
@@ -158,6 +183,11 @@ class HomeViewModel(QObject):
     """ ViewModel for the period summary component. """
     return self._period_summary_viewmodel
 
+  @Property(QObject, constant=True)
+  def search_viewmodel(self) -> SearchViewModel:
+    """ ViewModel for the search box. """
+    return self._search_viewmodel
+
   def _connect_period_changed(self):
     """ Connect the period_changed signal to child ViewModels. """
     for viewmodel in [
@@ -166,7 +196,8 @@ class HomeViewModel(QObject):
         self._top_applications_card_viewmodel,
         self._top_titles_card_viewmodel,
         self._focus_breakdown_viewmodel,
-        self._period_summary_viewmodel
+        self._period_summary_viewmodel,
+        self._search_viewmodel
     ]:
       self.period_changed.connect(viewmodel.update_period)
 
@@ -184,25 +215,74 @@ class HomeViewModel(QObject):
         self._focus_breakdown_viewmodel.compute_focus_breakdown)
     self.refresh_triggered.connect(
         self._period_summary_viewmodel.compute_period_summary)
+    self.refresh_triggered.connect(self._search_viewmodel.update_results)
 
   def _update_period(self, start: datetime, end: Optional[datetime], period_type: str) -> None:
     """ Update the period and emit period_changed signal. """
     self.period_start = start
     self.period_end = end
     self.period_type = period_type
-    self.period_changed.emit(start, end, period_type)
-
-  @Slot(int)
-  def shift_period(self, direction: int) -> None:
-    """ Shift the period forward or backward. """
-    if self.period_type == "Day":
-      new_start = self.period_start + timedelta(days=direction)
-      self._update_period(new_start, None, "Day")
-    elif self.period_type == "Week":
+    with metrics.refresh("HomeViewModel.period_change"):
+      self.period_changed.emit(start, end, period_type)
+    if self._config["dashboard"]["prefetch_adjacent_periods"]:
+      self._prefetch_timer.start()
+
+  def adjacent_periods(self) -> List[Tuple[datetime, Optional[datetime]]]:
+    """ The previous and next periods, the next one only if it has started. """
+    periods = [self._shifted_period(-1)]
+    next_period = self._shifted_period(1)
+    if next_period[0] <= datetime.now():
+      periods.append(next_period)
+    return periods
+
+  @Slot()
+  def _start_prefetch(self) -> None:
+    """ Prefetch the adjacent periods in a background thread. """
+    self._prefetch_generation += 1
+    threading.Thread(target=self.prefetch_periods,
+                     args=(self.adjacent_periods(), self._prefetch_generation),
+                     name="period-prefetch", daemon=True).start()
+
+  def prefetch_periods(self,
+                       periods: List[Tuple[datetime, Optional[datetime]]],
+                       generation: Optional[int] = None) -> None:
+    """ Run the dashboard queries of the given periods to fill the query cache.
+
+    Args:
+      periods: (start, end) of the periods to prefetch.
+      generation: Prefetch request, the prefetch stops once a newer one is made.
+    """
+    queries = (self._activity_service.get_period_entries,
+               self._activity_service.get_period_entries_class_time_total,
+               self._activity_service.get_period_entries_name_time_total,
+               self._category_service.get_period_category_rollup)
+    deadline = time.monotonic() + self.PREFETCH_MAX_WAIT
+    with metrics.timer("HomeViewModel.prefetch"):
+      for start, end in periods:
+        for query in queries:
+          # Back off while the watcher or an import is writing
+          while query_cache.seconds_since_write() < self.PREFETCH_QUIET_SECONDS:
+            if time.monotonic() > deadline:
+              logger.debug("Prefetch dropped, the database is busy")
+              return
+            time.sleep(self.PREFETCH_QUIET_SECONDS - query_cache.seconds_since_write())
+          if generation is not None and generation != self._prefetch_generation:
+            return
+          query(start, end)
+          time.sleep(self.PREFETCH_PAUSE)
+
+  @Slot()
+  def refresh(self) -> None:
+    """ Recompute every child ViewModel for the current period. """
+    with metrics.refresh("HomeViewModel.refresh"):
+      self.refresh_triggered.emit()
+
+  def _shifted_period(self, direction: int) -> Tuple[datetime, Optional[datetime]]:
+    """ Return the (start, end) of the period direction periods away from the current one. """
+    if self.period_type == "Week":
       new_start = self.period_start + timedelta(weeks=direction)
-      new_end = new_start + timedelta(days=6)
-      self._update_period(new_start, new_end, "Week")
-    elif self.period_type == "Month":
+      return new_start, new_start + timedelta(days=6)
+    if self.period_type == "Month":
       month_increment = direction
       year_increment = (self.period_start.month -
                         1 + month_increment) // 12
@@ -213,15 +293,18 @@ class HomeViewModel(QObject):
         year=new_year, month=new_month, day=1)
       next_month = new_month % 12 + 1
       next_month_year = new_year + (new_month // 12)
-      new_end = datetime(next_month_year, next_month,
-                         1) - timedelta(days=1)
-      self._update_period(new_start, new_end, "Month")
-    elif self.period_type == "Year":
+      return new_start, datetime(next_month_year, next_month, 1) - timedelta(days=1)
+    if self.period_type == "Year":
       new_start = self.period_start.replace(
           year=self.period_start.year + direction, month=1, day=1)
-      new_end = new_start.replace(
-        year=new_start.year + 1) - timedelta(days=1)
-      self._update_period(new_start, new_end, "Year")
+      return new_start, new_start.replace(year=new_start.year + 1) - timedelta(days=1)
+    return self.period_start + timedelta(days=direction), None
+
+  @Slot(int)
+  def shift_period(self, direction: int) -> None:
+    """ Shift the period forward or backward. """
+    if self.period_type in ("Day", "Week", "Month", "Year"):
+      self._update_period(*self._shifted_period(direction), self.period_type)
 
   @Slot(str)
   def set_period_type(self, period_type: str) -> None:
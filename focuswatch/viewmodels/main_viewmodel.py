@@ -1,31 +1,49 @@
-from typing import TYPE_CHECKING
+import logging
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional
 
 from PySide6.QtCore import Property, QObject, Signal
 
+from focuswatch.services.classifier_service import ClassifierService
+from focuswatch.services.export_service import ExportService
+from focuswatch.services.import_service import ImportService
+
 if TYPE_CHECKING:
   from focuswatch.services.activity_service import ActivityService
   from focuswatch.services.category_service import CategoryService
   from focuswatch.services.keyword_service import KeywordService
   from focuswatch.services.watcher_service import WatcherService
 
+logger = logging.getLogger(__name__)
 
 class MainViewModel(QObject):
   """ ViewModel for the main application window. """
 
   is_monitoring_changed = Signal()
+  is_transferring_changed = Signal()
+  transfer_progress = Signal(int, int)  # processed, total
+  transfer_finished = Signal(bool, int)  # success, number of activities
 
   def __init__(self,
                watcher_service: "WatcherService",
                activity_service: "ActivityService",
                category_service: "CategoryService",
-               keyword_service: "KeywordService"):
+               keyword_service: "KeywordService",
+               export_service: Optional[ExportService] = None,
+               import_service: Optional[ImportService] = None):
     super().__init__()
     self._watcher_service = watcher_service
     self._activity_service = activity_service
     self._category_service = category_service
     self._keyword_service = keyword_service
+    self._export_service = export_service or ExportService()
+    self._import_service = import_service or ImportService(
+      classifier_service=ClassifierService(category_service, keyword_service))
 
     self._is_monitoring = False
+    self._is_transferring = False
+    self._transfer_thread: Optional[threading.Thread] = None
 
   @Property(bool, notify=is_monitoring_changed)
   def is_monitoring(self) -> bool:
@@ -38,6 +56,22 @@ class MainViewModel(QObject):
       self._is_monitoring = value
       self.is_monitoring_changed.emit()
 
+  @Property(bool, notify=is_transferring_changed)
+  def is_transferring(self) -> bool:
+    """ Indicates whether an export or import is running. """
+    return self._is_transferring
+
+  @is_transferring.setter
+  def is_transferring(self, value: bool) -> None:
+    if self._is_transferring != value:
+      self._is_transferring = value
+      self.is_transferring_changed.emit()
+
+  @Property("QStringList", constant=True)
+  def export_formats(self) -> List[str]:
+    """ Export formats supported with the installed packages. """
+    return self._export_service.available_formats()
+
   def start_monitoring(self) -> None:
     """ Start the activity monitoring process. """
     if not self.is_monitoring:
@@ -50,10 +84,65 @@ class MainViewModel(QObject):
       # self._watcher_service.stop() # TODO: Implement stop method in WatcherService
       self.is_monitoring = False
 
-  def export_data(self, file_path: str) -> bool:  # TODO
-    """ Export data to a file. """
-    pass
+  def export_data(self,
+                  file_path: str,
+                  period_start: Optional[datetime] = None,
+                  period_end: Optional[datetime] = None) -> bool:
+    """ Export the activities of a period to a file in the background.
+
+    Progress is reported with transfer_progress and the outcome with transfer_finished.
+
+    Args:
+      file_path: Destination file, the format is taken from its extension.
+      period_start: First day to export, None for the whole history.
+      period_end: Last day to export (inclusive).
+
+    Returns:
+      bool: True if the export was started, False if another transfer is running.
+    """
+    def run() -> None:
+      exported = None
+      try:
+        exported = self._export_service.export(
+          file_path, period_start=period_start, period_end=period_end,
+          progress_callback=self.transfer_progress.emit)
+      finally:
+        # Reported as failed if the export raised
+        self._finish_transfer(exported)
+
+    return self._start_transfer(run)
+
+  def import_data(self, file_path: str) -> bool:
+    """ Import activities from a FocusWatch export or an ActivityWatch export in the background.
+
+    Progress is reported with transfer_progress and the outcome with transfer_finished.
+
+    Args:
+      file_path: File to import, the format is detected from its extension and content.
+
+    Returns:
+      bool: True if the import was started, False if another transfer is running.
+    """
+    def run() -> None:
+      result = None
+      try:
+        result = self._import_service.import_file(
+          file_path, progress_callback=self.transfer_progress.emit)
+      finally:
+        # Reported as failed if the import raised
+        self._finish_transfer(result.imported if result else None)
+
+    return self._start_transfer(run)
+
+  def _start_transfer(self, target) -> bool:
+    if self._is_transferring:
+      logger.warning("A data transfer is already running")
+      return False
+    self.is_transferring = True
+    self._transfer_thread = threading.Thread(target=target, daemon=True)
+    self._transfer_thread.start()
+    return True
 
-  def import_data(self, file_path: str) -> bool:  # TODO
-    """ Import data from a file. """
-    pass
+  def _finish_transfer(self, count: Optional[int]) -> None:
+    self.is_transferring = False
+    self.transfer_finished.emit(count is not None, count or 0)
@@ -5,6 +5,7 @@ from PySide6.QtCore import Property, QObject, Signal
 
 from focuswatch.config import Config
 from focuswatch.viewmodels.categories_viewmodel import CategoriesViewModel
+from focuswatch.viewmodels.diagnostics_viewmodel import DiagnosticsViewModel
 from focuswatch.viewmodels.home_viewmodel import HomeViewModel
 from focuswatch.viewmodels.settings_viewmodel import SettingsViewModel
 
@@ -54,9 +55,11 @@ class MainWindowViewModel(QObject):
       self._category_service,
       self._config
     )
+    self._diagnostics_viewmodel = DiagnosticsViewModel()
 
     # Initialize properties
-    self._pages = ["home", "categories", "settings"]
+    # "diagnostics" has no sidebar button, it is opened with a shortcut
+    self._pages = ["home", "categories", "settings", "diagnostics"]
     self._current_page_index = self.page_index("home")
     self._window_title = "focuswatch"
     self._window_size = (1600, 900)
@@ -103,6 +106,11 @@ class MainWindowViewModel(QObject):
       self._window_size = value
       self.window_size_changed.emit()
 
+  @Property(QObject, constant=True)
+  def main_viewmodel(self) -> "MainViewModel":
+    """ ViewModel for the application wide actions, such as data export. """
+    return self._main_viewmodel
+
   @Property(QObject, constant=True)
   def settings_viewmodel(self) -> SettingsViewModel:
     """ ViewModel for the settings page. """
@@ -118,6 +126,11 @@ class MainWindowViewModel(QObject):
     """ ViewModel for the home page. """
     return self._home_viewmodel
 
+  @Property(QObject, constant=True)
+  def diagnostics_viewmodel(self) -> DiagnosticsViewModel:
+    """ ViewModel for the hidden diagnostics page. """
+    return self._diagnostics_viewmodel
+
   def exit_application(self) -> None:
     """Exit the application."""
     pass
@@ -1,6 +1,7 @@
 """ ViewModel for settings view. """
 import logging
-from typing import Any, Dict, List, Tuple
+from collections.abc import Mapping
+from typing import Any, List, Tuple
 
 from PySide6.QtCore import Property, QObject, Signal
 
@@ -24,7 +25,10 @@ def create_getter(config_path: List[str]):
 
 
 def create_setter(config_path: List[str], signal_name: str):
-  """ Create a setter function for a config option. """
+  """ Create a setter function for a config option.
+
+  Config coalesces writes, so dragging a spinbox does not rewrite the file on every step.
+  """
 
   def setter(self, value):
     config_section = self._config
@@ -34,17 +38,16 @@ def create_setter(config_path: List[str], signal_name: str):
     if config_section[option] != value:
       config_section[option] = value
       getattr(self, signal_name).emit()
-      self._config.write_config_to_file()
   return setter
 
 
-def extract_config_options(config: Dict[str, Any], parent_keys: List[str] = None) -> List[Tuple[List[str], Any]]:
+def extract_config_options(config: Mapping, parent_keys: List[str] = None) -> List[Tuple[List[str], Any]]:
   """ Recursively extract config options and their paths. """
   parent_keys = parent_keys or []
   options = []
   for key, value in config.items():
     current_path = parent_keys + [key]
-    if isinstance(value, dict):
+    if isinstance(value, Mapping):
       options.extend(extract_config_options(value, current_path))
     else:
       options.append((current_path, value))
@@ -158,7 +161,6 @@ class SettingsViewModel(QObject):
   def restore_defaults(self) -> None:
     """ Restore default settings. """
     self._config.initialize_config()
-    self._config.write_config_to_file()
     self._autostart_enabled = self.get_autostart_state()
     self._autostart_available = self.is_autostart_available()
 
@@ -11,7 +11,6 @@ from PySide6.QtWidgets import (QFileDialog, QFrame, QHBoxLayout, QLabel,
                                QSpacerItem, QVBoxLayout, QWidget)
 
 from focuswatch.utils.resource_utils import apply_stylesheet
-from focuswatch.utils.ui_utils import get_category_color_or_parent
 from focuswatch.views.dialogs.categorization_helper_dialog_view import \
     CategorizationHelperDialogView
 from focuswatch.views.dialogs.category_dialog_view import CategoryDialogView
@@ -155,7 +154,8 @@ class CategoriesView(QWidget):
   def _connect_signals(self):
     """Connect signals and slots."""
     # Connect ViewModel signals
-    self._viewmodel.categories_changed.connect(self._on_categories_changed)
+    # categories_changed always accompanies organized_categories_changed,
+    # so only the latter repopulates
     self._viewmodel.filter_text_changed.connect(self._on_filter_text_changed)
     self._viewmodel.organized_categories_changed.connect(
       self._on_organized_categories_changed)
@@ -169,11 +169,6 @@ class CategoriesView(QWidget):
     self.button_export.clicked.connect(self._export_categories)
     self.button_import.clicked.connect(self._import_categories)
 
-  @Slot()
-  def _on_categories_changed(self):
-    """ Handle categories_changed signal from the ViewModel. """
-    self._populate_categories()
-
   @Slot()
   def _on_filter_text_changed(self):
     """ Handle filter_text_changed signal from the ViewModel. """
@@ -243,7 +238,7 @@ class CategoriesView(QWidget):
         # Color Indicator
         color_indicator = QLabel()
         color_indicator.setFixedSize(16, 16)
-        category_color = get_category_color_or_parent(category_id)
+        category_color = category_data["color"]
         if category_color:
           color_indicator.setStyleSheet(
             f"background-color: {category_color}; border-radius: 8px;")
@@ -350,7 +345,8 @@ class CategoriesView(QWidget):
     dialog = CategoryDialogView(
         self, self._viewmodel._category_service, self._viewmodel._keyword_service, category_id)
     if dialog.exec_():
-      self._viewmodel._load_categories()
+      # Patch only the edited, created or deleted category
+      self._viewmodel.refresh_category(dialog.category_id)
 
   def _show_categorization_helper(self):
     """ Show the categorization helper dialog. """
@@ -405,7 +401,7 @@ class CategoriesView(QWidget):
   def _update_progress_dialog(self, current: int, total: int):
     """ Update the progress dialog during retroactive categorization. """
     if hasattr(self, "progress_dialog"):
-      progress = int((current / total) * 100)
+      progress = int((current / total) * 100) if total else 100
       self.progress_dialog.setValue(progress)
       QCoreApplication.processEvents()
 
@@ -498,6 +494,22 @@ class CategoriesView(QWidget):
           f"Error while writing YAML data:\n{str(e)}"
         )
 
+  @staticmethod
+  def _format_import_changes(changes) -> str:
+    """ Describe the changes of a category import, one line per kind of change. """
+    lines = []
+    for label, paths in (("Added categories", changes.added_categories),
+                         ("Updated categories", changes.updated_categories),
+                         ("Removed categories", changes.removed_categories)):
+      if paths:
+        lines.append(f"{label}: " + ", ".join(" / ".join(path) for path in paths))
+    for label, keywords in (("Added keywords", changes.added_keywords),
+                            ("Removed keywords", changes.removed_keywords)):
+      if keywords:
+        lines.append(f"{label}: " + ", ".join(
+          f"{name} ({path[-1]})" for path, name in keywords))
+    return "\n".join(lines)
+
   def _import_categories(self):
     """ Import categories from a file and perform retroactive categorization. """
     file_dialog = QFileDialog(self,
@@ -506,14 +518,32 @@ class CategoriesView(QWidget):
     if file_dialog.exec_() == QFileDialog.Accepted:
       file_path = file_dialog.selectedFiles()[0]
       try:
-        self._viewmodel.import_categories(file_path)
-        # Ask user if they want to perform retroactive categorization
+        changes = self._viewmodel.import_categories(file_path)
+        if changes is None:
+          QMessageBox.critical(
+            self, "Import Failed", "The categories could not be imported. Check logs for details."
+          )
+          return
+        if not changes.has_changes:
+          QMessageBox.information(
+            self, "Import Successful", "The imported categories are identical, nothing changed."
+          )
+          return
+
+        summary = self._format_import_changes(changes)
+        if not changes.stale_category_ids and not changes.changed_keywords:
+          QMessageBox.information(
+            self, "Import Successful", f"Categories imported successfully.\n\n{summary}"
+          )
+          return
+
+        # Ask user if they want to recategorize the affected entries
         dialog = QMessageBox(self)
         dialog.setWindowTitle("Retroactive Categorization")
         dialog.setText(
-          "Categories imported successfully.\n"
-          "Do you want to retroactively categorize all entries based on the new categories?\n"
-          "This action cannot be undone and might take a while."
+          f"Categories imported successfully.\n\n{summary}\n\n"
+          "Do you want to recategorize the entries affected by these changes?\n"
+          "This action cannot be undone."
         )
         dialog.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
         dialog.setDefaultButton(QMessageBox.Yes)
@@ -530,8 +560,8 @@ class CategoriesView(QWidget):
             self._update_progress_dialog
           )
 
-          # Perform retroactive categorization
-          success = self._viewmodel.retroactive_categorization()
+          # Recategorize the affected entries
+          success = self._viewmodel.reclassify_imported()
 
           # Disconnect the signal
           self._viewmodel.retroactive_categorization_progress.disconnect(
@@ -548,10 +578,6 @@ class CategoriesView(QWidget):
             QMessageBox.critical(
               self, "Retroactive Categorization", "An error occurred during categorization. Check logs for details."
             )
-        else:
-          QMessageBox.information(
-            self, "Import Successful", "Categories imported successfully."
-          )
 
         # Reload categories to reflect any changes
         self._viewmodel._load_categories()
@@ -0,0 +1,145 @@
+import logging
+from typing import TYPE_CHECKING, Optional
+
+from PySide6.QtCore import QCoreApplication, QEvent, QPoint, Qt, QTimer, Slot
+from PySide6.QtWidgets import (QCheckBox, QFrame, QHBoxLayout, QLineEdit,
+                               QTreeWidget, QTreeWidgetItem, QVBoxLayout,
+                               QWidget)
+
+if TYPE_CHECKING:
+  from focuswatch.viewmodels.components.search_viewmodel import \
+      SearchViewModel
+
+logger = logging.getLogger(__name__)
+
+
+class SearchView(QWidget):
+  """ Search box for window classes and titles, with results in a dropdown. """
+  DEBOUNCE_MS = 250
+
+  def __init__(self, viewmodel: "SearchViewModel", parent: Optional[QWidget] = None):
+    super().__init__(parent)
+    self._viewmodel = viewmodel
+    self._setup_ui()
+    self._retranslate_ui()
+    self._connect_signals()
+
+  def _setup_ui(self) -> None:
+    """ Set up the UI components. """
+    self.setObjectName("search_view")
+    layout = QHBoxLayout(self)
+    layout.setContentsMargins(0, 0, 0, 0)
+    layout.setSpacing(6)
+
+    self.search_edit = QLineEdit(self)
+    self.search_edit.setObjectName("search_edit")
+    self.search_edit.setClearButtonEnabled(True)
+    self.search_edit.setMinimumWidth(220)
+    self.search_edit.setMaximumWidth(360)
+    self.search_edit.installEventFilter(self)
+    layout.addWidget(self.search_edit)
+
+    self.all_time_checkbox = QCheckBox(self)
+    self.all_time_checkbox.setObjectName("search_all_time_checkbox")
+    layout.addWidget(self.all_time_checkbox)
+
+    # Tool tip window so that the dropdown never takes the focus from the edit
+    self.results_popup = QFrame(self, Qt.ToolTip)
+    self.results_popup.setObjectName("search_results_popup")
+    self.results_popup.setFrameShape(QFrame.StyledPanel)
+    popup_layout = QVBoxLayout(self.results_popup)
+    popup_layout.setContentsMargins(0, 0, 0, 0)
+
+    self.results_tree = QTreeWidget(self.results_popup)
+    self.results_tree.setObjectName("search_results_tree")
+    self.results_tree.setColumnCount(3)
+    self.results_tree.setRootIsDecorated(False)
+    self.results_tree.setUniformRowHeights(True)
+    popup_layout.addWidget(self.results_tree)
+
+    self._debounce_timer = QTimer(self)
+    self._debounce_timer.setSingleShot(True)
+    self._debounce_timer.setInterval(self.DEBOUNCE_MS)
+
+  def _retranslate_ui(self) -> None:
+    self.search_edit.setPlaceholderText(QCoreApplication.translate(
+      "SearchView", "Search window titles", None))
+    self.all_time_checkbox.setText(QCoreApplication.translate(
+      "SearchView", "All time", None))
+    self.results_tree.setHeaderLabels([
+      QCoreApplication.translate("SearchView", "Application", None),
+      QCoreApplication.translate("SearchView", "Title", None),
+      QCoreApplication.translate("SearchView", "Time", None),
+    ])
+
+  def _connect_signals(self) -> None:
+    """ Connect signals between the ViewModel and the View. """
+    self.search_edit.textChanged.connect(self._debounce_timer.start)
+    self.search_edit.returnPressed.connect(self._run_search)
+    self._debounce_timer.timeout.connect(self._run_search)
+    self.all_time_checkbox.toggled.connect(self._on_all_time_toggled)
+    self._viewmodel.results_changed.connect(self._update_results)
+
+  @Slot()
+  def _run_search(self) -> None:
+    self._debounce_timer.stop()
+    self._viewmodel.search(self.search_edit.text())
+    self._update_results()
+
+  @Slot(bool)
+  def _on_all_time_toggled(self, checked: bool) -> None:
+    self._viewmodel.all_time = checked
+
+  @Slot()
+  def _update_results(self) -> None:
+    """ Fill the dropdown with the current results. """
+    results = self._viewmodel.results
+    self.results_tree.clear()
+    if not self._viewmodel.query or not self.search_edit.hasFocus():
+      self.results_popup.hide()
+      return
+
+    if results:
+      self.results_tree.addTopLevelItems([
+        QTreeWidgetItem([window_class, window_name, self._format_time(seconds)])
+        for window_class, window_name, seconds in results])
+    else:
+      self.results_tree.addTopLevelItem(QTreeWidgetItem(
+        ["", QCoreApplication.translate("SearchView", "No matches", None), ""]))
+    self.results_tree.resizeColumnToContents(0)
+    self.results_tree.resizeColumnToContents(2)
+    self._show_popup()
+
+  def _show_popup(self) -> None:
+    width = max(self.width(), 600)
+    self.results_popup.setGeometry(
+      self.mapToGlobal(QPoint(self.width() - width, self.height())).x(),
+      self.mapToGlobal(QPoint(0, self.height())).y(),
+      width, 300)
+    self.results_tree.setColumnWidth(
+      1, width - self.results_tree.columnWidth(0) - self.results_tree.columnWidth(2) - 20)
+    self.results_popup.show()
+
+  def eventFilter(self, watched, event) -> bool:  # noqa: N802
+    """ Hide the dropdown when the search box loses focus or Escape is pressed. """
+    if watched is self.search_edit:
+      if event.type() == QEvent.FocusOut:
+        self.results_popup.hide()
+      elif event.type() == QEvent.FocusIn and self._viewmodel.query:
+        self._update_results()
+      elif event.type() == QEvent.KeyPress and event.key() == Qt.Key_Escape:
+        self.results_popup.hide()
+    return super().eventFilter(watched, event)
+
+  @staticmethod
+  def _format_time(seconds: int) -> str:
+    """ Format the given time in seconds to a human-readable string. """
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
+
+    if hours > 0:
+      return f"{hours}h {minutes}m"
+    elif minutes > 0:
+      return f"{minutes}m"
+    else:
+      return f"{seconds}s"
@@ -0,0 +1,234 @@
+import bisect
+import logging
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QEvent, QPointF, QRectF, Qt, Signal
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPainter, QPen
+from PySide6.QtWidgets import QToolTip, QWidget
+
+if TYPE_CHECKING:
+  from focuswatch.viewmodels.components.timeline_viewmodel import (
+      TimelineBlock, TimelineViewModel)
+
+logger = logging.getLogger(__name__)
+
+
+class TimelineCanvas(QWidget):
+  """ Paints the 24-hour grid and the activity blocks of the timeline.
+
+  Block geometry is laid out once per data change or resize; painting only
+  walks the blocks intersecting the exposed area, and tooltips are built
+  lazily for the hovered block.
+  """
+  block_clicked = Signal(object)  # TimelineBlock
+
+  LABEL_WIDTH = 50
+  RIGHT_MARGIN = 30
+  COLOR_STRIP_WIDTH = 12
+  SHORT_BLOCK_MINUTES = 20
+
+  HOUR_BACKGROUND = QColor("#161616")
+  GRID_COLOR = QColor("#2d2d2d")
+  LABEL_COLOR = QColor("#626262")
+  CARD_BACKGROUND = QColor("#27282C")
+  TEXT_COLOR = QColor("#F9F9F9")
+  CURRENT_TIME_COLOR = QColor("#FF0000")
+
+  def __init__(self,
+               viewmodel: "TimelineViewModel",
+               hour_height: int = 120,
+               parent: Optional[QWidget] = None) -> None:
+    super().__init__(parent)
+    self._viewmodel = viewmodel
+    self._hour_height = hour_height
+    self._minute_height = hour_height / 60
+
+    self._blocks: List["TimelineBlock"] = []
+    # (rect, color, time range, block) per block, ordered by start; _block_tops for bisect
+    self._layout: List[Tuple[QRectF, QColor, str, "TimelineBlock"]] = []
+    self._block_tops: List[float] = []
+    self._tooltips: Dict[int, str] = {}
+
+    self._label_font = QFont()
+    self._label_font.setPixelSize(10)
+    self._parent_font = QFont()
+    self._parent_font.setPixelSize(12)
+    self._short_font = QFont()
+    self._short_font.setPixelSize(12)
+    self._short_font.setBold(True)
+    self._long_font = QFont()
+    self._long_font.setPixelSize(16)
+    self._long_font.setBold(True)
+    self._label_metrics = QFontMetrics(self._label_font)
+    self._parent_metrics = QFontMetrics(self._parent_font)
+    self._short_metrics = QFontMetrics(self._short_font)
+    self._long_metrics = QFontMetrics(self._long_font)
+
+    self.setObjectName("timeline_canvas")
+    self.setMouseTracking(True)
+    self.setAttribute(Qt.WA_OpaquePaintEvent)
+    self.setFixedHeight(24 * self._hour_height)
+
+  def set_blocks(self, blocks: List["TimelineBlock"]) -> None:
+    """ Replace the painted blocks. """
+    self._blocks = blocks
+    self._tooltips.clear()
+    self._layout_blocks()
+    self.update()
+
+  def _layout_blocks(self) -> None:
+    """ Compute block rectangles for the current width. """
+    width = max(0, self.width() - self.LABEL_WIDTH - self.RIGHT_MARGIN)
+    colors: Dict[str, QColor] = {}
+    self._layout = []
+    for block in self._blocks:
+      rect = QRectF(self.LABEL_WIDTH,
+                    int(block.start_minute * self._minute_height),
+                    width,
+                    int(block.duration * self._minute_height))
+      color = colors.setdefault(block.color, QColor(block.color))
+      start_time, end_time = self._time_range(block)
+      time_range = f"{start_time.strftime("%H:%M")} - {end_time.strftime("%H:%M")}"
+      self._layout.append((rect, color, time_range, block))
+    self._block_tops = [rect.top() for rect, _, _, _ in self._layout]
+
+  def block_at(self, pos: QPointF) -> Optional["TimelineBlock"]:
+    """ Return the block under pos, if any. """
+    index = bisect.bisect_right(self._block_tops, pos.y()) - 1
+    if index < 0:
+      return None
+    rect, _, _, block = self._layout[index]
+    # Half-open so that a pixel on the boundary belongs to a single block
+    inside = (rect.left() <= pos.x() < rect.right() and
+              rect.top() <= pos.y() < rect.bottom())
+    return block if inside else None
+
+  def _time_range(self, block: "TimelineBlock") -> Tuple[datetime, datetime]:
+    start_time = self._viewmodel.period_start + \
+        timedelta(minutes=block.start_minute)
+    return start_time, start_time + timedelta(minutes=block.duration)
+
+  def _tooltip(self, block: "TimelineBlock") -> str:
+    """ Build (once per data change) the tooltip listing the block's top entries. """
+    if block.start_minute not in self._tooltips:
+      start_time, end_time = self._time_range(block)
+      top_entries = self._viewmodel.get_top_entries(
+        start_time.isoformat(), end_time.isoformat())
+
+      tooltip_text = "Top Entries:\n"
+      for entry in top_entries:
+        duration_minutes = entry["duration"] / 60
+        tooltip_text += f"- {entry["window_class"]} | {
+          entry["window_name"]} ({duration_minutes:.1f} min)\n"
+      self._tooltips[block.start_minute] = tooltip_text
+    return self._tooltips[block.start_minute]
+
+  def event(self, event) -> bool:
+    if event.type() == QEvent.ToolTip:
+      block = self.block_at(QPointF(event.pos()))
+      if block:
+        QToolTip.showText(event.globalPos(), self._tooltip(block), self)
+      else:
+        QToolTip.hideText()
+        event.ignore()
+      return True
+    return super().event(event)
+
+  def mousePressEvent(self, event) -> None:  # noqa: N802
+    block = self.block_at(event.position())
+    if block and event.button() == Qt.LeftButton:
+      self.block_clicked.emit(block)
+    super().mousePressEvent(event)
+
+  def resizeEvent(self, event) -> None:  # noqa: N802
+    super().resizeEvent(event)
+    self._layout_blocks()
+
+  def paintEvent(self, event) -> None:  # noqa: N802
+    exposed = QRectF(event.rect())
+    painter = QPainter(self)
+    painter.fillRect(exposed, self.HOUR_BACKGROUND)
+    self._paint_grid(painter, exposed)
+
+    painter.setRenderHint(QPainter.Antialiasing)
+    first = max(0, bisect.bisect_right(self._block_tops, exposed.top()) - 1)
+    for rect, color, time_range, block in self._layout[first:]:
+      if rect.top() > exposed.bottom():
+        break
+      if rect.intersects(exposed):
+        self._paint_block(painter, rect, color, time_range, block)
+
+    self._paint_current_time(painter)
+    painter.end()
+
+  def _paint_grid(self, painter: QPainter, exposed: QRectF) -> None:
+    """ Paint hour separators and labels. """
+    painter.setFont(self._label_font)
+    first_hour = max(0, int(exposed.top() // self._hour_height))
+    last_hour = min(23, int(exposed.bottom() // self._hour_height))
+    for hour in range(first_hour, last_hour + 1):
+      top = hour * self._hour_height
+      painter.setPen(self.GRID_COLOR)
+      painter.drawLine(0, top + self._hour_height - 1,
+                       self.width(), top + self._hour_height - 1)
+      painter.setPen(self.LABEL_COLOR)
+      painter.drawText(QRectF(5, top, self.LABEL_WIDTH - 5, self._hour_height),
+                       Qt.AlignLeft | Qt.AlignTop, f"{hour:02d}:00")
+
+  def _paint_block(self, painter: QPainter, rect: QRectF, color: QColor,
+                   time_range: str, block: "TimelineBlock") -> None:
+    """ Paint a block: color strip, card and labels, elided to fit. """
+    card = rect.adjusted(0, 0, 0, -2)
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(self.CARD_BACKGROUND)
+    painter.drawRoundedRect(card, 4, 4)
+    painter.setBrush(color)
+    painter.drawRoundedRect(
+      QRectF(card.left(), card.top(), self.COLOR_STRIP_WIDTH, card.height()), 4, 4)
+
+    text_rect = card.adjusted(self.COLOR_STRIP_WIDTH + 3, 0, -6, 0)
+
+    if block.duration <= self.SHORT_BLOCK_MINUTES:
+      label = (f"{block.parent_name} -> {block.category_name}"
+               if block.parent_name else block.category_name)
+      painter.setFont(self._label_font)
+      painter.setPen(self.LABEL_COLOR)
+      painter.drawText(text_rect, Qt.AlignVCenter | Qt.AlignRight, time_range)
+      time_width = self._label_metrics.horizontalAdvance(time_range) + 6
+      self._draw_elided(painter, self._short_font, self._short_metrics, self.TEXT_COLOR,
+                        text_rect.adjusted(0, 0, -time_width, 0),
+                        Qt.AlignVCenter | Qt.AlignLeft, label)
+      return
+
+    top = text_rect.top()
+    if block.parent_name:
+      height = self._parent_metrics.height()
+      self._draw_elided(painter, self._parent_font, self._parent_metrics, self.TEXT_COLOR,
+                        QRectF(text_rect.left(), top, text_rect.width(), height),
+                        Qt.AlignVCenter | Qt.AlignLeft, block.parent_name)
+      top += height
+    height = self._long_metrics.height()
+    self._draw_elided(painter, self._long_font, self._long_metrics, self.TEXT_COLOR,
+                      QRectF(text_rect.left(), top, text_rect.width(), height),
+                      Qt.AlignVCenter | Qt.AlignLeft, block.category_name)
+    painter.setFont(self._label_font)
+    painter.setPen(self.LABEL_COLOR)
+    painter.drawText(text_rect, Qt.AlignBottom | Qt.AlignRight, time_range)
+
+  @staticmethod
+  def _draw_elided(painter: QPainter, font: QFont, metrics: QFontMetrics, color: QColor,
+                   rect: QRectF, flags, text: str) -> None:
+    painter.setFont(font)
+    painter.setPen(color)
+    elided = metrics.elidedText(text, Qt.ElideRight, int(rect.width()))
+    painter.drawText(rect, flags, elided)
+
+  def _paint_current_time(self, painter: QPainter) -> None:
+    """ Paint the current time line when showing today. """
+    if self._viewmodel.period_start.date() != datetime.now().date():
+      return
+    now = datetime.now()
+    y_position = int((now.hour * 60 + now.minute) * self._minute_height)
+    painter.setPen(QPen(self.CURRENT_TIME_COLOR, 1))
+    painter.drawLine(self.LABEL_WIDTH, y_position, self.width(), y_position)
@@ -0,0 +1,116 @@
+import logging
+from typing import TYPE_CHECKING, List, Optional
+
+from PySide6.QtCore import QCoreApplication, QObject, QTimer, Slot
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import (QAbstractItemView, QHBoxLayout, QHeaderView,
+                               QLabel, QPushButton, QTableWidget,
+                               QTableWidgetItem, QVBoxLayout, QWidget)
+
+if TYPE_CHECKING:
+  from focuswatch.viewmodels.diagnostics_viewmodel import (
+      DiagnosticsViewModel, MetricRow)
+
+logger = logging.getLogger(__name__)
+
+
+class DiagnosticsView(QWidget):
+  """ Hidden page showing latency percentiles, query counts and watcher tick jitter.
+
+  Opened with Ctrl+Shift+D. The tables refresh every second while the page is visible.
+  """
+  REFRESH_INTERVAL_MS = 1000
+
+  def __init__(self, viewmodel: "DiagnosticsViewModel",
+               parent: Optional[QObject] = None):
+    super().__init__(parent)
+    self._viewmodel = viewmodel
+    self._setup_ui()
+    self._connect_signals()
+
+  def _setup_ui(self) -> None:
+    """ Set up the UI components. """
+    self.setObjectName("diagnostics_view")
+    self.main_layout = QVBoxLayout(self)
+
+    header_font = QFont()
+    header_font.setPointSize(14)
+    header_font.setBold(True)
+    self.header = QLabel(QCoreApplication.translate(
+      "DiagnosticsView", "Diagnostics", None), self)
+    self.header.setFont(header_font)
+    self.main_layout.addWidget(self.header)
+
+    self.summary_label = QLabel(self)
+    self.summary_label.setObjectName("summary_label")
+    self.main_layout.addWidget(self.summary_label)
+
+    self.timings_table = self._create_table(
+      ["Operation", "Count", "p50 (ms)", "p95 (ms)", "Max (ms)"])
+    self.main_layout.addWidget(self.timings_table, 3)
+
+    self.values_table = self._create_table(
+      ["Value", "Samples", "p50", "p95", "Max"])
+    self.main_layout.addWidget(self.values_table, 1)
+
+    button_layout = QHBoxLayout()
+    button_layout.addStretch()
+    self.button_log = QPushButton(QCoreApplication.translate(
+      "DiagnosticsView", "Write to log", None), self)
+    self.button_reset = QPushButton(QCoreApplication.translate(
+      "DiagnosticsView", "Reset", None), self)
+    button_layout.addWidget(self.button_log)
+    button_layout.addWidget(self.button_reset)
+    self.main_layout.addLayout(button_layout)
+
+    self._refresh_timer = QTimer(self)
+    self._refresh_timer.setInterval(self.REFRESH_INTERVAL_MS)
+
+  def _create_table(self, headers: List[str]) -> QTableWidget:
+    table = QTableWidget(0, len(headers), self)
+    table.setHorizontalHeaderLabels(headers)
+    table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    table.verticalHeader().setVisible(False)
+    table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+    return table
+
+  def _connect_signals(self) -> None:
+    """ Connect signals between the ViewModel and the View. """
+    self._viewmodel.snapshot_changed.connect(self._update_tables)
+    self._refresh_timer.timeout.connect(self._viewmodel.refresh)
+    self.button_reset.clicked.connect(self._viewmodel.reset)
+    self.button_log.clicked.connect(self._viewmodel.log_summary)
+
+  def showEvent(self, event):  # noqa: N802
+    self._viewmodel.refresh()
+    self._refresh_timer.start()
+    super().showEvent(event)
+
+  def hideEvent(self, event):  # noqa: N802
+    self._refresh_timer.stop()
+    super().hideEvent(event)
+
+  @Slot()
+  def _update_tables(self) -> None:
+    """ Fill the tables from the latest snapshot. """
+    self._fill_table(self.timings_table, self._viewmodel.timing_rows)
+    self._fill_table(self.values_table, self._viewmodel.value_rows)
+
+    timings = self._viewmodel.snapshot["timings"]
+    jitter = timings.get("watcher.tick_jitter")
+    counters = self._viewmodel.counters
+    summary = (f"Database queries: {counters.get("db.queries", 0)}"
+               f"    Connection checkouts: {counters.get("db.checkouts", 0)}"
+               f"    Pings: {counters.get("db.pings", 0)}")
+    if jitter:
+      summary += (f"    Watcher tick jitter: p50 {jitter["p50"]:.1f} ms,"
+                  f" p95 {jitter["p95"]:.1f} ms")
+    self.summary_label.setText(summary)
+
+  @staticmethod
+  def _fill_table(table: QTableWidget, rows: List["MetricRow"]) -> None:
+    table.setRowCount(len(rows))
+    for row_index, (name, count, p50, p95, maximum) in enumerate(rows):
+      cells = [name, str(count), f"{p50:.2f}", f"{p95:.2f}", f"{maximum:.2f}"]
+      for column, text in enumerate(cells):
+        table.setItem(row_index, column, QTableWidgetItem(text))
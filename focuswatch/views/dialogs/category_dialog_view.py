@@ -40,6 +40,11 @@ class CategoryDialogView(QDialog):
 
     apply_stylesheet(self, "dialogs/category_dialog.qss")
 
+  @property
+  def category_id(self) -> Optional[int]:
+    """ ID of the edited category, set for new categories once saved. """
+    return self._viewmodel.category_id
+
   def _setup_ui(self) -> None:
     """ Set up the user interface. """
     is_editing = self._viewmodel.category_id is not None
@@ -263,14 +268,15 @@ class CategoryDialogView(QDialog):
 
       # Elide text if it's too long
       font_metrics = QFontMetrics(keyword_button.font())
+      label = f"¬ {keyword.name}" if keyword.exclude else keyword.name
       elided_text = font_metrics.elidedText(
-          keyword.name, Qt.ElideRight, keyword_button.maximumWidth() - 30
+          label, Qt.ElideRight, keyword_button.maximumWidth() - 30
       )
       keyword_button.setText(elided_text)
 
       # Set tooltip if text was elided
-      if elided_text != keyword.name:
-        keyword_button.setToolTip(keyword.name)
+      if elided_text != label:
+        keyword_button.setToolTip(label)
 
       keyword_button.clicked.connect(partial(self._edit_keyword, index))
       keyword_button.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -316,7 +322,9 @@ class CategoryDialogView(QDialog):
     if dialog.exec_() == QDialog.Accepted:
       updated_keyword = dialog.keyword_data
       self._viewmodel.update_keyword(
-          index, updated_keyword.name, updated_keyword.match_case)
+          index, updated_keyword.name, updated_keyword.match_case,
+          updated_keyword.match_type, updated_keyword.target,
+          bool(updated_keyword.exclude), updated_keyword.priority or 0)
       self._setup_keyword_grid()
 
   def _delete_keyword(self, index: int) -> None:
@@ -330,7 +338,8 @@ class CategoryDialogView(QDialog):
     if dialog.exec_() == QDialog.Accepted:
       new_keyword = dialog.keyword_data
       self._viewmodel.add_keyword(
-        new_keyword.name, new_keyword.match_case)
+        new_keyword.name, new_keyword.match_case, new_keyword.match_type,
+        new_keyword.target, bool(new_keyword.exclude), new_keyword.priority or 0)
       self._setup_keyword_grid()
 
   def accept(self) -> None:
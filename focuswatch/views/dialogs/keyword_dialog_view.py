@@ -2,9 +2,10 @@ import logging
 from typing import Optional
 
 from PySide6.QtCore import Qt, Signal, Slot
-from PySide6.QtWidgets import (QCheckBox, QDialog, QDialogButtonBox,
-                               QFormLayout, QLabel, QLineEdit, QMessageBox,
-                               QPushButton, QVBoxLayout, QWidget)
+from PySide6.QtWidgets import (QCheckBox, QComboBox, QDialog,
+                               QDialogButtonBox, QFormLayout, QLabel,
+                               QLineEdit, QMessageBox, QPushButton, QSpinBox,
+                               QVBoxLayout, QWidget)
 
 from focuswatch.database.models.keyword import Keyword
 from focuswatch.utils.resource_utils import apply_stylesheet
@@ -19,6 +20,17 @@ class KeywordDialogView(QDialog):
 
   keyword_deleted = Signal()
 
+  MATCH_TYPE_LABELS = {
+    Keyword.MATCH_SUBSTRING: "Contains",
+    Keyword.MATCH_WORD: "Whole word",
+    Keyword.MATCH_REGEX: "Regular expression",
+  }
+  TARGET_LABELS = {
+    Keyword.TARGET_TITLE: "Window class and name",
+    Keyword.TARGET_CLASS: "Window class",
+    Keyword.TARGET_NAME: "Window name",
+  }
+
   def __init__(
       self,
       parent: QWidget,
@@ -35,7 +47,7 @@ class KeywordDialogView(QDialog):
     """ Set up the user interface. """
     is_editing = self._viewmodel.get_keyword().id is not None
     self.setWindowTitle("Edit Keyword" if is_editing else "Add Keyword")
-    self.setMinimumSize(400, 250)
+    self.setMinimumSize(400, 350)
 
     # Main layout
     main_layout = QVBoxLayout(self)
@@ -64,6 +76,33 @@ class KeywordDialogView(QDialog):
     self._match_case_checkbox.setChecked(self._viewmodel.match_case)
     form_layout.addRow("", self._match_case_checkbox)
 
+    # Match type and target
+    self._match_type_combo = QComboBox(self)
+    for match_type, label in self.MATCH_TYPE_LABELS.items():
+      self._match_type_combo.addItem(label, match_type)
+    self._match_type_combo.setCurrentIndex(
+        self._match_type_combo.findData(self._viewmodel.match_type))
+    form_layout.addRow("Match:", self._match_type_combo)
+
+    self._target_combo = QComboBox(self)
+    for target, label in self.TARGET_LABELS.items():
+      self._target_combo.addItem(label, target)
+    self._target_combo.setCurrentIndex(
+        self._target_combo.findData(self._viewmodel.target))
+    form_layout.addRow("In:", self._target_combo)
+
+    # Exclusion and priority
+    self._exclude_checkbox = QCheckBox("Exclude matches from this category", self)
+    self._exclude_checkbox.setChecked(self._viewmodel.exclude)
+    form_layout.addRow("", self._exclude_checkbox)
+
+    self._priority_spinbox = QSpinBox(self)
+    self._priority_spinbox.setRange(-100, 100)
+    self._priority_spinbox.setValue(self._viewmodel.priority)
+    self._priority_spinbox.setToolTip(
+        "Keywords of higher priority win over deeper categories and override exclusions")
+    form_layout.addRow("Priority:", self._priority_spinbox)
+
     main_layout.addLayout(form_layout)
 
     # Spacer
@@ -90,6 +129,14 @@ class KeywordDialogView(QDialog):
     self._name_edit.textChanged.connect(self._on_name_edit)
     self._match_case_checkbox.stateChanged.connect(
         self._on_match_case_checkbox_changed)
+    self._match_type_combo.currentIndexChanged.connect(
+        lambda: setattr(self._viewmodel, "match_type", self._match_type_combo.currentData()))
+    self._target_combo.currentIndexChanged.connect(
+        lambda: setattr(self._viewmodel, "target", self._target_combo.currentData()))
+    self._exclude_checkbox.toggled.connect(
+        lambda checked: setattr(self._viewmodel, "exclude", checked))
+    self._priority_spinbox.valueChanged.connect(
+        lambda value: setattr(self._viewmodel, "priority", value))
 
     self._button_box.accepted.connect(self.accept)
     self._button_box.rejected.connect(self.reject)
@@ -119,7 +166,9 @@ class KeywordDialogView(QDialog):
   def accept(self) -> None:
     """ Handle the accept event. """
     if not self._viewmodel.is_input_valid():
-      QMessageBox.warning(self, "Error", "Keyword name cannot be empty")
+      error = self._viewmodel.pattern_error()
+      QMessageBox.warning(self, "Error", f"Invalid regular expression: {error}"
+                          if error else "Keyword name cannot be empty")
       return
 
     # Return the keyword data to the parent dialog
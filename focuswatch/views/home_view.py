@@ -9,6 +9,7 @@ from PySide6.QtWidgets import (QCalendarWidget, QDialog, QFrame, QGridLayout,
 
 from focuswatch.utils.resource_utils import apply_styles, apply_stylesheet
 from focuswatch.views.components.focus_breakdown_view import FocusBreakdownView
+from focuswatch.views.components.search_view import SearchView
 from focuswatch.views.components.timeline_view import TimelineView
 from focuswatch.views.components.top_applications_card_view import \
     TopApplicationsCardView
@@ -101,6 +102,14 @@ class HomeView(QWidget):
         40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
     self.horizontal_layout_5.addItem(self.horizontal_spacer_ref)
 
+    self.search_view = SearchView(
+        self._viewmodel.search_viewmodel, self.home_nav_frame)
+    self.horizontal_layout_5.addWidget(self.search_view)
+
+    self.horizontal_spacer_search = QSpacerItem(
+        10, 20, QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Minimum)
+    self.horizontal_layout_5.addItem(self.horizontal_spacer_search)
+
     self.refresh_button = QPushButton(self.home_nav_frame)
     self.refresh_button.setObjectName("refresh_button")
     self.horizontal_layout_5.addWidget(self.refresh_button)
@@ -275,4 +284,4 @@ class HomeView(QWidget):
 
   def _on_refresh_clicked(self):
     """ Handle the refresh button click. """
-    self._viewmodel.refresh_triggered.emit()
+    self._viewmodel.refresh()
@@ -2,7 +2,7 @@ import logging
 from typing import TYPE_CHECKING, Optional
 
 from PySide6.QtCore import QCoreApplication, QSize, Qt
-from PySide6.QtGui import QFont
+from PySide6.QtGui import QFont, QKeySequence, QShortcut
 from PySide6.QtWidgets import (QFrame, QHBoxLayout, QLabel, QMainWindow,
                                QSizePolicy, QSpacerItem,
                                QStackedWidget, QToolButton,
@@ -10,6 +10,7 @@ from PySide6.QtWidgets import (QFrame, QHBoxLayout, QLabel, QMainWindow,
 
 from focuswatch.utils.resource_utils import apply_stylesheet, load_icon
 from focuswatch.views.categories_view import CategoriesView
+from focuswatch.views.diagnostics_view import DiagnosticsView
 from focuswatch.views.home_view import HomeView
 from focuswatch.views.settings_view import SettingsView
 
@@ -103,12 +104,16 @@ class MainWindowView(QMainWindow):
     self.page_home = HomeView(self._viewmodel.home_viewmodel)
     self.page_categories = CategoriesView(
       self._viewmodel.categories_viewmodel)
-    self.page_settings = SettingsView(self._viewmodel.settings_viewmodel)
+    self.page_settings = SettingsView(self._viewmodel.settings_viewmodel,
+                                      self._viewmodel.main_viewmodel)
+    self.page_diagnostics = DiagnosticsView(
+      self._viewmodel.diagnostics_viewmodel)
 
     # Add pages to the stacked widget
     self.stacked_widget.addWidget(self.page_home)
     self.stacked_widget.addWidget(self.page_categories)
     self.stacked_widget.addWidget(self.page_settings)
+    self.stacked_widget.addWidget(self.page_diagnostics)
 
     # Set the central widget
     self.setCentralWidget(self.central_widget)
@@ -179,6 +184,11 @@ class MainWindowView(QMainWindow):
     self.sidebar_button_settings.clicked.connect(
         lambda: self._switch_page("settings"))
 
+    # The diagnostics page is hidden from the sidebar
+    self.diagnostics_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+    self.diagnostics_shortcut.activated.connect(
+        lambda: self._switch_page("diagnostics"))
+
   def _switch_page(self, name: str):
     """ Switch the page in the stacked widget. """
     self._viewmodel.current_page_index = self._viewmodel.page_index(name)
@@ -1,17 +1,24 @@
 """ View for application settings, with hardcoded sections and updated to work with the new ViewModel. """
 import logging
-from typing import Optional
+import os
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 
-from PySide6.QtCore import (QCoreApplication, QEasingCurve, QEvent, QObject,
-                            QPropertyAnimation, QSize, Qt, QTimer)
+from PySide6.QtCore import (QCoreApplication, QDate, QEasingCurve, QEvent,
+                            QObject, QPropertyAnimation, QSize, Qt, QTimer,
+                            Slot)
 from PySide6.QtGui import QFont
-from PySide6.QtWidgets import (QCheckBox, QDoubleSpinBox, QGroupBox,
-                               QHBoxLayout, QLabel, QLineEdit, QMessageBox,
+from PySide6.QtWidgets import (QCheckBox, QDateEdit, QDoubleSpinBox,
+                               QFileDialog, QGroupBox, QHBoxLayout, QLabel,
+                               QLineEdit, QMessageBox, QProgressBar,
                                QPushButton, QScrollArea, QSizePolicy, QSpinBox,
                                QToolButton, QVBoxLayout, QWidget)
 
 from focuswatch.utils.resource_utils import apply_stylesheet, load_icon
 
+if TYPE_CHECKING:
+  from focuswatch.viewmodels.main_viewmodel import MainViewModel
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,11 +34,20 @@ class WheelEventFilter(QObject):
 class SettingsView(QWidget):
   """ Settings view. """
 
+  EXPORT_FILTERS = {
+    "csv": "CSV Files (*.csv)",
+    "jsonl": "JSON Lines Files (*.jsonl)",
+    "parquet": "Parquet Files (*.parquet)",
+  }
+
   def __init__(self,
                viewmodel,
+               main_viewmodel: Optional["MainViewModel"] = None,
                parent: Optional[QObject] = None):
     super().__init__(parent)
     self._viewmodel = viewmodel
+    self._main_viewmodel = main_viewmodel
+    self._transfer_is_import = False
     self.current_animation = None
     self._setup_ui()
     self.sections = [
@@ -39,6 +55,8 @@ class SettingsView(QWidget):
         {"label": self.watcher_header, "widget": self.watcher_section},
         {"label": self.dashboard_header, "widget": self.dashboard_section},
     ]
+    if self._main_viewmodel is not None:
+      self.sections.append({"label": self.data_header, "widget": self.data_section})
     self._connect_signals()
 
     apply_stylesheet(self, "settings_view.qss")
@@ -85,6 +103,16 @@ class SettingsView(QWidget):
       self.nav_watcher_button, alignment=Qt.AlignCenter)
     self.navigation_layout.addWidget(
       self.nav_dashboard_button, alignment=Qt.AlignCenter)
+
+    if self._main_viewmodel is not None:
+      self.nav_data_button = self._create_sidebar_button(
+        text="Data",
+        icon_path="dashboard_icon.png"
+      )
+      self.nav_data_button.clicked.connect(
+        lambda: self.scroll_to_section("data"))
+      self.navigation_layout.addWidget(
+        self.nav_data_button, alignment=Qt.AlignCenter)
     self.navigation_layout.addStretch()
 
     # Scroll Area for Settings Content
@@ -111,6 +139,11 @@ class SettingsView(QWidget):
     self.dashboard_section = self._create_dashboard_section()
     self.scroll_layout.addWidget(self.dashboard_section)
 
+    # Data Section, export and import of the activity history
+    if self._main_viewmodel is not None:
+      self.data_section = self._create_data_section()
+      self.scroll_layout.addWidget(self.data_section)
+
     # Spacer at the bottom
     self.scroll_layout.addStretch()
 
@@ -150,7 +183,7 @@ class SettingsView(QWidget):
     self.label_note.setObjectName("label_note")
     self.label_note.setText(
         QCoreApplication.translate(
-            "SettingsView", "Note: Changes will apply on next restart.", None
+            "SettingsView", "Note: Watcher changes apply immediately, other changes on next restart.", None
         )
     )
     self.label_note.setAlignment(Qt.AlignCenter)
@@ -196,6 +229,8 @@ class SettingsView(QWidget):
         self._on_watch_interval_changed)
     self.watch_afk.stateChanged.connect(self._on_watch_afk_changed)
     self.afk_timeout.valueChanged.connect(self._on_afk_timeout_changed)
+    self.adaptive_interval.stateChanged.connect(
+      self._on_adaptive_interval_changed)
     self.button_restore_defaults.clicked.connect(self._restore_defaults)
 
     # Connect signals for dashboard settings
@@ -214,6 +249,14 @@ class SettingsView(QWidget):
     self.display_timeline_idle.stateChanged.connect(
         self._on_display_timeline_idle_changed)
 
+    # Connect signals for the data section
+    if self._main_viewmodel is not None:
+      self.export_all_history.toggled.connect(self._on_export_all_history_toggled)
+      self.button_export_activities.clicked.connect(self._export_activities)
+      self.button_import_activities.clicked.connect(self._import_activities)
+      self._main_viewmodel.transfer_progress.connect(self._on_transfer_progress)
+      self._main_viewmodel.transfer_finished.connect(self._on_transfer_finished)
+
   def _restore_defaults(self):
     """ Restore default categories with confirmation. """
     dialog = QMessageBox(self)
@@ -460,6 +503,20 @@ class SettingsView(QWidget):
     afk_timeout_setting.setObjectName("afk_timeout_setting")
     group_layout.addWidget(afk_timeout_setting)
 
+    # Adaptive Interval Checkbox
+    self.adaptive_interval = QCheckBox(group_box)
+    self.adaptive_interval.setObjectName("adaptive_interval")
+    self.adaptive_interval.setChecked(
+      self._viewmodel.general_adaptive_interval)
+    self.adaptive_interval.setText(
+        QCoreApplication.translate(
+          "SettingsView", "Poll less often while idle", None)
+    )
+
+    adaptive_interval_setting = self._create_setting_widget(
+      self.adaptive_interval)
+    group_layout.addWidget(adaptive_interval_setting)
+
     return group_box
 
   def _create_dashboard_section(self) -> QWidget:
@@ -614,6 +671,93 @@ class SettingsView(QWidget):
 
     return group_box
 
+  def _create_data_section(self) -> QWidget:
+    """ Create the Data section, to export and import the activity history. """
+    group_box = QGroupBox()
+    group_box.setObjectName("data_group_box")
+    group_box.setTitle("")
+
+    group_layout = QVBoxLayout(group_box)
+    group_layout.setContentsMargins(10, 15, 10, 10)
+    group_layout.setSpacing(10)
+
+    # Section Header
+    self.data_header = QLabel(
+        QCoreApplication.translate(
+            "SettingsView", "Data", None), group_box
+    )
+    header_font = QFont()
+    header_font.setPointSize(14)
+    header_font.setBold(True)
+    self.data_header.setFont(header_font)
+    self.data_header.setObjectName("data_header")
+    group_layout.addWidget(self.data_header)
+
+    # Export period
+    self.export_all_history = QCheckBox(group_box)
+    self.export_all_history.setObjectName("export_all_history")
+    self.export_all_history.setChecked(True)
+    self.export_all_history.setText(
+        QCoreApplication.translate(
+            "SettingsView", "Export the whole history", None)
+    )
+    group_layout.addWidget(self._create_setting_widget(self.export_all_history))
+
+    period_widget = QWidget(group_box)
+    period_layout = QHBoxLayout(period_widget)
+    period_layout.setContentsMargins(0, 0, 0, 0)
+    self.export_period_start = QDateEdit(QDate.currentDate().addMonths(-1), period_widget)
+    self.export_period_start.setObjectName("export_period_start")
+    self.export_period_start.setCalendarPopup(True)
+    self.export_period_end = QDateEdit(QDate.currentDate(), period_widget)
+    self.export_period_end.setObjectName("export_period_end")
+    self.export_period_end.setCalendarPopup(True)
+    period_layout.addWidget(self.export_period_start)
+    period_layout.addWidget(QLabel("-", period_widget))
+    period_layout.addWidget(self.export_period_end)
+    period_layout.addStretch()
+    period_widget.setEnabled(False)
+    self.export_period = period_widget
+    group_layout.addWidget(self._create_setting_widget(
+        period_widget,
+        QCoreApplication.translate("SettingsView", "Export period", None)
+    ))
+
+    # Export button and progress
+    self.button_export_activities = QPushButton(
+        QCoreApplication.translate(
+            "SettingsView", "Export activities...", None), group_box
+    )
+    self.button_export_activities.setObjectName("button_export_activities")
+
+    self.button_import_activities = QPushButton(
+        QCoreApplication.translate(
+            "SettingsView", "Import activities...", None), group_box
+    )
+    self.button_import_activities.setObjectName("button_import_activities")
+    self.button_import_activities.setToolTip(QCoreApplication.translate(
+        "SettingsView", "Import a FocusWatch export or an ActivityWatch export. "
+        "Time already in the history is skipped.", None))
+
+    buttons_widget = QWidget(group_box)
+    buttons_layout = QHBoxLayout(buttons_widget)
+    buttons_layout.setContentsMargins(0, 0, 0, 0)
+    buttons_layout.addWidget(self.button_export_activities)
+    buttons_layout.addWidget(self.button_import_activities)
+    buttons_layout.addStretch()
+    group_layout.addWidget(buttons_widget)
+
+    self.transfer_progress_bar = QProgressBar(group_box)
+    self.transfer_progress_bar.setObjectName("transfer_progress_bar")
+    self.transfer_progress_bar.setVisible(False)
+    group_layout.addWidget(self.transfer_progress_bar)
+
+    self.transfer_status = QLabel(group_box)
+    self.transfer_status.setObjectName("transfer_status")
+    group_layout.addWidget(self.transfer_status)
+
+    return group_box
+
   def scroll_to_section(self, section_name: str) -> None:
     """ Scroll the scroll area to the specified section. """
     if section_name == "general":
@@ -622,6 +766,8 @@ class SettingsView(QWidget):
       target_widget = self.watcher_header
     elif section_name == "dashboard":
       target_widget = self.dashboard_header
+    elif section_name == "data" and self._main_viewmodel is not None:
+      target_widget = self.data_header
     else:
       logger.warning(f"Unknown section name: {section_name}")
       return
@@ -683,6 +829,10 @@ class SettingsView(QWidget):
     """ Handle changes to the AFK timeout spin box. """
     self._viewmodel.general_afk_timeout = value
 
+  def _on_adaptive_interval_changed(self, state: int) -> None:
+    """ Handle changes to the adaptive interval checkbox. """
+    self._viewmodel.general_adaptive_interval = state == 2
+
   def _on_daily_focused_goal_changed(self, value: float) -> None:
     """ Handle changes to the daily focused goal setting. """
     self._viewmodel.dashboard_focused_target_day = value
@@ -712,3 +862,74 @@ class SettingsView(QWidget):
     """ Handle changes to the display timeline idle checkbox. """
     is_checked = state == 2
     self._viewmodel.dashboard_display_timeline_idle = is_checked
+
+  @Slot(bool)
+  def _on_export_all_history_toggled(self, checked: bool) -> None:
+    """ The export period is only used when not exporting the whole history. """
+    self.export_period.setEnabled(not checked)
+
+  def _export_activities(self) -> None:
+    """ Ask for a destination and export the activity history in the background. """
+    formats = self._main_viewmodel.export_formats
+    name_filters = ";;".join(self.EXPORT_FILTERS[fmt] for fmt in formats)
+    file_path, selected_filter = QFileDialog.getSaveFileName(
+      self, "Export Activities", "focuswatch_activities.csv", name_filters)
+    if not file_path:
+      return
+    if not os.path.splitext(file_path)[1]:
+      fmt = next(fmt for fmt in formats if self.EXPORT_FILTERS[fmt] == selected_filter)
+      file_path += f".{fmt}"
+
+    period_start = period_end = None
+    if not self.export_all_history.isChecked():
+      period_start = datetime.combine(self.export_period_start.date().toPython(),
+                                      datetime.min.time())
+      period_end = datetime.combine(self.export_period_end.date().toPython(),
+                                    datetime.min.time())
+
+    if self._main_viewmodel.export_data(file_path, period_start, period_end):
+      self._transfer_started(False)
+
+  def _import_activities(self) -> None:
+    """ Ask for a file and import its activities in the background. """
+    file_path, _ = QFileDialog.getOpenFileName(
+      self, "Import Activities", "",
+      "Activity Files (*.csv *.jsonl *.json);;All Files (*)")
+    if file_path and self._main_viewmodel.import_data(file_path):
+      self._transfer_started(True)
+
+  def _transfer_started(self, is_import: bool) -> None:
+    self._transfer_is_import = is_import
+    self.button_export_activities.setEnabled(False)
+    self.button_import_activities.setEnabled(False)
+    self.transfer_progress_bar.setValue(0)
+    self.transfer_progress_bar.setVisible(True)
+    self.transfer_status.setText(
+      QCoreApplication.translate("SettingsView", "Importing activities...", None) if is_import
+      else QCoreApplication.translate("SettingsView", "Exporting activities...", None))
+
+  @Slot(int, int)
+  def _on_transfer_progress(self, processed: int, total: int) -> None:
+    """ Update the progress bar of the running transfer. """
+    self.transfer_progress_bar.setMaximum(max(total, 1))
+    self.transfer_progress_bar.setValue(processed)
+
+  @Slot(bool, int)
+  def _on_transfer_finished(self, success: bool, count: int) -> None:
+    """ Report the outcome of the transfer. """
+    self.button_export_activities.setEnabled(True)
+    self.button_import_activities.setEnabled(True)
+    self.transfer_progress_bar.setVisible(False)
+    if success:
+      message = (QCoreApplication.translate("SettingsView", "Imported {count} activities.", None)
+                 if self._transfer_is_import else
+                 QCoreApplication.translate("SettingsView", "Exported {count} activities.", None))
+      self.transfer_status.setText(message.format(count=count))
+    elif self._transfer_is_import:
+      self.transfer_status.setText("")
+      QMessageBox.critical(
+        self, "Import Failed", "The activities could not be imported, see the log for details.")
+    else:
+      self.transfer_status.setText("")
+      QMessageBox.critical(
+        self, "Export Failed", "The activities could not be exported, see the log for details.")
@@ -0,0 +1,22 @@
+""" Pytest configuration shared by all tests.
+
+The default config, database and logs live in the project root, the tests use
+a temporary directory instead so that running them does not write config.yml there.
+"""
+import shutil
+import tempfile
+
+from focuswatch.config import Config
+
+_project_root = tempfile.mkdtemp(prefix="focuswatch-test-")
+# Not a mock patch, tests calling patch.stopall() would undo it
+_get_project_root = Config.__dict__["_get_project_root"]
+
+
+def pytest_configure(config):  # pylint: disable=unused-argument
+  Config._get_project_root = staticmethod(lambda: _project_root)  # pylint: disable=protected-access
+
+
+def pytest_unconfigure(config):  # pylint: disable=unused-argument
+  Config._get_project_root = _get_project_root  # pylint: disable=protected-access
+  shutil.rmtree(_project_root, ignore_errors=True)
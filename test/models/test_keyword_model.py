@@ -53,6 +53,27 @@ class TestKeyword(unittest.TestCase):
     self.assertTrue(partial_keyword.matches("Best case scenario"))
     self.assertFalse(partial_keyword.matches("Worst case"))
 
+  def test_whole_word_match(self):
+    """ Test whole word keywords, including keywords ending with punctuation. """
+    word_keyword = Keyword(name="code", match_type=Keyword.MATCH_WORD)
+    self.assertTrue(word_keyword.matches("Visual Studio Code"))
+    self.assertTrue(word_keyword.matches("code.py"))
+    self.assertFalse(word_keyword.matches("barcode scanner"))
+    self.assertTrue(Keyword(name="c++", match_type=Keyword.MATCH_WORD).matches("learn c++ now"))
+
+  def test_regex_match(self):
+    """ Test regex keywords, an invalid expression never matches. """
+    regex_keyword = Keyword(name=r"^issue #\d+", match_type=Keyword.MATCH_REGEX)
+    self.assertTrue(regex_keyword.matches("Issue #42 - Tracker"))
+    self.assertFalse(regex_keyword.matches("See issue #42"))
+    self.assertFalse(Keyword(name="(", match_type=Keyword.MATCH_REGEX).matches("("))
+
+  def test_target_text(self):
+    """ Test the part of the window title each target matches against. """
+    self.assertEqual(Keyword(name="x").target_text("code", "main.py"), "code main.py")
+    self.assertEqual(Keyword(name="x", target=Keyword.TARGET_CLASS).target_text("code", "main.py"), "code")
+    self.assertEqual(Keyword(name="x", target=Keyword.TARGET_NAME).target_text("code", "main.py"), "main.py")
+
 
 if __name__ == "__main__":
   unittest.main()
@@ -0,0 +1,57 @@
+""" Unit tests for ActivityService.search and the window title search index """
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from focuswatch.database.database_connection import DatabaseConnection
+from focuswatch.database.database_manager import DatabaseManager
+from focuswatch.database.models.activity import Activity
+from focuswatch.services.activity_service import ActivityService
+
+
+class TestActivitySearch(unittest.TestCase):
+  """ Unit tests for ActivityService.search """
+
+  def setUp(self):
+    self.temp_dir = tempfile.TemporaryDirectory()
+    DatabaseConnection._initialize_engine(  # pylint: disable=protected-access
+      os.path.join(self.temp_dir.name, "search.sqlite"))
+    DatabaseManager()
+    self.service = ActivityService()
+    self._add("firefox", "GitHub - focuswatch", 10, 30)
+    self._add("firefox", "GitHub - focuswatch", 11, 10)
+    self._add("code", "search_view.py - focuswatch", 12, 20)
+    self._add("firefox", "YouTube", 13, 5, day=29)
+
+  def tearDown(self):
+    DatabaseConnection().close_engine()
+    self.temp_dir.cleanup()
+
+  def _add(self, window_class, window_name, hour, minutes, day=30):
+    self.assertTrue(self.service.insert_activity(Activity(
+      datetime(2024, 6, day, hour), datetime(2024, 6, day, hour, minutes),
+      window_class, window_name)))
+
+  def test_substring_search_with_totals(self):
+    results = self.service.search("FOCUS")
+
+    self.assertEqual([(c, n) for c, n, _ in results], [
+      ("firefox", "GitHub - focuswatch"), ("code", "search_view.py - focuswatch")])
+    self.assertAlmostEqual(results[0][2], 40 * 60, delta=1)
+
+  def test_search_matches_class_and_period(self):
+    self.assertEqual([n for _, n, _ in self.service.search("firefox")],
+                     ["GitHub - focuswatch", "YouTube"])
+    self.assertEqual([n for _, n, _ in self.service.search("firefox", datetime(2024, 6, 29))],
+                     ["YouTube"])
+
+  def test_short_and_special_queries(self):
+    self.assertEqual([n for _, n, _ in self.service.search("_v")],
+                     ["search_view.py - focuswatch"])
+    self.assertEqual(self.service.search('"OR*'), [])
+    self.assertEqual(self.service.search("  "), [])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,162 @@
+""" Unit tests for focuswatch.services.activity_service """
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from focuswatch.database.models import Base
+from focuswatch.database.models.activity import Activity
+from focuswatch.database.models.category import Category
+from focuswatch.database.models.metadata import Metadata
+from focuswatch.database.models.uncategorized_total import UncategorizedTotal
+from focuswatch.services.activity_service import ActivityService
+
+
+class TestUncategorizedTotals(unittest.TestCase):
+  """ Unit tests for the uncategorized totals rollup and its keyset pagination """
+
+  def setUp(self):
+    self.engine = create_engine("sqlite://")
+    Base.metadata.create_all(self.engine)
+    with self.engine.begin() as connection:
+      connection.execute(insert(Category.__table__), [
+        {"id": 1, "name": "Work"}, {"id": 2, "name": "Uncategorized"}])
+    # Five classes of 100..500 seconds, plus a categorized and a short one
+    for minutes, window_class in enumerate("abcde", start=1):
+      self._add(window_class, minutes * 100)
+    self._add("work", 1000, category_id=1)
+    self._add("short", 10, category_id=2)
+
+    db_conn = MagicMock()
+    db_conn.get_session.side_effect = sessionmaker(bind=self.engine)
+    self.service = ActivityService(db_conn=db_conn)
+
+  def _add(self, window_class, seconds, category_id=None):
+    with self.engine.begin() as connection:
+      connection.execute(insert(Activity.__table__), {
+        "time_start": "2024-06-30T10:00:00",
+        "time_stop": f"2024-06-30T10:{seconds // 60:02d}:{seconds % 60:02d}",
+        "window_class": window_class, "window_name": f"{window_class} title",
+        "category_id": category_id, "focused": False})
+
+  def _all_pages(self, kind="class", limit=2):
+    entries, cursor = self.service.get_uncategorized_totals_page(kind, limit)
+    while cursor:
+      page, cursor = self.service.get_uncategorized_totals_page(kind, limit, cursor)
+      entries.extend(page)
+    return [name for name, _ in entries]
+
+  def test_keyset_pages_match_ranking(self):
+    self.assertEqual(self._all_pages(), ["e", "d", "c", "b", "a"])
+    self.assertEqual(self._all_pages("name", limit=3)[0], "e title")
+    first = self.service.get_top_uncategorized_window_classes(limit=1)
+    self.assertEqual([name for name, _ in self.service.get_top_uncategorized_window_classes(
+      limit=2, after=(first[0][1], first[0][0]))], ["d", "c"])
+
+  def test_new_activities_are_folded_in(self):
+    self._all_pages()
+    self._add("c", 400)
+
+    self.assertEqual(self._all_pages(), ["c", "e", "d", "b", "a"])
+
+  def test_recategorization_updates_totals(self):
+    self._all_pages()
+    self.service.bulk_update_category_by_name("d", 1)
+    self.service.bulk_update_category_by_name("work", 2)
+
+    self.assertEqual(self._all_pages(), ["work", "e", "c", "b", "a"])
+
+  def test_recreated_uncategorized_category(self):
+    self._all_pages()
+    with self.engine.begin() as connection:
+      connection.execute(Category.__table__.update().where(Category.id == 2).values(name="Old"))
+      connection.execute(insert(Category.__table__), {"id": 3, "name": "Uncategorized"})
+    self.service.bulk_update_category_by_name("d", 3)
+    self.service.bulk_update_category_by_name("e", 2)
+
+    self.assertEqual(self._all_pages(), ["d", "c", "b", "a"])
+
+
+
+class TestOpenActivity(unittest.TestCase):
+  """ Unit tests for the open activity row written by the watcher """
+
+  def setUp(self):
+    self.engine = create_engine("sqlite://")
+    Base.metadata.create_all(self.engine)
+    with self.engine.begin() as connection:
+      connection.execute(insert(Category.__table__), [
+        {"id": 1, "name": "Work"}, {"id": 2, "name": "Uncategorized"}, {"id": 3, "name": "AFK"}])
+    db_conn = MagicMock()
+    db_conn.engine = self.engine
+    db_conn.get_session.side_effect = sessionmaker(bind=self.engine)
+    self.service = ActivityService(db_conn=db_conn)
+    self.start = datetime(2024, 6, 30, 10)
+
+  def _open(self, category_id=2):
+    return self.service.open_activity(
+      Activity(self.start, self.start, "code", "main.py", category_id))
+
+  def _rows(self):
+    with self.engine.connect() as connection:
+      return connection.execute(Activity.__table__.select().with_only_columns(
+        Activity.time_stop, Activity.window_class, Activity.category_id)).all()
+
+  def _open_id(self):
+    with sessionmaker(bind=self.engine)() as session:
+      row = session.get(Metadata, ActivityService.OPEN_ACTIVITY_KEY)
+      return row and int(row.value)
+
+  def test_heartbeat_and_close(self):
+    activity_id = self._open()
+    self.assertEqual(self._open_id(), activity_id)
+
+    self.service.heartbeat_activity(activity_id, self.start, datetime(2024, 6, 30, 10, 5))
+    self.assertEqual(self._rows(), [("2024-06-30T10:05:00", "code", 2)])
+
+    self.service.close_activity(activity_id, Activity(
+      self.start, datetime(2024, 6, 30, 10, 6), "afk", "afk", 3))
+    self.assertEqual(self._rows(), [("2024-06-30T10:06:00", "afk", 3)])
+    self.assertIsNone(self._open_id())
+
+  def test_open_activity_is_not_folded_into_uncategorized_totals(self):
+    activity_id = self._open()
+    self.service.heartbeat_activity(activity_id, self.start, datetime(2024, 6, 30, 10, 5))
+    self.assertEqual(self.service.get_top_uncategorized_window_classes(), [])
+
+    self.service.close_activity(activity_id, Activity(
+      self.start, datetime(2024, 6, 30, 10, 10), "code", "main.py", 2))
+    self.assertEqual(self.service.get_top_uncategorized_window_classes(), [("code", 600)])
+
+  def test_recovery(self):
+    activity_id = self._open()
+    self.service.heartbeat_activity(activity_id, self.start, datetime(2024, 6, 30, 10, 5))
+
+    self.assertEqual(self.service.recover_open_activity(), activity_id)
+    self.assertIsNone(self._open_id())
+    self.assertEqual(self._rows(), [("2024-06-30T10:05:00", "code", 2)])
+    self.assertIsNone(self.service.recover_open_activity())
+
+  def test_recovery_drops_activity_without_heartbeat(self):
+    self._open()
+
+    self.service.recover_open_activity()
+    self.assertEqual(self._rows(), [])
+
+  def test_recovery_rebuilds_totals_of_dropped_activity(self):
+    activity_id = self._open()
+    # A stale rollup that already counted the row
+    with self.engine.begin() as connection:
+      connection.execute(insert(UncategorizedTotal.__table__),
+                         {"kind": "class", "name": "code", "total_seconds": 300})
+      connection.execute(insert(Metadata.__table__),
+                         {"key": ActivityService.UNCATEGORIZED_WATERMARK_KEY, "value": str(activity_id)})
+
+    self.service.recover_open_activity()
+    self.assertEqual(self.service.get_top_uncategorized_window_classes(), [])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,99 @@
+""" Unit tests for focuswatch.database.analytics_engine """
+import importlib.util
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine, insert
+
+from focuswatch.database import queries
+from focuswatch.database.analytics_engine import AnalyticsEngine
+from focuswatch.database.models import Base
+from focuswatch.database.models.activity import Activity
+
+HAS_DUCKDB = importlib.util.find_spec("duckdb") is not None
+
+
+def _sqlite_extension_loads() -> bool:
+  """ Whether DuckDB's sqlite extension is installed locally, it is never downloaded. """
+  import duckdb  # pylint: disable=import-outside-toplevel
+  connection = duckdb.connect(config={"autoinstall_known_extensions": False})
+  try:
+    connection.execute("LOAD sqlite")
+    return True
+  except duckdb.Error:
+    return False
+  finally:
+    connection.close()
+
+
+class TestAnalyticsEngine(unittest.TestCase):
+  """ Unit tests for AnalyticsEngine """
+
+  @classmethod
+  def setUpClass(cls):
+    cls.has_sqlite_extension = HAS_DUCKDB and _sqlite_extension_loads()
+
+  def setUp(self):
+    self.temp_dir = tempfile.TemporaryDirectory()
+    self.engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir.name, "analytics.sqlite")}")
+    Base.metadata.create_all(self.engine)
+    start = datetime(2024, 1, 1, 9)
+    with self.engine.begin() as connection:
+      connection.execute(insert(Activity.__table__), [
+        {"time_start": (start + timedelta(days=day)).isoformat(),
+         "time_stop": (start + timedelta(days=day, minutes=10 + day % 7)).isoformat(),
+         "window_class": f"app{day % 3}", "window_name": f"title {day % 5}",
+         "category_id": day % 4 or None, "focused": False}
+        for day in range(366)])
+    self.analytics = AnalyticsEngine()
+
+  def tearDown(self):
+    self.analytics.close()
+    self.engine.dispose()
+    self.temp_dir.cleanup()
+
+  def test_short_periods_and_memory_databases_stay_on_sqlite(self):
+    self.assertIsNone(self.analytics.time_totals(self.engine, "class", datetime(2024, 6, 1), datetime(2024, 6, 7)))
+    memory_engine = create_engine("sqlite://")
+    self.assertIsNone(self.analytics.time_totals(memory_engine, "class", datetime(2024, 1, 1), datetime(2024, 12, 31)))
+
+  def test_missing_duckdb_falls_back(self):
+    self.analytics._module = False  # pylint: disable=protected-access
+    self.assertFalse(self.analytics.is_enabled())
+    self.assertIsNone(self.analytics.time_totals(self.engine, "category", datetime(2024, 1, 1), datetime(2024, 12, 31)))
+
+  def test_missing_sqlite_extension_is_not_downloaded(self):
+    duckdb = MagicMock(Error=RuntimeError)
+    connection = duckdb.connect.return_value
+    connection.execute.side_effect = RuntimeError("Extension sqlite not found")
+    self.analytics._module = duckdb  # pylint: disable=protected-access
+
+    self.assertIsNone(self.analytics.time_totals(self.engine, "class", datetime(2024, 1, 1), datetime(2024, 12, 31)))
+    executed = [call.args[0] for call in connection.execute.call_args_list]
+    self.assertEqual(executed, ["LOAD sqlite"])
+    self.assertEqual(duckdb.connect.call_args.kwargs["config"], {"autoinstall_known_extensions": False})
+
+  def test_totals_match_sqlite(self):
+    if not self.has_sqlite_extension:
+      self.skipTest("duckdb or its sqlite extension is not installed")
+    period = queries.period_params(datetime(2024, 1, 1), datetime(2024, 12, 31))
+    with self.engine.connect() as connection:
+      expected = {row[0]: int(row[-1]) for row in connection.execute(queries.CATEGORY_TIME_TOTALS, period)}
+      expected_classes = {row[0]: int(row[-1]) for row in connection.execute(queries.CLASS_TIME_TOTALS, period)}
+
+    totals = self.analytics.time_totals(self.engine, "category", datetime(2024, 1, 1), datetime(2024, 12, 31))
+    classes = self.analytics.time_totals(self.engine, "class", datetime(2024, 1, 1), datetime(2024, 12, 31))
+    self.assertIsNotNone(totals)
+    self.assertIsNotNone(classes)
+    # julianday arithmetic may truncate a second off each SQLite total
+    for actual, wanted in ((totals, expected), (classes, expected_classes)):
+      self.assertEqual({row[0] for row in actual}, wanted.keys())
+      for row in actual:
+        self.assertAlmostEqual(row[-1], wanted[row[0]], delta=1)
+
+
+if __name__ == "__main__":
+  unittest.main()
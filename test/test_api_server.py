@@ -0,0 +1,134 @@
+""" Unit tests for focuswatch.api_server """
+import http.client
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from focuswatch.api_server import ApiServer
+from focuswatch.database.database_connection import DatabaseConnection
+from focuswatch.database.database_manager import DatabaseManager
+from focuswatch.database.models.activity import Activity
+from focuswatch.services.activity_service import ActivityService
+from focuswatch.services.category_service import CategoryService
+
+
+class TestApiServer(unittest.TestCase):
+  """ Unit tests for ApiServer """
+
+  def setUp(self):
+    self.temp_dir = tempfile.TemporaryDirectory()
+    DatabaseConnection._initialize_engine(  # pylint: disable=protected-access
+      os.path.join(self.temp_dir.name, "api.sqlite"))
+    DatabaseManager()
+    self.activity_service = ActivityService()
+    self.category_service = CategoryService()
+    self.work = self.category_service.get_category_id_from_name("Work")
+    self._insert(9, "code", "main.py", self.work)
+    self._insert(10, "firefox", "news", None)
+    self._insert(11, "code", "test.py", self.work)
+
+    self.server = ApiServer(0, self.activity_service, self.category_service)
+    self.assertTrue(self.server.start())
+
+  def tearDown(self):
+    self.server.stop()
+    DatabaseConnection().close_engine()
+    self.temp_dir.cleanup()
+
+  def _insert(self, hour, window_class, window_name, category_id):
+    self.activity_service.insert_activity(Activity(
+      datetime(2024, 6, 30, hour), datetime(2024, 6, 30, hour, 30), window_class, window_name, category_id))
+
+  def _get(self, target, headers=None, method="GET"):
+    connection = http.client.HTTPConnection("127.0.0.1", self.server.port, timeout=5)
+    try:
+      connection.request(method, target, headers=headers or {})
+      response = connection.getresponse()
+      return response, response.read()
+    finally:
+      connection.close()
+
+  def test_summary_and_top_apps(self):
+    response, body = self._get("/api/summary?start=2024-06-30")
+    self.assertEqual(response.status, 200)
+    summary = json.loads(body)
+    self.assertEqual((summary["start"], summary["end"]), ("2024-06-30", "2024-06-30"))
+    # Totals are truncated to whole seconds
+    self.assertAlmostEqual(summary["total_seconds"], 3 * 1800, delta=2)
+    self.assertAlmostEqual(summary["focused_seconds"], 2 * 1800, delta=1)
+    self.assertEqual([(category["id"], category["name"]) for category in summary["categories"]],
+                     [(self.work, "Work")])
+
+    _, body = self._get("/api/top/apps?start=2024-06-01&end=2024-06-30&limit=1")
+    apps = json.loads(body)["apps"]
+    self.assertEqual([(app["window_class"], app["category_id"]) for app in apps], [("code", self.work)])
+
+  def test_activities_are_streamed(self):
+    response, body = self._get("/api/activities?start=2024-06-30")
+    self.assertEqual(response.getheader("Transfer-Encoding"), "chunked")
+    activities = json.loads(body)
+    self.assertEqual([activity["window_name"] for activity in activities], ["main.py", "news", "test.py"])
+    self.assertEqual(activities[0]["category"], "Work")
+    self.assertIs(activities[1]["focused"], False)
+
+    _, body = self._get("/api/activities?start=2024-07-01")
+    self.assertEqual(json.loads(body), [])
+
+  def test_etag_changes_with_the_data(self):
+    response, _ = self._get("/api/categories?start=2024-06-30")
+    etag = response.getheader("ETag")
+
+    response, body = self._get("/api/categories?start=2024-06-30", {"If-None-Match": etag})
+    self.assertEqual((response.status, body), (304, b""))
+    # Another range is another resource
+    response, _ = self._get("/api/categories?start=2024-06-29", {"If-None-Match": etag})
+    self.assertEqual(response.status, 200)
+
+    self.activity_service.bulk_update_category_by_name("news", self.work)
+    response, body = self._get("/api/categories?start=2024-06-30", {"If-None-Match": etag})
+    self.assertEqual(response.status, 200)
+    self.assertNotEqual(response.getheader("ETag"), etag)
+    work = next(category for category in json.loads(body)["categories"] if category["id"] == self.work)
+    self.assertAlmostEqual(work["seconds"], 3 * 1800, delta=1)
+
+  def test_etag_changes_with_the_open_activity(self):
+    activity_id = self.activity_service.open_activity(Activity(
+      datetime(2024, 6, 30, 12), datetime(2024, 6, 30, 12), "code", "open.py", self.work))
+    response, _ = self._get("/api/summary?start=2024-06-30")
+    etag = response.getheader("ETag")
+
+    # Heartbeats are not in the change log
+    self.activity_service.heartbeat_activity(activity_id, datetime(2024, 6, 30, 12),
+                                             datetime(2024, 6, 30, 12, 10))
+    response, body = self._get("/api/summary?start=2024-06-30", {"If-None-Match": etag})
+    self.assertEqual(response.status, 200)
+    self.assertAlmostEqual(json.loads(body)["total_seconds"], 3 * 1800 + 600, delta=2)
+
+  def test_invalid_requests(self):
+    self.assertEqual(self._get("/api/summary?start=30.06.2024")[0].status, 400)
+    self.assertEqual(self._get("/api/summary?start=2024-06-30&end=2024-06-01")[0].status, 400)
+    self.assertEqual(self._get("/api/top/titles?limit=0")[0].status, 400)
+    self.assertEqual(self._get("/api/unknown")[0].status, 404)
+    response, _ = self._get("/api/summary", method="POST")
+    self.assertEqual((response.status, response.getheader("Allow")), (405, "GET"))
+
+
+  def test_foreign_host_is_rejected(self):
+    self.assertEqual(self._get("/api/summary", {"Host": f"localhost:{self.server.port}"})[0].status, 200)
+    for host in (f"evil.example:{self.server.port}", "127.0.0.1:1", None):
+      connection = http.client.HTTPConnection("127.0.0.1", self.server.port, timeout=5)
+      try:
+        connection.putrequest("GET", "/api/summary", skip_host=True)
+        if host is not None:
+          connection.putheader("Host", host)
+        connection.endheaders()
+        response = connection.getresponse()
+        self.assertEqual((response.status, response.read()[:1]), (421, b"{"), host)
+      finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+  unittest.main()
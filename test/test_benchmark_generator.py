@@ -0,0 +1,53 @@
+""" Unit tests for the synthetic activity generator in benchmarks.generator """
+import unittest
+from collections import Counter
+
+from sqlalchemy import create_engine, func, select
+
+from benchmarks.generator import ActivityGenerator, populate
+from focuswatch.database.models import Base
+from focuswatch.database.models.activity import Activity
+# Registers the categories table referenced by activity.category_id
+from focuswatch.database.models.category import Category  # pylint: disable=unused-import
+
+
+class TestActivityGenerator(unittest.TestCase):
+  """ Unit tests for ActivityGenerator """
+
+  def test_same_seed_same_history(self):
+    first = list(ActivityGenerator(seed=7).generate(3))
+    second = list(ActivityGenerator(seed=7).generate(3))
+    other = list(ActivityGenerator(seed=8).generate(3))
+
+    self.assertEqual(first, second)
+    self.assertNotEqual(first, other)
+
+  def test_titles_are_skewed(self):
+    titles = Counter(row["window_name"]
+                     for row in ActivityGenerator(seed=0).generate(30)
+                     if row["window_class"] != "afk")
+    top_ten = sum(count for _, count in titles.most_common(10))
+
+    # A handful of titles dominate while the long tail stays large
+    self.assertGreater(top_ten / sum(titles.values()), 0.1)
+    self.assertGreater(len(titles), 1000)
+
+  def test_rows_are_ordered_and_well_formed(self):
+    rows = list(ActivityGenerator(seed=0).generate(2))
+    for previous, current in zip(rows, rows[1:]):
+      self.assertLessEqual(previous["time_stop"], current["time_start"])
+    self.assertTrue(all(row["time_start"] < row["time_stop"] for row in rows))
+
+  def test_populate(self):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    inserted = populate(engine, days=2, seed=0, chunk_size=100)
+
+    with engine.connect() as connection:
+      count = connection.execute(
+        select(func.count()).select_from(Activity.__table__)).scalar()  # pylint: disable=not-callable
+    self.assertEqual(count, inserted)
+
+
+if __name__ == "__main__":
+  unittest.main()
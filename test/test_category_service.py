@@ -0,0 +1,199 @@
+""" Unit tests for focuswatch.services.category_service """
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import yaml
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from focuswatch.database.database_connection import DatabaseConnection
+from focuswatch.database.database_manager import DatabaseManager
+from focuswatch.database.models import Base
+from focuswatch.database.models.activity import Activity
+from focuswatch.database.models.category import Category
+from focuswatch.database.models.keyword import Keyword
+from focuswatch.services.activity_service import ActivityService
+from focuswatch.services.categorization_service import CategorizationService
+from focuswatch.services.category_service import CategoryService
+from focuswatch.services.classifier_service import ClassifierService
+from focuswatch.services.keyword_service import KeywordService
+
+
+class TestCategoryRollup(unittest.TestCase):
+  """ Unit tests for CategoryService.get_period_category_rollup """
+
+  def setUp(self):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+      connection.execute(insert(Category.__table__), [
+        {"id": 1, "name": "Work", "parent_category_id": None},
+        {"id": 2, "name": "Programming", "parent_category_id": 1},
+        {"id": 3, "name": "Python", "parent_category_id": 2},
+        {"id": 4, "name": "Media", "parent_category_id": None},
+      ])
+      connection.execute(insert(Activity.__table__), [
+        self._activity("2024-06-30T10:00:00", "2024-06-30T10:01:00", 2),
+        self._activity("2024-06-30T11:00:00", "2024-06-30T11:02:00", 3),
+        self._activity("2024-06-30T12:00:00", "2024-06-30T12:00:30", 1),
+        self._activity("2024-06-29T12:00:00", "2024-06-29T13:00:00", 4),
+      ])
+
+    db_conn = MagicMock()
+    db_conn.get_session.side_effect = sessionmaker(bind=engine)
+    self.service = CategoryService(db_conn=db_conn, keyword_service=MagicMock())
+
+  @staticmethod
+  def _activity(start, stop, category_id):
+    return {"time_start": start, "time_stop": stop, "window_class": "app",
+            "window_name": "title", "category_id": category_id, "focused": False}
+
+  def test_rollup_for_day(self):
+    rollup = {category.id: (self_time, subtree_time)
+              for category, self_time, subtree_time
+              in self.service.get_period_category_rollup(datetime(2024, 6, 30))}
+
+    # julianday arithmetic may truncate a second off each total
+    expected = {1: (30, 210), 2: (60, 180), 3: (120, 120)}
+    self.assertEqual(rollup.keys(), expected.keys())
+    for category_id, times in expected.items():
+      for actual, wanted in zip(rollup[category_id], times):
+        self.assertAlmostEqual(actual, wanted, delta=1)
+
+  def test_rollup_for_period_is_sorted(self):
+    rollup = self.service.get_period_category_rollup(
+      datetime(2024, 6, 29), datetime(2024, 6, 30))
+
+    self.assertEqual([category.id for category, _, _ in rollup], [4, 1, 2, 3])
+    self.assertAlmostEqual(rollup[0][2], 3600, delta=1)
+
+
+
+class TestCategoryImport(unittest.TestCase):
+  """ Unit tests for the diff-based CategoryService.import_categories_from_yml """
+
+  def setUp(self):
+    self.temp_dir = tempfile.TemporaryDirectory()
+    DatabaseConnection._initialize_engine(  # pylint: disable=protected-access
+      os.path.join(self.temp_dir.name, "categories.sqlite"))
+    DatabaseManager()
+    self.keyword_service = KeywordService()
+    self.service = CategoryService(keyword_service=self.keyword_service)
+    self.activity_service = ActivityService()
+    self.classifier = ClassifierService(self.service, self.keyword_service)
+    self.ids = {category.name: category.id for category in self.service.get_all_categories()}
+
+    for hour, (window_class, window_name) in enumerate([
+        ("steam", "Minecraft"), ("kitty", "nvim notes.txt"),
+        ("firefox", "GitHub pull request"), ("firefox", "Spotify Web Player"),
+        ("mpv", "lecture.mkv")]):
+      self.activity_service.insert_activity(Activity(
+        datetime(2024, 6, 30, 10 + hour), datetime(2024, 6, 30, 10 + hour, 30),
+        window_class, window_name,
+        self.classifier.classify_entry(window_class, window_name)))
+    # Manual corrections, only the entries affected by an import are reclassified
+    self.activity_service.bulk_update_category_by_name("Spotify Web Player", self.ids["Work"])
+    self.activity_service.bulk_update_category_by_name("lecture.mkv", self.ids["Work"])
+
+  def tearDown(self):
+    DatabaseConnection().close_engine()
+    self.temp_dir.cleanup()
+
+  def _categories(self):
+    return {(activity.window_class, activity.window_name): activity.category_id
+            for activity in self.activity_service.get_all_activities()}
+
+  def test_round_trip_changes_nothing(self):
+    changes = self.service.import_categories_from_yml(self.service.export_categories_to_yml())
+
+    self.assertFalse(changes.has_changes)
+    self.assertEqual({category.name: category.id for category in self.service.get_all_categories()},
+                     self.ids)
+
+  def test_import_applies_only_the_differences(self):
+    entries = yaml.safe_load(self.service.export_categories_to_yml())
+    by_name = {entry["name"]: entry for entry in entries}
+    by_name["Work"]["color"] = "#123456"
+    by_name["Programming"]["keywords"] = [keyword for keyword in by_name["Programming"]["keywords"]
+                                          if keyword["name"] != "vim"]
+    by_name["Music"]["keywords"].append({"name": "web player", "match_case": False})
+    entries.remove(by_name["Games"])
+    entries.append({"name": "Notes", "color": None, "focused": True,
+                    "parent_path": ["Work"], "keywords": [{"name": "notes", "match_case": False}]})
+
+    changes = self.service.import_categories_from_yml(yaml.dump(entries))
+
+    self.assertEqual(changes.added_categories, [("Work", "Notes")])
+    self.assertEqual(changes.updated_categories, [("Work",)])
+    self.assertEqual(changes.removed_categories, [("Media", "Games")])
+    self.assertEqual(sorted(changes.added_keywords),
+                     [(("Media", "Music"), "web player"), (("Work", "Notes"), "notes")])
+    self.assertEqual(changes.removed_keywords, [(("Work", "Programming"), "vim")])
+    self.assertEqual(changes.stale_category_ids, sorted([self.ids["Programming"], self.ids["Games"]]))
+    categories = {category.name: category for category in self.service.get_all_categories()}
+    self.assertNotIn("Games", categories)
+    self.assertEqual(categories["Programming"].id, self.ids["Programming"])
+    self.assertEqual(categories["Work"].color, "#123456")
+    self.assertEqual(categories["Notes"].parent_category_id, self.ids["Work"])
+
+    categorization = CategorizationService(self.activity_service, self.classifier)
+    self.assertTrue(categorization.reclassify_after_import(changes))
+    self.assertEqual(self._categories(), {
+      ("steam", "Minecraft"): self.ids["Uncategorized"],
+      ("kitty", "nvim notes.txt"): categories["Notes"].id,
+      ("firefox", "GitHub pull request"): self.ids["Programming"],
+      ("firefox", "Spotify Web Player"): self.ids["Music"],
+      ("mpv", "lecture.mkv"): self.ids["Work"],
+    })
+
+  def test_exclusion_keyword_import(self):
+    entries = yaml.safe_load(self.service.export_categories_to_yml())
+    programming = next(entry for entry in entries if entry["name"] == "Programming")
+    programming["keywords"].append({"name": "pull request", "match_case": False,
+                                    "match_type": "word", "exclude": True})
+
+    changes = self.service.import_categories_from_yml(yaml.dump(entries))
+    self.assertEqual([keyword.name for keyword in changes.changed_keywords], ["pull request"])
+    categorization = CategorizationService(self.activity_service, self.classifier)
+    self.assertTrue(categorization.reclassify_after_import(changes))
+
+    self.assertNotEqual(self._categories()[("firefox", "GitHub pull request")], self.ids["Programming"])
+    exported = yaml.safe_load(self.service.export_categories_to_yml())
+    self.assertIn({"name": "pull request", "match_case": False, "match_type": "word", "exclude": True},
+                  next(entry for entry in exported if entry["name"] == "Programming")["keywords"])
+    self.assertFalse(self.service.import_categories_from_yml(yaml.dump(exported)).has_changes)
+
+  def test_invalid_yaml_changes_nothing(self):
+    self.assertIsNone(self.service.import_categories_from_yml("- name: [unclosed"))
+    self.assertEqual({category.name: category.id for category in self.service.get_all_categories()},
+                     self.ids)
+
+
+  def test_classifier_rereads_rules_only_after_writes(self):
+    self.keyword_service.get_all_keywords = MagicMock(wraps=self.keyword_service.get_all_keywords)
+    self.classifier.classify_entry("firefox", "warmup")
+    reads = self.keyword_service.get_all_keywords.call_count
+    for _ in range(50):
+      self.classifier.classify_entry("kitty", "notes")
+    self.assertEqual(self.keyword_service.get_all_keywords.call_count, reads)
+
+    notes = self.service.create_category(Category("Notes"))
+    self.keyword_service.add_keyword(Keyword("notes", notes))
+    self.assertEqual(self.classifier.classify_entry("kitty", "notes"), notes)
+    self.assertEqual(self.keyword_service.get_all_keywords.call_count, reads + 1)
+
+  def test_retroactive_categorization(self):
+    notes = self.service.create_category(Category("Notes"))
+    self.keyword_service.add_keyword(Keyword("notes", notes, priority=1))
+
+    categorization = CategorizationService(self.activity_service, self.classifier)
+    self.assertTrue(categorization.retroactive_categorization())
+    self.assertEqual(self._categories()[("kitty", "nvim notes.txt")], notes)
+    # Manual corrections are overwritten
+    self.assertEqual(self._categories()[("firefox", "Spotify Web Player")], self.ids["Music"])
+
+if __name__ == "__main__":
+  unittest.main()
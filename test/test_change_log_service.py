@@ -0,0 +1,133 @@
+""" Unit tests for focuswatch.services.change_log_service """
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from sqlalchemy import text
+
+from focuswatch.database.database_connection import DatabaseConnection
+from focuswatch.database.database_manager import DatabaseManager
+from focuswatch.database.models.activity import Activity
+from focuswatch.services.activity_service import ActivityService
+from focuswatch.services.category_service import CategoryService
+from focuswatch.services.change_log_service import ChangeLogService
+
+
+class TestChangeLogService(unittest.TestCase):
+  """ Unit tests for ChangeLogService """
+
+  def setUp(self):
+    self.temp_dir = tempfile.TemporaryDirectory()
+    DatabaseConnection._initialize_engine(  # pylint: disable=protected-access
+      os.path.join(self.temp_dir.name, "change_log.sqlite"))
+    DatabaseManager()
+    self.service = ChangeLogService()
+    self.activity_service = ActivityService()
+    self.category_service = CategoryService()
+    self.start = self.service.latest_sequence()
+
+  def tearDown(self):
+    DatabaseConnection().close_engine()
+    self.temp_dir.cleanup()
+
+  def _insert(self, window_name, category_id=None):
+    self.activity_service.insert_activity(Activity(
+      datetime(2024, 6, 30, 10), datetime(2024, 6, 30, 11), "code", window_name, category_id))
+
+  def test_bulk_updates_are_recorded(self):
+    work = self.category_service.get_category_id_from_name("Work")
+    self._insert("one.py")
+    self._insert("two.py", work)
+
+    self.activity_service.bulk_update_category_by_name("one.py", work)
+    # Already in the category, nothing changes
+    self.activity_service.bulk_update_category_by_name("two.py", work)
+
+    changes = self.service.changes_since(self.start)
+    self.assertEqual([(change.table_name, change.operation) for change in changes],
+                     [("activity", "insert"), ("activity", "insert"), ("activity", "update")])
+    self.assertEqual(changes[0].row_id, changes[2].row_id)
+    self.assertIsNone(changes[2].old_values["category_id"])
+    self.assertEqual(changes[2].old_values["time_start"], "2024-06-30T10:00:00")
+    self.assertEqual([change.seq for change in changes], sorted(change.seq for change in changes))
+
+  def test_changes_since_watermark(self):
+    self._insert("one.py")
+    self.service.set_watermark("test", self.service.latest_sequence())
+    category_id = self.category_service.get_category_id_from_name("Games")
+    self.category_service.delete_category(category_id)
+
+    changes = self.service.changes_since(self.service.get_watermark("test"), tables=["categories"])
+    self.assertEqual([(change.row_id, change.operation) for change in changes],
+                     [(category_id, "delete")])
+    self.assertEqual(changes[0].old_values["name"], "Games")
+    self.assertEqual(self.service.changes_since(self.service.get_watermark("test"), tables=["activity"]), [])
+
+  def test_prune_keeps_unprocessed_changes(self):
+    self._insert("one.py")
+    self.service.set_watermark("slow", self.start)
+    self.service.set_watermark("fast", self.service.latest_sequence())
+    self._insert("two.py")
+
+    self.assertEqual(self.service.prune(), self.start)
+    self.assertEqual(len(self.service.changes_since(self.start)), 2)
+    self.assertTrue(self.service.is_complete_since(self.start))
+
+    self.service.remove_consumer("slow")
+    self.service.prune()
+    self.assertFalse(self.service.is_complete_since(self.start))
+    self.assertEqual(len(self.service.changes_since(0)), 1)
+
+    # Sequence numbers are not reused after pruning
+    latest = self.service.latest_sequence()
+    self._insert("three.py")
+    self.assertEqual(self.service.changes_since(latest)[0].seq, latest + 1)
+
+  def test_raw_writes_are_recorded(self):
+    activity_id = self.activity_service.open_activity(Activity(
+      datetime(2024, 6, 30, 10), datetime(2024, 6, 30, 10), "code", "open.py"))
+    with DatabaseConnection().engine.begin() as connection:
+      connection.execute(text("UPDATE activity SET window_name = 'renamed.py' WHERE id = :id"),
+                         {"id": activity_id})
+      connection.execute(text("DELETE FROM activity WHERE id = :id"), {"id": activity_id})
+
+    changes = self.service.changes_since(self.start, tables=["activity"])
+    self.assertEqual([change.operation for change in changes], ["insert", "update", "delete"])
+    self.assertEqual(changes[2].old_values["window_name"], "renamed.py")
+
+  def test_heartbeats_are_not_recorded(self):
+    activity_id = self.activity_service.open_activity(Activity(
+      datetime(2024, 6, 30, 10), datetime(2024, 6, 30, 10), "code", "open.py"))
+    for minute in range(1, 4):
+      self.activity_service.heartbeat_activity(activity_id, datetime(2024, 6, 30, 10),
+                                               datetime(2024, 6, 30, 10, minute))
+    self.assertEqual([change.operation for change in self.service.changes_since(self.start)],
+                     ["insert"])
+
+    # Closing the same window only moves time_stop, it is recorded once
+    self.activity_service.close_activity(activity_id, Activity(
+      datetime(2024, 6, 30, 10), datetime(2024, 6, 30, 10, 5), "code", "open.py"))
+    changes = self.service.changes_since(self.start)
+    self.assertEqual([change.operation for change in changes], ["insert", "update"])
+    self.assertEqual(changes[1].old_values["time_stop"], "2024-06-30T10:03:00")
+
+  def test_outdated_triggers_are_replaced(self):
+    with DatabaseConnection().engine.begin() as connection:
+      connection.execute(text("DROP TRIGGER activity_change_update"))
+      connection.execute(text(
+        "CREATE TRIGGER activity_change_update AFTER UPDATE ON activity BEGIN "
+        "INSERT INTO change_log (table_name, row_id, operation, changed_at) "
+        "VALUES ('activity', new.id, 'update', 'outdated'); END"))
+    DatabaseManager()
+
+    activity_id = self.activity_service.open_activity(Activity(
+      datetime(2024, 6, 30, 10), datetime(2024, 6, 30, 10), "code", "open.py"))
+    self.activity_service.heartbeat_activity(activity_id, datetime(2024, 6, 30, 10),
+                                             datetime(2024, 6, 30, 10, 1))
+    self.assertEqual([change.operation for change in self.service.changes_since(self.start)],
+                     ["insert"])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -64,6 +64,52 @@ class TestConfig(unittest.TestCase):
 
     self.assertIn("location", config_contents["database"])
 
+  def test_config_is_shared_per_file(self):
+    """ Config() returns the same in-memory instance for the same file. """
+    self.assertIs(Config(self.config_path), Config(self.config_path))
+    # The default file is the same file whether or not it is named
+    project_root = os.path.join(self.temp_dir.name, "project")
+    os.makedirs(project_root, exist_ok=True)
+    with mock.patch.object(Config, "_get_project_root", return_value=project_root):
+      self.assertIs(Config(), Config(os.path.join(project_root, "config.yml")))
+      self.assertEqual(Config().default_config_path, os.path.join(project_root, "config.yml"))
+
+  def test_nested_writes_are_coalesced(self):
+    """ Repeated assignments mark the config dirty and produce a single write. """
+    config = Config(self.config_path)
+    config.flush()
+    with mock.patch.object(Config, "write_config_to_file",
+                           autospec=True, side_effect=Config.write_config_to_file) as mock_write:
+      for value in range(1, 30):
+        config["general"]["watch_interval"] = float(value)
+      self.assertTrue(config.is_dirty)
+      mock_write.assert_not_called()
+      config.flush()
+      mock_write.assert_called_once()
+    self.assertFalse(config.is_dirty)
+
+    config.reload()
+    self.assertEqual(config["general"]["watch_interval"], 29.0)
+    self.assertFalse(os.path.exists(f"{self.config_path}.tmp"))
+
+  def test_subscribers_notified_of_changes(self):
+    """ Subscribers receive (section, key, value) only for changed options. """
+    config = Config(self.config_path)
+    config["general"]["afk_timeout"] = 10
+    changes = []
+
+    def on_change(section, key, value):
+      changes.append((section, key, value))
+
+    config.subscribe(on_change)
+    try:
+      config["general"]["afk_timeout"] = 15
+      config["general"]["afk_timeout"] = 15
+    finally:
+      config.unsubscribe(on_change)
+      config.flush()
+    self.assertEqual(changes, [("general", "afk_timeout", 15)])
+
 
 if __name__ == "__main__":
   unittest.main()
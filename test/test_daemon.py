@@ -0,0 +1,63 @@
+""" Unit tests for the headless daemon in focuswatch.daemon """
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from focuswatch.daemon import HAS_UNIX_SOCKETS, FocusWatchDaemon, query_status
+
+
+class TestFocusWatchDaemon(unittest.TestCase):
+  """ Unit tests for FocusWatchDaemon """
+
+  def setUp(self):
+    self.temp_dir = tempfile.TemporaryDirectory()
+    self.config = {
+      "daemon": {
+        "status_socket": os.path.join(self.temp_dir.name, "focuswatch.sock"),
+        "status_port": 0,
+      }
+    }
+    self.watcher = MagicMock()
+    self.watcher.get_status.return_value = {
+      "running": True, "window_class": "kitty", "window_name": "vim"}
+    self.daemon = FocusWatchDaemon(self.watcher, self.config)
+
+  def tearDown(self):
+    self.daemon.stop_status_server()
+    self.temp_dir.cleanup()
+
+  def test_daemon_does_not_import_pyside(self):
+    """ The daemon module must stay importable without Qt. """
+    code = "import sys, focuswatch.daemon; print('PySide6' in sys.modules)"
+    output = subprocess.check_output(
+      [sys.executable, "-c", code], cwd=os.getcwd(), encoding="utf-8")
+    self.assertEqual(output.strip(), "False")
+
+  @unittest.skipUnless(HAS_UNIX_SOCKETS, "requires unix domain sockets")
+  def test_status_socket_roundtrip(self):
+    """ A client connecting to the status socket receives the daemon status. """
+    self.daemon.start_status_server()
+    status = query_status(self.config)
+
+    self.assertIsNotNone(status)
+    self.assertEqual(status["pid"], os.getpid())
+    self.assertEqual(status["watcher"]["window_class"], "kitty")
+
+  def test_query_status_without_daemon(self):
+    """ Querying with no daemon running returns None. """
+    if HAS_UNIX_SOCKETS:
+      self.assertIsNone(query_status(self.config, timeout=0.1))
+
+  def test_run_stops_status_server(self):
+    """ run() returns once the watcher stops and tears the socket down. """
+    with patch.object(FocusWatchDaemon, "install_signal_handlers"):
+      self.assertEqual(self.daemon.run(), 0)
+    self.watcher.monitor.assert_called_once()
+    self.assertFalse(os.path.exists(self.config["daemon"]["status_socket"]))
+
+
+if __name__ == "__main__":
+  unittest.main()
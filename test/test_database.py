@@ -0,0 +1,57 @@
+""" Unit tests for focuswatch.database """
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+
+from focuswatch.database.database_connection import DatabaseConnection
+from focuswatch.database.database_manager import DatabaseManager
+from focuswatch.services.activity_service import ActivityService
+from focuswatch.utils.instrumentation import metrics
+
+
+class TestDatabaseConnection(unittest.TestCase):
+  """ Unit tests for the pooled connections of DatabaseConnection """
+
+  def setUp(self):
+    self.temp_dir = tempfile.TemporaryDirectory()
+    DatabaseConnection._initialize_engine(  # pylint: disable=protected-access
+      os.path.join(self.temp_dir.name, "connection.sqlite"))
+    DatabaseManager()
+    self.engine = DatabaseConnection().engine
+    self.activity_service = ActivityService()
+
+  def tearDown(self):
+    DatabaseConnection().close_engine()
+    self.temp_dir.cleanup()
+
+  def test_checkouts_are_not_pinged(self):
+    with metrics.refresh("test.refresh"):
+      for day in range(1, 4):
+        self.activity_service.get_period_entries(datetime(2024, 5, day))
+
+    values = metrics.snapshot()["values"]
+    self.assertEqual(values["test.refresh.checkouts"]["count"], values["test.refresh.pings"]["count"])
+    self.assertGreaterEqual(values["test.refresh.checkouts"]["max"], 3)
+    self.assertEqual(values["test.refresh.pings"]["max"], 0)
+
+  def test_connections_are_reused(self):
+    with self.engine.connect() as connection:
+      first = connection.connection.dbapi_connection
+    with self.engine.connect() as connection:
+      self.assertIs(connection.connection.dbapi_connection, first)
+
+    def query_from_thread():
+      with self.engine.connect() as connection:
+        connection.exec_driver_sql("SELECT 1")
+    thread = threading.Thread(target=query_from_thread)
+    thread.start()
+    thread.join()
+
+    with self.engine.connect() as connection:
+      self.assertIs(connection.connection.dbapi_connection, first)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,86 @@
+""" Unit tests for ExportService """
+import csv
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from focuswatch.database.database_connection import DatabaseConnection
+from focuswatch.database.database_manager import DatabaseManager
+from focuswatch.database.models.activity import Activity
+from focuswatch.services.activity_service import ActivityService
+from focuswatch.services.export_service import ExportService
+
+
+class TestExportService(unittest.TestCase):
+  """ Unit tests for ExportService """
+
+  def setUp(self):
+    self.temp_dir = tempfile.TemporaryDirectory()
+    DatabaseConnection._initialize_engine(  # pylint: disable=protected-access
+      os.path.join(self.temp_dir.name, "export.sqlite"))
+    DatabaseManager()
+    self.service = ExportService()
+    activity_service = ActivityService()
+    for day in (28, 29, 30):
+      for hour in range(5):
+        self.assertTrue(activity_service.insert_activity(Activity(
+          datetime(2024, 6, day, 10 + hour), datetime(2024, 6, day, 10 + hour, 30),
+          "code", f"module_{day}_{hour}.py", focused=hour == 0)))
+
+  def tearDown(self):
+    DatabaseConnection().close_engine()
+    self.temp_dir.cleanup()
+
+  def _path(self, name):
+    return os.path.join(self.temp_dir.name, name)
+
+  def test_csv_export_in_chunks(self):
+    progress = []
+    exported = self.service.export(self._path("activities.csv"), chunk_size=4,
+                                   progress_callback=lambda done, total: progress.append(done))
+
+    self.assertEqual(exported, 15)
+    self.assertEqual(progress, [4, 8, 12, 15])
+    with open(self._path("activities.csv"), encoding="utf-8", newline="") as export_file:
+      rows = list(csv.DictReader(export_file))
+    self.assertEqual(len(rows), 15)
+    self.assertEqual(rows[0]["window_name"], "module_28_0.py")
+    self.assertEqual(rows[0]["time_start"], "2024-06-28T10:00:00")
+    self.assertEqual(rows[0]["focused"], "True")
+    self.assertFalse(os.path.exists(self._path("activities.csv.part")))
+
+  def test_jsonl_export_of_a_period(self):
+    exported = self.service.export(self._path("activities.jsonl"),
+                                   period_start=datetime(2024, 6, 29),
+                                   period_end=datetime(2024, 6, 30))
+
+    self.assertEqual(exported, 10)
+    with open(self._path("activities.jsonl"), encoding="utf-8") as export_file:
+      rows = [json.loads(line) for line in export_file]
+    self.assertEqual(list(rows[0]), list(ExportService.COLUMNS))
+    self.assertEqual({row["time_start"][:10] for row in rows}, {"2024-06-29", "2024-06-30"})
+    self.assertIs(rows[0]["focused"], True)
+    self.assertIsNone(rows[0]["category"])
+
+  def test_writer_error_removes_partial_file(self):
+    with patch.object(ExportService, "_record", side_effect=TypeError("not serializable")):
+      with self.assertRaises(TypeError):
+        self.service.export(self._path("activities.jsonl"))
+    self.assertFalse(os.path.exists(self._path("activities.jsonl.part")))
+    self.assertFalse(os.path.exists(self._path("activities.jsonl")))
+
+  def test_unsupported_format(self):
+    self.assertIsNone(self.service.export(self._path("activities.xlsx")))
+    self.assertFalse(os.path.exists(self._path("activities.xlsx")))
+
+  @unittest.skipIf(ExportService.is_parquet_available(), "pyarrow is installed")
+  def test_parquet_requires_pyarrow(self):
+    self.assertNotIn("parquet", ExportService.available_formats())
+    self.assertIsNone(self.service.export(self._path("activities.parquet")))
+
+
+if __name__ == "__main__":
+  unittest.main()
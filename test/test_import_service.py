@@ -0,0 +1,159 @@
+""" Unit tests for ImportService """
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from focuswatch.database.database_connection import DatabaseConnection
+from focuswatch.database.database_manager import DatabaseManager
+from focuswatch.database.models.activity import Activity
+from focuswatch.services.activity_service import ActivityService
+from focuswatch.services.change_log_service import ChangeLogService
+from focuswatch.services.export_service import ExportService
+from focuswatch.services.import_service import ImportService
+
+
+class TestImportService(unittest.TestCase):
+  """ Unit tests for ImportService """
+
+  def setUp(self):
+    self.temp_dir = tempfile.TemporaryDirectory()
+    DatabaseConnection._initialize_engine(  # pylint: disable=protected-access
+      os.path.join(self.temp_dir.name, "import.sqlite"))
+    DatabaseManager()
+    self.service = ImportService()
+    self.activity_service = ActivityService()
+    self.activity_service.insert_activity(Activity(
+      datetime(2024, 6, 30, 10), datetime(2024, 6, 30, 11), "code", "existing.py"))
+
+  def tearDown(self):
+    DatabaseConnection().close_engine()
+    self.temp_dir.cleanup()
+
+  def _path(self, name):
+    return os.path.join(self.temp_dir.name, name)
+
+  def _activities(self):
+    with DatabaseConnection().engine.connect() as connection:
+      return connection.execute(text(
+        "SELECT time_start, time_stop, window_class, window_name FROM activity "
+        "ORDER BY time_start, id")).all()
+
+  def _write_jsonl(self, name, records):
+    with open(self._path(name), "w", encoding="utf-8") as import_file:
+      for start, stop, window_class, window_name in records:
+        import_file.write(json.dumps({
+          "time_start": start, "time_stop": stop, "window_class": window_class,
+          "window_name": window_name, "focused": False}) + "\n")
+    return self._path(name)
+
+  def test_overlaps_are_trimmed(self):
+    path = self._write_jsonl("dump.jsonl", [
+      ("2024-06-30T09:30:00", "2024-06-30T10:30:00", "firefox", "before"),
+      ("2024-06-30T10:15:00", "2024-06-30T10:45:00", "firefox", "covered"),
+      ("2024-06-30T10:50:00", "2024-06-30T11:10:00", "firefox", "after"),
+      ("2024-06-30T11:05:00", "2024-06-30T11:20:00", "firefox", "in file"),
+      ("2024-06-30T12:00:00", "2024-06-30T11:00:00", "firefox", "invalid"),
+    ])
+
+    result = self.service.import_file(path, chunk_size=2)
+
+    self.assertEqual(result, (5, 3, 2))
+    self.assertEqual([(start[11:16], stop[11:16], name) for start, stop, _, name in self._activities()], [
+      ("09:30", "10:00", "before"),
+      ("10:00", "11:00", "existing.py"),
+      ("11:00", "11:10", "after"),
+      ("11:10", "11:20", "in file"),
+    ])
+    with DatabaseConnection().engine.connect() as connection:
+      self.assertEqual(connection.execute(text(
+        "SELECT COUNT(*) FROM activity WHERE category_id IS NULL")).scalar(), 1)
+
+  def test_reimporting_an_export_adds_nothing(self):
+    path = self._path("export.csv")
+    ExportService().export(path)
+
+    result = self.service.import_file(path)
+
+    self.assertEqual(result, (1, 0, 1))
+    self.assertEqual(len(self._activities()), 1)
+
+  def test_activitywatch_export(self):
+    start = datetime(2024, 6, 29, 8, tzinfo=timezone.utc)
+    local = start.astimezone().replace(tzinfo=None)
+    with open(self._path("aw-export.json"), "w", encoding="utf-8") as import_file:
+      json.dump({"buckets": {
+        "aw-watcher-window_host": {"type": "currentwindow", "events": [
+          {"timestamp": start.isoformat(), "duration": 1800,
+           "data": {"app": "Firefox", "title": "GitHub"}}]},
+        "aw-watcher-afk_host": {"type": "afkstatus", "events": [
+          {"timestamp": start.isoformat(), "duration": 600, "data": {"status": "afk"}},
+          {"timestamp": start.isoformat(), "duration": 60, "data": {"status": "not-afk"}}]},
+        "aw-watcher-web": {"type": "web.tab.current", "events": [{}]},
+      }}, import_file)
+
+    result = self.service.import_file(self._path("aw-export.json"))
+
+    self.assertEqual(result, (3, 2, 1))
+    self.assertEqual(self._activities()[:2], [
+      (local.isoformat(), local.replace(minute=10).isoformat(), "afk", "afk"),
+      (local.replace(minute=10).isoformat(), local.replace(minute=30).isoformat(),
+       "Firefox", "GitHub"),
+    ])
+
+  def test_malformed_activitywatch_export(self):
+    start = datetime(2024, 6, 29, 8, tzinfo=timezone.utc).isoformat()
+    with open(self._path("list.json"), "w", encoding="utf-8") as import_file:
+      json.dump([{"timestamp": start}], import_file)
+    with open(self._path("null-app.json"), "w", encoding="utf-8") as import_file:
+      json.dump({"type": "currentwindow", "events": [
+        {"timestamp": start, "duration": 60, "data": {"app": None, "title": None}}]}, import_file)
+
+    self.assertIsNone(self.service.import_file(self._path("list.json")))
+    self.assertEqual(self.service.import_file(self._path("null-app.json")), (1, 1, 0))
+    self.assertEqual(self._activities()[0][2:], ("", ""))
+
+  def test_window_titles_are_indexed(self):
+    path = self._write_jsonl("dump.jsonl", [
+      ("2024-06-28T09:00:00", "2024-06-28T10:00:00", "code", "import_service.py")])
+
+    self.service.import_file(path)
+
+    results = self.activity_service.search("import_serv")
+    self.assertEqual([name for _, name, _ in results], ["import_service.py"])
+
+  def test_imported_activities_are_in_the_change_log(self):
+    change_log = ChangeLogService()
+    watermark = change_log.latest_sequence()
+    path = self._write_jsonl("dump.jsonl", [
+      ("2024-06-28T09:00:00", "2024-06-28T10:00:00", "code", "first.py"),
+      ("2024-06-28T10:00:00", "2024-06-28T11:00:00", "code", "second.py")])
+
+    self.service.import_file(path)
+    self.activity_service.insert_activity(Activity(
+      datetime(2024, 6, 27, 9), datetime(2024, 6, 27, 10), "code", "after_import.py"))
+
+    changes = change_log.changes_since(watermark)
+    self.assertEqual([change.operation for change in changes], ["insert"] * 3)
+    self.assertEqual([change.row_id for change in changes],
+                     sorted(change.row_id for change in changes))
+
+  def test_failed_import_leaves_history_untouched(self):
+    path = self._write_jsonl("dump.jsonl", [
+      ("2024-06-28T09:00:00", "2024-06-28T10:00:00", "code", "first.py")])
+    with open(path, "a", encoding="utf-8") as import_file:
+      import_file.write("not json\n")
+
+    self.assertIsNone(self.service.import_file(path, chunk_size=1))
+    self.assertEqual(len(self._activities()), 1)
+    # The window title trigger is restored
+    self.activity_service.insert_activity(Activity(
+      datetime(2024, 6, 27, 9), datetime(2024, 6, 27, 10), "code", "after_failure.py"))
+    self.assertEqual(len(self.activity_service.search("after_failure")), 1)
+
+
+if __name__ == "__main__":
+  unittest.main()
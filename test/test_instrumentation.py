@@ -0,0 +1,76 @@
+""" Unit tests for focuswatch.utils.instrumentation """
+import json
+import logging
+import unittest
+
+from sqlalchemy import create_engine, text
+
+from focuswatch.logger import MyJSONFormatter
+from focuswatch.utils.instrumentation import Metrics, instrument_engine
+
+
+class TestMetrics(unittest.TestCase):
+  """ Unit tests for the Metrics registry """
+
+  def setUp(self):
+    self.metrics = Metrics()
+
+  def test_percentiles(self):
+    for ms in range(1, 101):
+      self.metrics.record("op", ms / 1000)
+    stats = self.metrics.snapshot()["timings"]["op"]
+
+    self.assertEqual(stats["count"], 100)
+    self.assertAlmostEqual(stats["p50"], 50.0)
+    self.assertAlmostEqual(stats["p95"], 95.0)
+    self.assertAlmostEqual(stats["max"], 100.0)
+
+  def test_timed_decorator_uses_qualname(self):
+    @self.metrics.timed()
+    def compute():
+      return 42
+
+    self.assertEqual(compute(), 42)
+    self.assertIn(compute.__qualname__, self.metrics.snapshot()["timings"])
+
+  def test_refresh_counts_queries(self):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, self.metrics)
+
+    with engine.connect() as connection:
+      connection.execute(text("SELECT 1"))
+      with self.metrics.refresh("page.refresh"):
+        for _ in range(3):
+          connection.execute(text("SELECT 1"))
+
+    snapshot = self.metrics.snapshot()
+    self.assertEqual(snapshot["values"]["page.refresh.queries"]["max"], 3)
+    self.assertEqual(snapshot["counters"]["db.queries"], 4)
+
+  def test_refresh_counts_checkouts_and_pings(self):
+    engine = create_engine("sqlite://", pool_pre_ping=True)
+    instrument_engine(engine, self.metrics)
+
+    with self.metrics.refresh("page.refresh"):
+      for _ in range(3):
+        with engine.connect() as connection:
+          connection.execute(text("SELECT 1"))
+
+    values = self.metrics.snapshot()["values"]
+    self.assertEqual(values["page.refresh.checkouts"]["max"], 3)
+    # The first checkout opens the connection, the next ones ping it
+    self.assertEqual(values["page.refresh.pings"]["max"], 2)
+
+  def test_summary_is_structured_json(self):
+    self.metrics.record("op", 0.01)
+    formatter = MyJSONFormatter()
+    with self.assertLogs("focuswatch.utils.instrumentation", logging.INFO) as logs:
+      self.metrics.log_summary()
+
+    event = json.loads(formatter.format(logs.records[0]))
+    self.assertEqual(event["event"], "metrics.summary")
+    self.assertIn("op", event["timings"])
+
+
+if __name__ == "__main__":
+  unittest.main()
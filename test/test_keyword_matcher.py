@@ -0,0 +1,66 @@
+""" Unit tests for focuswatch.services.keyword_matcher """
+import unittest
+
+from focuswatch.database.models.keyword import Keyword
+from focuswatch.services.keyword_matcher import KeywordMatcher
+
+WORK, CODING, MEDIA = 1, 2, 3
+DEPTHS = {WORK: 0, CODING: 1, MEDIA: 0}
+
+
+class TestKeywordMatcher(unittest.TestCase):
+  """ Unit tests for KeywordMatcher """
+
+  def _match(self, keywords, window_class, window_name):
+    return KeywordMatcher(keywords, DEPTHS).match(window_class, window_name)
+
+  def test_deepest_category_wins(self):
+    keywords = [Keyword("github", WORK), Keyword("GitHub", CODING, match_case=True)]
+
+    self.assertEqual(self._match(keywords, "firefox", "GitHub - pull request"), CODING)
+    self.assertEqual(self._match(keywords, "firefox", "github.io"), WORK)
+    self.assertIsNone(self._match(keywords, "firefox", "YouTube"))
+
+  def test_priority_wins_over_depth(self):
+    keywords = [Keyword("github", CODING), Keyword("youtube", MEDIA, priority=1)]
+
+    self.assertEqual(self._match(keywords, "firefox", "GitHub on YouTube"), MEDIA)
+
+  def test_targets(self):
+    keywords = [Keyword("code", CODING, target=Keyword.TARGET_CLASS),
+                Keyword("mpv", MEDIA, target=Keyword.TARGET_NAME)]
+
+    self.assertEqual(self._match(keywords, "code", "notes.txt"), CODING)
+    self.assertIsNone(self._match(keywords, "mpv", "source code"))
+    self.assertEqual(self._match(keywords, "vlc", "mpv.conf"), MEDIA)
+
+  def test_exclusions(self):
+    keywords = [Keyword("code", CODING, match_type=Keyword.MATCH_SUBSTRING),
+                Keyword("code", WORK),
+                Keyword("barcode", CODING, exclude=True),
+                Keyword("zxing", CODING, priority=1)]
+
+    self.assertEqual(self._match(keywords, "firefox", "source code"), CODING)
+    # Falls back to the next matching category
+    self.assertEqual(self._match(keywords, "firefox", "barcode scanner"), WORK)
+    # Overridden by a keyword of higher priority
+    self.assertEqual(self._match(keywords, "firefox", "zxing barcode scanner"), CODING)
+
+  def test_whole_words(self):
+    keywords = [Keyword("code", CODING, match_type=Keyword.MATCH_WORD)]
+
+    self.assertEqual(self._match(keywords, "firefox", "Code review - GitHub"), CODING)
+    self.assertEqual(self._match(keywords, "firefox", "source code."), CODING)
+    self.assertIsNone(self._match(keywords, "firefox", "barcode scanner"))
+    self.assertIsNone(self._match(keywords, "firefox", "codec settings"))
+
+  def test_invalid_regex_is_skipped(self):
+    keywords = [Keyword("(", MEDIA, match_type=Keyword.MATCH_REGEX),
+                Keyword(r"\.py\b", CODING, match_type=Keyword.MATCH_REGEX)]
+
+    self.assertEqual(self._match(keywords, "code", "main.py - focuswatch"), CODING)
+    self.assertIsNone(self._match(keywords, "code", "main.pyc ("))
+
+
+if __name__ == "__main__":
+  unittest.main()
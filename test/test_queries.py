@@ -0,0 +1,54 @@
+""" Unit tests for focuswatch.database.queries """
+import unittest
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert
+
+from focuswatch.database import queries
+from focuswatch.database.models import Base
+from focuswatch.database.models.activity import Activity
+
+
+class TestQueries(unittest.TestCase):
+  """ Unit tests for the prebuilt period statements """
+
+  def setUp(self):
+    self.engine = create_engine("sqlite://")
+    Base.metadata.create_all(self.engine)
+    with self.engine.begin() as connection:
+      connection.execute(insert(Activity.__table__), [
+        {"time_start": start, "time_stop": stop, "window_class": window_class,
+         "window_name": window_class, "category_id": None, "focused": False}
+        for start, stop, window_class in [
+          ("2024-06-29T23:59:00", "2024-06-30T00:00:00", "before"),
+          ("2024-06-30T00:00:00", "2024-06-30T00:10:00", "first"),
+          ("2024-06-30T23:59:00", "2024-06-30T23:59:30", "first"),
+          ("2024-07-01T00:00:00", "2024-07-01T00:01:00", "after"),
+        ]])
+
+  def _class_totals(self, *period):
+    with self.engine.connect() as connection:
+      rows = connection.execute(queries.CLASS_TIME_TOTALS, queries.period_params(*period)).all()
+    return [(window_class, category_id, round(seconds)) for window_class, category_id, seconds in rows]
+
+  def test_period_bounds(self):
+    self.assertEqual(self._class_totals(datetime(2024, 6, 30, 15)), [("first", None, 630)])
+    self.assertEqual(sorted(self._class_totals(datetime(2024, 6, 29), datetime(2024, 6, 30))),
+                     [("before", None, 60), ("first", None, 630)])
+
+  def test_compiled_statement_is_cached(self):
+    with self.engine.connect() as connection:
+      connection.execute(queries.CLASS_TIME_TOTALS, queries.period_params(datetime(2024, 6, 1)))
+      result = connection.execute(queries.CLASS_TIME_TOTALS, queries.period_params(datetime(2024, 6, 2)))
+      self.assertEqual(result.context.cache_hit, result.context.cache_hit.CACHE_HIT)
+
+  def test_period_uses_the_time_start_index(self):
+    with self.engine.connect() as connection:
+      compiled = queries.PERIOD_ENTRIES.compile(self.engine)
+      plan = connection.exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {compiled}", ("2024-06-30", "2024-07-01")).all()
+    self.assertIn("ix_activity_time_start", " ".join(row[-1] for row in plan))
+
+
+if __name__ == "__main__":
+  unittest.main()
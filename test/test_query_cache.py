@@ -0,0 +1,117 @@
+""" Unit tests for focuswatch.utils.query_cache """
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+
+from focuswatch.database.database_connection import DatabaseConnection
+from focuswatch.database.database_manager import DatabaseManager
+from focuswatch.database.models.activity import Activity
+from focuswatch.services.activity_service import ActivityService
+from focuswatch.services.category_service import CategoryService
+from focuswatch.utils.query_cache import QueryCache, query_cache
+
+
+class TestQueryCache(unittest.TestCase):
+  """ Unit tests for QueryCache """
+
+  def setUp(self):
+    self.cache = QueryCache(max_entries=3, max_rows=10)
+    self.calls = 0
+
+  def _get(self, day, end_day=None, rows=1):
+    def compute():
+      self.calls += 1
+      return list(range(rows))
+    return self.cache.get_or_compute(
+      "db", "kind", datetime(2024, 6, day), end_day and datetime(2024, 6, end_day), compute)
+
+  def test_hit_returns_a_copy(self):
+    first = self._get(1)
+    first.append("changed")
+
+    self.assertEqual(self._get(1), [0])
+    self.assertEqual(self.calls, 1)
+
+  def test_invalidate_drops_overlapping_periods(self):
+    self._get(1)
+    self._get(1, 7)
+    self._get(10)
+
+    self.cache.invalidate(date(2024, 6, 3))
+
+    self._get(1)
+    self._get(10)
+    self.assertEqual(self.calls, 3)
+    self._get(1, 7)
+    self.assertEqual(self.calls, 4)
+
+  def test_bounded_by_entries_and_rows(self):
+    for day in range(1, 5):
+      self._get(day)
+    self.assertEqual(len(self.cache), 3)
+
+    self._get(5, rows=9)
+    self.assertEqual(len(self.cache), 2)  # 1 + 9 rows
+    self._get(6, rows=11)  # Larger than the whole cache
+    self.assertEqual(len(self.cache), 2)
+
+  def test_result_computed_during_a_write_is_not_stored(self):
+    def compute():
+      self.cache.invalidate(date(2024, 6, 20))
+      return [1]
+
+    self.cache.get_or_compute("db", "kind", datetime(2024, 6, 1), None, compute)
+    self.assertEqual(len(self.cache), 0)
+
+
+class TestServiceCaching(unittest.TestCase):
+  """ The service aggregates are invalidated by the write paths """
+
+  def setUp(self):
+    self.temp_dir = tempfile.TemporaryDirectory()
+    DatabaseConnection._initialize_engine(  # pylint: disable=protected-access
+      os.path.join(self.temp_dir.name, "cache.sqlite"))
+    DatabaseManager()
+    self.activity_service = ActivityService()
+    self.category_service = CategoryService()
+    self.work_id = self.category_service.get_category_id_from_name("Work")
+    self._insert(datetime(2024, 6, 29, 10), "old.py")
+    self._insert(datetime(2024, 6, 30, 10), "today.py")
+
+  def tearDown(self):
+    DatabaseConnection().close_engine()
+    self.temp_dir.cleanup()
+
+  def _insert(self, start, name):
+    self.activity_service.insert_activity(Activity(
+      start, start.replace(minute=30), "code", name, self.work_id))
+
+  def _names(self, day):
+    return sorted(activity.window_name
+                  for activity in self.activity_service.get_period_entries(day))
+
+  def test_insert_invalidates_its_day_only(self):
+    self.assertEqual(self._names(datetime(2024, 6, 29)), ["old.py"])
+    self.assertEqual(self._names(datetime(2024, 6, 30)), ["today.py"])
+    cached = len(query_cache)
+
+    self._insert(datetime(2024, 6, 30, 11), "new.py")
+
+    self.assertEqual(len(query_cache), cached - 1)
+    self.assertEqual(self._names(datetime(2024, 6, 30)), ["new.py", "today.py"])
+
+  def test_recategorization_invalidates_every_period(self):
+    period = (datetime(2024, 6, 29), datetime(2024, 6, 30))
+    self.assertEqual(self.category_service.get_period_category_time_totals(*period),
+                     [(self.work_id, 3600)])
+
+    other_id = self.category_service.get_category_id_from_name("Media")
+    self.activity_service.bulk_update_category_by_name("old.py", other_id)
+
+    self.assertEqual(sorted(self.category_service.get_period_category_time_totals(*period)),
+                     sorted([(self.work_id, 1800), (other_id, 1800)]))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,87 @@
+""" Unit tests for the lazy main window and the startup profiler """
+import io
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import MagicMock
+
+from focuswatch.__main__ import LazyMainWindow
+from focuswatch.utils.profiling_utils import StartupProfiler
+
+
+class TestLazyMainWindow(unittest.TestCase):
+  """ Unit tests for LazyMainWindow """
+
+  def setUp(self):
+    self.window = MagicMock()
+    self.factory = MagicMock(return_value=self.window)
+    self.lazy_window = LazyMainWindow(self.factory, StartupProfiler())
+
+  def test_window_is_built_on_first_show(self):
+    self.factory.assert_not_called()
+    self.assertIsNone(self.lazy_window.window)
+
+    self.lazy_window.show()
+    self.lazy_window.show()
+    self.factory.assert_called_once()
+    self.assertIs(self.lazy_window.window, self.window)
+    self.assertEqual(self.window.show.call_count, 2)
+
+  def test_toggle_builds_then_hides(self):
+    self.lazy_window.toggle()
+    self.factory.assert_called_once()
+    self.window.show.assert_called_once()
+
+    self.window.isVisible.return_value = True
+    self.lazy_window.toggle()
+    self.window.hide.assert_called_once()
+
+
+class TestStartupProfiler(unittest.TestCase):
+  """ Unit tests for StartupProfiler """
+
+  def test_stages_are_recorded(self):
+    profiler = StartupProfiler()
+    with profiler.stage("PySide6", kind="import"):
+      pass
+    with self.assertRaises(RuntimeError):
+      with profiler.stage("QApplication"):
+        raise RuntimeError("failed stages are recorded too")
+
+    self.assertEqual([(kind, name) for kind, name, _ in profiler.stages],
+                     [("import", "PySide6"), ("construct", "QApplication")])
+    self.assertGreaterEqual(profiler.total("import"), 0.0)
+    self.assertEqual(profiler.total("unknown"), 0.0)
+
+  def test_report_only_when_enabled(self):
+    profiler = StartupProfiler()
+    with profiler.stage("DatabaseManager"):
+      pass
+
+    output = io.StringIO()
+    with redirect_stdout(output):
+      profiler.report()
+    self.assertEqual(output.getvalue(), "")
+    self.assertFalse(profiler.reported)
+
+    profiler.enabled = True
+    with redirect_stdout(output):
+      profiler.report()
+    self.assertIn("DatabaseManager", output.getvalue())
+    self.assertIn("[construct]", output.getvalue())
+    self.assertNotIn("[import]", output.getvalue())
+    self.assertTrue(profiler.reported)
+
+  def test_window_built_after_report_reports_again(self):
+    profiler = StartupProfiler(enabled=True)
+    with redirect_stdout(io.StringIO()):
+      profiler.report()
+    lazy_window = LazyMainWindow(MagicMock(), profiler)
+
+    output = io.StringIO()
+    with redirect_stdout(output):
+      lazy_window.show()
+    self.assertIn("Startup profile:", output.getvalue())
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,130 @@
+""" Unit tests for focuswatch.services.sync_service """
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, text
+
+from focuswatch.database.database_connection import DatabaseConnection
+from focuswatch.database.database_manager import DatabaseManager
+from focuswatch.database.models.activity import Activity
+from focuswatch.database.models.category import Category
+from focuswatch.services.activity_service import ActivityService
+from focuswatch.services.category_service import CategoryService
+from focuswatch.services.sync_service import SyncResult, SyncService
+
+
+class TestSyncService(unittest.TestCase):
+  """ Unit tests for SyncService """
+
+  def setUp(self):
+    self.temp_dir = tempfile.TemporaryDirectory()
+    self.peer_path = os.path.join(self.temp_dir.name, "laptop.sqlite")
+
+    # The laptop has a category the desktop lacks, and so gets other IDs
+    self._open(self.peer_path)
+    category_service = CategoryService()
+    reviews = category_service.create_category(
+      Category("Reviews", category_service.get_category_id_from_name("Work"), "#112233"))
+    for hour, window_name, category_id in ((9, "shared.py", None), (10, "review.md", reviews),
+                                           (11, "notes.txt", None)):
+      ActivityService().insert_activity(Activity(
+        datetime(2024, 6, 30, hour), datetime(2024, 6, 30, hour, 30), "code", window_name, category_id))
+    DatabaseConnection().close_engine()
+    self.peer = create_engine(f"sqlite:///{self.peer_path}")
+
+    self._open(os.path.join(self.temp_dir.name, "desktop.sqlite"))
+    self.category_service = CategoryService()
+    self.category_service.create_category(Category("Desktop only"))
+    self.activity_service = ActivityService()
+    self.activity_service.insert_activity(Activity(
+      datetime(2024, 6, 30, 9), datetime(2024, 6, 30, 9, 30), "code", "shared.py"))
+    self.service = SyncService()
+
+  def tearDown(self):
+    self.peer.dispose()
+    DatabaseConnection().close_engine()
+    self.temp_dir.cleanup()
+
+  @staticmethod
+  def _open(path):
+    DatabaseConnection._initialize_engine(path)  # pylint: disable=protected-access
+    DatabaseManager()
+
+  def _activities(self):
+    with DatabaseConnection().engine.connect() as connection:
+      return connection.execute(text(
+        "SELECT time_start, window_name, category_id FROM activity ORDER BY time_start")).all()
+
+  def _peer_execute(self, statement, **params):
+    with self.peer.begin() as connection:
+      connection.execute(text(statement), params)
+
+  def test_merge_maps_categories_and_skips_duplicates(self):
+    self.assertEqual(self.service.sync_file(self.peer_path), SyncResult(3, 2, 1, 0, 0))
+
+    reviews = self.category_service.get_category_by_name("Reviews")
+    self.assertEqual(self.category_service.get_category_by_id(reviews.parent_category_id).name, "Work")
+    self.assertEqual(reviews.color, "#112233")
+    self.assertEqual(self._activities(), [
+      ("2024-06-30T09:00:00", "shared.py", None),
+      ("2024-06-30T10:00:00", "review.md", reviews.id),
+      ("2024-06-30T11:00:00", "notes.txt", None),
+    ])
+    self.assertEqual([name for _, name, _ in self.activity_service.search("review")], ["review.md"])
+
+  def test_next_sync_only_reads_new_activities(self):
+    self.service.sync_file(self.peer_path)
+    self.assertEqual(self.service.sync_file(self.peer_path), SyncResult(0, 0, 0, 0, 0))
+
+    self._peer_execute(
+      "INSERT INTO activity (time_start, time_stop, window_class, window_name, focused) "
+      "VALUES ('2024-07-01T09:00:00', '2024-07-01T09:10:00', 'code', 'new.py', 0)")
+    self.assertEqual(self.service.sync_file(self.peer_path), SyncResult(1, 1, 0, 0, 0))
+    self.assertEqual(len(self._activities()), 4)
+
+  def test_peer_updates_and_deletes_are_replayed(self):
+    self.service.sync_file(self.peer_path)
+    games = self.category_service.get_category_id_from_name("Games")
+
+    self._peer_execute("UPDATE activity SET category_id = (SELECT id FROM categories WHERE name = 'Games') "
+                       "WHERE window_name = 'notes.txt'")
+    self._peer_execute("UPDATE activity SET time_stop = '2024-06-30T11:45:00' WHERE window_name = 'notes.txt'")
+    self._peer_execute("DELETE FROM activity WHERE window_name = 'review.md'")
+
+    self.assertEqual(self.service.sync_file(self.peer_path), SyncResult(0, 0, 0, 1, 1))
+    self.assertEqual(self._activities(), [
+      ("2024-06-30T09:00:00", "shared.py", None),
+      ("2024-06-30T11:00:00", "notes.txt", games),
+    ])
+
+  def test_open_activity_is_left_for_next_sync(self):
+    self._peer_execute("INSERT INTO metadata (key, value) SELECT 'open_activity_id', max(id) FROM activity")
+
+    self.assertEqual(self.service.sync_file(self.peer_path).read, 2)
+    self._peer_execute("DELETE FROM metadata WHERE key = 'open_activity_id'")
+    self.assertEqual(self.service.sync_file(self.peer_path), SyncResult(1, 1, 0, 0, 0))
+
+  def test_sync_with_itself_fails(self):
+    self.assertIsNone(self.service.sync_file(DatabaseConnection().engine.url.database))
+    self.assertIsNone(self.service.sync_file(os.path.join(self.temp_dir.name, "missing.sqlite")))
+    # The insert triggers are still in place
+    self.activity_service.insert_activity(Activity(
+      datetime(2024, 6, 29, 9), datetime(2024, 6, 29, 10), "code", "after_failure.py"))
+    self.assertEqual(len(self.activity_service.search("after_failure")), 1)
+
+
+  def test_failed_merge_creates_no_categories(self):
+    with patch.object(SyncService, "INSERT_NEW", "INSERT INTO missing_table VALUES (1)"):
+      self.assertIsNone(self.service.sync_file(self.peer_path))
+    self.assertIsNone(self.category_service.get_category_by_name("Reviews"))
+    self.assertEqual(len(self._activities()), 1)
+
+    self.assertEqual(self.service.sync_file(self.peer_path), SyncResult(3, 2, 1, 0, 0))
+    self.assertIsNotNone(self.category_service.get_category_by_name("Reviews"))
+
+
+if __name__ == "__main__":
+  unittest.main()
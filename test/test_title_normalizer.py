@@ -0,0 +1,92 @@
+""" Unit tests for focuswatch.services.title_normalizer """
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from focuswatch.database.models import Base
+from focuswatch.database.models.activity import Activity
+from focuswatch.database.models.window_title import WindowTitle
+from focuswatch.services.activity_service import ActivityService
+from focuswatch.services.title_normalizer import TitleNormalizer
+from focuswatch.utils.query_cache import query_cache
+
+
+class TestTitleNormalizer(unittest.TestCase):
+  """ Unit tests for TitleNormalizer """
+
+  def test_counters_and_markers_are_stripped(self):
+    normalizer = TitleNormalizer()
+
+    self.assertEqual(normalizer.normalize("Slack", "(3) Slack | general"), "Slack | general")
+    self.assertEqual(normalizer.normalize("code", "● main.py - Visual Studio Code"),
+                     "main.py - Visual Studio Code")
+    self.assertEqual(normalizer.normalize("firefox", "Inbox (12) - me@example.com - Gmail"),
+                     "Inbox - me@example.com - Gmail")
+    self.assertEqual(normalizer.normalize("firefox", "Chapter(2) notes"), "Chapter(2) notes")
+    self.assertEqual(normalizer.normalize("term", "(3)"), "(3)")
+
+  def test_class_rules(self):
+    normalizer = TitleNormalizer(rules=[
+      {"window_class": "code", "pattern": r"^(.+) - (.+) - Visual Studio Code$", "replace": r"\2"},
+      {"pattern": r" — Mozilla Firefox$"},
+      {"pattern": "("},  # Invalid, skipped
+      " — Mozilla Firefox$",  # Not a mapping, skipped
+    ])
+
+    self.assertEqual(normalizer.normalize("Code", "main.py - focuswatch - Visual Studio Code"),
+                     "focuswatch")
+    self.assertEqual(normalizer.normalize("firefox", "main.py - focuswatch - Visual Studio Code"),
+                     "main.py - focuswatch - Visual Studio Code")
+    self.assertEqual(normalizer.normalize("firefox", "GitHub — Mozilla Firefox"), "GitHub")
+
+  def test_disabled(self):
+    normalizer = TitleNormalizer(rules=[{"pattern": "Slack"}], enabled=False)
+
+    self.assertEqual(normalizer.normalize("Slack", "(3) Slack"), "(3) Slack")
+    self.assertNotEqual(normalizer.fingerprint, TitleNormalizer().fingerprint)
+
+
+class TestNormalizedTitleTotals(unittest.TestCase):
+  """ The title aggregates group on the normalized titles """
+
+  def setUp(self):
+    self.engine = create_engine("sqlite://")
+    Base.metadata.create_all(self.engine)
+    for minute, name in enumerate(["(1) Slack | general", "(4) Slack | general",
+                                   "Slack | general", "main.py"]):
+      with self.engine.begin() as connection:
+        connection.execute(insert(Activity.__table__), {
+          "time_start": f"2024-06-30T10:{minute * 10:02d}:00",
+          "time_stop": f"2024-06-30T10:{minute * 10 + 10:02d}:00",
+          "window_class": "slack", "window_name": name, "focused": False})
+        connection.execute(insert(WindowTitle.__table__),
+                           {"window_class": "slack", "window_name": name})
+    self.db_conn = MagicMock()
+    self.db_conn.engine = self.engine
+    self.db_conn.get_session.side_effect = sessionmaker(bind=self.engine)
+
+  def tearDown(self):
+    query_cache.clear()
+
+  def _totals(self, normalizer):
+    query_cache.clear()
+    service = ActivityService(db_conn=self.db_conn, title_normalizer=normalizer)
+    return [(name, seconds) for name, _, seconds in
+            service.get_period_entries_name_time_total(datetime(2024, 6, 30))]
+
+  def test_totals_group_on_normalized_titles(self):
+    self.assertEqual(self._totals(TitleNormalizer()), [("Slack | general", 1800), ("main.py", 600)])
+
+  def test_keys_are_recomputed_when_rules_change(self):
+    self._totals(TitleNormalizer())
+
+    totals = self._totals(TitleNormalizer(rules=[{"pattern": r" \| .*$"}], strip_counters=False))
+
+    self.assertEqual(sorted(totals), [("(1) Slack", 600), ("(4) Slack", 600), ("Slack", 600), ("main.py", 600)])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,159 @@
+""" Unit tests for the WatcherService settings handling """
+import unittest
+from unittest.mock import MagicMock, patch
+
+from focuswatch.services.watcher_service import WatcherService
+
+
+class TestWatcherServiceSettings(unittest.TestCase):
+  """ Unit tests for hot reloading and the adaptive interval """
+
+  def setUp(self):
+    patcher_name = patch.object(
+      WatcherService, "get_active_window_name", return_value="vim")
+    patcher_class = patch.object(
+      WatcherService, "get_active_window_class", return_value="kitty")
+    patcher_name.start()
+    patcher_class.start()
+    self.addCleanup(patch.stopall)
+
+    self.watcher = WatcherService(
+      MagicMock(), MagicMock(), MagicMock(), watch_interval=None, verbose=0)
+    self.watcher._watch_interval = 1.0
+    self.watcher._max_watch_interval = 8.0
+    self.watcher._adaptive_interval = True
+    self.watcher._current_interval = 1.0
+
+  def tearDown(self):
+    self.watcher.stop()
+
+  def test_config_change_is_applied_between_ticks(self):
+    self.watcher._on_config_changed("general", "afk_timeout", 3)
+    self.watcher._on_config_changed("dashboard", "distracted_goal", 5)
+    self.assertNotEqual(self.watcher._afk_timeout, 3.0)
+
+    self.watcher._apply_pending_settings()
+    self.assertEqual(self.watcher._afk_timeout, 3.0)
+
+  def test_command_line_interval_is_not_overridden(self):
+    self.watcher._watch_interval_override = 2.0
+    self.watcher._on_config_changed("general", "watch_interval", 5.0)
+    self.watcher._apply_pending_settings()
+    self.assertEqual(self.watcher._watch_interval, 1.0)
+
+  def test_adaptive_interval_backs_off_while_idle(self):
+    intervals = []
+    for _ in range(5):
+      self.watcher._current_interval = self.watcher._next_interval(120, False)
+      intervals.append(self.watcher._current_interval)
+    self.assertEqual(intervals, [2.0, 4.0, 8.0, 8.0, 8.0])
+
+    # Input or a window change snaps back to the base interval
+    self.assertEqual(self.watcher._next_interval(0, False), 1.0)
+    self.assertEqual(self.watcher._next_interval(120, True), 1.0)
+
+  def test_idle_time_is_reused_without_afk_detection(self):
+    self.watcher._watch_afk = False
+    with patch.object(WatcherService, "_get_idle_time", return_value=40.0) as get_idle_time:
+      for now in (1000.0, 1001.0, 1004.0):
+        with patch("time.time", return_value=now):
+          idle_time = self.watcher._sample_idle_time()
+      self.assertEqual((get_idle_time.call_count, idle_time), (1, 44.0))
+      with patch("time.time", return_value=1005.0):
+        self.assertEqual(self.watcher._sample_idle_time(), 40.0)
+      self.assertEqual(get_idle_time.call_count, 2)
+
+      # AFK detection needs every sample
+      self.watcher._watch_afk = True
+      with patch("time.time", return_value=1006.0):
+        self.watcher._sample_idle_time()
+      self.assertEqual(get_idle_time.call_count, 3)
+
+  def test_adaptive_interval_disabled(self):
+    self.watcher._adaptive_interval = False
+    self.assertEqual(self.watcher._next_interval(120, False), 1.0)
+
+
+
+class TestWatcherServiceOpenActivity(unittest.TestCase):
+  """ Unit tests for the open activity row and its heartbeat """
+
+  def setUp(self):
+    self.window_name = "vim"
+    patcher_name = patch.object(
+      WatcherService, "get_active_window_name", side_effect=lambda: self.window_name)
+    patcher_class = patch.object(
+      WatcherService, "get_active_window_class", return_value="kitty")
+    patcher_name.start()
+    patcher_class.start()
+    self.addCleanup(patch.stopall)
+
+    self.activity_service = MagicMock()
+    self.activity_service.open_activity.side_effect = [1, 2, 3]
+    self.category_service = MagicMock()
+    self.category_service.get_category_id_from_name.return_value = 9
+    self.watcher = WatcherService(
+      self.activity_service, self.category_service, MagicMock(), watch_interval=None, verbose=0)
+    self.watcher._heartbeat_interval = 10.0
+    self.watcher._afk_timeout = 1
+
+  def tearDown(self):
+    self.watcher.stop()
+
+  def test_dangling_activity_is_recovered_on_start(self):
+    self.activity_service.recover_open_activity.assert_called_once()
+
+  def test_open_row_lifecycle(self):
+    self.watcher._time_start = 1000.0
+    self.watcher._open_entry()
+    self.assertEqual(self.activity_service.open_activity.call_args[0][0].window_name, "vim")
+
+    with patch("time.time", return_value=1005.0):
+      self.watcher._heartbeat()
+    self.activity_service.heartbeat_activity.assert_not_called()
+    with patch("time.time", return_value=1011.0):
+      self.watcher._heartbeat()
+    self.assertEqual(self.activity_service.heartbeat_activity.call_args[0][0], 1)
+
+    self.window_name = "notes.txt"
+    with patch("time.time", return_value=1020.0):
+      self.watcher._log_activity_change()
+      self.watcher._reset_activity_state()
+    activity_id, activity = self.activity_service.close_activity.call_args[0]
+    self.assertEqual((activity_id, activity.window_name, activity.duration), (1, "vim", 20.0))
+    self.activity_service.insert_activity.assert_not_called()
+    self.assertEqual(self.activity_service.open_activity.call_args[0][0].window_name, "notes.txt")
+
+  def test_afk_is_one_open_activity(self):
+    self.watcher._open_entry()
+    self.watcher._check_afk_status(120)
+    self.watcher._check_afk_status(300)
+
+    self.assertEqual(self.activity_service.close_activity.call_args[0][1].window_class, "afk")
+    afk = self.activity_service.open_activity.call_args[0][0]
+    self.assertEqual((afk.window_class, afk.category_id), ("afk", 9))
+    self.assertEqual(self.activity_service.open_activity.call_count, 2)
+
+    self.watcher._check_afk_status(0)
+    self.assertEqual(self.activity_service.close_activity.call_args[0][0], 2)
+    self.assertEqual(self.activity_service.open_activity.call_count, 3)
+
+  def test_change_log_is_pruned_periodically(self):
+    change_log_service = MagicMock()
+    self.watcher._change_log_service = change_log_service
+
+    # The first tick prunes, so does every tick PRUNE_INTERVAL later
+    with patch("time.time", return_value=1000.0):
+      self.watcher._prune_change_log()
+      self.watcher._prune_change_log()
+    self.assertEqual(change_log_service.prune.call_count, 1)
+    with patch("time.time", return_value=1000.0 + WatcherService.PRUNE_INTERVAL - 1):
+      self.watcher._prune_change_log()
+    self.assertEqual(change_log_service.prune.call_count, 1)
+    with patch("time.time", return_value=1000.0 + WatcherService.PRUNE_INTERVAL):
+      self.watcher._prune_change_log()
+    self.assertEqual(change_log_service.prune.call_count, 2)
+
+
+if __name__ == "__main__":
+  unittest.main()
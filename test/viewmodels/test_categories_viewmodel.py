@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import MagicMock
+
+from focuswatch.database.models.category import Category
+from focuswatch.viewmodels.categories_viewmodel import CategoriesViewModel
+
+
+class TestCategoriesViewModel(unittest.TestCase):
+  """ Test the category tree in CategoriesViewModel. """
+
+  def setUp(self) -> None:
+    self.rows = [
+      (Category(id=1, name="Work", color="#00cc00"), ["office"]),
+      (Category(id=2, name="Programming", parent_category_id=1), ["vim", "code"]),
+      (Category(id=3, name="Media", color="#ff0000"), []),
+      (Category(id=4, name="Python", parent_category_id=2), ["python"]),
+    ]
+    self.mock_category_service = MagicMock()
+    self.mock_category_service.get_categories_with_keywords.return_value = self.rows
+    self.mock_keyword_service = MagicMock()
+
+    self.viewmodel = CategoriesViewModel(
+        MagicMock(), self.mock_category_service, self.mock_keyword_service, MagicMock())
+
+  def test_tree_is_built_from_a_single_query(self) -> None:
+    """ Loading the page does not query keywords per category. """
+    self.mock_category_service.get_categories_with_keywords.assert_called_once_with()
+    self.mock_keyword_service.get_keywords_for_category.assert_not_called()
+
+    tree = self.viewmodel.organized_categories
+    self.assertEqual(tree[1]["children"], [2])
+    self.assertEqual(tree[2]["children"], [4])
+    self.assertEqual(tree[2]["keywords"], ["vim", "code"])
+    self.assertEqual(self.viewmodel.get_category_depth(4), 2)
+
+  def test_colors_are_inherited(self) -> None:
+    """ Categories without a color use their closest ancestor's color. """
+    tree = self.viewmodel.organized_categories
+    self.assertEqual(tree[4]["color"], "#00cc00")
+    self.assertEqual(tree[3]["color"], "#ff0000")
+
+  def test_refresh_category_moves_subtree(self) -> None:
+    """ Moving a category patches only its subtree. """
+    moved = Category(id=2, name="Programming", parent_category_id=3)
+    self.mock_category_service.get_categories_with_keywords.return_value = [
+      (moved, ["vim"])]
+    self.viewmodel.refresh_category(2)
+
+    self.mock_category_service.get_categories_with_keywords.assert_called_with([2])
+    tree = self.viewmodel.organized_categories
+    self.assertEqual(tree[1]["children"], [])
+    self.assertEqual(tree[3]["children"], [2])
+    self.assertEqual(tree[2]["children"], [4])
+    self.assertEqual(tree[4]["color"], "#ff0000")
+
+  def test_refresh_deleted_category(self) -> None:
+    """ Deleting a category turns its children into roots. """
+    self.mock_category_service.get_categories_with_keywords.return_value = []
+    self.viewmodel.refresh_category(2)
+
+    tree = self.viewmodel.organized_categories
+    self.assertNotIn(2, tree)
+    self.assertEqual(tree[1]["children"], [])
+    self.assertIsNone(tree[4]["category"].parent_category_id)
+    self.assertNotIn(2, [c.id for c in self.viewmodel.categories])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from focuswatch.utils.query_cache import query_cache
+from focuswatch.viewmodels.home_viewmodel import HomeViewModel
+
+
+class TestHomeViewModelPrefetch(unittest.TestCase):
+  """ Test the prefetch of the periods adjacent to the displayed one. """
+
+  def setUp(self) -> None:
+    self.activity_service = MagicMock()
+    self.activity_service.get_period_entries.return_value = []
+    self.category_service = MagicMock()
+    self.category_service.get_period_category_rollup.return_value = []
+    config = {"dashboard": {"display_cards_idle": True, "display_timeline_idle": True,
+                            "distracted_goal": 20.0, "focused_target_day": 8.0,
+                            "focused_target_month": 160.0, "prefetch_adjacent_periods": True}}
+    self.viewmodel = HomeViewModel(self.activity_service, self.category_service, config)
+    self.viewmodel.PREFETCH_PAUSE = 0
+
+  def test_adjacent_periods(self) -> None:
+    self.viewmodel.set_period_type("Month")
+    self.viewmodel.update_period_from_selected_date(datetime(2024, 1, 15))
+
+    self.assertEqual(self.viewmodel.adjacent_periods(), [
+      (datetime(2023, 12, 1), datetime(2023, 12, 31)),
+      (datetime(2024, 2, 1), datetime(2024, 2, 29)),
+    ])
+
+  def test_future_period_is_not_prefetched(self) -> None:
+    self.viewmodel.set_period_type("Day")
+
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    self.assertEqual(self.viewmodel.adjacent_periods(), [(today - timedelta(days=1), None)])
+
+  def test_prefetch_runs_the_dashboard_queries(self) -> None:
+    period = (datetime(2024, 6, 29), None)
+    with patch.object(query_cache, "seconds_since_write", return_value=60.0):
+      self.viewmodel.prefetch_periods([period])
+
+    for query in (self.activity_service.get_period_entries,
+                  self.activity_service.get_period_entries_class_time_total,
+                  self.activity_service.get_period_entries_name_time_total,
+                  self.category_service.get_period_category_rollup):
+      query.assert_called_with(*period)
+
+  def test_prefetch_backs_off_while_writing(self) -> None:
+    self.viewmodel.PREFETCH_MAX_WAIT = 0.1
+    self.viewmodel.PREFETCH_QUIET_SECONDS = 0.05
+    self.activity_service.reset_mock()
+    with patch.object(query_cache, "seconds_since_write", return_value=0.0):
+      self.viewmodel.prefetch_periods([(datetime(2024, 6, 29), None)])
+
+    self.activity_service.get_period_entries.assert_not_called()
+
+  def test_stale_prefetch_stops(self) -> None:
+    self.activity_service.reset_mock()
+    with patch.object(query_cache, "seconds_since_write", return_value=60.0):
+      self.viewmodel.prefetch_periods([(datetime(2024, 6, 29), None)], generation=-1)
+
+    self.activity_service.get_period_entries.assert_not_called()
+
+
+if __name__ == "__main__":
+  unittest.main()
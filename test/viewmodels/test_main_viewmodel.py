@@ -0,0 +1,59 @@
+""" Unit tests for the data transfers of MainViewModel """
+import unittest
+from unittest.mock import MagicMock, patch
+
+from PySide6.QtCore import Qt
+
+from focuswatch.viewmodels.main_viewmodel import MainViewModel
+
+
+class TestMainViewModelTransfers(unittest.TestCase):
+  """ Test the background exports and imports of the MainViewModel. """
+
+  def setUp(self) -> None:
+    self.export_service = MagicMock()
+    self.import_service = MagicMock()
+    self.viewmodel = MainViewModel(
+      MagicMock(), MagicMock(), MagicMock(), MagicMock(),
+      export_service=self.export_service, import_service=self.import_service)
+    self.finished = []
+    self.viewmodel.transfer_finished.connect(
+      lambda success, count: self.finished.append((success, count)), Qt.DirectConnection)
+
+  def _wait(self) -> None:
+    self.viewmodel._transfer_thread.join(5)  # pylint: disable=protected-access
+
+  def test_export_finishes(self) -> None:
+    self.export_service.export.return_value = 15
+    self.assertTrue(self.viewmodel.export_data("activities.csv"))
+    self._wait()
+
+    self.assertFalse(self.viewmodel.is_transferring)
+    self.assertEqual(self.finished, [(True, 15)])
+
+  def test_export_exception_ends_the_transfer(self) -> None:
+    self.export_service.export.side_effect = TypeError("not serializable")
+    # The exception still reaches the thread's excepthook, keep it out of the output
+    with patch("threading.excepthook"):
+      self.assertTrue(self.viewmodel.export_data("activities.jsonl"))
+      self._wait()
+
+    self.assertFalse(self.viewmodel.is_transferring)
+    self.assertEqual(self.finished, [(False, 0)])
+    # A new transfer can be started
+    self.export_service.export.side_effect = None
+    self.assertTrue(self.viewmodel.export_data("activities.jsonl"))
+    self._wait()
+
+
+  def test_import_exception_ends_the_transfer(self) -> None:
+    self.import_service.import_file.side_effect = AttributeError("unexpected")
+    with patch("threading.excepthook"):
+      self.assertTrue(self.viewmodel.import_data("aw-export.json"))
+      self._wait()
+
+    self.assertFalse(self.viewmodel.is_transferring)
+    self.assertEqual(self.finished, [(False, 0)])
+
+if __name__ == "__main__":
+  unittest.main()
@@ -8,7 +8,7 @@ from focuswatch.viewmodels.home_viewmodel import HomeViewModel
 
 class TestMainWindowViewModel(unittest.TestCase):
   """ Test the MainWindowViewModel. """
-  PAGES = ["home", "categories", "settings"]
+  PAGES = ["home", "categories", "settings", "diagnostics"]
 
   def setUp(self) -> None:
     self.mock_activity_service = MagicMock()
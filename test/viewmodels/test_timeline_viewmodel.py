@@ -0,0 +1,70 @@
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from focuswatch.database.models.category import Category
+from focuswatch.viewmodels.components.timeline_viewmodel import \
+    TimelineViewModel
+
+
+def entry(start: str, stop: str, category_id: int) -> SimpleNamespace:
+  return SimpleNamespace(time_start=datetime.fromisoformat(start),
+                         time_stop=datetime.fromisoformat(stop),
+                         window_class="app", window_name="title",
+                         category_id=category_id)
+
+
+class TestTimelineViewModel(unittest.TestCase):
+  """ Test the timeline blocks built by TimelineViewModel. """
+
+  def setUp(self) -> None:
+    self.mock_activity_service = MagicMock()
+    self.mock_activity_service.get_period_entries.return_value = [
+      entry("2024-06-30T09:00:00", "2024-06-30T09:30:00", 2),
+      entry("2024-06-30T09:30:00", "2024-06-30T09:40:00", 3),
+      entry("2024-06-30T13:00:00", "2024-06-30T13:10:00", 99),
+    ]
+    self.mock_category_service = MagicMock()
+    self.mock_category_service.get_all_categories.return_value = [
+      Category(id=1, name="Work", color="#00cc00"),
+      Category(id=2, name="Programming", parent_category_id=1),
+      Category(id=3, name="Media", color="#ff0000"),
+    ]
+    config = {"dashboard": {"display_timeline_idle": True}}
+
+    self.viewmodel = TimelineViewModel(
+      self.mock_activity_service, self.mock_category_service, config)
+
+  def test_blocks_follow_activities(self) -> None:
+    """ Each activity forms a block; unknown categories are skipped. """
+    blocks = self.viewmodel.timeline_blocks
+    self.assertEqual([(b.start_minute, b.duration, b.category_id) for b in blocks],
+                     [(540, 30, 2), (570, 10, 3)])
+
+  def test_minute_resolution(self) -> None:
+    """ Short activities keep their own block, blocks never overlap. """
+    self.mock_activity_service.get_period_entries.return_value = [
+      entry("2024-06-30T10:00:00", "2024-06-30T10:02:30", 2),
+      entry("2024-06-30T10:02:30", "2024-06-30T10:02:50", 3),  # within a covered minute
+      entry("2024-06-30T10:02:50", "2024-06-30T10:05:00", 3),
+      entry("2024-06-30T10:05:00", "2024-06-30T10:06:00", 3),
+      entry("2024-06-30T23:58:00", "2024-07-01T00:01:00", 2),
+    ]
+    self.viewmodel.update_timeline_data()
+    blocks = self.viewmodel.timeline_blocks
+    self.assertEqual([(b.start_minute, b.duration, b.category_id) for b in blocks],
+                     [(0, 1, 2), (600, 3, 2), (603, 3, 3), (1438, 2, 2)])
+
+  def test_blocks_resolve_names_and_colors_once(self) -> None:
+    """ Names, parents and inherited colors come from one category query. """
+    programming = self.viewmodel.timeline_blocks[0]
+    self.assertEqual(programming.category_name, "Programming")
+    self.assertEqual(programming.parent_name, "Work")
+    self.assertEqual(programming.color, "#00cc00")
+    self.mock_category_service.get_all_categories.assert_called_once()
+    self.mock_category_service.get_category_by_id.assert_not_called()
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from focuswatch.database.models.category import Category
+from focuswatch.viewmodels.components.top_categories_card_viewmodel import \
+    TopCategoriesCardViewModel
+
+
+class TestTopCategoriesCardViewModel(unittest.TestCase):
+  """ Test the category hierarchy built from the period rollup. """
+
+  def setUp(self) -> None:
+    self.rollup = [
+      (Category(id=1, name="Work", color="#00cc00"), 0, 300),
+      (Category(id=4, name="AFK", color="#999999"), 250, 250),
+      (Category(id=2, name="Programming", parent_category_id=1), 120, 200),
+      (Category(id=3, name="Python", parent_category_id=2), 80, 80),
+      (Category(id=5, name="Documents", parent_category_id=1), 100, 100),
+    ]
+    self.mock_category_service = MagicMock()
+    self.mock_category_service.get_period_category_rollup.return_value = self.rollup
+    self.config = {"dashboard": {"display_cards_idle": False}}
+
+    self.viewmodel = TopCategoriesCardViewModel(
+      MagicMock(), self.mock_category_service, self.config, datetime(2024, 6, 30))
+
+  def test_hierarchy_from_a_single_query(self) -> None:
+    """ Subtree times come from the rollup without per-category lookups. """
+    self.mock_category_service.get_period_category_rollup.assert_called_once()
+    self.mock_category_service.get_category_by_id.assert_not_called()
+
+    organized = self.viewmodel.organized_categories
+    self.assertEqual(list(organized), [1])  # AFK is hidden
+    work = organized[1]
+    self.assertEqual(work["time"], 300)
+    self.assertEqual([child["category"].id for child in work["children"]], [2, 5])
+    self.assertEqual(work["children"][0]["children"][0]["time"], 80)
+
+  def test_lookups_use_the_node_map(self) -> None:
+    """ Colors, depth and visibility are answered from the id-indexed nodes. """
+    self.assertEqual(self.viewmodel.get_category_color(3), "#00cc00")
+    self.assertEqual(self.viewmodel.get_category_depth(3), 2)
+
+    self.viewmodel.toggle_category_visibility(2)
+    self.assertFalse(self.viewmodel.is_category_visible(2))
+    self.assertEqual(self.viewmodel.get_visible_categories(),
+                     [(1, 300), (5, 100)])
+    self.mock_category_service.get_category_depth.assert_not_called()
+
+  def test_visibility_survives_refresh(self) -> None:
+    """ Collapsed categories stay collapsed when the period is reloaded. """
+    self.viewmodel.toggle_category_visibility(2)
+    self.viewmodel.update_top_items()
+    self.assertFalse(self.viewmodel.is_category_visible(2))
+
+
+if __name__ == "__main__":
+  unittest.main()
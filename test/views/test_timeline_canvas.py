@@ -0,0 +1,60 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from PySide6.QtCore import QPoint, QPointF, Qt
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication
+
+from focuswatch.viewmodels.components.timeline_viewmodel import TimelineBlock
+from focuswatch.views.components.timeline_canvas import TimelineCanvas
+
+
+@pytest.fixture(scope="module", autouse=True)
+def app():
+  """ Module-scoped fixture providing the QApplication for Qt tests. """
+  qapp = QApplication.instance()
+  if qapp is None:
+    qapp = QApplication([])
+  yield qapp
+
+
+class TestTimelineCanvas:
+  """ Test hit-testing and painting of the TimelineCanvas. """
+
+  @pytest.fixture
+  def canvas(self):
+    viewmodel = MagicMock()
+    viewmodel.period_start = datetime(2024, 6, 30)
+    viewmodel.get_top_entries.return_value = [
+      {"window_class": "code", "window_name": "main.py", "duration": 600}]
+    canvas = TimelineCanvas(viewmodel, hour_height=60)
+    canvas.resize(300, canvas.height())
+    # One block per minute-resolution chunk over the whole day
+    canvas.set_blocks([
+      TimelineBlock(minute, 1, minute % 7 + 1, f"Category {minute % 7}", None, "#00cc00")
+      for minute in range(0, 24 * 60, 2)])
+    return canvas
+
+  def test_block_at(self, canvas):
+    assert canvas.block_at(QPointF(100, 600.5)).start_minute == 600
+    assert canvas.block_at(QPointF(100, 601.5)) is None  # gap between blocks
+    assert canvas.block_at(QPointF(10, 600.5)) is None  # hour labels
+
+  def test_tooltip_is_built_lazily_once(self, canvas):
+    block = canvas.block_at(QPointF(100, 600.5))
+    text = canvas._tooltip(block)  # pylint: disable=protected-access
+    canvas._tooltip(block)  # pylint: disable=protected-access
+
+    assert "code | main.py (10.0 min)" in text
+    canvas._viewmodel.get_top_entries.assert_called_once()  # pylint: disable=protected-access
+
+  def test_click_emits_block(self, canvas):
+    clicked = []
+    canvas.block_clicked.connect(clicked.append)
+    QTest.mouseClick(canvas, Qt.LeftButton, pos=QPoint(100, 120))
+    QTest.mouseClick(canvas, Qt.LeftButton, pos=QPoint(100, 121))
+    assert [block.start_minute for block in clicked] == [120]
+
+  def test_paint_thousands_of_blocks(self, canvas):
+    assert not canvas.grab().isNull()